@@ -7,14 +7,34 @@ Extracts pain points, purchase intent, and need patterns from Reddit comments us
 import json
 import logging
 import os
-from typing import List, Dict, Any
-from dataclasses import dataclass
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Collection, Dict, Generator, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+
+import numpy as np
 from openai import OpenAI
 
 import config as cfg
+from comment_ranker import rank_table
+from comment_table import CommentTable
+from llm_cache import AnalysisCache, make_key
+from prompts import PROMPT_VERSION, analysis_messages, repair_messages
+from reddit_fetcher import iter_comment_dicts
+from response_schema import (ANSWER_ERRORS, RESPONSE_FORMAT, check_pain_point, merge_repair, parse_answer,
+                             salvage_analysis)
+from stream_parser import PainPointScanner
+from token_counter import COMMENT_SEPARATOR, format_comment, pack_comments
 
 logger = logging.getLogger(__name__)
 
+# sentiment_summary of an analysis whose answer could not be used
+FAILED_SENTIMENT = 'Analysis failed: invalid response format'
+
+SEVERITY_ORDER = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+INTENT_ORDER = {'none': 1, 'low': 2, 'medium': 3, 'high': 4}
+
 
 @dataclass
 class PainPoint:
@@ -38,59 +58,234 @@ class AnalysisResult:
     market_opportunities: List[str]
     sentiment_summary: str
     analyzed_comments: int = 0
+    tokens_used: int = 0
+    packed_tokens: int = 0   # local estimate of the packed comments, not API usage
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cache_hit: bool = False
+    failed: bool = False     # (part of) the model's answer could not be used
+    # Ids of the comments packed into the prompts; empty if the analysis failed
+    comment_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PromptRequest:
+    """One chat completion to send, with the bookkeeping to finish it"""
+    messages: List[Dict[str, str]]
+    packing: Dict[str, int]     # packed_tokens / packed_comments
+    cache_key: Optional[str]
+
+
+@dataclass
+class UsageStats:
+    """OpenAI usage of one model over a run"""
+    model: str
+    requests: int = 0
+    cache_hits: int = 0     # answers reused from the local result cache
+    input_tokens: int = 0
+    cached_tokens: int = 0  # input tokens served from the provider's prompt cache
+    output_tokens: int = 0
+    batch: bool = False     # Batch API requests, billed at config.BATCH_PRICE_FACTOR
+
+    @property
+    def prompt_cache_ratio(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    @property
+    def cost(self) -> Optional[float]:
+        """Estimated USD, with cached input tokens at the cached price"""
+        return self._billed(estimate_cost(self.model, self.input_tokens, self.output_tokens, self.cached_tokens))
+
+    @property
+    def uncached_cost(self) -> Optional[float]:
+        """Estimated USD had no input tokens come from the prompt cache"""
+        return self._billed(estimate_cost(self.model, self.input_tokens, self.output_tokens))
+
+    def _billed(self, cost: Optional[float]) -> Optional[float]:
+        if cost is None or not self.batch:
+            return cost
+        return cost * cfg.BATCH_PRICE_FACTOR
 
 
 class AIAnalyzer:
     """AI Analysis Engine"""
 
-    def __init__(self, model: str | None = None, api_key: str | None = None):
+    cache: AnalysisCache | None = None
+    refresh: bool = False
+    map_reduce: bool = cfg.MAP_REDUCE
+    # Per-model usage of this analyzer (see log_usage)
+    usage: Dict[str, UsageStats] | None = None
+    _usage_lock = threading.Lock()
+
+    def __init__(self, model: str | None = None, api_key: str | None = None,
+                 cache: AnalysisCache | None = None, refresh: bool = False,
+                 map_reduce: bool | None = None):
         """
         Args:
             model: Model to use. Defaults to config.MODEL.
             api_key: OpenAI API key. Falls back to OPENAI_API_KEY env var if None.
+            cache: Persistent result cache. None disables caching.
+            refresh: Ignore existing cache entries but still store new results.
+            map_reduce: Analyze every comment in concurrent chunks instead of
+                the first MAX_COMMENTS. Defaults to config.MAP_REDUCE.
         """
         self.client = OpenAI(api_key=api_key) if api_key else OpenAI()
         self.model = model or cfg.MODEL
+        self.cache = cache
+        self.refresh = refresh
+        if map_reduce is not None:
+            self.map_reduce = map_reduce
 
-    def analyze_thread(self, thread_data: Dict[str, Any]) -> AnalysisResult:
+    def analyze_thread(self, thread_data: Dict[str, Any],
+                       skip_comment_ids: Collection[str] = ()) -> AnalysisResult:
         """
         Analyze an entire thread to extract pain points, purchase intent, and market opportunities.
 
         Args:
             thread_data: Thread data fetched by reddit_fetcher.py
+            skip_comment_ids: Comment ids already analyzed earlier; only the
+                remaining comments are sent (see merge_results).
 
         Returns:
             AnalysisResult: Analysis results
         """
-        # Flatten comments
-        all_comments = self._flatten_comments(thread_data.get('comments', []))
+        comment_texts, comment_ids, total = self._select_comments(thread_data, skip_comment_ids)
+        batches, analyzed = self._comment_batches(comment_texts, total)
+        analysis = self._analyze_batches(
+            thread_data.get('title', ''), thread_data.get('selftext', ''), batches,
+        )
+        return self._build_result(thread_data, total, analysis, analyzed, comment_ids)
+
+    def analyze_thread_stream(self, thread_data: Dict[str, Any],
+                              skip_comment_ids: Collection[str] = ()) -> Iterator[Tuple[str, Any]]:
+        """
+        Like analyze_thread, but streams the model's answer and reports
+        progress as it arrives.
+
+        Yields:
+            ('pain_point', PainPoint) for each pain point, as soon as its JSON
+            object is complete, then ('result', AnalysisResult) last. Cache
+            hits and map-reduce runs (several requests) yield all their pain
+            points at once, when the analysis is done.
+        """
+        comment_texts, comment_ids, total = self._select_comments(thread_data, skip_comment_ids)
+        batches, analyzed = self._comment_batches(comment_texts, total)
+        title, body = thread_data.get('title', ''), thread_data.get('selftext', '')
+
+        if len(batches) == 1:
+            analysis = yield from self._stream_with_ai(title, body, batches[0])
+        else:
+            analysis = self._analyze_batches(title, body, batches)
+            for pain_point in analysis['pain_points']:
+                yield 'pain_point', pain_point
+
+        yield 'result', self._build_result(thread_data, total, analysis, analyzed, comment_ids)
+
+    def _stream_with_ai(self, thread_title: str, thread_body: str,
+                        comments: List[str]) -> Generator[Tuple[str, Any], None, Dict[str, Any]]:
+        """_analyze_with_ai with a streamed answer; yields pain points, returns the analysis"""
+        request = self._build_request(thread_title, thread_body, comments)
+        cached = self._cached_analysis(request)
+        if cached:
+            for pain_point in cached['pain_points']:
+                yield 'pain_point', pain_point
+            return cached
+
+        scanner: Optional[PainPointScanner] = PainPointScanner()
+        parts: List[str] = []
+        tokens = completion_tokens = cached_tokens = 0
+        try:
+            stream = self.client.chat.completions.create(
+                **self._completion_kwargs(request),
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            for chunk in stream:
+                if chunk.usage:
+                    tokens, completion_tokens = _total_tokens(chunk), _completion_tokens(chunk)
+                    cached_tokens = _cached_tokens(chunk)
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                text = chunk.choices[0].delta.content
+                parts.append(text)
+                if scanner is None:
+                    continue
+                try:
+                    events = scanner.feed_text(text)
+                except ValueError:
+                    # Not the expected shape; the full answer is still parsed below
+                    scanner = None
+                    continue
+                for _, value in events:
+                    if check_pain_point(value):
+                        yield 'pain_point', pain_point_from_dict(value)
+
+            return self._finish_request(request, ''.join(parts).strip(), tokens, completion_tokens,
+                                        cached_tokens)
+        except ANSWER_ERRORS as e:
+            logger.error("AI returned an unusable answer: %s", e)
+            return self._failed_analysis(request)
+        except Exception as e:
+            logger.error("AI analysis error: %s", e)
+            raise
+
+    def _analyze_batches(self, thread_title: str, thread_body: str,
+                         batches: List[List[str]]) -> Dict[str, Any]:
+        """One request per batch (concurrently when there are several), merged"""
+        if len(batches) == 1:
+            return self._analyze_with_ai(
+                thread_title=thread_title, thread_body=thread_body, comments=batches[0],
+            )
+
+        with ThreadPoolExecutor(max_workers=cfg.CHUNK_CONCURRENCY) as pool:
+            partials = list(pool.map(
+                lambda chunk: self._analyze_with_ai(thread_title, thread_body, chunk),
+                batches,
+            ))
+
+        return merge_analyses(partials)
+
+    def _select_comments(self, thread_data: Dict[str, Any],
+                         skip_comment_ids: Collection[str] = ()) -> Tuple[List[str], List[str], int]:
+        """Usable comment bodies, most informative first, their ids, and how many there are"""
+        table = CommentTable.from_dicts(thread_data.get('comments', []))
+        rows = _usable_rows(table, skip_comment_ids)
 
-        # Extract comment texts
-        comment_texts = [
-            c['body'] for c in all_comments
-            if c['body']
-            and len(c['body']) > 10
-            and c['body'] not in ('[deleted]', '[removed]')
-        ]
+        # Most informative comments first, so the cap and token budget keep them
+        if cfg.RANK_COMMENTS:
+            rows = rank_table(table, rows)
+        return table.bodies(rows), table.ids[rows].tolist(), len(rows)
+
+    def _comment_batches(self, comment_texts: List[str], total: int) -> Tuple[List[List[str]], int]:
+        """
+        Split comments into per-request batches: one capped batch, or
+        token-budgeted chunks in map-reduce mode.
+
+        Returns:
+            (batches, number of comments analyzed); always at least one batch.
+        """
+        if self.map_reduce:
+            return self._map_reduce_batches(comment_texts)
 
         max_comments = cfg.MAX_COMMENTS
-        total = len(comment_texts)
         capped = comment_texts[:max_comments]
-
         if total > max_comments:
             logger.warning(
-                "Comment limit: %d total, analyzing first %d",
+                "Comment limit: %d total, analyzing top %d",
                 total, max_comments,
             )
         logger.info("Analyzing: processing %d comments...", len(capped))
+        return [capped], len(capped)
 
-        # Batch AI analysis
-        analysis = self._analyze_with_ai(
-            thread_title=thread_data.get('title', ''),
-            thread_body=thread_data.get('selftext', ''),
-            comments=capped,
-        )
-
+    def _build_result(self, thread_data: Dict[str, Any], total: int, analysis: Dict[str, Any],
+                      analyzed: int, comment_ids: Sequence[str] = ()) -> AnalysisResult:
+        """
+        AnalysisResult of *analysis*. Batches and token packing always keep
+        a prefix of the selected comments, so the ids sent are the first
+        analyzed_comments of *comment_ids*.
+        """
+        analyzed = analysis.get('packed_comments', analyzed)
+        failed = analysis.get('failed', False)
         return AnalysisResult(
             thread_id=thread_data.get('id', ''),
             thread_title=thread_data.get('title', ''),
@@ -99,146 +294,284 @@ class AIAnalyzer:
             key_insights=analysis['key_insights'],
             market_opportunities=analysis['market_opportunities'],
             sentiment_summary=analysis['sentiment_summary'],
-            analyzed_comments=len(capped),
+            analyzed_comments=analyzed,
+            tokens_used=analysis.get('tokens_used', 0),
+            packed_tokens=analysis.get('packed_tokens', 0),
+            completion_tokens=analysis.get('completion_tokens', 0),
+            cached_tokens=analysis.get('cached_tokens', 0),
+            cache_hit=analysis.get('cache_hit', False),
+            failed=failed,
+            comment_ids=[] if failed else list(comment_ids[:analyzed]),
         )
 
+    def _map_reduce_batches(self, comments: List[str]) -> Tuple[List[List[str]], int]:
+        """Token-budgeted chunks, limited to MAP_REDUCE_MAX_CHUNKS (at least one, maybe empty)"""
+        chunks = self._chunk_comments(comments)
+        if len(chunks) > cfg.MAP_REDUCE_MAX_CHUNKS:
+            logger.warning(
+                "Chunk limit: %d chunks, analyzing first %d",
+                len(chunks), cfg.MAP_REDUCE_MAX_CHUNKS,
+            )
+            chunks = chunks[:cfg.MAP_REDUCE_MAX_CHUNKS]
+
+        analyzed = sum(len(c) for c in chunks)
+        logger.info("Analyzing: %d comments in %d chunks...", analyzed, len(chunks))
+        return chunks or [[]], analyzed
+
+    def _chunk_comments(self, comments: List[str]) -> List[List[str]]:
+        """Split comments into consecutive chunks that each fill one prompt's token budget"""
+        chunks: List[List[str]] = []
+        start = 0
+        while start < len(comments):
+            packed = pack_comments(comments[start:], model=self.model)
+            chunks.append(comments[start:start + packed.consumed])
+            start += packed.consumed
+        return chunks
+
     def _flatten_comments(self, comments: List[Dict], result: List[Dict] = None) -> List[Dict]:
-        """Recursively flatten comments"""
+        """Flatten nested comment dicts in pre-order (iterative, any depth)"""
         if result is None:
             result = []
-
-        for comment in comments:
-            result.append(comment)
-            if comment.get('replies'):
-                self._flatten_comments(comment['replies'], result)
-
+        result.extend(iter_comment_dicts(comments))
         return result
 
     def _analyze_with_ai(self, thread_title: str, thread_body: str, comments: List[str]) -> Dict[str, Any]:
         """Analyze comments using AI"""
+        request = self._build_request(thread_title, thread_body, comments)
+        cached = self._cached_analysis(request)
+        if cached:
+            return cached
+
+        try:
+            response = self.client.chat.completions.create(**self._completion_kwargs(request))
+            return self._finish_request(request, response.choices[0].message.content.strip(),
+                                        _total_tokens(response), _completion_tokens(response),
+                                        _cached_tokens(response))
+        except ANSWER_ERRORS as e:
+            logger.error("AI returned an unusable answer: %s", e)
+            return self._failed_analysis(request)
+        except Exception as e:
+            logger.error("AI analysis error: %s", e)
+            raise
+
+    def _build_request(self, thread_title: str, thread_body: str, comments: List[str]) -> PromptRequest:
+        """Pack comments into the token budget and build the chat messages"""
+        # Fill the token budget rather than a fixed number of comments
+        packed = pack_comments(comments, model=self.model)
+        if packed.consumed < len(comments):
+            logger.info(
+                "Prompt budget: packed %d of %d comments (%d tokens)",
+                packed.consumed, len(comments), packed.tokens,
+            )
+        comments = packed.comments
+        packing = {'packed_tokens': packed.tokens, 'packed_comments': packed.consumed}
 
         # Combine comments
-        comments_text = "\n\n---\n\n".join(
-            [f"Comment {i+1}: {c}" for i, c in enumerate(comments[:cfg.MAX_COMMENTS_IN_PROMPT])]
+        comments_text = COMMENT_SEPARATOR.join(
+            [format_comment(i + 1, c) for i, c in enumerate(comments)]
         )
 
-        prompt = f"""You are an expert in market research and business opportunity discovery.
-Analyze the following Reddit thread and comments, then extract customer "pain points", "purchase intent", and "market opportunities".
-
-【Thread Title】
-{thread_title}
-
-【Thread Body】
-{thread_body}
-
-【Comments】
-{comments_text}
-
-Return the analysis results in the following JSON format:
-
-{{
-  "pain_points": [
-    {{
-      "description": "Description of the pain point",
-      "severity": "one of: low/medium/high/critical",
-      "frequency_mentioned": estimated number of times mentioned in comments,
-      "example_comments": ["actual comment example 1", "actual comment example 2"],
-      "purchase_intent": "one of: none/low/medium/high",
-      "category": "category name (e.g., Marketing, Finance, Operations, Technology, etc.)"
-    }}
-  ],
-  "key_insights": [
-    "Important insight 1",
-    "Important insight 2",
-    "Important insight 3"
-  ],
-  "market_opportunities": [
-    "Market opportunity 1: specific product/service idea",
-    "Market opportunity 2: specific product/service idea"
-  ],
-  "sentiment_summary": "Summary of overall sentiment (positive/negative/neutral, with reasoning)"
-}}
-
-Important instructions:
-1. Focus on specific, actionable pain points
-2. Evaluate purchase intent by the urgency of "I need a solution right now"
-3. Focus market opportunities on products/services that can actually be sold
-4. Prioritize problems people would "pay money to solve"
-5. Always respond in JSON format only (no other text)
-"""
+        cache_key = None
+        if self.cache:
+            cache_key = make_key(self.model, cfg.TEMPERATURE, PROMPT_VERSION,
+                                 thread_title, thread_body, comments)
+
+        return PromptRequest(
+            messages=analysis_messages(thread_title, thread_body, comments_text),
+            packing=packing,
+            cache_key=cache_key,
+        )
+
+    def _completion_kwargs(self, request: PromptRequest) -> Dict[str, Any]:
+        """Arguments for chat.completions.create"""
+        return {
+            'model': self.model,
+            'messages': request.messages,
+            'temperature': cfg.TEMPERATURE,
+            'response_format': RESPONSE_FORMAT if cfg.STRUCTURED_OUTPUT else {"type": "json_object"},
+        }
+
+    def _cached_text(self, request: PromptRequest) -> Optional[Tuple[str, int]]:
+        """Stored (answer text, tokens) for *request*, unless caching is off or refreshing"""
+        if not self.cache or self.refresh:
+            return None
+        return self.cache.get(request.cache_key)
 
+    def _cached_answer(self, request: PromptRequest) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Stored (validated answer, tokens) for *request*. An entry that no
+        longer parses is discarded and treated as a miss.
+        """
+        cached = self._cached_text(request)
+        if not cached:
+            return None
+        result_text, tokens = cached
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a market research expert. Respond only in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=cfg.TEMPERATURE,
-                response_format={"type": "json_object"}
-            )
+            return parse_answer(result_text), tokens
+        except ANSWER_ERRORS as e:
+            logger.warning("Discarding unusable cached analysis: %s", e)
+            self.cache.discard(request.cache_key)
+            return None
+
+    def _cached_analysis(self, request: PromptRequest) -> Optional[Dict[str, Any]]:
+        """Stored analysis for *request*, unless caching is off or refreshing"""
+        cached = self._cached_answer(request)
+        if not cached:
+            return None
+        answer, tokens = cached
+        logger.info("Cache hit: reusing analysis (%d tokens saved)", tokens)
+        self._record_usage(self.model, cache_hit=True)
+        analysis = _analysis_fields(answer)
+        analysis['tokens_used'] = tokens
+        analysis['cache_hit'] = True
+        analysis.update(request.packing)
+        return analysis
+
+    def _finish_request(self, request: PromptRequest, result_text: str, tokens: int,
+                        completion_tokens: int = 0, cached_tokens: int = 0,
+                        batch: bool = False) -> Dict[str, Any]:
+        """
+        Record the usage of a request, parse the model's answer and cache it.
+        A malformed answer is salvaged, and its unparsed rest repaired with a
+        short re-ask (see _finish_salvaged).
 
-            result_text = response.choices[0].message.content.strip()
-            # Strip markdown code fences if present
-            if result_text.startswith("```"):
-                result_text = result_text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-            result = json.loads(result_text)
-
-            # Convert to PainPoint objects
-            pain_points = []
-            for pp in result.get('pain_points', []):
-                pain_points.append(PainPoint(
-                    description=pp.get('description', ''),
-                    severity=pp.get('severity', 'medium'),
-                    frequency_mentioned=pp.get('frequency_mentioned', 0),
-                    example_comments=pp.get('example_comments', []),
-                    purchase_intent=pp.get('purchase_intent', 'none'),
-                    category=pp.get('category', 'Other')
-                ))
-
-            return {
-                'pain_points': pain_points,
-                'key_insights': result.get('key_insights', []),
-                'market_opportunities': result.get('market_opportunities', []),
-                'sentiment_summary': result.get('sentiment_summary', '')
-            }
+        Args:
+            batch: The answer came from the Batch API; its usage is recorded
+                separately, at the batch price.
 
-        except json.JSONDecodeError as e:
-            logger.error("AI returned invalid JSON: %s", e)
-            return {
-                'pain_points': [],
-                'key_insights': [],
-                'market_opportunities': [],
-                'sentiment_summary': 'Analysis failed: invalid response format'
-            }
+        Raises:
+            json.JSONDecodeError, SchemaError: Nothing could be recovered.
+        """
+        self._record_usage(self.model, tokens, completion_tokens, cached_tokens, batch=batch)
+        try:
+            answer = parse_answer(result_text)
+        except ANSWER_ERRORS as e:
+            salvaged, fragment = salvage_analysis(result_text)
+            repair = self._repair(fragment) if fragment else None
+            return self._finish_salvaged(request, salvaged, repair, e, tokens, completion_tokens,
+                                         cached_tokens)
+        return self._finish_answer(request, answer, result_text, tokens, completion_tokens, cached_tokens)
+
+    def _repair(self, fragment: str):
+        """
+        Ask the model to fix only the unparsed rest of an answer (not the
+        whole prompt again). Returns the response, or None.
+        """
+        if not cfg.REPAIR_MALFORMED:
+            return None
+        logger.info("Repairing the unparsed end of the answer (%d characters)", len(fragment))
+        try:
+            return self.client.chat.completions.create(**self._completion_kwargs(_repair_request(fragment)))
         except Exception as e:
-            logger.error("AI analysis error: %s", e)
-            raise
+            logger.warning("Repair request failed: %s", e)
+            return None
 
-    def save_analysis(self, result: AnalysisResult, filepath: str):
-        """Save analysis results to a JSON file"""
-        data = {
-            'thread_id': result.thread_id,
-            'thread_title': result.thread_title,
-            'total_comments': result.total_comments,
-            'pain_points': [
-                {
-                    'description': pp.description,
-                    'severity': pp.severity,
-                    'frequency_mentioned': pp.frequency_mentioned,
-                    'example_comments': pp.example_comments,
-                    'purchase_intent': pp.purchase_intent,
-                    'category': pp.category
-                }
-                for pp in result.pain_points
-            ],
-            'key_insights': result.key_insights,
-            'market_opportunities': result.market_opportunities,
-            'sentiment_summary': result.sentiment_summary
+    def _finish_salvaged(self, request: PromptRequest, salvaged: Dict[str, Any], repair, error: ValueError,
+                         tokens: int, completion_tokens: int, cached_tokens: int) -> Dict[str, Any]:
+        """
+        _finish_answer for a salvaged answer, merged with the repair
+        response if there is one. The merged answer is what gets cached.
+
+        Raises:
+            error: Neither the salvage nor the repair recovered anything.
+        """
+        if repair is not None:
+            repair_tokens = _total_tokens(repair), _completion_tokens(repair), _cached_tokens(repair)
+            self._record_usage(self.model, *repair_tokens)
+            tokens += repair_tokens[0]
+            completion_tokens += repair_tokens[1]
+            cached_tokens += repair_tokens[2]
+            try:
+                salvaged = merge_repair(salvaged, parse_answer(repair.choices[0].message.content or ''))
+            except ANSWER_ERRORS as e:
+                logger.warning("Repair answer is unusable too: %s", e)
+
+        if not any(salvaged.values()):
+            raise error
+        logger.warning("AI returned a malformed answer (%s); recovered %d pain points",
+                       error, len(salvaged['pain_points']))
+        return self._finish_answer(request, salvaged, json.dumps(salvaged, ensure_ascii=False),
+                                   tokens, completion_tokens, cached_tokens)
+
+    def _finish_answer(self, request: PromptRequest, answer: Dict[str, Any], result_text: str, tokens: int,
+                       completion_tokens: int, cached_tokens: int) -> Dict[str, Any]:
+        """Analysis dict from a validated answer, cached as *result_text*"""
+        analysis = _analysis_fields(answer)
+        analysis['tokens_used'] = tokens
+        analysis['completion_tokens'] = completion_tokens
+        analysis['cached_tokens'] = cached_tokens
+        analysis.update(request.packing)
+        if self.cache:
+            self.cache.put(request.cache_key, result_text, tokens)
+        return analysis
+
+    def _record_usage(self, model: str, tokens: int = 0, completion_tokens: int = 0,
+                      cached_tokens: int = 0, cache_hit: bool = False, batch: bool = False):
+        """
+        Add one API call (or one local cache hit) to self.usage. Batch API
+        calls go to their own entry, keyed '<model> (batch)'.
+        """
+        key = f"{model} (batch)" if batch else model
+        with self._usage_lock:
+            if self.usage is None:
+                self.usage = {}
+            stats = self.usage.setdefault(key, UsageStats(model, batch=batch))
+            if cache_hit:
+                stats.cache_hits += 1
+                return
+            stats.requests += 1
+            stats.input_tokens += tokens - completion_tokens
+            stats.cached_tokens += cached_tokens
+            stats.output_tokens += completion_tokens
+
+    def log_usage(self):
+        """Log requests, prompt cache hit ratio and estimated cost per model for this run"""
+        with self._usage_lock:
+            usage = [UsageStats(**vars(stats)) for stats in (self.usage or {}).values()]
+        for stats in usage:
+            cost, uncached = stats.cost, stats.uncached_cost
+            logger.info(
+                "AI usage (%s%s): %d requests, %d cached answers, %d input tokens (%.0f%% from prompt cache), "
+                "%d output tokens, %s",
+                stats.model, ", Batch API" if stats.batch else "", stats.requests, stats.cache_hits, stats.input_tokens,
+                stats.prompt_cache_ratio * 100, stats.output_tokens,
+                "unknown cost" if cost is None else f"~${cost:.4f} (~${uncached:.4f} without prompt caching)",
+            )
+
+    def _failed_analysis(self, request: PromptRequest) -> Dict[str, Any]:
+        """Empty analysis used when the model's answer cannot be parsed"""
+        return {
+            'pain_points': [],
+            'key_insights': [],
+            'market_opportunities': [],
+            'sentiment_summary': FAILED_SENTIMENT,
+            'failed': True,
+            **request.packing,
         }
 
+    def _parse_result_text(self, result_text: str) -> Dict[str, Any]:
+        """
+        Parse and validate the model's JSON answer into PainPoint objects and lists
+
+        Raises:
+            json.JSONDecodeError, SchemaError: Not a usable answer.
+        """
+        return _analysis_fields(parse_answer(result_text))
+
+    def save_analysis(self, result: AnalysisResult, filepath: str, indent: int | None = None):
+        """
+        Save analysis results to a JSON file.
+
+        Args:
+            indent: Indentation width. 0 writes compact JSON.
+                Defaults to config.JSON_INDENT.
+        """
+        data = analysis_to_dict(result)
+        indent = indent if indent is not None else cfg.JSON_INDENT
+
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False,
+                      indent=indent or None, separators=None if indent else (',', ':'))
 
         logger.info("Analysis saved: %s", filepath)
 
@@ -329,6 +662,249 @@ Important instructions:
         return report
 
 
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from how i in is it of on or that the this to "
+    "was we were what when with you your they their them not no can do does".split()
+)
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS)
+
+
+def _similar(a: frozenset, b: frozenset, threshold: float = 0.5) -> bool:
+    """Jaccard similarity of two word sets"""
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= threshold
+
+
+def _dedupe_texts(texts: List[str]) -> List[str]:
+    """Drop repeated or near-identical strings, keeping first occurrence order"""
+    kept: List[str] = []
+    kept_words: List[frozenset] = []
+    for text in texts:
+        words = _words(text)
+        if any(_similar(words, other, 0.8) for other in kept_words):
+            continue
+        kept.append(text)
+        kept_words.append(words)
+    return kept
+
+
+def analysis_to_dict(result: AnalysisResult) -> Dict[str, Any]:
+    """JSON-ready dict of an analysis (the analysis_<id>.json format)"""
+    return {
+        'thread_id': result.thread_id,
+        'thread_title': result.thread_title,
+        'total_comments': result.total_comments,
+        'pain_points': [
+            {
+                'description': pp.description,
+                'severity': pp.severity,
+                'frequency_mentioned': pp.frequency_mentioned,
+                'example_comments': pp.example_comments,
+                'purchase_intent': pp.purchase_intent,
+                'category': pp.category
+            }
+            for pp in result.pain_points
+        ],
+        'key_insights': result.key_insights,
+        'market_opportunities': result.market_opportunities,
+        'sentiment_summary': result.sentiment_summary
+    }
+
+
+def pain_point_from_dict(pp: Dict[str, Any]) -> PainPoint:
+    """PainPoint from one item of the model's (or a saved) pain_points list"""
+    return PainPoint(
+        description=pp.get('description', ''),
+        severity=pp.get('severity', 'medium'),
+        frequency_mentioned=pp.get('frequency_mentioned', 0),
+        example_comments=pp.get('example_comments', []),
+        purchase_intent=pp.get('purchase_intent', 'none'),
+        category=pp.get('category', 'Other'),
+    )
+
+
+def analysis_from_dict(data: Dict[str, Any]) -> AnalysisResult:
+    """Rebuild an AnalysisResult from analysis_to_dict output"""
+    return AnalysisResult(
+        thread_id=data.get('thread_id', ''),
+        thread_title=data.get('thread_title', ''),
+        total_comments=data.get('total_comments', 0),
+        pain_points=[pain_point_from_dict(pp) for pp in data.get('pain_points', [])],
+        key_insights=data.get('key_insights', []),
+        market_opportunities=data.get('market_opportunities', []),
+        sentiment_summary=data.get('sentiment_summary', ''),
+    )
+
+
+def merge_results(previous: AnalysisResult, update: AnalysisResult) -> AnalysisResult:
+    """
+    Fold an analysis of a thread's new comments into its earlier analysis.
+
+    Pain points and insights are merged as in map-reduce. The newer sentiment
+    summary wins when present, unless the update failed. Token, cache, failed
+    and comment_ids fields describe the update only, i.e. what this run spent
+    and sent.
+    """
+    def as_partial(result: AnalysisResult) -> Dict[str, Any]:
+        return {
+            'pain_points': result.pain_points,
+            'key_insights': result.key_insights,
+            'market_opportunities': result.market_opportunities,
+            'sentiment_summary': result.sentiment_summary,
+        }
+
+    merged = merge_analyses([as_partial(previous), as_partial(update)])
+    return AnalysisResult(
+        thread_id=update.thread_id or previous.thread_id,
+        thread_title=update.thread_title or previous.thread_title,
+        total_comments=previous.total_comments + update.total_comments,
+        pain_points=merged['pain_points'],
+        key_insights=merged['key_insights'],
+        market_opportunities=merged['market_opportunities'],
+        sentiment_summary=(update.sentiment_summary if update.sentiment_summary != FAILED_SENTIMENT else '')
+                          or previous.sentiment_summary,
+        analyzed_comments=previous.analyzed_comments + update.analyzed_comments,
+        tokens_used=update.tokens_used,
+        packed_tokens=update.packed_tokens,
+        completion_tokens=update.completion_tokens,
+        cached_tokens=update.cached_tokens,
+        cache_hit=update.cache_hit,
+        failed=update.failed,
+        comment_ids=update.comment_ids,
+    )
+
+
+def merge_pain_points(pain_points: List[PainPoint]) -> List[PainPoint]:
+    """
+    Merge duplicate pain points reported by different chunks.
+
+    Pain points in the same category with similar descriptions are combined:
+    frequencies are summed, the highest severity and purchase intent win,
+    and example comments are unioned.
+    """
+    merged: List[PainPoint] = []
+    keys: List[tuple] = []
+    for pp in pain_points:
+        key = (pp.category.strip().lower(), _words(pp.description))
+        for i, (category, words) in enumerate(keys):
+            if category == key[0] and _similar(words, key[1]):
+                target = merged[i]
+                target.frequency_mentioned += pp.frequency_mentioned
+                if SEVERITY_ORDER.get(pp.severity, 0) > SEVERITY_ORDER.get(target.severity, 0):
+                    target.severity = pp.severity
+                if INTENT_ORDER.get(pp.purchase_intent, 0) > INTENT_ORDER.get(target.purchase_intent, 0):
+                    target.purchase_intent = pp.purchase_intent
+                for example in pp.example_comments:
+                    if example not in target.example_comments:
+                        target.example_comments.append(example)
+                break
+        else:
+            merged.append(PainPoint(
+                description=pp.description,
+                severity=pp.severity,
+                frequency_mentioned=pp.frequency_mentioned,
+                example_comments=list(pp.example_comments),
+                purchase_intent=pp.purchase_intent,
+                category=pp.category,
+            ))
+            keys.append(key)
+    return merged
+
+
+def merge_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reduce step: combine several _analyze_with_ai results into one"""
+    return {
+        'pain_points': merge_pain_points([pp for a in analyses for pp in a['pain_points']]),
+        'key_insights': _dedupe_texts([i for a in analyses for i in a['key_insights']]),
+        'market_opportunities': _dedupe_texts([o for a in analyses for o in a['market_opportunities']]),
+        'sentiment_summary': next((a['sentiment_summary'] for a in analyses if a['sentiment_summary']), ''),
+        'tokens_used': sum(a.get('tokens_used', 0) for a in analyses),
+        'packed_tokens': sum(a.get('packed_tokens', 0) for a in analyses),
+        'completion_tokens': sum(a.get('completion_tokens', 0) for a in analyses),
+        'cached_tokens': sum(a.get('cached_tokens', 0) for a in analyses),
+        'packed_comments': sum(a.get('packed_comments', 0) for a in analyses),
+        'cache_hit': bool(analyses) and all(a.get('cache_hit', False) for a in analyses),
+        'failed': any(a.get('failed', False) for a in analyses),
+    }
+
+
+def count_usable_comments(thread_data: Dict[str, Any], skip_comment_ids: Collection[str] = ()) -> int:
+    """Comments AIAnalyzer would send for *thread_data*, before the cap and token budget"""
+    return len(_usable_rows(CommentTable.from_dicts(thread_data.get('comments', [])), skip_comment_ids))
+
+
+def _usable_rows(table: CommentTable, skip_comment_ids: Collection[str] = ()) -> np.ndarray:
+    """Rows of *table* worth analyzing: not empty, trivial, deleted or skipped"""
+    return np.flatnonzero(table.usable_mask(min_length=10, exclude_ids=skip_comment_ids))
+
+
+def _analysis_fields(answer: Dict[str, Any]) -> Dict[str, Any]:
+    """Analysis dict (PainPoint objects and lists) from a validated answer"""
+    return {
+        'pain_points': [pain_point_from_dict(pp) for pp in answer['pain_points']],
+        'key_insights': answer['key_insights'],
+        'market_opportunities': answer['market_opportunities'],
+        'sentiment_summary': answer['sentiment_summary'],
+    }
+
+
+def _repair_request(fragment: str) -> PromptRequest:
+    """Request for the repair re-ask of an answer's unparsed rest (never cached)"""
+    return PromptRequest(messages=repair_messages(fragment), packing={}, cache_key=None)
+
+
+def _total_tokens(response) -> int:
+    """Total tokens billed for a chat completion (0 if usage is missing)"""
+    try:
+        return int(response.usage.total_tokens)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def _completion_tokens(response) -> int:
+    """Output tokens billed for a chat completion (0 if usage is missing)"""
+    try:
+        return int(response.usage.completion_tokens)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def _cached_tokens(response) -> int:
+    """Input tokens served from the provider's prompt cache (0 if not reported)"""
+    try:
+        return int(response.usage.prompt_tokens_details.cached_tokens or 0)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int,
+                  cached_tokens: int = 0) -> Optional[float]:
+    """
+    USD cost of a model's usage per config.MODEL_PRICING (None for unknown
+    models). *cached_tokens* of the input tokens are billed at the cached
+    input price.
+    """
+    prices = cfg.MODEL_PRICING.get(model)
+    if prices is None:
+        # Dated snapshots (gpt-4.1-mini-2025-04-14) are priced like their base model
+        base = max((m for m in cfg.MODEL_PRICING if model.startswith(m + '-')), key=len, default=None)
+        prices = cfg.MODEL_PRICING.get(base)
+    if prices is None:
+        return None
+    if len(prices) == 2:
+        input_price, output_price = prices
+        cached_price = input_price
+    else:
+        input_price, cached_price, output_price = prices
+    uncached = input_tokens - cached_tokens
+    return (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1_000_000
+
+
 # Test
 if __name__ == "__main__":
     import glob
@@ -48,11 +48,13 @@ T = {
         "status_fetch": "Fetching thread from Reddit",
         "status_parse": "Parsing {n} comments",
         "status_ai": "Running AI analysis",
+        "status_ai_found": "Running AI analysis — {n} pain points so far",
         "status_done": "Analysis complete",
         "status_browse": "Loading threads from r/{subreddit}",
         "err_fetch": "Could not fetch thread. Check the URL.",
         "sec_pain": "Pain Points",
         "sec_pain_sub": "What people are frustrated about — ranked by severity and purchase intent",
+        "sec_pain_live": "Arriving as the AI writes them — the full, ranked report follows",
         "sec_insight": "Key Insights",
         "sec_insight_sub": "Recurring themes and hidden patterns across the discussion",
         "sec_opp": "Market Opportunities",
@@ -111,11 +113,13 @@ T = {
         "status_fetch": "Reddit\u304b\u3089\u30b9\u30ec\u30c3\u30c9\u3092\u53d6\u5f97\u4e2d",
         "status_parse": "{n}\u4ef6\u306e\u30b3\u30e1\u30f3\u30c8\u3092\u89e3\u6790\u4e2d",
         "status_ai": "AI\u5206\u6790\u3092\u5b9f\u884c\u4e2d",
+        "status_ai_found": "AI分析を実行中 — これまでに{n}件のペインポイント",
         "status_done": "\u5206\u6790\u5b8c\u4e86",
         "status_browse": "r/{subreddit}\u306e\u30b9\u30ec\u30c3\u30c9\u3092\u8aad\u307f\u8fbc\u307f\u4e2d",
         "err_fetch": "\u30b9\u30ec\u30c3\u30c9\u3092\u53d6\u5f97\u3067\u304d\u307e\u305b\u3093\u3067\u3057\u305f\u3002URL\u3092\u78ba\u8a8d\u3057\u3066\u304f\u3060\u3055\u3044\u3002",
         "sec_pain": "ペインポイント",
         "sec_pain_sub": "ユーザーが不満に思っていること。深刻度・購買意欲つき",
+        "sec_pain_live": "AIが書き出した順に表示中。完了後にランキング付きの全結果を表示します",
         "sec_insight": "主要インサイト",
         "sec_insight_sub": "議論に隠れたパターンや繰り返し出るテーマ",
         "sec_opp": "市場機会",
@@ -756,66 +760,53 @@ def load_sample(filename: str = "sample_analysis.json"):
         return None
 
 
-def _comment_to_dict(c):
-    """Convert Comment dataclass to dict (recursive for replies)."""
-    return {
-        "id": c.id, "author": c.author, "body": c.body,
-        "score": c.score, "created_utc": c.created_utc,
-        "parent_id": c.parent_id, "gilded": c.gilded,
-        "depth": c.depth,
-        "replies": [_comment_to_dict(r) for r in c.replies],
-    }
+@st.cache_resource(show_spinner=False)
+def _http_cache():
+    """Persistent Reddit response cache shared with the CLI."""
+    import config as cfg
+    from http_cache import ResponseCache
+
+    return ResponseCache(cfg.HTTP_CACHE_PATH)
 
 
 @st.cache_data(ttl=3600, show_spinner=False)
 def _fetch_thread(_url: str):
     """Fetch a Reddit thread. Cached 1 hour per URL."""
-    from reddit_fetcher import RedditFetcher
+    from reddit_fetcher import RedditFetcher, thread_to_dict
 
-    fetcher = RedditFetcher()
+    fetcher = RedditFetcher(cache=_http_cache())
     thread = fetcher.fetch_thread(_url)
     if thread is None:
         return None
-    return {
-        "id": thread.id, "title": thread.title,
-        "author": thread.author, "selftext": thread.selftext,
-        "score": thread.score, "num_comments": thread.num_comments,
-        "created_utc": thread.created_utc, "url": thread.url,
-        "subreddit": thread.subreddit, "upvote_ratio": thread.upvote_ratio,
-        "comments": [_comment_to_dict(c) for c in thread.comments],
-    }
+    return thread_to_dict(thread)
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def _analyze_thread(_thread_dict_json: str, _api_key: str):
-    """Run AI analysis on a thread dict. Cached 1 hour."""
-    import json as _json
-    from ai_analyzer import AIAnalyzer
-
-    thread_dict = _json.loads(_thread_dict_json)
-    analyzer = AIAnalyzer(api_key=_api_key)
-    result = analyzer.analyze_thread(thread_dict)
-
-    analysis_data = {
-        "thread_id": result.thread_id,
-        "thread_title": result.thread_title,
-        "total_comments": result.total_comments,
-        "pain_points": [
-            {
-                "description": pp.description,
-                "severity": pp.severity,
-                "frequency_mentioned": pp.frequency_mentioned,
-                "example_comments": pp.example_comments,
-                "purchase_intent": pp.purchase_intent,
-                "category": pp.category,
-            }
-            for pp in result.pain_points
-        ],
-        "key_insights": result.key_insights,
-        "market_opportunities": result.market_opportunities,
-        "sentiment_summary": result.sentiment_summary,
-    }
-    return analysis_data, result.total_comments, result.analyzed_comments
+@st.cache_resource(show_spinner=False)
+def _llm_cache():
+    """Persistent AI result cache shared with the CLI."""
+    import config as cfg
+    from llm_cache import AnalysisCache
+
+    return AnalysisCache(cfg.LLM_CACHE_PATH)
+
+
+def _stream_analysis(thread_dict: dict, api_key: str):
+    """
+    Stream AI analysis of a thread dict.
+
+    Yields ("pain_point", dict) as each pain point arrives, then
+    ("result", (analysis_data, total, analyzed)). Repeat analyses are
+    served by the persistent AI result cache.
+    """
+    from dataclasses import asdict
+    from ai_analyzer import AIAnalyzer, analysis_to_dict
+
+    analyzer = AIAnalyzer(api_key=api_key, cache=_llm_cache())
+    for kind, value in analyzer.analyze_thread_stream(thread_dict):
+        if kind == "pain_point":
+            yield kind, asdict(value)
+        else:
+            yield kind, (analysis_to_dict(value), value.total_comments, value.analyzed_comments)
 
 
 def _relative_time(created_utc: float) -> str:
@@ -835,7 +826,7 @@ def _browse_subreddit(subreddit: str, sort: str, time_filter: str, limit: int =
     """Fetch subreddit posts. Cached 5 min."""
     from reddit_fetcher import RedditFetcher
 
-    fetcher = RedditFetcher(rate_limit_delay=0)
+    fetcher = RedditFetcher()
     if sort == "top":
         return fetcher.fetch_subreddit_top(subreddit, time_filter=time_filter, limit=limit)
     elif sort == "new":
@@ -1278,7 +1269,10 @@ else:
             st.stop()
 
         try:
-            with st.status(t("spinner_fetch"), expanded=True) as _status:
+            _status = st.status(t("spinner_fetch"), expanded=True)
+            # Pain points are painted here while the AI is still writing
+            _live = st.empty()
+            with _status:
                 # Step 1: Fetch thread
                 _status.update(label=t("status_fetch"), state="running")
                 thread_dict = _fetch_thread(url)
@@ -1295,10 +1289,22 @@ else:
                     state="running",
                 )
 
-                # Step 3: AI analysis
+                # Step 3: AI analysis, streamed
                 _status.update(label=t("status_ai"), state="running")
-                _thread_json = json.dumps(thread_dict, ensure_ascii=False)
-                analysis_data, total, analyzed = _analyze_thread(_thread_json, api_key)
+                _live_box = None
+                _found = 0
+                for _kind, _value in _stream_analysis(thread_dict, api_key):
+                    if _kind == "result":
+                        analysis_data, total, analyzed = _value
+                        continue
+                    if _live_box is None:
+                        _live_box = _live.container()
+                        with _live_box:
+                            render_section(t("sec_pain"), "a", t("sec_pain_live"))
+                    _found += 1
+                    with _live_box:
+                        render_pain_point(_value, _found)
+                    _status.update(label=t("status_ai_found", n=_found), state="running")
 
                 # Done
                 _status.update(label=t("status_done"), state="complete", expanded=False)
@@ -1314,6 +1320,7 @@ else:
                     total=total,
                     analyzed=analyzed,
                 ))
+            _live.empty()
             render_analysis(analysis_data)
 
         except Exception as e:
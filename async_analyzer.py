@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Async AI Analyzer
+asyncio counterpart of AIAnalyzer: many requests in flight under a
+concurrency bound, retries of transient API errors, and per-minute
+request / token budgets that throttle before the API starts refusing
+"""
+
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+import config as cfg
+from ai_analyzer import (AIAnalyzer, AnalysisResult, PromptRequest, _cached_tokens, _completion_tokens,
+                         _repair_request, _total_tokens, merge_analyses)
+from llm_cache import AnalysisCache
+from rate_limiter import TokenBucket
+from response_schema import ANSWER_ERRORS, parse_answer, salvage_analysis
+from token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying (the same set the OpenAI client retries itself)
+RETRYABLE_STATUS = frozenset({408, 409, 429})
+
+
+class AsyncAIAnalyzer(AIAnalyzer):
+    """AI Analysis Engine for asyncio"""
+
+    def __init__(self, model: str | None = None, api_key: str | None = None,
+                 cache: AnalysisCache | None = None, refresh: bool = False,
+                 map_reduce: bool | None = None,
+                 base_url: str | None = None,
+                 max_concurrency: int | None = None,
+                 max_retries: int | None = None,
+                 rpm_limit: int | None = None,
+                 tpm_limit: int | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            model, api_key, cache, refresh, map_reduce: As for AIAnalyzer.
+            base_url: OpenAI-compatible endpoint. Defaults to the client's own
+                (OPENAI_BASE_URL or api.openai.com).
+            max_concurrency: Maximum in-flight requests. Defaults to
+                config.AI_MAX_CONCURRENCY.
+            max_retries: Retries of 429 / 5xx / connection errors per request.
+                Defaults to config.AI_MAX_RETRIES.
+            rpm_limit: Requests per minute for this analyzer (0 = unlimited).
+                Defaults to config.AI_RPM_LIMIT.
+            tpm_limit: Tokens per minute for this analyzer (0 = unlimited).
+                Defaults to config.AI_TPM_LIMIT.
+            clock: Monotonic time source for the budgets (injectable for tests).
+        """
+        # Retries are ours, so the client must not retry on its own as well
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        self.model = model or cfg.MODEL
+        self.cache = cache
+        self.refresh = refresh
+        if map_reduce is not None:
+            self.map_reduce = map_reduce
+
+        self.max_concurrency = max_concurrency or cfg.AI_MAX_CONCURRENCY
+        self.max_retries = cfg.AI_MAX_RETRIES if max_retries is None else max_retries
+        rpm = cfg.AI_RPM_LIMIT if rpm_limit is None else rpm_limit
+        tpm = cfg.AI_TPM_LIMIT if tpm_limit is None else tpm_limit
+        self.request_budget = TokenBucket(rate=rpm / 60.0, capacity=rpm, clock=clock)
+        self.token_budget = TokenBucket(rate=tpm / 60.0, capacity=tpm, clock=clock)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self) -> 'AsyncAIAnalyzer':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        await self.client.close()
+
+    async def analyze_thread(self, thread_data: Dict[str, Any],
+                             skip_comment_ids: Collection[str] = ()) -> AnalysisResult:
+        """Analyze an entire thread (see AIAnalyzer.analyze_thread)"""
+        comment_texts, comment_ids, total = self._select_comments(thread_data, skip_comment_ids)
+        batches, analyzed = self._comment_batches(comment_texts, total)
+        analysis = await self._analyze_batches(
+            thread_data.get('title', ''), thread_data.get('selftext', ''), batches,
+        )
+        return self._build_result(thread_data, total, analysis, analyzed, comment_ids)
+
+    async def analyze_threads(self, threads: List[Dict[str, Any]]) -> List[Optional[AnalysisResult]]:
+        """
+        Analyze several threads concurrently.
+
+        Returns:
+            One result per thread, in order; None where analysis failed.
+        """
+        async def analyze(thread_data: Dict[str, Any]) -> Optional[AnalysisResult]:
+            try:
+                return await self.analyze_thread(thread_data)
+            except Exception as e:
+                logger.error("Analysis failed for %s: %s", thread_data.get('id', '?'), e)
+                return None
+
+        return list(await asyncio.gather(*(analyze(t) for t in threads)))
+
+    async def _analyze_batches(self, thread_title: str, thread_body: str,
+                               batches: List[List[str]]) -> Dict[str, Any]:
+        """One request per batch, all in flight together, merged"""
+        partials = await asyncio.gather(*(
+            self._analyze_with_ai(thread_title, thread_body, batch) for batch in batches
+        ))
+        return partials[0] if len(partials) == 1 else merge_analyses(list(partials))
+
+    async def _analyze_with_ai(self, thread_title: str, thread_body: str,
+                               comments: List[str]) -> Dict[str, Any]:
+        """Analyze comments using AI"""
+        request = self._build_request(thread_title, thread_body, comments)
+        cached = self._cached_analysis(request)
+        if cached:
+            return cached
+
+        try:
+            response = await self._create_with_retries(request)
+            return await self._finish_request_async(request, response.choices[0].message.content.strip(),
+                                                    _total_tokens(response), _completion_tokens(response),
+                                                    _cached_tokens(response))
+        except ANSWER_ERRORS as e:
+            logger.error("AI returned an unusable answer: %s", e)
+            return self._failed_analysis(request)
+        except Exception as e:
+            logger.error("AI analysis error: %s", e)
+            raise
+
+    async def _finish_request_async(self, request: PromptRequest, result_text: str, tokens: int,
+                                    completion_tokens: int, cached_tokens: int) -> Dict[str, Any]:
+        """AIAnalyzer._finish_request with the repair re-ask awaited"""
+        self._record_usage(self.model, tokens, completion_tokens, cached_tokens)
+        try:
+            answer = parse_answer(result_text)
+        except ANSWER_ERRORS as e:
+            salvaged, fragment = salvage_analysis(result_text)
+            repair = await self._repair_async(fragment) if fragment else None
+            return self._finish_salvaged(request, salvaged, repair, e, tokens, completion_tokens,
+                                         cached_tokens)
+        return self._finish_answer(request, answer, result_text, tokens, completion_tokens, cached_tokens)
+
+    async def _repair_async(self, fragment: str):
+        """AIAnalyzer._repair through the concurrency bound, budgets and retries"""
+        if not cfg.REPAIR_MALFORMED:
+            return None
+        logger.info("Repairing the unparsed end of the answer (%d characters)", len(fragment))
+        try:
+            return await self._create_with_retries(_repair_request(fragment))
+        except Exception as e:
+            logger.warning("Repair request failed: %s", e)
+            return None
+
+    async def _create_with_retries(self, request: PromptRequest):
+        """chat.completions.create, retrying transient failures with backoff"""
+        kwargs = self._completion_kwargs(request)
+        estimate = self._estimated_tokens(request)
+        attempt = 0
+        while True:
+            try:
+                return await self._create(kwargs, estimate)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(e, attempt)
+                attempt += 1
+                logger.warning("AI request failed (%s), retry %d/%d in %.1fs",
+                               _describe(e), attempt, self.max_retries, delay)
+                await asyncio.sleep(delay)
+
+    async def _create(self, kwargs: Dict[str, Any], estimate: int):
+        """One API call inside the concurrency bound and the per-minute budgets"""
+        async with self._semaphore:
+            await self.request_budget.acquire_async()
+            await self.token_budget.acquire_async(estimate)
+            response = await self.client.chat.completions.create(**kwargs)
+
+        # Charge what the estimate missed; later requests wait for it
+        extra = _total_tokens(response) - estimate
+        if extra > 0:
+            self.token_budget.reserve(extra)
+        return response
+
+    def _estimated_tokens(self, request: PromptRequest) -> int:
+        """Tokens to reserve before sending: the whole prompt plus an assumed answer"""
+        prompt = sum(count_tokens(m['content'], model=self.model) for m in request.messages)
+        return prompt + cfg.AI_OUTPUT_TOKEN_ESTIMATE
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections"""
+    if isinstance(error, openai.APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_delay(error: Exception, attempt: int,
+                base_delay: float | None = None, max_delay: float | None = None,
+                rand: Callable[[], float] = random.random) -> float:
+    """
+    Seconds to wait before retry number *attempt* + 1.
+
+    A Retry-After (or retry-after-ms) header from the server wins, plus a
+    little jitter so waiting callers do not return in lockstep. Otherwise
+    exponential backoff from *base_delay* with "equal jitter": somewhere
+    between half and all of min(max_delay, base_delay * 2 ** attempt).
+    Both are capped at *max_delay*.
+    """
+    base = cfg.AI_RETRY_BASE_DELAY if base_delay is None else base_delay
+    cap = cfg.AI_RETRY_MAX_DELAY if max_delay is None else max_delay
+
+    response = getattr(error, 'response', None)
+    retry_after = _retry_after(getattr(response, 'headers', None))
+    if retry_after is not None:
+        return min(cap, retry_after + rand() * base)
+
+    backoff = min(cap, base * 2 ** attempt)
+    return backoff * (0.5 + rand() / 2)
+
+
+def _retry_after(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """Server-requested wait from retry-after-ms or Retry-After (seconds or HTTP date)"""
+    if not headers:
+        return None
+
+    value = headers.get('retry-after-ms')
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except (TypeError, ValueError):
+            pass
+
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _describe(error: Exception) -> str:
+    status = getattr(error, 'status_code', None)
+    return f"HTTP {status}" if status else type(error).__name__
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Async Reddit JSON Fetcher
+asyncio counterpart of RedditFetcher on one pooled, keep-alive HTTP client
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+import config as cfg
+import json_codec
+from rate_limiter import TokenBucket, get_default_limiter
+from reddit_fetcher import LISTING_PAGE_SIZE, RedditParser, Thread
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedditFetcher(RedditParser):
+    """Reddit JSON API Fetcher for asyncio"""
+
+    def __init__(
+        self,
+        user_agent: str | None = None,
+        rate_limiter: TokenBucket | None = None,
+        max_concurrency: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        expand_more: bool | None = None,
+    ):
+        """
+        Args:
+            user_agent: User-Agent header. Defaults to config.USER_AGENT.
+            rate_limiter: Request budget. Defaults to the process-wide limiter
+                shared with every sync RedditFetcher.
+            max_concurrency: Maximum in-flight requests (and pooled
+                connections). Defaults to config.ASYNC_MAX_CONCURRENCY.
+            transport: Custom httpx transport (e.g. httpx.MockTransport in tests).
+            expand_more: Resolve 'more' stubs via /api/morechildren when
+                fetching threads. Defaults to config.EXPAND_MORE.
+        """
+        self.user_agent = user_agent or cfg.USER_AGENT
+        self.rate_limiter = rate_limiter or get_default_limiter()
+        self.max_concurrency = max_concurrency or cfg.ASYNC_MAX_CONCURRENCY
+        self.client = httpx.AsyncClient(
+            headers={'User-Agent': self.user_agent},
+            timeout=cfg.REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            follow_redirects=True,
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.expand_more = cfg.EXPAND_MORE if expand_more is None else expand_more
+
+    async def __aenter__(self) -> 'AsyncRedditFetcher':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        await self.client.aclose()
+
+    async def _get_json(self, url: str) -> Any:
+        """GET a JSON endpoint under the shared rate limit and concurrency bound"""
+        async with self._semaphore:
+            await self.rate_limiter.acquire_async()
+            response = await self.client.get(url)
+            self.rate_limiter.update_from_headers(response.headers)
+            response.raise_for_status()
+            return json_codec.loads(response.content)
+
+    async def fetch_thread(self, url: str) -> Optional[Thread]:
+        """
+        Fetch data from a Reddit thread URL in JSON format.
+
+        Args:
+            url: Reddit thread URL (e.g., https://www.reddit.com/r/Entrepreneur/comments/xxx/)
+
+        Returns:
+            Thread: Structured thread data, or None on failure
+        """
+        json_url = self._normalize_url(url)
+
+        try:
+            data = await self._get_json(json_url)
+            thread = self._parse_thread(data)
+            if self.expand_more:
+                await self.expand_more_comments(thread, self._more_ids(data))
+            return thread
+
+        except httpx.HTTPError as e:
+            logger.error("Failed to fetch data: %s", e)
+            return None
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse JSON: %s", e)
+            return None
+        except ValueError as e:
+            logger.error("Failed to parse thread: %s", e)
+            return None
+
+    async def expand_more_comments(self, thread: Thread, more_ids: List[str],
+                                   max_requests: int | None = None) -> int:
+        """Load comments hidden behind 'more' stubs (see RedditFetcher.expand_more_comments)"""
+        budget = cfg.MORECHILDREN_MAX_REQUESTS if max_requests is None else max_requests
+        link_id = f"t3_{thread.id}"
+        pending = list(dict.fromkeys(more_ids))
+        added = 0
+
+        while pending and budget > 0:
+            batches = self._morechildren_batches(pending)[:budget]
+            budget -= len(batches)
+            pending = pending[sum(len(b) for b in batches):]
+
+            results = await asyncio.gather(*(
+                self._fetch_morechildren(self._morechildren_url(link_id, batch)) for batch in batches
+            ))
+            for things in results:
+                count, new_ids = self._graft_comments(thread, things)
+                added += count
+                pending.extend(new_ids)
+
+        logger.info("More comments: added %d comments", added)
+        return added
+
+    async def _fetch_morechildren(self, url: str) -> List[Dict]:
+        """One /api/morechildren call; failures are logged and yield no comments"""
+        try:
+            return self._morechildren_things(await self._get_json(url))
+        except (httpx.HTTPError, json.JSONDecodeError, AttributeError) as e:
+            logger.warning("Failed to load more comments: %s", e)
+            return []
+
+    async def fetch_threads(self, urls: List[str]) -> List[Optional[Thread]]:
+        """Fetch many threads concurrently, keeping input order"""
+        return await asyncio.gather(*(self.fetch_thread(url) for url in urls))
+
+    async def _fetch_listing_page(self, url: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one listing page: (posts, cursor for the next page)"""
+        try:
+            data = await self._get_json(url)
+            return self._parse_post_listing(data), self._listing_after(data)
+        except httpx.HTTPError as e:
+            logger.error("Failed to fetch subreddit: %s", e)
+            return [], None
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse subreddit JSON: %s", e)
+            return [], None
+
+    async def _fetch_listing(self, url: str) -> List[Dict[str, Any]]:
+        """Fetch and parse a subreddit listing URL."""
+        return (await self._fetch_listing_page(url))[0]
+
+    async def iter_subreddit(
+        self,
+        subreddit: str,
+        sort: str = "hot",
+        limit: int | None = 25,
+        time_filter: str | None = None,
+        predicate: Callable[[Dict[str, Any]], bool] | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream posts across listing pages (see RedditFetcher.iter_subreddit)"""
+        def page_url(after: str | None, count: int) -> str:
+            size = LISTING_PAGE_SIZE if limit is None else limit - count
+            return self._listing_url(subreddit, sort, size, time_filter, after, count)
+
+        if limit is not None and limit <= 0:
+            return
+
+        pending = asyncio.ensure_future(self._fetch_listing_page(page_url(None, 0)))
+        count = 0
+        try:
+            while pending is not None:
+                posts, after = await pending
+                if limit is not None:
+                    posts = posts[:limit - count]
+                count += len(posts)
+
+                has_more = after and posts and (limit is None or count < limit)
+                pending = asyncio.ensure_future(self._fetch_listing_page(page_url(after, count))) if has_more else None
+
+                for post in posts:
+                    if predicate is not None and not predicate(post):
+                        return
+                    yield post
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _collect(self, subreddit: str, sort: str, limit: int,
+                       time_filter: str | None = None) -> List[Dict[str, Any]]:
+        return [post async for post in self.iter_subreddit(subreddit, sort, limit, time_filter)]
+
+    async def fetch_subreddit_hot(self, subreddit: str, limit: int = 25) -> List[Dict[str, Any]]:
+        """Fetch hot posts from a subreddit (see RedditFetcher.fetch_subreddit_hot)"""
+        return await self._collect(subreddit, "hot", limit)
+
+    async def fetch_subreddit_top(self, subreddit: str, time_filter: str = "week", limit: int = 25) -> List[Dict[str, Any]]:
+        """Fetch top posts from a subreddit (see RedditFetcher.fetch_subreddit_top)"""
+        return await self._collect(subreddit, "top", limit, time_filter)
+
+    async def fetch_subreddit_new(self, subreddit: str, limit: int = 25) -> List[Dict[str, Any]]:
+        """Fetch new posts from a subreddit (see RedditFetcher.fetch_subreddit_new)"""
+        return await self._collect(subreddit, "new", limit)
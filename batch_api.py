@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+OpenAI Batch API Runner
+Sends the analysis prompts of many threads as one Batch API job (half the
+per-token price, results within the completion window) and maps the answers
+back to threads. Progress is kept in a local manifest, so an interrupted
+run picks the job up where it left off.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openai import OpenAI
+
+import config as cfg
+from ai_analyzer import AIAnalyzer, AnalysisResult, PromptRequest, merge_analyses
+from ndjson_io import NdjsonWriter, iter_records
+from response_schema import ANSWER_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# (answer text, total tokens, completion tokens, prompt-cached tokens)
+Answer = Tuple[str, int, int, int]
+
+ENDPOINT = "/v1/chat/completions"
+MANIFEST_FILE = "manifest.json"
+REQUESTS_FILE = "requests.jsonl"
+THREADS_FILE = "threads.ndjson"
+
+# Manifest states, in order; "failed" ends a job without results
+PREPARED = "prepared"
+SUBMITTED = "submitted"
+FINISHED = "finished"
+COLLECTED = "collected"
+FAILED = "failed"
+
+# Batch states after which no more results will appear
+TERMINAL_STATES = ("completed", "expired", "cancelled", "failed")
+
+
+class OpenAIBatchClient:
+    """Files and Batches API calls made by BatchRunner (swappable for a fake in tests)"""
+
+    def __init__(self, client=None):
+        """
+        Args:
+            client: openai.OpenAI instance. Defaults to a new client from
+                the OPENAI_API_KEY environment variable.
+        """
+        self.client = client or OpenAI()
+
+    def upload(self, path: str) -> str:
+        """Upload a batch input file, returning its file id"""
+        with open(path, 'rb') as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def find_batch(self, input_file_id: str) -> Optional[str]:
+        """Id of a recent batch already created from *input_file_id*, if any"""
+        for batch in self.client.batches.list(limit=100):
+            if batch.input_file_id == input_file_id:
+                return batch.id
+        return None
+
+    def create_batch(self, input_file_id: str, metadata: Dict[str, str]) -> str:
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint=ENDPOINT,
+            completion_window=cfg.BATCH_COMPLETION_WINDOW,
+            metadata=metadata,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: status, output_file_id, error_file_id, completed, failed,
+                total (request counts) and errors (messages).
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        errors = batch.errors.data if batch.errors and batch.errors.data else []
+        return {
+            'status': batch.status,
+            'output_file_id': batch.output_file_id,
+            'error_file_id': batch.error_file_id,
+            'completed': counts.completed if counts else 0,
+            'failed': counts.failed if counts else 0,
+            'total': counts.total if counts else 0,
+            'errors': [e.message for e in errors],
+        }
+
+    def download(self, file_id: str) -> bytes:
+        return self.client.files.content(file_id).content
+
+
+class BatchRunner:
+    """
+    One Batch API job per work directory, driven through
+    prepare → submit → wait → collect.
+
+    The work directory holds the manifest, the request JSONL uploaded to
+    the API and the thread dicts the answers are mapped back to.
+    """
+
+    def __init__(self, analyzer: AIAnalyzer, work_dir: str, client=None,
+                 poll_interval: float | None = None, max_wait: float | None = None,
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            analyzer: Builds the prompts and parses the answers (and owns
+                the result cache).
+            work_dir: Directory for the manifest and job files.
+            client: Batch API client. Defaults to OpenAIBatchClient on the
+                analyzer's OpenAI client.
+            poll_interval: Seconds between status checks. Defaults to
+                config.BATCH_POLL_INTERVAL.
+            max_wait: Seconds to poll before leaving the job for a later run
+                (0 = until it finishes). Defaults to config.BATCH_MAX_WAIT.
+            sleep, clock: Injectable for tests.
+        """
+        self.analyzer = analyzer
+        self.work_dir = work_dir
+        self._client = client
+        self.poll_interval = cfg.BATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.max_wait = cfg.BATCH_MAX_WAIT if max_wait is None else max_wait
+        self._sleep = sleep
+        self._clock = clock
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = OpenAIBatchClient(self.analyzer.client)
+        return self._client
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.work_dir, MANIFEST_FILE)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.work_dir, name)
+
+    def load_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        # Write-then-rename, so an interrupted run never leaves half a manifest
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def pending(self) -> bool:
+        """True if the work directory holds a job that has not been collected"""
+        manifest = self.load_manifest()
+        return manifest is not None and manifest['status'] not in (COLLECTED, FAILED)
+
+    @property
+    def label(self) -> str:
+        """Name the current job was started with (subreddit or "batch")"""
+        manifest = self.load_manifest()
+        return manifest.get('label', 'batch') if manifest else 'batch'
+
+    def run(self, thread_dicts: List[Dict[str, Any]],
+            label: str = "batch") -> Optional[List[Tuple[Dict[str, Any], AnalysisResult]]]:
+        """
+        Analyze *thread_dicts* in one batch job.
+
+        An unfinished job in the work directory is resumed instead, and the
+        new threads are ignored.
+
+        Returns:
+            (thread dict, result) pairs, or None while the job is still
+            running after max_wait (run again, or resume(), to continue).
+        """
+        if self.pending():
+            logger.warning("Resuming unfinished batch job in %s; new threads are ignored", self.work_dir)
+        elif not thread_dicts:
+            return []
+        else:
+            self.prepare(thread_dicts, label)
+        return self.resume()
+
+    def resume(self) -> Optional[List[Tuple[Dict[str, Any], AnalysisResult]]]:
+        """Continue the job from the stage its manifest records (see run)"""
+        manifest = self.load_manifest()
+        if manifest is None:
+            raise RuntimeError(f"No batch job in {self.work_dir}")
+        if manifest['status'] == PREPARED:
+            manifest = self.submit()
+        if manifest['status'] == SUBMITTED and not self.wait():
+            return None
+        return self.collect()
+
+    def prepare(self, thread_dicts: List[Dict[str, Any]], label: str = "batch") -> Dict[str, Any]:
+        """
+        Build every prompt and write the request JSONL.
+
+        Prompts with a cached answer are not sent; their answer is kept in
+        the manifest instead.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        for name in (REQUESTS_FILE, THREADS_FILE):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+        analyzer = self.analyzer
+        entries = []
+        seen = set()
+        with NdjsonWriter(self._path(REQUESTS_FILE)) as requests_out, \
+                NdjsonWriter(self._path(THREADS_FILE)) as threads_out:
+            for thread_data in thread_dicts:
+                thread_id = thread_data.get('id', '')
+                if thread_id in seen:
+                    continue
+                seen.add(thread_id)
+                threads_out.write(thread_data)
+
+                comment_texts, comment_ids, total = analyzer._select_comments(thread_data)
+                batches, analyzed = analyzer._comment_batches(comment_texts, total)
+                records = []
+                for i, comments in enumerate(batches):
+                    request = analyzer._build_request(
+                        thread_data.get('title', ''), thread_data.get('selftext', ''), comments,
+                    )
+                    record = {
+                        'custom_id': f"{thread_id}-{i}",
+                        'packing': request.packing,
+                        'cache_key': request.cache_key,
+                    }
+                    cached = analyzer._cached_answer(request)
+                    if cached:
+                        answer, tokens = cached
+                        record['cached'] = [json.dumps(answer, ensure_ascii=False), tokens]
+                    else:
+                        requests_out.write({
+                            'custom_id': record['custom_id'],
+                            'method': 'POST',
+                            'url': ENDPOINT,
+                            'body': analyzer._completion_kwargs(request),
+                        })
+                    records.append(record)
+                entries.append({'id': thread_id, 'total': total, 'analyzed': analyzed,
+                                'comment_ids': comment_ids[:analyzed], 'requests': records})
+            to_send = requests_out.count
+
+        manifest = {
+            'label': label,
+            'model': analyzer.model,
+            'created_at': time.time(),
+            'status': PREPARED if to_send else FINISHED,
+            'requests': to_send,
+            'input_file_id': None,
+            'batch_id': None,
+            'batch_status': None,
+            'output_file_id': None,
+            'error_file_id': None,
+            'threads': entries,
+        }
+        self._save_manifest(manifest)
+        logger.info("Batch job: %d threads, %d requests to send (%d answered from cache)",
+                    len(entries), to_send,
+                    sum(len(e['requests']) for e in entries) - to_send)
+        return manifest
+
+    def submit(self) -> Dict[str, Any]:
+        """Upload the request file and create the batch (each step recorded before the next)"""
+        manifest = self.load_manifest()
+        if not manifest['input_file_id']:
+            manifest['input_file_id'] = self.client.upload(self._path(REQUESTS_FILE))
+            self._save_manifest(manifest)
+
+        # A run interrupted right after creating the batch must not pay for it twice
+        batch_id = self.client.find_batch(manifest['input_file_id'])
+        if batch_id is None:
+            batch_id = self.client.create_batch(manifest['input_file_id'],
+                                                {'label': manifest['label']})
+        manifest['batch_id'] = batch_id
+        manifest['status'] = SUBMITTED
+        self._save_manifest(manifest)
+        logger.info("Batch submitted: %s (%d requests)", batch_id, manifest['requests'])
+        return manifest
+
+    def wait(self) -> bool:
+        """
+        Poll until the batch reaches a terminal state.
+
+        Returns:
+            bool: True when finished; False if max_wait ran out first.
+
+        Raises:
+            RuntimeError: The batch failed as a whole (e.g. invalid input).
+        """
+        manifest = self.load_manifest()
+        batch_id = manifest['batch_id']
+        deadline = self._clock() + self.max_wait if self.max_wait > 0 else None
+
+        while True:
+            info = self.client.status(batch_id)
+            manifest.update({
+                'batch_status': info['status'],
+                'output_file_id': info.get('output_file_id'),
+                'error_file_id': info.get('error_file_id'),
+            })
+            logger.info("Batch %s: %s (%d/%d done, %d failed)", batch_id, info['status'],
+                        info.get('completed', 0), info.get('total', 0), info.get('failed', 0))
+
+            if info['status'] == 'failed':
+                manifest['status'] = FAILED
+                self._save_manifest(manifest)
+                raise RuntimeError(f"Batch {batch_id} failed: {'; '.join(info.get('errors') or [])}")
+            if info['status'] in TERMINAL_STATES:
+                manifest['status'] = FINISHED
+                self._save_manifest(manifest)
+                return True
+
+            self._save_manifest(manifest)
+            if deadline is not None and self._clock() + self.poll_interval > deadline:
+                logger.info("Batch %s is still %s; run again with --batch-api to collect it",
+                            batch_id, info['status'])
+                return False
+            self._sleep(self.poll_interval)
+
+    def collect(self) -> List[Tuple[Dict[str, Any], AnalysisResult]]:
+        """
+        Map the batch answers back to threads.
+
+        Threads with a request the API did not answer are left out (and logged).
+        """
+        manifest = self.load_manifest()
+        answers, errors = self._download_answers(manifest)
+        threads = {t.get('id', ''): t for t in iter_records(self._path(THREADS_FILE))}
+
+        results = []
+        for entry in manifest['threads']:
+            partials = []
+            for record in entry['requests']:
+                analysis = self._request_analysis(record, answers, errors)
+                if analysis is None:
+                    break
+                partials.append(analysis)
+            else:
+                thread_data = threads[entry['id']]
+                analysis = partials[0] if len(partials) == 1 else merge_analyses(partials)
+                results.append((thread_data, self.analyzer._build_result(
+                    thread_data, entry['total'], analysis, entry['analyzed'], entry.get('comment_ids', ()))))
+
+        manifest['status'] = COLLECTED
+        self._save_manifest(manifest)
+        logger.info("Batch results: %d of %d threads analyzed", len(results), len(manifest['threads']))
+        return results
+
+    def _download_answers(self, manifest: Dict[str, Any]) -> Tuple[Dict[str, Answer], Dict[str, str]]:
+        """(custom_id -> Answer, custom_id -> error) from the output/error files"""
+        answers: Dict[str, Answer] = {}
+        errors: Dict[str, str] = {}
+        for key in ('output_file_id', 'error_file_id'):
+            if not manifest.get(key):
+                continue
+            for line in self.client.download(manifest[key]).decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                custom_id = record.get('custom_id', '')
+                response = record.get('response') or {}
+                body = response.get('body') or {}
+                if record.get('error') or response.get('status_code') != 200:
+                    error = record.get('error') or body.get('error') or {}
+                    errors[custom_id] = error.get('message') or f"HTTP {response.get('status_code')}"
+                    continue
+                try:
+                    text = body['choices'][0]['message']['content'].strip()
+                except (KeyError, IndexError, TypeError, AttributeError):
+                    errors[custom_id] = "no message in response"
+                    continue
+                answers[custom_id] = (text, *_usage_tokens(body.get('usage') or {}))
+        return answers, errors
+
+    def _request_analysis(self, record: Dict[str, Any], answers: Dict[str, Answer],
+                          errors: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        request = PromptRequest(messages=[], packing=record['packing'], cache_key=record['cache_key'])
+
+        if record.get('cached'):
+            text, tokens = record['cached']
+            try:
+                analysis = self.analyzer._parse_result_text(text)
+            except ANSWER_ERRORS as e:
+                # Written by an older version; the thread is analyzed again next run
+                logger.error("Unusable cached analysis for %s: %s", record['custom_id'], e)
+                return None
+            analysis.update(tokens_used=tokens, cache_hit=True, **request.packing)
+            return analysis
+
+        answer = answers.get(record['custom_id'])
+        if answer is None:
+            logger.error("Batch request %s failed: %s", record['custom_id'],
+                         errors.get(record['custom_id'], "no answer"))
+            return None
+        try:
+            return self.analyzer._finish_request(request, *answer, batch=True)
+        except ANSWER_ERRORS as e:
+            logger.error("AI returned an unusable answer for %s: %s", record['custom_id'], e)
+            return self.analyzer._failed_analysis(request)
+
+
+def _usage_tokens(usage: Dict[str, Any]) -> Tuple[int, int, int]:
+    """(total, completion, prompt-cached) tokens from a batch response body's usage"""
+    details = usage.get('prompt_tokens_details') or {}
+    return (int(usage.get('total_tokens') or 0), int(usage.get('completion_tokens') or 0),
+            int(details.get('cached_tokens') or 0))
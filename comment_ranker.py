@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Comment Ranker
+Vectorized relevance scoring and near-duplicate removal, run before the
+comment cap so the prompt gets the most informative comments first
+"""
+
+import logging
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+
+import config as cfg
+
+logger = logging.getLogger(__name__)
+
+# Phrases that signal a pain point or willingness to pay
+PAIN_PATTERNS = [
+    r"i'?d pay", r"would pay", r"willing to pay", r"take my money", r"shut up and take",
+    r"looking for (?:a|an|some) (?:tool|app|service|solution|way)", r"is there (?:a|an) (?:tool|app|service)",
+    r"any recommendations?", r"recommend (?:a|an|any)",
+    r"struggl\w*", r"frustrat\w*", r"annoy\w*", r"pain in the", r"nightmare", r"hate (?:it|that|how|when)",
+    r"waste (?:of )?(?:time|money|hours)", r"hours (?:every|each|a) (?:day|week|month)",
+    r"too expensive", r"can'?t afford", r"overpriced", r"wish (?:there was|i could|it)",
+    r"biggest (?:problem|challenge|issue)", r"doesn'?t work", r"gave up", r"switched (?:to|from)",
+    r"manual(?:ly)?", r"spreadsheet", r"workaround",
+]
+# Matched against lowercased text, which is much faster than re.IGNORECASE
+PAIN_RE = re.compile(r"\b(?:" + "|".join(PAIN_PATTERNS) + r")")
+
+# Relative feature weights (features are scaled to roughly [0, 1])
+WEIGHTS = {
+    'score': 1.0,
+    'gilded': 0.5,
+    'depth': 0.6,
+    'length': 0.8,
+    'keywords': 1.5,
+}
+
+_WORD_RE = re.compile(r"\w+")
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+
+
+def score_comments(comments: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Relevance score per comment (higher is better).
+
+    Uses Reddit score and gilding (community signal), depth (top-level
+    comments carry more standalone context), length (very short replies rarely
+    describe a problem) and pain/intent keyword hits.
+    """
+    n = len(comments)
+    if n == 0:
+        return np.zeros(0)
+
+    bodies = [c.get('body') or '' for c in comments]
+    return _relevance(
+        score=np.fromiter((c.get('score') or 0 for c in comments), dtype=np.float64, count=n),
+        gilded=np.fromiter((c.get('gilded') or 0 for c in comments), dtype=np.float64, count=n),
+        depth=np.fromiter((c.get('depth') or 0 for c in comments), dtype=np.float64, count=n),
+        length=np.fromiter((len(b) for b in bodies), dtype=np.float64, count=n),
+        bodies=bodies,
+    )
+
+
+def _relevance(score: np.ndarray, gilded: np.ndarray, depth: np.ndarray,
+               length: np.ndarray, bodies: List[str]) -> np.ndarray:
+    """Weighted feature sum behind score_comments / rank_table"""
+    features = {
+        # Signed log so downvoted comments sink without dominating
+        'score': np.sign(score) * np.log1p(np.abs(score)) / np.log1p(1000),
+        'gilded': np.minimum(np.log1p(gilded), 1.0),
+        'depth': 1.0 / (1.0 + depth),
+        # Saturates around 1000 characters
+        'length': np.minimum(np.log1p(length) / np.log1p(1000), 1.0),
+        'keywords': np.minimum(_keyword_hits(bodies), 3) / 3.0,
+    }
+    return sum(WEIGHTS[name] * values for name, values in features.items())
+
+
+def _keyword_hits(bodies: List[str]) -> np.ndarray:
+    """Pain/intent phrase matches per body, from one regex pass over all text"""
+    joined = "\x00".join(bodies).lower()
+    ends = np.cumsum([len(b) + 1 for b in bodies])
+    positions = np.fromiter((m.start() for m in PAIN_RE.finditer(joined)), dtype=np.int64)
+    owners = np.searchsorted(ends, positions, side='right')
+    return np.bincount(owners, minlength=len(bodies)).astype(np.float64)
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spreads token ids over all 64 bits"""
+    with np.errstate(over='ignore'):
+        x = (x + np.uint64(0x9E3779B97F4A7C15)).astype(np.uint64)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def simhashes(bodies: List[str]) -> np.ndarray:
+    """64-bit SimHash fingerprint of each body over word bigrams"""
+    vocab: Dict[str, int] = {}
+    word_ids: List[int] = []
+    counts = np.zeros(len(bodies), dtype=np.int64)
+    for i, body in enumerate(bodies):
+        words = _WORD_RE.findall(body.lower())
+        word_ids.extend(vocab.setdefault(w, len(vocab)) for w in words)
+        counts[i] = len(words)
+
+    result = np.zeros(len(bodies), dtype=np.uint64)
+    if not word_ids:
+        return result
+
+    # Bigram ids: pair each word with the next one in the same body.
+    # Single-word bodies keep their lone word (paired with itself).
+    ids = np.asarray(word_ids, dtype=np.uint64)
+    owner = np.repeat(np.arange(len(bodies)), counts)
+    nxt = np.empty_like(ids)
+    nxt[:-1] = ids[1:]
+    last = np.cumsum(counts)[counts > 0] - 1
+    nxt[last] = ids[last]
+    keep = np.ones(len(ids), dtype=bool)
+    keep[last[counts[counts > 0] > 1]] = False
+    with np.errstate(over='ignore'):
+        hashes = _mix64(ids[keep] * np.uint64(0x100000001B3) ^ _mix64(nxt[keep]))
+    owner = owner[keep]
+    shingles = np.bincount(owner, minlength=len(bodies))
+
+    # Majority vote per bit position
+    for bit in range(64):
+        ones = np.bincount(owner, weights=(hashes >> np.uint64(bit)) & np.uint64(1),
+                           minlength=len(bodies))
+        result |= (2 * ones > shingles).astype(np.uint64) << np.uint64(bit)
+    return result
+
+
+def near_duplicates(fingerprints: np.ndarray, order: np.ndarray, max_distance: int) -> np.ndarray:
+    """
+    Mark comments whose fingerprint is within *max_distance* bits of an
+    earlier comment in *order*. Candidates come from LSH banding, so only
+    comments sharing a 16-bit band are compared.
+    """
+    duplicate = np.zeros(len(fingerprints), dtype=bool)
+    buckets: List[Dict[int, List[int]]] = [{} for _ in range(_BANDS)]
+    mask = (1 << _BAND_BITS) - 1
+    values = [int(f) for f in fingerprints]
+
+    for i in order.tolist():
+        fp = values[i]
+        keys = [(fp >> (band * _BAND_BITS)) & mask for band in range(_BANDS)]
+        if any((fp ^ values[j]).bit_count() <= max_distance
+               for band, key in enumerate(keys)
+               for j in buckets[band].get(key, ())):
+            duplicate[i] = True
+            continue
+        for band, key in enumerate(keys):
+            buckets[band].setdefault(key, []).append(i)
+    return duplicate
+
+
+def rank_comments(comments: List[Dict[str, Any]], dedupe: bool = True,
+                  max_distance: int | None = None) -> List[Dict[str, Any]]:
+    """
+    Order comments by relevance, dropping near-duplicates.
+
+    Args:
+        comments: Comment dicts with body/score/gilded/depth keys.
+        dedupe: Remove near-duplicate bodies (the higher-ranked copy is kept).
+        max_distance: SimHash Hamming distance treated as duplicate.
+            Defaults to config.NEAR_DUPLICATE_DISTANCE.
+
+    Returns:
+        The same dicts, best first.
+    """
+    if not comments:
+        return []
+
+    order = _rank_order(score_comments(comments), [c.get('body') or '' for c in comments],
+                        dedupe, max_distance)
+    return [comments[i] for i in order.tolist()]
+
+
+def rank_table(table, rows: np.ndarray, dedupe: bool = True,
+               max_distance: int | None = None) -> np.ndarray:
+    """
+    rank_comments for rows of a CommentTable, computed from its columns.
+
+    Returns:
+        The selected row numbers, best first (near-duplicates removed).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if len(rows) == 0:
+        return rows
+
+    bodies = table.bodies(rows)
+    scores = _relevance(
+        score=table.score[rows].astype(np.float64),
+        gilded=table.gilded[rows].astype(np.float64),
+        depth=table.depth[rows].astype(np.float64),
+        length=table.lengths[rows].astype(np.float64),
+        bodies=bodies,
+    )
+    return rows[_rank_order(scores, bodies, dedupe, max_distance)]
+
+
+def _rank_order(scores: np.ndarray, bodies: List[str], dedupe: bool,
+                max_distance: int | None) -> np.ndarray:
+    """Positions sorted by descending score, minus near-duplicates"""
+    # Stable sort keeps tree order among equal scores
+    order = np.argsort(-scores, kind='stable')
+
+    if dedupe:
+        distance = max_distance if max_distance is not None else cfg.NEAR_DUPLICATE_DISTANCE
+        duplicate = near_duplicates(simhashes(bodies), order, distance)
+        if duplicate.any():
+            logger.info("Ranking: dropped %d near-duplicate comments", int(duplicate.sum()))
+        order = order[~duplicate[order]]
+    return order
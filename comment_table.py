@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Comment Table
+Columnar view of a comment tree: NumPy columns for the numeric fields and
+one contiguous body buffer, so filtering, ranking and statistics run as
+array operations instead of per-comment Python loops
+"""
+
+from typing import Any, Collection, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from reddit_fetcher import walk_comments
+
+DELETED_BODIES = ('[deleted]', '[removed]')
+
+
+class CommentTable:
+    """
+    Comments of one thread in pre-order, one row per comment.
+
+    Columns:
+        ids (str), parent (row of the parent comment, -1 for top-level),
+        depth, score, gilded, created_utc, deleted (bool), and the bodies
+        as one string with offsets (body i is buffer[offsets[i]:offsets[i + 1]]).
+    """
+
+    def __init__(self, ids: np.ndarray, parent: np.ndarray, depth: np.ndarray,
+                 score: np.ndarray, gilded: np.ndarray, created_utc: np.ndarray,
+                 deleted: np.ndarray, buffer: str, offsets: np.ndarray):
+        self.ids = ids
+        self.parent = parent
+        self.depth = depth
+        self.score = score
+        self.gilded = gilded
+        self.created_utc = created_utc
+        self.deleted = deleted
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def from_dicts(cls, comments: Iterable[Dict[str, Any]]) -> 'CommentTable':
+        """Build from nested comment dicts ('replies' lists)"""
+        return cls._build(walk_comments(comments, lambda c: c.get('replies')), lambda c, key: c.get(key))
+
+    @classmethod
+    def from_comments(cls, comments: Iterable) -> 'CommentTable':
+        """Build from a tree of Comment objects"""
+        return cls._build(walk_comments(comments), getattr)
+
+    @classmethod
+    def _build(cls, walk, field) -> 'CommentTable':
+        ids: List[str] = []
+        parent: List[int] = []
+        depth: List[int] = []
+        score: List[int] = []
+        gilded: List[int] = []
+        created: List[float] = []
+        bodies: List[str] = []
+        rows: Dict[int, int] = {}  # id(node) -> row
+
+        for node, level, parent_node in walk:
+            rows[id(node)] = len(ids)
+            ids.append(field(node, 'id') or '')
+            parent.append(-1 if parent_node is None else rows[id(parent_node)])
+            stored = field(node, 'depth')
+            depth.append(level if stored is None else stored)
+            score.append(field(node, 'score') or 0)
+            gilded.append(field(node, 'gilded') or 0)
+            created.append(field(node, 'created_utc') or 0.0)
+            bodies.append(field(node, 'body') or '')
+
+        offsets = np.zeros(len(bodies) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in bodies], out=offsets[1:])
+        return cls(
+            ids=np.array(ids, dtype=str),
+            parent=np.array(parent, dtype=np.int32),
+            depth=np.array(depth, dtype=np.int32),
+            score=np.array(score, dtype=np.int64),
+            gilded=np.array(gilded, dtype=np.int32),
+            created_utc=np.array(created, dtype=np.float64),
+            deleted=np.fromiter((b in DELETED_BODIES for b in bodies), dtype=bool, count=len(bodies)),
+            buffer=''.join(bodies),
+            offsets=offsets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Body length (characters) per row"""
+        return np.diff(self.offsets)
+
+    def body(self, row: int) -> str:
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]]
+
+    def bodies(self, rows: Optional[Iterable[int]] = None) -> List[str]:
+        """Bodies of *rows* (all rows by default), in the given order"""
+        if rows is None:
+            rows = range(len(self))
+        starts, ends = self.offsets[:-1].tolist(), self.offsets[1:].tolist()
+        return [self.buffer[starts[i]:ends[i]] for i in np.asarray(rows, dtype=np.int64).tolist()]
+
+    def usable_mask(self, min_length: int = 10, exclude_ids: Collection[str] = ()) -> np.ndarray:
+        """Rows worth analyzing: longer than *min_length*, not deleted, not in *exclude_ids*"""
+        mask = (self.lengths > min_length) & ~self.deleted
+        if exclude_ids:
+            mask &= ~np.isin(self.ids, np.array(list(exclude_ids), dtype=str))
+        return mask
+
+    def depth_stats(self) -> Dict[int, Dict[str, float]]:
+        """Comment count, mean score and mean body length per depth"""
+        if not len(self):
+            return {}
+        counts = np.bincount(self.depth)
+        scores = np.bincount(self.depth, weights=self.score)
+        lengths = np.bincount(self.depth, weights=self.lengths)
+        return {
+            int(d): {
+                'count': int(counts[d]),
+                'mean_score': float(scores[d] / counts[d]),
+                'mean_length': float(lengths[d] / counts[d]),
+            }
+            for d in np.flatnonzero(counts)
+        }
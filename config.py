@@ -5,20 +5,144 @@ Override any value via environment variables prefixed with RGA_:
     RGA_MODEL=gpt-4.1-nano  python goldmine_finder.py --url ...
 """
 
+import json
 import os
 
 # ── Reddit Fetcher ────────────────────────────────────────────────────────────
 
 RATE_LIMIT_DELAY: float = float(os.environ.get("RGA_RATE_LIMIT_DELAY", "2"))
+RATE_LIMIT_BURST: int = int(os.environ.get("RGA_RATE_LIMIT_BURST", "3"))
 REQUEST_TIMEOUT: int = int(os.environ.get("RGA_REQUEST_TIMEOUT", "30"))
 USER_AGENT: str = os.environ.get(
     "RGA_USER_AGENT",
     "RedditGoldmineAnalyzer/1.0 (Educational Research)",
 )
+ASYNC_MAX_CONCURRENCY: int = int(os.environ.get("RGA_ASYNC_MAX_CONCURRENCY", "10"))
+
+# JSON decoder for Reddit payloads: auto, orjson, msgspec or json (stdlib)
+JSON_DECODER: str = os.environ.get("RGA_JSON_DECODER", "auto")
+# Parse thread payloads incrementally while downloading (bounded memory on huge threads)
+STREAM_PARSE: bool = os.environ.get("RGA_STREAM_PARSE", "").lower() in ("1", "true", "yes")
+STREAM_CHUNK_SIZE: int = int(os.environ.get("RGA_STREAM_CHUNK_SIZE", str(64 * 1024)))
+
+# ── HTTP Cache ────────────────────────────────────────────────────────────────
+
+HTTP_CACHE_PATH: str = os.environ.get("RGA_HTTP_CACHE_PATH", os.path.join(".cache", "reddit_http.sqlite"))
+HTTP_CACHE_MAX_MB: int = int(os.environ.get("RGA_HTTP_CACHE_MAX_MB", "200"))
+HTTP_CACHE_LISTING_TTL: int = int(os.environ.get("RGA_HTTP_CACHE_LISTING_TTL", "300"))
+HTTP_CACHE_THREAD_TTL: int = int(os.environ.get("RGA_HTTP_CACHE_THREAD_TTL", "900"))
+HTTP_CACHE_OLD_THREAD_TTL: int = int(os.environ.get("RGA_HTTP_CACHE_OLD_THREAD_TTL", "604800"))
+HTTP_CACHE_OLD_THREAD_AGE: int = int(os.environ.get("RGA_HTTP_CACHE_OLD_THREAD_AGE", "604800"))
+
+# ── "More" Comment Expansion ──────────────────────────────────────────────────
+
+EXPAND_MORE: bool = os.environ.get("RGA_EXPAND_MORE", "0").lower() in ("1", "true", "yes")
+MORECHILDREN_BATCH: int = 100  # API maximum ids per call
+MORECHILDREN_MAX_REQUESTS: int = int(os.environ.get("RGA_MORECHILDREN_MAX_REQUESTS", "20"))
+MORECHILDREN_WORKERS: int = int(os.environ.get("RGA_MORECHILDREN_WORKERS", "3"))
 
 # ── AI Analyzer ───────────────────────────────────────────────────────────────
 
 MODEL: str = os.environ.get("RGA_MODEL", "gpt-4.1-mini")
 TEMPERATURE: float = float(os.environ.get("RGA_TEMPERATURE", "0.3"))
 MAX_COMMENTS: int = int(os.environ.get("RGA_MAX_COMMENTS", "100"))
-MAX_COMMENTS_IN_PROMPT: int = int(os.environ.get("RGA_MAX_COMMENTS_IN_PROMPT", "50"))
+# Rank comments by relevance (and drop near-duplicates) before the cap
+RANK_COMMENTS: bool = os.environ.get("RGA_RANK_COMMENTS", "1").lower() in ("1", "true", "yes")
+NEAR_DUPLICATE_DISTANCE: int = int(os.environ.get("RGA_NEAR_DUPLICATE_DISTANCE", "3"))
+# Prompts are packed by token count, not comment count
+PROMPT_TOKEN_BUDGET: int = int(os.environ.get("RGA_PROMPT_TOKEN_BUDGET", "6000"))
+MAX_COMMENT_TOKENS: int = int(os.environ.get("RGA_MAX_COMMENT_TOKENS", "400"))
+# Strict JSON schema response format (structured outputs); off = plain JSON mode
+STRUCTURED_OUTPUT: bool = os.environ.get("RGA_STRUCTURED_OUTPUT", "1").lower() in ("1", "true", "yes")
+# Re-ask the model to fix only the unparsed rest of a malformed answer
+REPAIR_MALFORMED: bool = os.environ.get("RGA_REPAIR_MALFORMED", "1").lower() in ("1", "true", "yes")
+
+# USD per million (input, cached input, output) tokens, for cost reports.
+# RGA_MODEL_PRICING='{"my-model": [0.5, 0.25, 2.0]}' adds or overrides entries.
+MODEL_PRICING: dict = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    **{model: tuple(prices) for model, prices in json.loads(os.environ.get("RGA_MODEL_PRICING", "{}")).items()},
+}
+
+# ── Tiered Model Routing (--tiered) ──────────────────────────────────────────
+
+# A cheap model triages every thread; likely goldmines are escalated to the full model
+TIER_TRIAGE_MODEL: str = os.environ.get("RGA_TIER_TRIAGE_MODEL", "gpt-4.1-nano")
+TIER_FULL_MODEL: str = os.environ.get("RGA_TIER_FULL_MODEL", "gpt-4.1")
+# Escalate when the triage goldmine likelihood (0-1) and pain point estimate reach these
+TIER_TRIAGE_THRESHOLD: float = float(os.environ.get("RGA_TIER_TRIAGE_THRESHOLD", "0.5"))
+TIER_MIN_PAIN_POINTS: int = int(os.environ.get("RGA_TIER_MIN_PAIN_POINTS", "1"))
+# Comment tokens shown to the triage model, and the length of its answer
+TIER_TRIAGE_TOKEN_BUDGET: int = int(os.environ.get("RGA_TIER_TRIAGE_TOKEN_BUDGET", "1500"))
+TIER_TRIAGE_MAX_TOKENS: int = int(os.environ.get("RGA_TIER_TRIAGE_MAX_TOKENS", "150"))
+
+# ── Map-reduce Analysis (large threads) ───────────────────────────────────────
+
+MAP_REDUCE: bool = os.environ.get("RGA_MAP_REDUCE", "0").lower() in ("1", "true", "yes")
+CHUNK_CONCURRENCY: int = int(os.environ.get("RGA_CHUNK_CONCURRENCY", "4"))
+MAP_REDUCE_MAX_CHUNKS: int = int(os.environ.get("RGA_MAP_REDUCE_MAX_CHUNKS", "20"))
+
+# ── Async AI Analysis ─────────────────────────────────────────────────────────
+
+AI_MAX_CONCURRENCY: int = int(os.environ.get("RGA_AI_MAX_CONCURRENCY", "8"))
+# Retries of 429 / 5xx / connection errors, with exponential backoff and jitter
+AI_MAX_RETRIES: int = int(os.environ.get("RGA_AI_MAX_RETRIES", "5"))
+AI_RETRY_BASE_DELAY: float = float(os.environ.get("RGA_AI_RETRY_BASE_DELAY", "1.0"))
+AI_RETRY_MAX_DELAY: float = float(os.environ.get("RGA_AI_RETRY_MAX_DELAY", "60"))
+# Per-run request / token budgets per minute (0 = unlimited)
+AI_RPM_LIMIT: int = int(os.environ.get("RGA_AI_RPM_LIMIT", "0"))
+AI_TPM_LIMIT: int = int(os.environ.get("RGA_AI_TPM_LIMIT", "0"))
+# Output tokens assumed per request when reserving the token budget
+AI_OUTPUT_TOKEN_ESTIMATE: int = int(os.environ.get("RGA_AI_OUTPUT_TOKEN_ESTIMATE", "1500"))
+
+# ── Batch API (--batch-api) ──────────────────────────────────────────────────
+
+# Seconds between batch status checks
+BATCH_POLL_INTERVAL: float = float(os.environ.get("RGA_BATCH_POLL_INTERVAL", "60"))
+# Stop polling after this many seconds and leave the job to a later run (0 = wait until done)
+BATCH_MAX_WAIT: float = float(os.environ.get("RGA_BATCH_MAX_WAIT", "0"))
+BATCH_COMPLETION_WINDOW: str = os.environ.get("RGA_BATCH_COMPLETION_WINDOW", "24h")
+# Batch API price relative to MODEL_PRICING (OpenAI bills batch requests at half price)
+BATCH_PRICE_FACTOR: float = float(os.environ.get("RGA_BATCH_PRICE_FACTOR", "0.5"))
+
+# ── Thread Gate (local pre-classifier) ───────────────────────────────────────
+
+# Skip threads whose predicted chance of high-intent pain points is below this (0 = analyze all)
+GATE_THRESHOLD: float = float(os.environ.get("RGA_GATE_THRESHOLD", "0"))
+# Model trained by `python thread_gate.py train`; the keyword scorer is used while it is missing
+GATE_MODEL_PATH: str = os.environ.get("RGA_GATE_MODEL_PATH", os.path.join(".cache", "thread_gate.npz"))
+# Share of below-threshold threads analyzed anyway, to estimate the false-negative rate
+GATE_AUDIT_RATE: float = float(os.environ.get("RGA_GATE_AUDIT_RATE", "0.05"))
+# Lowest purchase intent that makes a thread worth analyzing
+GATE_MIN_INTENT: str = os.environ.get("RGA_GATE_MIN_INTENT", "high")
+
+# ── LLM Result Cache ──────────────────────────────────────────────────────────
+
+LLM_CACHE_PATH: str = os.environ.get("RGA_LLM_CACHE_PATH", os.path.join(".cache", "llm_results.sqlite"))
+LLM_CACHE_TTL: int = int(os.environ.get("RGA_LLM_CACHE_TTL", str(30 * 86400)))
+LLM_CACHE_MAX_ENTRIES: int = int(os.environ.get("RGA_LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# ── Watch Mode ────────────────────────────────────────────────────────────────
+
+THREAD_STATE_PATH: str = os.environ.get("RGA_THREAD_STATE_PATH", ".cache/thread_state.sqlite")
+WATCH_MIN_NEW_COMMENTS: int = int(os.environ.get("RGA_WATCH_MIN_NEW_COMMENTS", "10"))
+
+# ── Output Files ──────────────────────────────────────────────────────────────
+
+# Indentation of thread_/analysis_ JSON files (0 = compact)
+JSON_INDENT: int = int(os.environ.get("RGA_JSON_INDENT", "2"))
+# Compression of NDJSON archives: none, gzip or zstd (needs zstandard)
+NDJSON_COMPRESSION: str = os.environ.get("RGA_NDJSON_COMPRESSION", "gzip")
+
+# ── Result Database ───────────────────────────────────────────────────────────
+
+RESULT_DB_PATH: str = os.environ.get("RGA_RESULT_DB_PATH", os.path.join("output", "goldmine.sqlite"))
+
+# ── Pipeline ──────────────────────────────────────────────────────────────────
+
+FETCH_WORKERS: int = int(os.environ.get("RGA_FETCH_WORKERS", "2"))
+ANALYSIS_WORKERS: int = int(os.environ.get("RGA_ANALYSIS_WORKERS", "4"))
@@ -9,9 +9,21 @@ import json
 import logging
 import os
 import sys
-from typing import List, Dict
-from reddit_fetcher import RedditFetcher
-from ai_analyzer import AIAnalyzer
+import time
+from typing import Iterable, List, Dict, Optional
+
+import config as cfg
+from http_cache import ResponseCache
+from llm_cache import AnalysisCache
+from ndjson_io import ANALYSES_FILE, THREADS_FILE, NdjsonWriter, archive_path
+from reddit_fetcher import RedditFetcher, Thread, posted_since, thread_from_dict, thread_to_dict
+from ai_analyzer import AIAnalyzer, analysis_from_dict, analysis_to_dict, count_usable_comments, merge_results
+from batch_api import BatchRunner
+from pipeline import ThreadPipeline
+from result_store import ResultStore
+from thread_gate import ThreadGate
+from tiered_analyzer import TieredAnalyzer
+from thread_state import ThreadStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +31,81 @@ logger = logging.getLogger(__name__)
 class GoldmineFinder:
     """Goldmine discovery tool"""
 
-    def __init__(self, output_dir: str = "output"):
-        self.fetcher = RedditFetcher()
-        self.analyzer = AIAnalyzer()
+    def __init__(self, output_dir: str = "output", workers: int | None = None,
+                 http_cache_path: str | None = None, llm_cache_path: str | None = None,
+                 refresh: bool = False, map_reduce: bool | None = None,
+                 expand_more: bool | None = None, state_path: str | None = None,
+                 min_new_comments: int | None = None, db_path: str | None = None,
+                 output_format: str = "json", json_indent: int | None = None,
+                 stream_parse: bool | None = None, batch_api: bool = False,
+                 batch_client=None, gate_threshold: float | None = None,
+                 gate_model_path: str | None = None, tiered: bool = False):
+        """
+        Args:
+            output_dir: Directory for thread/analysis/report files.
+            workers: Concurrent AI analysis workers for subreddit/batch mode.
+                Defaults to config.ANALYSIS_WORKERS.
+            http_cache_path: SQLite file for the persistent Reddit response
+                cache. None disables it.
+            llm_cache_path: SQLite file for the AI result cache. None disables it.
+            refresh: Re-run AI analysis even when a cached result exists.
+            map_reduce: Analyze every comment of large threads in chunks.
+                Defaults to config.MAP_REDUCE.
+            expand_more: Load comments hidden behind "more" stubs.
+                Defaults to config.EXPAND_MORE.
+            state_path: SQLite file recording analyzed threads for watch
+                mode. None uses config.THREAD_STATE_PATH when watching.
+            min_new_comments: Comment growth that makes watch mode re-analyze
+                a thread. Defaults to config.WATCH_MIN_NEW_COMMENTS.
+            db_path: SQLite file that also receives every thread and analysis
+                (see result_store.py). None disables it.
+            output_format: "json" writes thread_<id>.json/analysis_<id>.json
+                per thread; "ndjson" appends to threads.ndjson/analyses.ndjson
+                archives (compressed per config.NDJSON_COMPRESSION).
+            json_indent: Indentation of the per-thread JSON files (0 = compact).
+                Defaults to config.JSON_INDENT.
+            stream_parse: Parse thread payloads while they download.
+                Defaults to config.STREAM_PARSE.
+            batch_api: Analyze subreddit/batch runs as one OpenAI Batch API
+                job, resumable from <output_dir>/batch_api/manifest.json.
+            batch_client: Batch API client for batch_api (see
+                batch_api.OpenAIBatchClient). Defaults to the OpenAI one.
+            gate_threshold: Skip subreddit/batch threads whose thread_gate
+                score is below this (0 = analyze all).
+                Defaults to config.GATE_THRESHOLD.
+            gate_model_path: Trained gate model (see thread_gate.py).
+                Defaults to config.GATE_MODEL_PATH, or keywords if missing.
+            tiered: Triage every thread with config.TIER_TRIAGE_MODEL and run
+                the full analysis on config.TIER_FULL_MODEL only for likely
+                goldmines (see tiered_analyzer.py).
+        """
+        self.http_cache = ResponseCache(http_cache_path) if http_cache_path else None
+        self.llm_cache = AnalysisCache(llm_cache_path) if llm_cache_path else None
+        self.fetcher = RedditFetcher(cache=self.http_cache, expand_more=expand_more,
+                                     stream_parse=stream_parse)
+        self.tiered = tiered
+        analyzer_class = TieredAnalyzer if tiered else AIAnalyzer
+        self.analyzer = analyzer_class(cache=self.llm_cache, refresh=refresh, map_reduce=map_reduce)
         self.output_dir = output_dir
+        self.workers = workers if workers is not None else cfg.ANALYSIS_WORKERS
+        self.state_path = state_path
+        self.min_new_comments = min_new_comments
+        self.state: Optional[ThreadStateStore] = None
+        self.store = ResultStore(db_path) if db_path else None
+        self.json_indent = json_indent
+        self.thread_archive: Optional[NdjsonWriter] = None
+        self.analysis_archive: Optional[NdjsonWriter] = None
+        if output_format == "ndjson":
+            self.thread_archive = NdjsonWriter(archive_path(output_dir, THREADS_FILE))
+            self.analysis_archive = NdjsonWriter(archive_path(output_dir, ANALYSES_FILE))
+        elif output_format != "json":
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.batch_runner: Optional[BatchRunner] = None
+        if batch_api:
+            self.batch_runner = BatchRunner(self.analyzer, os.path.join(output_dir, "batch_api"),
+                                            client=batch_client)
+        gate_threshold = gate_threshold if gate_threshold is not None else cfg.GATE_THRESHOLD
+        self.gate = ThreadGate(gate_threshold, gate_model_path) if gate_threshold > 0 else None
 
         os.makedirs(output_dir, exist_ok=True)
 
@@ -32,7 +115,15 @@ class GoldmineFinder:
         logger.info("Starting thread analysis: %s", url)
         logger.info("=" * 70)
 
-        logger.info("Fetching thread data...")
+        thread = self._fetch_and_save(url)
+        if not thread:
+            return None
+
+        return self._analyze_and_report(thread)
+
+    def _fetch_and_save(self, url: str) -> Optional[Thread]:
+        """Pipeline stage 1: fetch a thread and save its raw data"""
+        logger.info("Fetching thread data: %s", url)
         thread = self.fetcher.fetch_thread(url)
 
         if not thread:
@@ -41,16 +132,75 @@ class GoldmineFinder:
 
         logger.info("Fetched: %d comments", thread.num_comments)
 
-        thread_file = os.path.join(self.output_dir, f"thread_{thread.id}.json")
-        self.fetcher.save_to_json(thread, thread_file)
+        if self.thread_archive:
+            self.thread_archive.write_thread(thread)
+        else:
+            thread_file = os.path.join(self.output_dir, f"thread_{thread.id}.json")
+            self.fetcher.save_to_json(thread, thread_file, indent=self.json_indent)
 
-        thread_dict = self._thread_to_dict(thread)
+        return thread
 
-        logger.info("Running AI analysis...")
+    def _analyze_and_report(self, thread: Thread, thread_dict: Optional[Dict] = None) -> Dict:
+        """Pipeline stage 2: run AI analysis and write analysis/report files"""
+        thread_dict = thread_dict or self._thread_to_dict(thread)
+
+        logger.info("Running AI analysis: %s", thread.title)
         result = self.analyzer.analyze_thread(thread_dict)
 
-        analysis_file = os.path.join(self.output_dir, f"analysis_{thread.id}.json")
-        self.analyzer.save_analysis(result, analysis_file)
+        return self._save_outputs(thread, thread_dict, result)
+
+    def _analyze_gated(self, thread: Thread) -> Optional[Dict]:
+        """Pipeline stage 2 behind the thread gate: low-scoring threads are skipped"""
+        thread_dict = self._thread_to_dict(thread)
+        if not self.gate.decide(thread_dict).analyze:
+            return None
+        return self._analyze_and_report(thread, thread_dict)
+
+    def _analyze_incremental(self, thread: Thread) -> Dict:
+        """
+        Watch-mode stage 2: analyze only comments not covered by the stored
+        analysis and merge the result into it.
+        """
+        thread_dict = self._thread_to_dict(thread)
+        state = self.state.get(thread.id)
+
+        if state and state.analysis:
+            seen = self.state.seen_comment_ids(thread.id)
+            previous = analysis_from_dict(state.analysis)
+            previous.analyzed_comments = state.analysis.get('analyzed_comments', 0)
+            new_comments = count_usable_comments(thread_dict, seen)
+            if new_comments:
+                logger.info("Incremental analysis: %s (%d new comments)", thread.title, new_comments)
+                update = self.analyzer.analyze_thread(thread_dict, skip_comment_ids=seen)
+                result = merge_results(previous, update)
+            else:
+                # Re-analyzing the title and body alone would only inflate the counts
+                logger.info("No new usable comments, keeping the stored analysis: %s", thread.title)
+                result = previous
+        else:
+            logger.info("Running AI analysis: %s", thread.title)
+            result = self.analyzer.analyze_thread(thread_dict)
+
+        # Only comments actually sent count as seen: the ones dropped by the
+        # comment cap or token budget stay pending for the next pass
+        if result.failed:
+            logger.warning("Analysis failed, keeping the stored state for a retry: %s", thread.title)
+        else:
+            stored = analysis_to_dict(result)
+            stored['analyzed_comments'] = result.analyzed_comments
+            self.state.record_analysis(thread.id, thread.subreddit, thread.num_comments,
+                                       thread.score, stored, result.comment_ids)
+
+        return self._save_outputs(thread, thread_dict, result)
+
+    def _save_outputs(self, thread: Thread, thread_dict: Dict, result) -> Dict:
+        """Write analysis/report files for one thread"""
+        if self.analysis_archive:
+            analysis_file = self.analysis_archive.path
+            self.analysis_archive.write_analysis(result)
+        else:
+            analysis_file = os.path.join(self.output_dir, f"analysis_{thread.id}.json")
+            self.analyzer.save_analysis(result, analysis_file, indent=self.json_indent)
 
         report = self.analyzer.generate_report(result)
         report_file = os.path.join(self.output_dir, f"report_{thread.id}.md")
@@ -58,6 +208,12 @@ class GoldmineFinder:
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write(report)
 
+        if self.store:
+            self.store.save_thread(thread_dict)
+            self.store.save_analysis(result)
+        if self.gate:
+            self.gate.observe(result)
+
         logger.info("Analysis complete!")
         logger.info("Report: %s", report_file)
         logger.info("Analysis data: %s", analysis_file)
@@ -68,37 +224,152 @@ class GoldmineFinder:
             'report_file': report_file
         }
 
-    def analyze_subreddit(self, subreddit: str, limit: int = 10, min_comments: int = 5) -> List[Dict]:
-        """Analyze multiple threads from a subreddit"""
+    def _run_pipeline(self, urls: Iterable[str], analyze=None, label: str = "batch") -> List[Dict]:
+        """Fetch and analyze threads concurrently, keeping input order"""
+        if self.batch_runner and analyze is None:
+            return self._run_batch_api(urls, label)
+
+        pipeline = ThreadPipeline(
+            fetch=self._fetch_and_save,
+            analyze=analyze or (self._analyze_gated if self.gate else self._analyze_and_report),
+            fetch_workers=min(cfg.FETCH_WORKERS, self.workers),
+            analysis_workers=self.workers,
+        )
+        return [r for r in pipeline.run(urls) if r]
+
+    def _run_batch_api(self, urls: Iterable[str], label: str) -> List[Dict]:
+        """Fetch every thread, then analyze them all in one Batch API job"""
+        if self.batch_runner.pending():
+            logger.warning("Resuming unfinished batch job in %s; new threads are ignored",
+                           self.batch_runner.work_dir)
+            return self._save_batch_results(self.batch_runner.resume())
+
+        pipeline = ThreadPipeline(
+            fetch=self._fetch_and_save,
+            analyze=self._thread_to_dict,
+            fetch_workers=cfg.FETCH_WORKERS,
+        )
+        thread_dicts = [d for d in pipeline.run(urls) if d]
+        if self.gate:
+            thread_dicts = [d for d in thread_dicts if self.gate.decide(d).analyze]
+        return self._save_batch_results(self.batch_runner.run(thread_dicts, label))
+
+    def resume_batch_api(self) -> List[Dict]:
+        """Finish the unfinished Batch API job of a previous run and write its reports"""
+        label = self.batch_runner.label
+        logger.info("Resuming batch job: %s", label)
+        results = self._save_batch_results(self.batch_runner.resume())
+        self._generate_summary_report(label, results)
+        return results
+
+    def _save_batch_results(self, outcome) -> List[Dict]:
+        """Write outputs for collected batch results (none while the job still runs)"""
+        if outcome is None:
+            return []
+        return [self._save_outputs(thread_from_dict(thread_dict), thread_dict, result)
+                for thread_dict, result in outcome]
+
+    def analyze_subreddit(self, subreddit: str, limit: int = 10, min_comments: int = 5,
+                          sort: str = "hot", max_age_hours: float | None = None) -> List[Dict]:
+        """
+        Analyze multiple threads from a subreddit.
+
+        Listing pages stream in while earlier threads are already being
+        fetched and analyzed.
+
+        Args:
+            subreddit: Subreddit name.
+            limit: Posts to scan (pages past 100 are followed automatically).
+            min_comments: Skip posts with fewer comments.
+            sort: Listing to scan: hot, new or top.
+            max_age_hours: Skip posts older than this. On the "new" listing the
+                sweep stops at the first older post.
+        """
         logger.info("=" * 70)
         logger.info("Subreddit analysis: r/%s", subreddit)
         logger.info("=" * 70)
 
-        logger.info("Fetching hot posts from r/%s...", subreddit)
-        posts = self.fetcher.fetch_subreddit_hot(subreddit, limit=limit)
-
-        if not posts:
+        predicate = None
+        cutoff = None
+        if max_age_hours is not None:
+            cutoff = time.time() - max_age_hours * 3600
+            if sort == "new":
+                predicate = posted_since(cutoff)
+
+        logger.info("Fetching %s posts from r/%s...", sort, subreddit)
+        posts = self.fetcher.iter_subreddit(subreddit, sort, limit, predicate=predicate)
+        counts = {'fetched': 0, 'selected': 0}
+
+        def selected_urls() -> Iterable[str]:
+            for post in posts:
+                counts['fetched'] += 1
+                if post['num_comments'] < min_comments:
+                    continue
+                if cutoff is not None and (post.get('created_utc') or 0) < cutoff:
+                    continue
+                counts['selected'] += 1
+                logger.info("[%d] %s (%d comments)", counts['selected'], post['title'], post['num_comments'])
+                yield post['permalink']
+
+        results = self._run_pipeline(selected_urls(), label=subreddit)
+
+        if not counts['fetched']:
             logger.error("Failed to fetch posts")
             return []
 
-        logger.info("Fetched %d posts", len(posts))
+        logger.info(
+            "Fetched %d posts, %d met the minimum %d comments threshold",
+            counts['fetched'], counts['selected'], min_comments,
+        )
 
-        filtered_posts = [p for p in posts if p['num_comments'] >= min_comments]
-        logger.info("%d posts meet the minimum %d comments threshold", len(filtered_posts), min_comments)
+        self._generate_summary_report(subreddit, results)
 
-        results = []
+        return results
 
-        for i, post in enumerate(filtered_posts, 1):
-            logger.info("--- [%d/%d] ---", i, len(filtered_posts))
-            logger.info("Title: %s", post['title'])
-            logger.info("Comments: %d", post['num_comments'])
+    def watch_subreddit(self, subreddit: str, limit: int = 100, min_comments: int = 5,
+                        sort: str = "hot", max_age_hours: float | None = None) -> List[Dict]:
+        """
+        One watch pass: analyze only threads that are new or have grown.
 
-            result = self.analyze_single_thread(post['permalink'])
-            if result:
-                results.append(result)
+        Threads already in the state store are skipped unless their comment
+        count grew by min_new_comments; grown threads send only their new
+        comments to the AI and merge the result into the stored analysis.
+        """
+        if self.state is None:
+            self.state = ThreadStateStore(self.state_path, self.min_new_comments)
 
-        self._generate_summary_report(subreddit, results)
+        logger.info("=" * 70)
+        logger.info("Watching r/%s (%d threads tracked)", subreddit, self.state.thread_count())
+        logger.info("=" * 70)
 
+        cutoff = time.time() - max_age_hours * 3600 if max_age_hours is not None else None
+        predicate = posted_since(cutoff) if cutoff is not None and sort == "new" else None
+        posts = self.fetcher.iter_subreddit(subreddit, sort, limit, predicate=predicate)
+        counts = {'fetched': 0, 'changed': 0, 'unchanged': 0}
+
+        def changed_urls() -> Iterable[str]:
+            for post in posts:
+                counts['fetched'] += 1
+                if post['num_comments'] < min_comments:
+                    continue
+                if cutoff is not None and (post.get('created_utc') or 0) < cutoff:
+                    continue
+                if not self.state.needs_analysis(post):
+                    counts['unchanged'] += 1
+                    self.state.observe(post)
+                    continue
+                counts['changed'] += 1
+                logger.info("[%d] %s (%d comments)", counts['changed'], post['title'], post['num_comments'])
+                yield post['permalink']
+
+        results = self._run_pipeline(changed_urls(), analyze=self._analyze_incremental)
+
+        logger.info(
+            "Watch: %d posts scanned, %d new or changed analyzed, %d unchanged skipped",
+            counts['fetched'], counts['changed'], counts['unchanged'],
+        )
+        if results:
+            self._generate_summary_report(subreddit, results)
         return results
 
     def batch_analyze_urls(self, urls: List[str]) -> List[Dict]:
@@ -107,46 +378,56 @@ class GoldmineFinder:
         logger.info("Batch analysis: %d threads", len(urls))
         logger.info("=" * 70)
 
-        results = []
-
-        for i, url in enumerate(urls, 1):
-            logger.info("--- [%d/%d] ---", i, len(urls))
-            result = self.analyze_single_thread(url)
-            if result:
-                results.append(result)
+        results = self._run_pipeline(urls, label="batch")
 
         self._generate_summary_report("batch", results)
 
         return results
 
+    def log_cache_stats(self):
+        """Log cache effectiveness, AI usage and cost (plus gate and tier stats) for this run"""
+        if self.http_cache:
+            stats = self.http_cache.stats()
+            logger.info(
+                "HTTP cache: %d hits, %d revalidated, %d misses (%d entries, %.1f MB)",
+                stats['hits'], stats['revalidated'], stats['misses'],
+                stats['entries'], stats['bytes'] / (1024 * 1024),
+            )
+        if self.llm_cache:
+            logger.info(
+                "AI result cache: %d hits, %d misses, ~%d tokens saved",
+                self.llm_cache.hits, self.llm_cache.misses, self.llm_cache.tokens_saved,
+            )
+        if self.gate and self.gate.stats()['scored']:
+            stats = self.gate.stats()
+            logger.info(
+                "Thread gate (%s, threshold %.2f): %d scored, %d skipped (%.0f%%), %d audited",
+                self.gate.scorer, self.gate.threshold, stats['scored'], stats['skipped'],
+                stats['skip_rate'] * 100, stats['audited'],
+            )
+            if stats['hit_rate'] is not None:
+                logger.info("Thread gate: %d/%d analyzed threads had high-intent pain points",
+                            stats['passed_hits'], stats['passed'])
+            if stats['false_negative_rate'] is not None:
+                logger.info(
+                    "Thread gate: %d/%d audited skips had high-intent pain points "
+                    "(estimated false-negative rate %.0f%%)",
+                    stats['audit_hits'], stats['audited'], stats['false_negative_rate'] * 100,
+                )
+        self.analyzer.log_usage()
+        if self.tiered:
+            self.analyzer.log_tier_stats()
+
     def _thread_to_dict(self, thread) -> Dict:
         """Convert Thread object to dictionary"""
-        def comment_to_dict(comment):
-            return {
-                'id': comment.id,
-                'author': comment.author,
-                'body': comment.body,
-                'score': comment.score,
-                'created_utc': comment.created_utc,
-                'parent_id': comment.parent_id,
-                'gilded': comment.gilded,
-                'depth': comment.depth,
-                'replies': [comment_to_dict(r) for r in comment.replies]
-            }
+        return thread_to_dict(thread)
 
-        return {
-            'id': thread.id,
-            'title': thread.title,
-            'author': thread.author,
-            'selftext': thread.selftext,
-            'score': thread.score,
-            'num_comments': thread.num_comments,
-            'created_utc': thread.created_utc,
-            'url': thread.url,
-            'subreddit': thread.subreddit,
-            'upvote_ratio': thread.upvote_ratio,
-            'comments': [comment_to_dict(c) for c in thread.comments]
-        }
+    def close(self):
+        """Flush archives and close the databases opened by this finder"""
+        for resource in (self.thread_archive, self.analysis_archive, self.store, self.state,
+                         self.http_cache, self.llm_cache):
+            if resource:
+                resource.close()
 
     def _generate_summary_report(self, name: str, results: List[Dict]):
         """Generate summary report for multiple threads"""
@@ -155,11 +436,23 @@ class GoldmineFinder:
 
         summary_file = os.path.join(self.output_dir, f"summary_{name}.md")
 
+        cached = [r['analysis'] for r in results if r['analysis'].cache_hit]
+        cache_hits = len(cached)
+        tokens_saved = sum(a.tokens_used for a in cached)
+        sent = [r['analysis'] for r in results if not r['analysis'].cache_hit]
+        input_tokens = sum(a.tokens_used - a.completion_tokens for a in sent)
+        prompt_cached = sum(a.cached_tokens for a in sent)
+        prompt_cache_line = (
+            f"**Prompt Cache**: {prompt_cached:,} of {input_tokens:,} input tokens "
+            f"({prompt_cached / input_tokens:.0%})\n" if input_tokens else ""
+        )
+
         report = f"""# Reddit Goldmine Analysis - Summary Report
 
 **Target**: {name}
 **Threads Analyzed**: {len(results)}
-
+**Cached Analyses**: {cache_hits} ({tokens_saved:,} tokens saved)
+{prompt_cache_line}
 ---
 
 ## Top Pain Points (by Purchase Intent)
@@ -281,6 +574,23 @@ Examples:
 
   # Specify output directory
   python goldmine_finder.py --subreddit SaaS --output my_analysis/
+
+  # Run 8 AI analyses in parallel
+  python goldmine_finder.py --batch urls.txt --workers 8
+
+  # Nightly sweep through the Batch API (re-run the same command to resume)
+  python goldmine_finder.py --subreddit SaaS --limit 200 --batch-api
+
+  # Skip threads the local gate scores below 0.2 (train it on past results first)
+  python thread_gate.py train --db output/goldmine.sqlite
+  python goldmine_finder.py --subreddit SaaS --gate-threshold 0.2
+
+  # Triage with a cheap model, full analysis only for likely goldmines
+  python goldmine_finder.py --subreddit SaaS --limit 100 --tiered
+
+  # Also record results in SQLite, then query them
+  python goldmine_finder.py --subreddit SaaS --db
+  python result_store.py query --subreddit SaaS --since-days 30 --min-intent high
         """
     )
 
@@ -288,29 +598,114 @@ Examples:
     parser.add_argument('--subreddit', help='Subreddit name to analyze')
     parser.add_argument('--limit', type=int, default=10, help='Number of posts to fetch (default: 10)')
     parser.add_argument('--min-comments', type=int, default=5, help='Minimum number of comments (default: 5)')
+    parser.add_argument('--sort', choices=['hot', 'new', 'top'], default='hot',
+                        help='Subreddit listing to scan (default: hot)')
+    parser.add_argument('--max-age-hours', type=float,
+                        help='Skip posts older than this (with --sort new, stop the sweep there)')
     parser.add_argument('--batch', help='URL list file (one URL per line)')
     parser.add_argument('--output', default='output', help='Output directory (default: output/)')
+    parser.add_argument('--http-cache', default=cfg.HTTP_CACHE_PATH,
+                        help=f'Persistent Reddit response cache file (default: {cfg.HTTP_CACHE_PATH})')
+    parser.add_argument('--no-http-cache', action='store_true', help='Always re-download Reddit data')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the AI result cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-run AI analysis even for cached threads (and update the cache)')
+    parser.add_argument('--watch', action='store_true',
+                        help='With --subreddit: analyze only new threads or threads with new comments')
+    parser.add_argument('--interval', type=float, default=0,
+                        help='With --watch: repeat every N minutes until interrupted (default: run once)')
+    parser.add_argument('--state', default=cfg.THREAD_STATE_PATH,
+                        help=f'Watch state database (default: {cfg.THREAD_STATE_PATH})')
+    parser.add_argument('--min-new-comments', type=int, default=cfg.WATCH_MIN_NEW_COMMENTS,
+                        help=f'With --watch: comment growth that triggers re-analysis (default: {cfg.WATCH_MIN_NEW_COMMENTS})')
+    parser.add_argument('--output-format', choices=['json', 'ndjson'], default='json',
+                        help='json: one file per thread; ndjson: append to threads/analyses archives '
+                             f'({cfg.NDJSON_COMPRESSION} compressed, see RGA_NDJSON_COMPRESSION)')
+    parser.add_argument('--compact-json', action='store_true',
+                        help='Write thread/analysis JSON files without indentation')
+    parser.add_argument('--db', metavar='PATH', nargs='?', const=cfg.RESULT_DB_PATH,
+                        help=f'Also store threads and analyses in a SQLite database (default path: {cfg.RESULT_DB_PATH})')
+    parser.add_argument('--expand-more', action='store_true', default=cfg.EXPAND_MORE,
+                        help=f'Load comments hidden behind "more" links (up to {cfg.MORECHILDREN_MAX_REQUESTS} extra requests per thread)')
+    parser.add_argument('--stream-parse', action='store_true', default=cfg.STREAM_PARSE,
+                        help='Parse thread JSON incrementally while downloading (lower peak memory on huge threads)')
+    parser.add_argument('--map-reduce', action='store_true', default=cfg.MAP_REDUCE,
+                        help='Analyze all comments of large threads in chunks and merge the results')
+    parser.add_argument('--batch-api', action='store_true',
+                        help='With --subreddit/--batch: analyze via the OpenAI Batch API (half price, '
+                             'results within 24h); re-run to resume an unfinished job')
+    parser.add_argument('--gate-threshold', type=float, default=cfg.GATE_THRESHOLD,
+                        help='With --subreddit/--batch: skip threads whose predicted chance of high-intent '
+                             f'pain points is below this, e.g. 0.2 (default: {cfg.GATE_THRESHOLD:g} = analyze all)')
+    parser.add_argument('--gate-model',
+                        help=f'Gate model from thread_gate.py train (default: {cfg.GATE_MODEL_PATH} if it exists, '
+                             'else keyword scoring)')
+    parser.add_argument('--tiered', action='store_true',
+                        help=f'Triage every thread with {cfg.TIER_TRIAGE_MODEL} and run the full analysis on '
+                             f'{cfg.TIER_FULL_MODEL} only for likely goldmines (see RGA_TIER_* settings)')
+    parser.add_argument('--workers', type=int, default=cfg.ANALYSIS_WORKERS,
+                        help=f'Concurrent AI analysis workers for --subreddit/--batch (default: {cfg.ANALYSIS_WORKERS})')
 
     args = parser.parse_args()
 
     if not any([args.url, args.subreddit, args.batch]):
         parser.print_help()
         sys.exit(1)
-
-    finder = GoldmineFinder(output_dir=args.output)
+    if args.batch_api and (args.url or args.watch):
+        parser.error("--batch-api works with --subreddit or --batch (not --url or --watch)")
+    if args.batch_api and args.tiered:
+        parser.error("--tiered cannot be combined with --batch-api")
+    if not 0 <= args.gate_threshold < 1:
+        parser.error("--gate-threshold must be between 0 and 1")
+
+    finder = GoldmineFinder(
+        output_dir=args.output,
+        workers=args.workers,
+        http_cache_path=None if args.no_http_cache else args.http_cache,
+        llm_cache_path=None if args.no_cache else cfg.LLM_CACHE_PATH,
+        refresh=args.refresh,
+        map_reduce=args.map_reduce,
+        expand_more=args.expand_more,
+        state_path=args.state,
+        min_new_comments=args.min_new_comments,
+        db_path=args.db,
+        output_format=args.output_format,
+        json_indent=0 if args.compact_json else None,
+        stream_parse=args.stream_parse,
+        batch_api=args.batch_api,
+        gate_threshold=args.gate_threshold,
+        gate_model_path=args.gate_model,
+        tiered=args.tiered,
+    )
 
     try:
-        if args.url:
+        if args.batch_api and finder.batch_runner.pending():
+            logger.info("An unfinished batch job exists; collecting it before starting a new one")
+            finder.resume_batch_api()
+
+        elif args.url:
             finder.analyze_single_thread(args.url)
 
+        elif args.subreddit and args.watch:
+            while True:
+                finder.watch_subreddit(args.subreddit, limit=args.limit, min_comments=args.min_comments,
+                                       sort=args.sort, max_age_hours=args.max_age_hours)
+                if args.interval <= 0:
+                    break
+                logger.info("Next watch pass in %.0f minutes", args.interval)
+                time.sleep(args.interval * 60)
+
         elif args.subreddit:
-            finder.analyze_subreddit(args.subreddit, limit=args.limit, min_comments=args.min_comments)
+            finder.analyze_subreddit(args.subreddit, limit=args.limit, min_comments=args.min_comments,
+                                     sort=args.sort, max_age_hours=args.max_age_hours)
 
         elif args.batch:
             with open(args.batch, 'r', encoding='utf-8') as f:
                 urls = [line.strip() for line in f if line.strip()]
             finder.batch_analyze_urls(urls)
 
+        finder.log_cache_stats()
+
         logger.info("=" * 70)
         logger.info("All analyses complete!")
         logger.info("Results saved in %s/", args.output)
@@ -322,6 +717,8 @@ Examples:
     except Exception as e:
         logger.error("Error: %s", e, exc_info=True)
         sys.exit(1)
+    finally:
+        finder.close()
 
 
 if __name__ == "__main__":
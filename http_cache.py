@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP Response Cache
+SQLite-backed cache for Reddit JSON responses, shared by the CLI and the Web UI
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+import config as cfg
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+"""
+
+
+@dataclass
+class CachedResponse:
+    """A stored response body plus its revalidation headers"""
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite response cache with per-endpoint TTLs and size-based LRU eviction"""
+
+    def __init__(self, path: str | None = None, max_bytes: int | None = None,
+                 clock=time.time):
+        """
+        Args:
+            path: SQLite file. Defaults to config.HTTP_CACHE_PATH.
+            max_bytes: Total body size before least-recently-used entries are
+                evicted. Defaults to config.HTTP_CACHE_MAX_MB.
+            clock: Wall-clock time source (injectable for tests).
+        """
+        self.path = path or cfg.HTTP_CACHE_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else cfg.HTTP_CACHE_MAX_MB * 1024 * 1024
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def ttl_for(self, url: str, created_utc: float | None = None) -> float:
+        """
+        Seconds a response stays fresh.
+
+        Listings change constantly and get a short TTL. Threads get a short TTL
+        while they are young and a long one once they are old enough that new
+        comments are rare.
+        """
+        if '/comments/' not in url:
+            return cfg.HTTP_CACHE_LISTING_TTL
+        if created_utc and self._clock() - created_utc > cfg.HTTP_CACHE_OLD_THREAD_AGE:
+            return cfg.HTTP_CACHE_OLD_THREAD_TTL
+        return cfg.HTTP_CACHE_THREAD_TTL
+
+    def contains(self, url: str) -> bool:
+        """True if *url* has an entry (fresh or stale), without counting a hit"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM responses WHERE url = ?", (url,)).fetchone() is not None
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Look up *url*. Returns stale entries too, so callers can revalidate."""
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+            body, etag, last_modified, expires_at = row
+            fresh = expires_at > now
+            if fresh:
+                self.hits += 1
+        return CachedResponse(body=body, etag=etag, last_modified=last_modified, fresh=fresh)
+
+    def put(self, url: str, body: bytes, headers: Mapping[str, Any] | None = None,
+            created_utc: float | None = None):
+        """Store a freshly downloaded response and evict old entries if over the size limit"""
+        headers = headers or {}
+        now = self._clock()
+        expires_at = now + self.ttl_for(url, created_utc)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, etag, last_modified, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, headers.get('ETag'), headers.get('Last-Modified'),
+                 expires_at, now, len(body)),
+            )
+            self._total += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+            self.misses += 1
+
+    def mark_revalidated(self, url: str, created_utc: float | None = None):
+        """Extend an entry's freshness after a 304 Not Modified"""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE url = ?",
+                (now + self.ttl_for(url, created_utc), now, url),
+            )
+            self._conn.commit()
+            self.revalidated += 1
+
+    def _evict(self):
+        """Drop least-recently-used entries until under max_bytes (lock held)"""
+        if self._total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        evicted = []
+        for url, size in rows:
+            if self._total <= self.max_bytes:
+                break
+            evicted.append((url,))
+            self._total -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        logger.debug("HTTP cache evicted %d entries", len(evicted))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for this process plus current cache size.
+
+        hits are served without touching the network, revalidated cost one
+        conditional request answered with 304, misses were fully downloaded.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'entries': entries,
+                'bytes': self._total,
+            }
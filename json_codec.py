@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+JSON Decoding
+Pluggable decoder for Reddit payloads: orjson or msgspec when installed,
+the standard library otherwise
+"""
+
+import functools
+import json
+import logging
+from typing import Any, Callable, Dict
+
+import config as cfg
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional dependency
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+# Preference order for "auto"
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _orjson_loads(data: bytes | str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return orjson.loads(data)
+
+
+def _msgspec_loads(data: bytes | str) -> Any:
+    try:
+        return _msgspec_decoder().decode(data)
+    except msgspec.DecodeError as e:
+        raise json.JSONDecodeError(str(e), data if isinstance(data, str) else '', 0) from e
+
+
+@functools.lru_cache(maxsize=None)
+def _msgspec_decoder():
+    return msgspec.json.Decoder()
+
+
+def _json_loads(data: bytes | str) -> Any:
+    return json.loads(data)
+
+
+_LOADERS: Dict[str, Callable[[bytes | str], Any]] = {
+    "orjson": _orjson_loads,
+    "msgspec": _msgspec_loads,
+    "json": _json_loads,
+}
+
+
+def available_backends() -> list:
+    """Installed backends, fastest first"""
+    installed = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+@functools.lru_cache(maxsize=None)
+def get_decoder(name: str | None = None) -> Callable[[bytes | str], Any]:
+    """
+    Decoder function for *name*.
+
+    Args:
+        name: orjson, msgspec, json or auto. Defaults to config.JSON_DECODER.
+            "auto" picks the fastest installed backend; an explicitly named
+            backend that is not installed falls back the same way.
+
+    Raises:
+        ValueError: Unknown backend name.
+    """
+    name = name or cfg.JSON_DECODER
+    if name != "auto" and name not in _LOADERS:
+        raise ValueError(f"Unknown JSON decoder: {name}")
+    installed = available_backends()
+    if name not in installed:
+        if name != "auto":
+            logger.warning("JSON decoder %s is not installed, using %s", name, installed[0])
+        name = installed[0]
+    return _LOADERS[name]
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Decode a JSON document with the configured backend.
+
+    Raises:
+        json.JSONDecodeError: Invalid JSON (for every backend).
+    """
+    return get_decoder()(data)
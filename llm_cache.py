@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+LLM Result Cache
+Content-addressed SQLite cache for AI analysis responses
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import config as cfg
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_last_access ON analyses(last_access);
+"""
+
+
+def make_key(model: str, temperature: float, prompt_version: str,
+             title: str, body: str, comments: List[str]) -> str:
+    """Hash everything that can change the model's answer"""
+    payload = json.dumps(
+        [model, temperature, prompt_version, title, body, comments],
+        ensure_ascii=False, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite cache of raw AI responses with TTL and LRU size limit"""
+
+    def __init__(self, path: str | None = None, ttl: int | None = None,
+                 max_entries: int | None = None, clock=time.time):
+        """
+        Args:
+            path: SQLite file. Defaults to config.LLM_CACHE_PATH.
+            ttl: Seconds an entry stays valid. Defaults to config.LLM_CACHE_TTL.
+            max_entries: Entries kept before least-recently-used ones are
+                evicted. Defaults to config.LLM_CACHE_MAX_ENTRIES.
+            clock: Wall-clock time source (injectable for tests).
+        """
+        self.path = path or cfg.LLM_CACHE_PATH
+        self.ttl = ttl if ttl is not None else cfg.LLM_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else cfg.LLM_CACHE_MAX_ENTRIES
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """
+        Returns:
+            (result_text, tokens) for a live entry, else None. tokens is what
+            the original call cost, i.e. what this hit saved.
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, tokens, created_at FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE analyses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.tokens_saved += row[1]
+        return row[0], row[1]
+
+    def put(self, key: str, result_text: str, tokens: int):
+        """Store a response and trim the cache to max_entries"""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, result, tokens, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, result_text, tokens, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM analyses WHERE key IN ("
+                "SELECT key FROM analyses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def discard(self, key: str):
+        """
+        Delete an entry that get() returned but that turned out to be
+        unusable; the lookup is counted as a miss instead of a hit.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT tokens FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+            self._conn.commit()
+            self.hits -= 1
+            self.misses += 1
+            self.tokens_saved -= row[0]
+
+    def entries(self) -> int:
+        """Number of stored results"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
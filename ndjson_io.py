@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+NDJSON Archives
+Append-only, one-record-per-line files of threads and analyses (optionally
+gzip or zstd compressed) with streaming readers, for bulk runs where one
+pretty-printed JSON file per thread is too slow and too large
+"""
+
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+from typing import IO, Any, Dict, Iterator
+
+import config as cfg
+from ai_analyzer import AnalysisResult, analysis_from_dict, analysis_to_dict
+from reddit_fetcher import Thread, thread_from_dict, thread_to_dict
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+THREADS_FILE = "threads.ndjson"
+ANALYSES_FILE = "analyses.ndjson"
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def archive_path(output_dir: str, name: str, compression: str | None = None) -> str:
+    """
+    Path of an archive file in *output_dir*.
+
+    Args:
+        name: THREADS_FILE or ANALYSES_FILE.
+        compression: none, gzip or zstd. Defaults to config.NDJSON_COMPRESSION.
+    """
+    compression = compression or cfg.NDJSON_COMPRESSION
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown NDJSON compression: {compression}")
+    return os.path.join(output_dir, name + COMPRESSION_SUFFIXES[compression])
+
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    """Open *path* as UTF-8 text ('r' or 'a'), compressed according to its suffix"""
+    if path.endswith(".gz"):
+        # Appending adds a gzip member; readers decode all members in sequence
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed (pip install zstandard)")
+        raw = open(path, mode + "b")
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        else:
+            # Each writer session appends one frame
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class NdjsonWriter:
+    """Thread-safe appender of JSON records, one per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = None
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = _open_text(self.path, "a")
+            self._file.write(line)
+            self.count += 1
+
+    def write_thread(self, thread: Thread):
+        self.write(thread_to_dict(thread))
+
+    def write_analysis(self, result: AnalysisResult):
+        self.write(analysis_to_dict(result))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of an NDJSON file.
+
+    Blank lines are ignored. A line that does not parse (typically the last
+    line of an interrupted run) is logged and skipped.
+    """
+    with _open_text(path, "r") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("%s:%d: skipping malformed record: %s", path, lineno, e)
+
+
+def iter_threads(path: str) -> Iterator[Thread]:
+    """Stream Thread objects from a threads archive"""
+    return (thread_from_dict(record) for record in iter_records(path))
+
+
+def iter_analyses(path: str) -> Iterator[AnalysisResult]:
+    """Stream AnalysisResult objects from an analyses archive"""
+    return (analysis_from_dict(record) for record in iter_records(path))
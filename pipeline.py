@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Thread Pipeline
+Overlaps Reddit fetches with AI analysis using two bounded worker pools
+connected by a queue, so a batch takes roughly as long as its slowest stage.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class ThreadPipeline:
+    """Two-stage fetch → analyze executor"""
+
+    def __init__(
+        self,
+        fetch: Callable[[Any], Any],
+        analyze: Callable[[Any], Any],
+        fetch_workers: int = 1,
+        analysis_workers: int = 1,
+    ):
+        """
+        Args:
+            fetch: Stage 1 callable. Returning None drops the item.
+            analyze: Stage 2 callable, receives whatever fetch returned.
+            fetch_workers: Number of concurrent fetch workers.
+            analysis_workers: Number of concurrent analysis workers.
+        """
+        self.fetch = fetch
+        self.analyze = analyze
+        self.fetch_workers = max(1, fetch_workers)
+        self.analysis_workers = max(1, analysis_workers)
+
+    def run(self, items: Iterable[Any]) -> List[Optional[Any]]:
+        """
+        Push every item through both stages.
+
+        Items are pulled from *items* lazily, so a generator can keep producing
+        while earlier items are already being analyzed.
+
+        Returns:
+            List[Optional[Any]]: One entry per input item, in input order.
+                Items dropped by the fetch stage yield None.
+
+        Raises:
+            Exception: The first exception raised by either stage. Remaining
+                queued items are abandoned once a stage fails.
+        """
+        # Bounded queues give backpressure: fetchers never run far ahead of analysis.
+        fetch_q: queue.Queue = queue.Queue(maxsize=self.fetch_workers * 2)
+        analysis_q: queue.Queue = queue.Queue(maxsize=self.analysis_workers * 2)
+        results: dict = {}
+        errors: List[BaseException] = []
+        stop = threading.Event()
+        count = [0]
+
+        def fail(exc: BaseException):
+            if not errors:
+                errors.append(exc)
+            stop.set()
+
+        def feeder():
+            try:
+                for idx, item in enumerate(items):
+                    if stop.is_set():
+                        break
+                    count[0] = idx + 1
+                    fetch_q.put((idx, item))
+            except Exception as e:
+                fail(e)
+            finally:
+                for _ in range(self.fetch_workers):
+                    fetch_q.put(_DONE)
+
+        def fetch_worker():
+            while True:
+                job = fetch_q.get()
+                if job is _DONE:
+                    return
+                if stop.is_set():
+                    continue
+                idx, item = job
+                logger.info("--- [%d] fetching ---", idx + 1)
+                try:
+                    fetched = self.fetch(item)
+                except Exception as e:
+                    fail(e)
+                    continue
+                if fetched is None:
+                    results[idx] = None
+                    continue
+                analysis_q.put((idx, fetched))
+
+        def analysis_worker():
+            while True:
+                job = analysis_q.get()
+                if job is _DONE:
+                    return
+                if stop.is_set():
+                    continue
+                idx, fetched = job
+                try:
+                    results[idx] = self.analyze(fetched)
+                except Exception as e:
+                    fail(e)
+
+        feed_thread = threading.Thread(target=feeder, name="pipeline-feed", daemon=True)
+        fetchers = [
+            threading.Thread(target=fetch_worker, name=f"pipeline-fetch-{i}", daemon=True)
+            for i in range(self.fetch_workers)
+        ]
+        analyzers = [
+            threading.Thread(target=analysis_worker, name=f"pipeline-analyze-{i}", daemon=True)
+            for i in range(self.analysis_workers)
+        ]
+
+        for t in [feed_thread, *fetchers, *analyzers]:
+            t.start()
+
+        feed_thread.join()
+        for t in fetchers:
+            t.join()
+        for _ in analyzers:
+            analysis_q.put(_DONE)
+        for t in analyzers:
+            t.join()
+
+        if errors:
+            raise errors[0]
+
+        return [results.get(i) for i in range(count[0])]
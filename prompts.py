@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Prompt Templates
+Versioned prompts for the AI analyzers. Each prompt starts with a static
+prefix (system message: role, schema, instructions) and ends with the
+variable thread payload (user message), so provider-side prompt caching can
+reuse the prefix across threads.
+
+OpenAI caches prompts of 1024 tokens or more, in 128-token steps of the
+longest shared prefix, so the static part is kept above that size. Any
+change to a template must bump its version: the versions are part of the
+result cache keys.
+"""
+
+import json
+from typing import Dict, List
+
+from response_schema import ANALYSIS_SCHEMA
+
+# Bump whenever ANALYSIS_SYSTEM_PROMPT, the payload layout or the response format changes
+PROMPT_VERSION = "4"
+# Bump whenever TRIAGE_SYSTEM_PROMPT or the payload layout changes
+TRIAGE_PROMPT_VERSION = "triage-2"
+
+ANALYSIS_SYSTEM_PROMPT = """You are an expert in market research and business opportunity discovery.
+Analyze the Reddit thread and comments in the next message, then extract customer "pain points", "purchase intent", and "market opportunities".
+
+Return the analysis results in the following JSON format:
+
+{
+  "pain_points": [
+    {
+      "description": "Description of the pain point",
+      "severity": "one of: low/medium/high/critical",
+      "frequency_mentioned": estimated number of times mentioned in comments,
+      "example_comments": ["actual comment example 1", "actual comment example 2"],
+      "purchase_intent": "one of: none/low/medium/high",
+      "category": "category name (e.g., Marketing, Finance, Operations, Technology, etc.)"
+    }
+  ],
+  "key_insights": [
+    "Important insight 1",
+    "Important insight 2",
+    "Important insight 3"
+  ],
+  "market_opportunities": [
+    "Market opportunity 1: specific product/service idea",
+    "Market opportunity 2: specific product/service idea"
+  ],
+  "sentiment_summary": "Summary of overall sentiment (positive/negative/neutral, with reasoning)"
+}
+
+Important instructions:
+1. Focus on specific, actionable pain points
+2. Evaluate purchase intent by the urgency of "I need a solution right now"
+3. Focus market opportunities on products/services that can actually be sold
+4. Prioritize problems people would "pay money to solve"
+5. Always respond in JSON format only (no other text)
+
+Field reference (the same format as above, one field at a time):
+
+- pain_points: array of objects, one object per pain point. Each object has exactly the six fields below.
+- pain_points[].description: string. Description of the pain point.
+- pain_points[].severity: string, exactly one of "low", "medium", "high" or "critical".
+- pain_points[].frequency_mentioned: integer. Estimated number of times the pain point is mentioned in the comments.
+- pain_points[].example_comments: array of strings. Actual comment examples for the pain point.
+- pain_points[].purchase_intent: string, exactly one of "none", "low", "medium" or "high".
+- pain_points[].category: string. Category name (e.g., Marketing, Finance, Operations, Technology, etc.).
+- key_insights: array of strings. Important insights.
+- market_opportunities: array of strings. Market opportunities, each a specific product/service idea.
+- sentiment_summary: string. Summary of overall sentiment (positive/negative/neutral, with reasoning).
+
+All six pain point fields and all four top-level fields are required. No other fields are allowed.
+Use an empty array for an array field with no entries.
+
+The same format as a JSON Schema:
+
+""" + json.dumps(ANALYSIS_SCHEMA, indent=2) + """
+
+Layout of the next message:
+- 【Thread Title】 followed by the title of the Reddit post.
+- 【Thread Body】 followed by the text of the post. It may be empty for link or image posts.
+- 【Comments】 followed by the comments, numbered "Comment 1:", "Comment 2:" and so on, separated by lines containing only "---".
+  Long comments may be shortened, and not every comment of the thread is included.
+
+The thread to analyze follows in the next message."""
+
+# Too short to be cached by itself, but kept first so the layout matches
+TRIAGE_SYSTEM_PROMPT = """You are a market research expert screening Reddit threads before a detailed analysis.
+Decide whether the thread you receive is worth analyzing: does it contain customer pain points that people would pay to solve?
+
+Respond only with a JSON object in exactly this format:
+{"goldmine_likelihood": number from 0 to 1, "pain_point_count": estimated number of distinct pain points, "reason": "one short sentence"}
+
+Scoring guide:
+- 0.8 to 1: several people describe a costly problem, ask for tools or say they would pay.
+- 0.5 to 0.8: a clear recurring problem, but little sign that people look for a paid solution.
+- 0.2 to 0.5: complaints in passing, mostly discussion or advice.
+- 0 to 0.2: jokes, celebrations, news, link sharing or self-promotion.
+
+The thread follows in the next message."""
+
+# Sent with only the unparsed end of a malformed answer, never with the thread
+REPAIR_SYSTEM_PROMPT = """You repair the broken end of a JSON answer from a market research analysis.
+The earlier part of the answer was already recovered; you receive only the rest, which is cut off or malformed.
+
+Return a JSON object with the keys "pain_points", "key_insights", "market_opportunities" and "sentiment_summary" holding what the fragment contains:
+- Keep every value as written; close a cut-off string at its last complete word.
+- Drop pain points too incomplete to keep (no description).
+- Use empty lists and an empty string for fields the fragment does not contain.
+- Never add content that is not in the fragment.
+
+Pain points have the fields description, severity (low/medium/high/critical), frequency_mentioned (integer), example_comments (list of strings), purchase_intent (none/low/medium/high) and category."""
+
+
+def thread_payload(thread_title: str, thread_body: str, comments_text: str, comments_heading: str = "Comments") -> str:
+    """Variable part of a prompt: the thread itself"""
+    return f"""【Thread Title】
+{thread_title}
+
+【Thread Body】
+{thread_body}
+
+【{comments_heading}】
+{comments_text}"""
+
+
+def analysis_messages(thread_title: str, thread_body: str, comments_text: str) -> List[Dict[str, str]]:
+    """Chat messages for the full analysis: static system prefix, then the thread"""
+    return [
+        {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+        {"role": "user", "content": thread_payload(thread_title, thread_body, comments_text)},
+    ]
+
+
+def triage_messages(thread_title: str, thread_body: str, comments_text: str) -> List[Dict[str, str]]:
+    """Chat messages for the triage prompt: static system prefix, then the thread"""
+    return [
+        {"role": "system", "content": TRIAGE_SYSTEM_PROMPT},
+        {"role": "user", "content": thread_payload(thread_title, thread_body, comments_text, "Top Comments")},
+    ]
+
+
+def repair_messages(fragment: str) -> List[Dict[str, str]]:
+    """Chat messages for the repair re-ask of a malformed answer's unparsed rest"""
+    return [
+        {"role": "system", "content": REPAIR_SYSTEM_PROMPT},
+        {"role": "user", "content": fragment},
+    ]
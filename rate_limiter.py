@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Token-bucket Rate Limiter
+One process-wide request budget shared by every Reddit fetcher, sync or async
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Mapping, Optional
+
+import config as cfg
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that also works from asyncio code"""
+
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second. 0 or less disables limiting.
+            capacity: Maximum burst size. The bucket starts full, so a cold
+                start does not wait.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take *tokens* from the bucket, going into debt if necessary.
+
+        Returns:
+            float: Seconds the caller must wait before using the reservation.
+        """
+        if self.unlimited:
+            return 0.0
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self, tokens: float = 1.0):
+        """Block the calling thread until *tokens* are available"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Suspend the calling coroutine until *tokens* are available"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, Any]):
+        """
+        Reconcile the local budget with Reddit's X-Ratelimit-* response headers.
+
+        X-Ratelimit-Remaining caps the tokens we believe we have. When it hits
+        zero, every caller waits until X-Ratelimit-Reset seconds have passed.
+        """
+        if self.unlimited or headers is None:
+            return
+
+        remaining = _header_float(headers, 'X-Ratelimit-Remaining')
+        reset = _header_float(headers, 'X-Ratelimit-Reset')
+        if remaining is None:
+            return
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, remaining)
+            if remaining < 1 and reset:
+                self._blocked_until = max(self._blocked_until, now + reset)
+                logger.warning("Reddit rate limit exhausted, pausing %.0fs", reset)
+
+
+def _header_float(headers: Mapping[str, Any], name: str) -> Optional[float]:
+    """Read a numeric header, returning None when absent or malformed"""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_default_limiter: Optional[TokenBucket] = None
+_default_lock = threading.Lock()
+
+
+def get_default_limiter() -> TokenBucket:
+    """Return the process-wide Reddit limiter, creating it from config on first use"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            delay = cfg.RATE_LIMIT_DELAY
+            _default_limiter = TokenBucket(
+                rate=1.0 / delay if delay > 0 else 0.0,
+                capacity=cfg.RATE_LIMIT_BURST,
+            )
+        return _default_limiter
+
+
+def set_default_limiter(limiter: Optional[TokenBucket]):
+    """Replace the process-wide limiter (None rebuilds it from config)"""
+    global _default_limiter
+    with _default_lock:
+        _default_limiter = limiter
@@ -6,21 +6,31 @@ Fetches and structures data from Reddit threads in JSON format
 
 import json
 import logging
-import time
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime
 
 import requests
 
 import config as cfg
+import json_codec
+from http_cache import ResponseCache
+from rate_limiter import TokenBucket, get_default_limiter
+from stream_parser import ThreadPayloadScanner
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _intern(value):
+    """Share one copy of frequently repeated strings (authors, parent ids)"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
 class Comment:
-    """Comment data class"""
+    """Comment data class (slotted: big threads hold tens of thousands)"""
     id: str
     author: str
     body: str
@@ -32,11 +42,22 @@ class Comment:
     replies: List['Comment'] = None
 
     def __post_init__(self):
+        self.author = _intern(self.author)
+        self.parent_id = _intern(self.parent_id)
         if self.replies is None:
             self.replies = []
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Nested dict of this comment and its replies"""
+        return comment_to_dict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Comment':
+        """Rebuild a comment (and its replies) from to_dict output"""
+        return comments_from_dicts([data])[0]
+
 
-@dataclass
+@dataclass(slots=True)
 class Thread:
     """Thread data class"""
     id: str
@@ -52,50 +73,228 @@ class Thread:
     comments: List[Comment] = None
 
     def __post_init__(self):
+        self.author = _intern(self.author)
+        self.subreddit = _intern(self.subreddit)
         if self.comments is None:
             self.comments = []
 
-
-class RedditFetcher:
-    """Reddit JSON API Fetcher"""
-
-    def __init__(self, user_agent: str | None = None, rate_limit_delay: float | None = None):
-        self.user_agent = user_agent or cfg.USER_AGENT
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': self.user_agent})
-        self.rate_limit_delay = rate_limit_delay if rate_limit_delay is not None else cfg.RATE_LIMIT_DELAY
-
-    def fetch_thread(self, url: str) -> Optional[Thread]:
-        """
-        Fetch data from a Reddit thread URL in JSON format.
-
-        Args:
-            url: Reddit thread URL (e.g., https://www.reddit.com/r/Entrepreneur/comments/xxx/)
-
-        Returns:
-            Thread: Structured thread data
-        """
-        json_url = self._normalize_url(url)
-
-        try:
-            time.sleep(self.rate_limit_delay)
-            response = self.session.get(json_url, timeout=cfg.REQUEST_TIMEOUT)
-            response.raise_for_status()
-
-            data = response.json()
-
-            thread = self._parse_thread(data)
-            return thread
-
-        except requests.exceptions.RequestException as e:
-            logger.error("Failed to fetch data: %s", e)
-            return None
-        except json.JSONDecodeError as e:
-            logger.error("Failed to parse JSON: %s", e)
-            return None
-        except ValueError as e:
-            logger.error("Failed to parse thread: %s", e)
-            return None
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict of this thread (the thread_<id>.json format)"""
+        return thread_to_dict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Thread':
+        """Rebuild a thread from to_dict output"""
+        return thread_from_dict(data)
+
+
+# Reddit returns at most 100 posts per listing request
+LISTING_PAGE_SIZE = 100
+
+
+def posted_since(cutoff_utc: float) -> Callable[[Dict[str, Any]], bool]:
+    """Listing predicate: true while posts are newer than *cutoff_utc*"""
+    return lambda post: (post.get('created_utc') or 0) >= cutoff_utc
+
+
+# Sentinel for exhausted iterators in the explicit-stack walkers
+_DONE = object()
+
+
+def _comment_replies(comment) -> List:
+    return comment.replies
+
+
+def _json_replies(item: Dict) -> List[Dict]:
+    """Children of a raw t1 comment ('replies' is '' when there are none)"""
+    replies = item.get('data', {}).get('replies')
+    if isinstance(replies, dict):
+        return replies.get('data', {}).get('children', [])
+    return []
+
+
+def _comment_from_json(item: Dict, depth: int) -> Optional[Comment]:
+    """Comment from a raw listing child, or None for 'more' stubs and other kinds"""
+    if item.get('kind') != 't1':
+        return None
+    comment_data = item.get('data', {})
+    return Comment(
+        id=comment_data.get('id', ''),
+        author=comment_data.get('author', ''),
+        body=comment_data.get('body', ''),
+        score=comment_data.get('score', 0),
+        created_utc=comment_data.get('created_utc', 0),
+        parent_id=comment_data.get('parent_id', ''),
+        gilded=comment_data.get('gilded', 0),
+        depth=depth,
+    )
+
+
+def _json_replies_all(item: Dict) -> List[Dict]:
+    """Like _json_replies, but only t1 comments have children"""
+    return _json_replies(item) if item.get('kind') == 't1' else []
+
+
+def walk_comments(
+    roots: Iterable,
+    children: Callable[[Any], Optional[Iterable]] = _comment_replies,
+) -> Iterator[Tuple[Any, int, Any]]:
+    """
+    Stream a comment tree in pre-order (the order Reddit displays it).
+
+    Uses an explicit stack instead of recursion, so arbitrarily deep reply
+    chains cannot hit the recursion limit, and yields lazily without
+    building intermediate lists.
+
+    Args:
+        roots: Top-level nodes (Comment objects, comment dicts, ...).
+        children: Returns a node's replies. Defaults to Comment.replies.
+
+    Yields:
+        (node, depth, parent) with depth 0 and parent None for roots.
+    """
+    stack = [(iter(roots), 0, None)]
+    while stack:
+        nodes, depth, parent = stack[-1]
+        node = next(nodes, _DONE)
+        if node is _DONE:
+            stack.pop()
+            continue
+        yield node, depth, parent
+        replies = children(node)
+        if replies:
+            stack.append((iter(replies), depth + 1, node))
+
+
+def map_comment_tree(
+    roots: Iterable,
+    convert: Callable[[Any, int], Any],
+    children: Callable[[Any], Optional[Iterable]],
+    replies: Callable[[Any], List],
+    depth: int = 0,
+) -> List:
+    """
+    Build a converted copy of a comment tree without recursion.
+
+    Args:
+        roots: Top-level source nodes.
+        convert: (node, depth) -> converted node, or None to drop the node
+            and its whole subtree.
+        children: Returns a source node's replies.
+        replies: Returns the list on a converted node that its converted
+            replies are appended to.
+        depth: Depth of the roots.
+
+    Returns:
+        Converted roots, in source order.
+    """
+    result: List = []
+    stack = [(iter(roots), result, depth)]
+    while stack:
+        nodes, out, level = stack[-1]
+        node = next(nodes, _DONE)
+        if node is _DONE:
+            stack.pop()
+            continue
+        converted = convert(node, level)
+        if converted is None:
+            continue
+        out.append(converted)
+        kids = children(node)
+        if kids:
+            stack.append((iter(kids), replies(converted), level + 1))
+    return result
+
+
+def iter_comments(comments: Iterable) -> Iterator:
+    """Every comment in a tree of Comment objects, in pre-order"""
+    return (node for node, _, _ in walk_comments(comments))
+
+
+def iter_comment_dicts(comments: Iterable[Dict]) -> Iterator[Dict]:
+    """Every comment in a tree of comment dicts ('replies' lists), in pre-order"""
+    return (node for node, _, _ in walk_comments(comments, lambda c: c.get('replies')))
+
+
+def _comment_fields(comment: Comment, _depth: int) -> Dict[str, Any]:
+    return {
+        'id': comment.id,
+        'author': comment.author,
+        'body': comment.body,
+        'score': comment.score,
+        'created_utc': comment.created_utc,
+        'parent_id': comment.parent_id,
+        'gilded': comment.gilded,
+        'depth': comment.depth,
+        'replies': [],
+    }
+
+
+def comments_to_dicts(comments: Iterable[Comment]) -> List[Dict[str, Any]]:
+    """Convert a Comment tree to nested JSON-ready dicts"""
+    return map_comment_tree(comments, _comment_fields, _comment_replies, lambda d: d['replies'])
+
+
+def comment_to_dict(comment: Comment) -> Dict[str, Any]:
+    """Convert one Comment (and its replies) to a nested dict"""
+    return comments_to_dicts([comment])[0]
+
+
+def _comment_from_fields(data: Dict[str, Any], depth: int) -> Comment:
+    return Comment(
+        id=data.get('id', ''),
+        author=data.get('author', '[deleted]'),
+        body=data.get('body', ''),
+        score=data.get('score', 0),
+        created_utc=data.get('created_utc', 0),
+        parent_id=data.get('parent_id', ''),
+        gilded=data.get('gilded', 0),
+        depth=data.get('depth', depth),
+    )
+
+
+def comments_from_dicts(comments: Iterable[Dict[str, Any]]) -> List[Comment]:
+    """Rebuild a Comment tree from comments_to_dicts output"""
+    return map_comment_tree(comments, _comment_from_fields, lambda d: d.get('replies'),
+                            lambda c: c.replies)
+
+
+def thread_to_dict(thread: Thread) -> Dict[str, Any]:
+    """JSON-ready dict of a thread and its comment tree (the thread_<id>.json format)"""
+    return {
+        'id': thread.id,
+        'title': thread.title,
+        'author': thread.author,
+        'selftext': thread.selftext,
+        'score': thread.score,
+        'num_comments': thread.num_comments,
+        'created_utc': thread.created_utc,
+        'url': thread.url,
+        'subreddit': thread.subreddit,
+        'upvote_ratio': thread.upvote_ratio,
+        'comments': comments_to_dicts(thread.comments)
+    }
+
+
+def thread_from_dict(data: Dict[str, Any]) -> Thread:
+    """Rebuild a Thread from thread_to_dict output"""
+    return Thread(
+        id=data.get('id', ''),
+        title=data.get('title', ''),
+        author=data.get('author', '[deleted]'),
+        selftext=data.get('selftext', ''),
+        score=data.get('score', 0),
+        num_comments=data.get('num_comments', 0),
+        created_utc=data.get('created_utc', 0),
+        url=data.get('url', ''),
+        subreddit=data.get('subreddit', ''),
+        upvote_ratio=data.get('upvote_ratio', 0),
+        comments=comments_from_dicts(data.get('comments', [])),
+    )
+
+
+class RedditParser:
+    """Parsing and URL helpers shared by the sync and async fetchers"""
 
     def _parse_post_listing(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Parse a Reddit listing response into a list of post dicts."""
@@ -116,62 +315,18 @@ class RedditFetcher:
             })
         return posts
 
-    def _fetch_listing(self, url: str) -> List[Dict[str, Any]]:
-        """Fetch and parse a subreddit listing URL."""
-        try:
-            time.sleep(self.rate_limit_delay)
-            response = self.session.get(url, timeout=cfg.REQUEST_TIMEOUT)
-            response.raise_for_status()
-            return self._parse_post_listing(response.json())
-        except requests.exceptions.RequestException as e:
-            logger.error("Failed to fetch subreddit: %s", e)
-            return []
-        except json.JSONDecodeError as e:
-            logger.error("Failed to parse subreddit JSON: %s", e)
-            return []
-
-    def fetch_subreddit_hot(self, subreddit: str, limit: int = 25) -> List[Dict[str, Any]]:
-        """
-        Fetch hot posts from a subreddit.
+    def _listing_url(self, subreddit: str, sort: str, limit: int, time_filter: str | None = None,
+                     after: str | None = None, count: int = 0) -> str:
+        """Build one subreddit listing page URL (limit capped at 100 per page)"""
+        params = f"t={time_filter}&" if time_filter else ""
+        url = f"https://old.reddit.com/r/{subreddit}/{sort}.json?{params}limit={min(limit, LISTING_PAGE_SIZE)}"
+        if after:
+            url += f"&after={after}&count={count}"
+        return url
 
-        Args:
-            subreddit: Subreddit name (e.g., "Entrepreneur")
-            limit: Number of posts to fetch (max 100)
-
-        Returns:
-            List[Dict]: List of posts
-        """
-        url = f"https://old.reddit.com/r/{subreddit}/hot.json?limit={min(limit, 100)}"
-        return self._fetch_listing(url)
-
-    def fetch_subreddit_top(self, subreddit: str, time_filter: str = "week", limit: int = 25) -> List[Dict[str, Any]]:
-        """
-        Fetch top posts from a subreddit.
-
-        Args:
-            subreddit: Subreddit name (e.g., "Entrepreneur")
-            time_filter: Time filter (hour, day, week, month, year, all)
-            limit: Number of posts to fetch (max 100)
-
-        Returns:
-            List[Dict]: List of posts
-        """
-        url = f"https://old.reddit.com/r/{subreddit}/top.json?t={time_filter}&limit={min(limit, 100)}"
-        return self._fetch_listing(url)
-
-    def fetch_subreddit_new(self, subreddit: str, limit: int = 25) -> List[Dict[str, Any]]:
-        """
-        Fetch new posts from a subreddit.
-
-        Args:
-            subreddit: Subreddit name (e.g., "Entrepreneur")
-            limit: Number of posts to fetch (max 100)
-
-        Returns:
-            List[Dict]: List of posts
-        """
-        url = f"https://old.reddit.com/r/{subreddit}/new.json?limit={min(limit, 100)}"
-        return self._fetch_listing(url)
+    def _listing_after(self, data: Dict[str, Any]) -> Optional[str]:
+        """Cursor for the next listing page (None on the last page)"""
+        return data.get('data', {}).get('after')
 
     def _normalize_url(self, url: str) -> str:
         """Normalize URL to JSON API endpoint"""
@@ -187,6 +342,13 @@ class RedditFetcher:
         url = url.rstrip('/')
         return f"{url}.json"
 
+    def _payload_created_utc(self, data: Any) -> Optional[float]:
+        """created_utc of the post in a thread payload (None for listings)"""
+        try:
+            return data[0]['data']['children'][0]['data'].get('created_utc')
+        except (IndexError, KeyError, TypeError, AttributeError):
+            return None
+
     def _parse_thread(self, data: List[Dict]) -> Thread:
         """Build Thread object from JSON data"""
         try:
@@ -217,87 +379,428 @@ class RedditFetcher:
 
         return thread
 
+    def _iter_thread_stream(self, chunks: Iterable[bytes]) -> Iterator[Tuple[str, Any]]:
+        """
+        Parse a thread payload from body chunks as they arrive.
+
+        Yields:
+            ('thread', Thread) once, with no comments yet, as soon as the post
+            is complete; then ('comment', Comment) for each top-level comment
+            (with its replies) and ('more', ids) for the 'more' stub ids in
+            that subtree.
+
+        Raises:
+            ValueError: Malformed or truncated payload (json.JSONDecodeError included).
+        """
+        scanner = ThreadPayloadScanner()
+
+        def events():
+            for chunk in chunks:
+                yield from scanner.feed(chunk)
+            yield from scanner.close()
+
+        seen_post = False
+        for kind, value in events():
+            if kind == 'post':
+                seen_post = True
+                yield 'thread', self._parse_thread([value])
+                continue
+            if not seen_post:
+                raise ValueError("Unexpected Reddit API response structure: comments before post")
+            for comment in self._parse_comments([value]):
+                yield 'comment', comment
+            more_ids = self._more_ids([None, {'data': {'children': [value]}}])
+            if more_ids:
+                yield 'more', more_ids
+        if not seen_post:
+            raise ValueError("Unexpected Reddit API response structure: no post")
+
+    def _parse_thread_stream(self, chunks: Iterable[bytes]) -> Tuple[Thread, List[str]]:
+        """
+        Build the same Thread as _parse_thread from streamed body chunks.
+
+        Returns:
+            (thread, more_ids), more_ids matching _more_ids of the full payload.
+        """
+        thread: Optional[Thread] = None
+        more_ids: List[str] = []
+        for kind, value in self._iter_thread_stream(chunks):
+            if kind == 'thread':
+                thread = value
+            elif kind == 'comment':
+                thread.comments.append(value)
+            else:
+                more_ids.extend(value)
+        return thread, more_ids
+
     def _parse_comments(self, comments_data: List[Dict], depth: int = 0) -> List[Comment]:
-        """Recursively parse comments"""
-        comments = []
+        """Parse a comment listing tree ('more' stubs are skipped)"""
+        return map_comment_tree(
+            comments_data, _comment_from_json, _json_replies, _comment_replies, depth,
+        )
 
-        for item in comments_data:
-            kind = item.get('kind')
+    def _more_ids(self, data: List[Dict]) -> List[str]:
+        """
+        Comment ids hidden behind 'more' stubs in a thread payload.
 
+        "Continue this thread" stubs (id '_', no children) link to a separate
+        page rather than loadable ids and are ignored.
+        """
+        try:
+            listing = data[1].get('data', {}).get('children', [])
+        except (IndexError, KeyError, TypeError, AttributeError):
+            return []
+        ids: List[str] = []
+        for item, _, _ in walk_comments(listing, _json_replies_all):
+            if item.get('kind') == 'more':
+                ids.extend(i for i in item.get('data', {}).get('children', []) if i and i != '_')
+        return ids
+
+    def _morechildren_url(self, link_id: str, ids: List[str]) -> str:
+        """/api/morechildren URL resolving up to MORECHILDREN_BATCH comment ids"""
+        return (
+            "https://old.reddit.com/api/morechildren.json?api_type=json&raw_json=1"
+            f"&limit_children=false&link_id={link_id}&children={','.join(ids)}"
+        )
+
+    def _morechildren_batches(self, ids: List[str]) -> List[List[str]]:
+        size = cfg.MORECHILDREN_BATCH
+        return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+    def _graft_comments(self, thread: Thread, things: List[Dict]) -> Tuple[int, List[str]]:
+        """
+        Attach /api/morechildren results to the tree under their parent_id.
+
+        Things arrive flat (parents before children). Depth is recomputed from
+        the parent so grafted comments line up with the parsed tree.
+
+        Returns:
+            (comments added, ids of 'more' stubs found in the results)
+        """
+        by_name = {f"t1_{c.id}": c for c in iter_comments(thread.comments)}
+        link_name = f"t3_{thread.id}"
+        added = 0
+        more_ids: List[str] = []
+
+        for thing in things:
+            kind = thing.get('kind')
+            data = thing.get('data', {})
             if kind == 'more':
+                more_ids.extend(i for i in data.get('children', []) if i and i != '_')
+                continue
+            if kind != 't1' or f"t1_{data.get('id')}" in by_name:
                 continue
 
-            if kind != 't1':
+            parent_id = data.get('parent_id', '')
+            if parent_id == link_name:
+                siblings, depth = thread.comments, 0
+            elif parent_id in by_name:
+                parent = by_name[parent_id]
+                siblings, depth = parent.replies, parent.depth + 1
+            else:
+                logger.debug("Dropping comment %s: parent %s not in tree", data.get('id'), parent_id)
                 continue
 
-            comment_data = item.get('data', {})
-
-            comment = Comment(
-                id=comment_data.get('id', ''),
-                author=comment_data.get('author', ''),
-                body=comment_data.get('body', ''),
-                score=comment_data.get('score', 0),
-                created_utc=comment_data.get('created_utc', 0),
-                parent_id=comment_data.get('parent_id', ''),
-                gilded=comment_data.get('gilded', 0),
-                depth=depth,
-            )
-
-            replies_data = comment_data.get('replies')
-            if isinstance(replies_data, dict):
-                replies_children = replies_data.get('data', {}).get('children', [])
-                comment.replies = self._parse_comments(replies_children, depth + 1)
-
-            comments.append(comment)
-
-        return comments
-
-    def save_to_json(self, thread: Thread, filepath: str):
-        """Save thread data to a JSON file"""
-        def comment_to_dict(comment: Comment) -> Dict:
-            return {
-                'id': comment.id,
-                'author': comment.author,
-                'body': comment.body,
-                'score': comment.score,
-                'created_utc': comment.created_utc,
-                'parent_id': comment.parent_id,
-                'gilded': comment.gilded,
-                'depth': comment.depth,
-                'replies': [comment_to_dict(r) for r in comment.replies]
-            }
-
-        thread_dict = {
-            'id': thread.id,
-            'title': thread.title,
-            'author': thread.author,
-            'selftext': thread.selftext,
-            'score': thread.score,
-            'num_comments': thread.num_comments,
-            'created_utc': thread.created_utc,
-            'url': thread.url,
-            'subreddit': thread.subreddit,
-            'upvote_ratio': thread.upvote_ratio,
-            'comments': [comment_to_dict(c) for c in thread.comments]
-        }
+            comment = _comment_from_json(thing, depth)
+            comment.replies = self._parse_comments(_json_replies(thing), depth + 1)
+            siblings.append(comment)
+            for c in iter_comments([comment]):
+                by_name[f"t1_{c.id}"] = c
+                added += 1
+
+        return added, more_ids
+
+    def _morechildren_things(self, data: Dict) -> List[Dict]:
+        """Flat list of things from an /api/morechildren response"""
+        return data.get('json', {}).get('data', {}).get('things', [])
 
+    def save_to_json(self, thread: Thread, filepath: str, indent: int | None = None):
+        """
+        Save thread data to a JSON file.
+
+        Args:
+            indent: Indentation width. 0 writes compact JSON.
+                Defaults to config.JSON_INDENT.
+        """
+        indent = indent if indent is not None else cfg.JSON_INDENT
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(thread_dict, f, ensure_ascii=False, indent=2)
+            json.dump(thread_to_dict(thread), f, ensure_ascii=False,
+                      indent=indent or None, separators=None if indent else (',', ':'))
 
         logger.info("Data saved: %s", filepath)
 
     def get_all_comments_flat(self, thread: Thread) -> List[Comment]:
         """Get all comments in a thread as a flat list"""
-        all_comments = []
+        return list(iter_comments(thread.comments))
+
+
+class RedditFetcher(RedditParser):
+    """Reddit JSON API Fetcher"""
+
+    def __init__(self, user_agent: str | None = None, rate_limiter: TokenBucket | None = None,
+                 cache: ResponseCache | None = None, expand_more: bool | None = None,
+                 stream_parse: bool | None = None):
+        """
+        Args:
+            user_agent: User-Agent header. Defaults to config.USER_AGENT.
+            rate_limiter: Request budget. Defaults to the process-wide limiter
+                shared by every fetcher.
+            cache: Persistent response cache. None disables caching.
+            expand_more: Resolve 'more' stubs via /api/morechildren when
+                fetching threads. Defaults to config.EXPAND_MORE.
+            stream_parse: Parse thread payloads incrementally while they
+                download. Defaults to config.STREAM_PARSE.
+        """
+        self.user_agent = user_agent or cfg.USER_AGENT
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': self.user_agent})
+        self.rate_limiter = rate_limiter or get_default_limiter()
+        self.cache = cache
+        self.expand_more = cfg.EXPAND_MORE if expand_more is None else expand_more
+        self.stream_parse = cfg.STREAM_PARSE if stream_parse is None else stream_parse
+
+    def _get_json(self, url: str) -> Any:
+        """
+        GET a JSON endpoint, serving fresh cache entries without a request
+        and revalidating stale ones with If-None-Match/If-Modified-Since.
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.fresh:
+            return json_codec.loads(cached.body)
+
+        self.rate_limiter.acquire()
+        if cached:
+            response = self.session.get(url, timeout=cfg.REQUEST_TIMEOUT, headers=cached.validators())
+        else:
+            response = self.session.get(url, timeout=cfg.REQUEST_TIMEOUT)
+        self.rate_limiter.update_from_headers(response.headers)
+
+        if cached and response.status_code == 304:
+            data = json_codec.loads(cached.body)
+            self.cache.mark_revalidated(url, self._payload_created_utc(data))
+            return data
+
+        response.raise_for_status()
+        data = json_codec.loads(response.content)
+        if self.cache:
+            self.cache.put(url, response.content, response.headers, self._payload_created_utc(data))
+        return data
+
+    def _stream_thread(self, url: str) -> Tuple[Thread, List[str]]:
+        """
+        Download and parse a thread payload chunk by chunk.
+
+        The raw body is kept only when it has to be written to the cache.
+        """
+        self.rate_limiter.acquire()
+        with self.session.get(url, timeout=cfg.REQUEST_TIMEOUT, stream=True) as response:
+            self.rate_limiter.update_from_headers(response.headers)
+            response.raise_for_status()
+            body: Optional[List[bytes]] = [] if self.cache else None
+
+            def chunks():
+                for chunk in response.iter_content(chunk_size=cfg.STREAM_CHUNK_SIZE):
+                    if body is not None:
+                        body.append(chunk)
+                    yield chunk
+
+            thread, more_ids = self._parse_thread_stream(chunks())
+
+        if body is not None:
+            self.cache.put(url, b''.join(body), response.headers, thread.created_utc)
+        return thread, more_ids
+
+    def fetch_thread(self, url: str) -> Optional[Thread]:
+        """
+        Fetch data from a Reddit thread URL in JSON format.
+
+        Args:
+            url: Reddit thread URL (e.g., https://www.reddit.com/r/Entrepreneur/comments/xxx/)
+
+        Returns:
+            Thread: Structured thread data
+        """
+        json_url = self._normalize_url(url)
+
+        try:
+            # Cached payloads are already local; only stream real downloads
+            if self.stream_parse and not (self.cache and self.cache.contains(json_url)):
+                thread, more_ids = self._stream_thread(json_url)
+            else:
+                data = self._get_json(json_url)
+                thread = self._parse_thread(data)
+                more_ids = self._more_ids(data) if self.expand_more else []
+
+            if self.expand_more:
+                self.expand_more_comments(thread, more_ids)
+            return thread
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to fetch data: %s", e)
+            return None
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse JSON: %s", e)
+            return None
+        except ValueError as e:
+            logger.error("Failed to parse thread: %s", e)
+            return None
+
+    def expand_more_comments(self, thread: Thread, more_ids: List[str],
+                             max_requests: int | None = None) -> int:
+        """
+        Load comments hidden behind 'more' stubs and graft them into *thread*.
 
-        def flatten(comments: List[Comment]):
-            for comment in comments:
-                all_comments.append(comment)
-                if comment.replies:
-                    flatten(comment.replies)
+        Ids are resolved in batches of MORECHILDREN_BATCH, several batches at
+        a time, all under the shared rate limiter. Stubs found in the results
+        are queued for the next round until the request cap is reached.
 
-        flatten(thread.comments)
-        return all_comments
+        Args:
+            thread: Parsed thread to extend in place.
+            more_ids: Comment ids from the thread payload's 'more' stubs.
+            max_requests: Cap on /api/morechildren calls. Defaults to
+                config.MORECHILDREN_MAX_REQUESTS.
+
+        Returns:
+            int: Number of comments added.
+        """
+        budget = cfg.MORECHILDREN_MAX_REQUESTS if max_requests is None else max_requests
+        link_id = f"t3_{thread.id}"
+        pending = list(dict.fromkeys(more_ids))
+        added = 0
+
+        with ThreadPoolExecutor(max_workers=cfg.MORECHILDREN_WORKERS) as pool:
+            while pending and budget > 0:
+                batches = self._morechildren_batches(pending)[:budget]
+                budget -= len(batches)
+                pending = pending[sum(len(b) for b in batches):]
+
+                urls = [self._morechildren_url(link_id, batch) for batch in batches]
+                for things in pool.map(self._fetch_morechildren, urls):
+                    count, new_ids = self._graft_comments(thread, things)
+                    added += count
+                    pending.extend(new_ids)
+
+        if pending:
+            logger.info("More comments: request cap reached, %d ids left unloaded", len(pending))
+        logger.info("More comments: added %d comments", added)
+        return added
+
+    def _fetch_morechildren(self, url: str) -> List[Dict]:
+        """One /api/morechildren call; failures are logged and yield no comments"""
+        try:
+            return self._morechildren_things(self._get_json(url))
+        except (requests.exceptions.RequestException, json.JSONDecodeError, AttributeError) as e:
+            logger.warning("Failed to load more comments: %s", e)
+            return []
+
+    def _fetch_listing_page(self, url: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one listing page: (posts, cursor for the next page)"""
+        try:
+            data = self._get_json(url)
+            return self._parse_post_listing(data), self._listing_after(data)
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to fetch subreddit: %s", e)
+            return [], None
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse subreddit JSON: %s", e)
+            return [], None
+
+    def _fetch_listing(self, url: str) -> List[Dict[str, Any]]:
+        """Fetch and parse a subreddit listing URL."""
+        return self._fetch_listing_page(url)[0]
+
+    def iter_subreddit(
+        self,
+        subreddit: str,
+        sort: str = "hot",
+        limit: int | None = 25,
+        time_filter: str | None = None,
+        predicate: Callable[[Dict[str, Any]], bool] | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream posts from a subreddit listing, following the `after` cursor.
+
+        Pages are requested lazily. While the caller works through one page,
+        the next one is already being fetched in the background (the cursor
+        only allows one page of look-ahead).
+
+        Args:
+            subreddit: Subreddit name (e.g., "Entrepreneur")
+            sort: Listing sort: hot, top or new
+            limit: Total posts to yield. None follows the cursor to the end
+                (Reddit stops around 1,000 posts).
+            time_filter: Time filter for top (hour, day, week, month, year, all)
+            predicate: Stop at the first post for which this returns False,
+                e.g. posted_since(cutoff) on the "new" listing.
+
+        Yields:
+            Dict: Posts in listing order
+        """
+        def page_url(after: str | None, count: int) -> str:
+            size = LISTING_PAGE_SIZE if limit is None else limit - count
+            return self._listing_url(subreddit, sort, size, time_filter, after, count)
+
+        if limit is not None and limit <= 0:
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self._fetch_listing_page, page_url(None, 0))
+            count = 0
+            while pending is not None:
+                posts, after = pending.result()
+                if limit is not None:
+                    posts = posts[:limit - count]
+                count += len(posts)
+
+                has_more = after and posts and (limit is None or count < limit)
+                pending = pool.submit(self._fetch_listing_page, page_url(after, count)) if has_more else None
+
+                for post in posts:
+                    if predicate is not None and not predicate(post):
+                        if pending is not None:
+                            pending.cancel()
+                        return
+                    yield post
+
+    def fetch_subreddit_hot(self, subreddit: str, limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Fetch hot posts from a subreddit.
+
+        Args:
+            subreddit: Subreddit name (e.g., "Entrepreneur")
+            limit: Number of posts to fetch (paginates past 100)
+
+        Returns:
+            List[Dict]: List of posts
+        """
+        return list(self.iter_subreddit(subreddit, "hot", limit))
+
+    def fetch_subreddit_top(self, subreddit: str, time_filter: str = "week", limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Fetch top posts from a subreddit.
+
+        Args:
+            subreddit: Subreddit name (e.g., "Entrepreneur")
+            time_filter: Time filter (hour, day, week, month, year, all)
+            limit: Number of posts to fetch (paginates past 100)
+
+        Returns:
+            List[Dict]: List of posts
+        """
+        return list(self.iter_subreddit(subreddit, "top", limit, time_filter))
+
+    def fetch_subreddit_new(self, subreddit: str, limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Fetch new posts from a subreddit.
+
+        Args:
+            subreddit: Subreddit name (e.g., "Entrepreneur")
+            limit: Number of posts to fetch (paginates past 100)
+
+        Returns:
+            List[Dict]: List of posts
+        """
+        return list(self.iter_subreddit(subreddit, "new", limit))
 
 
 # Usage example
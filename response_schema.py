@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Analysis Answer Schema
+JSON Schema of the AI analysis answer (sent as a strict structured-output
+response format), a validator that runs on every answer, and a salvage
+parser that recovers the complete parts of a malformed or truncated answer
+so that only the broken rest needs a repair re-ask
+"""
+
+import json
+import re
+from typing import Any, Dict, Tuple
+
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+INTENTS = ('none', 'low', 'medium', 'high')
+
+PAIN_POINT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "description": {"type": "string"},
+        "severity": {"type": "string", "enum": list(SEVERITIES)},
+        "frequency_mentioned": {"type": "integer"},
+        "example_comments": {"type": "array", "items": {"type": "string"}},
+        "purchase_intent": {"type": "string", "enum": list(INTENTS)},
+        "category": {"type": "string"},
+    },
+    "required": ["description", "severity", "frequency_mentioned", "example_comments",
+                 "purchase_intent", "category"],
+    "additionalProperties": False,
+}
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "pain_points": {"type": "array", "items": PAIN_POINT_SCHEMA},
+        "key_insights": {"type": "array", "items": {"type": "string"}},
+        "market_opportunities": {"type": "array", "items": {"type": "string"}},
+        "sentiment_summary": {"type": "string"},
+    },
+    "required": ["pain_points", "key_insights", "market_opportunities", "sentiment_summary"],
+    "additionalProperties": False,
+}
+
+# response_format for chat.completions.create (structured outputs)
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "goldmine_analysis", "strict": True, "schema": ANALYSIS_SCHEMA},
+}
+
+# Top-level fields with their type and the value used when one is missing
+_FIELDS = (
+    ('pain_points', list, list),
+    ('key_insights', list, list),
+    ('market_opportunities', list, list),
+    ('sentiment_summary', str, str),
+)
+
+_DECODER = json.JSONDecoder()
+# Whitespace and at most one separator between two JSON tokens
+_SEP = re.compile(r'\s*[,:]?\s*')
+
+
+class SchemaError(ValueError):
+    """The answer is valid JSON but not an analysis"""
+
+
+# What parse_answer raises for an unusable answer
+ANSWER_ERRORS = (json.JSONDecodeError, SchemaError)
+
+
+def decode_answer(text: str) -> Any:
+    """
+    Decode the first JSON object in *text*.
+
+    Code fences and any prose before or after the object are skipped
+    rather than stripped.
+
+    Raises:
+        json.JSONDecodeError: No complete JSON object.
+    """
+    start = text.find('{')
+    if start < 0:
+        raise json.JSONDecodeError("No JSON object in answer", text, 0)
+    return _DECODER.raw_decode(text, start)[0]
+
+
+def parse_answer(text: str) -> Dict[str, Any]:
+    """decode_answer + check_analysis"""
+    return check_analysis(decode_answer(text))
+
+
+def check_analysis(data: Any, strict: bool = True) -> Dict[str, Any]:
+    """
+    Validate a decoded answer against ANALYSIS_SCHEMA, in place.
+
+    Missing fields get empty defaults; pain points that are not objects or
+    have no description are dropped, and their other fields are coerced to
+    the schema (unknown severity -> medium, unknown intent -> none).
+    Values are only copied when something has to be removed.
+
+    Args:
+        strict: Raise on a top-level field of the wrong type. Otherwise the
+            field is dropped (used for salvaged answers).
+
+    Raises:
+        SchemaError: Not an object, or (strict) a field of the wrong type.
+    """
+    if not isinstance(data, dict):
+        raise SchemaError(f"answer is a JSON {type(data).__name__}, not an object")
+
+    for key, kind, default in _FIELDS:
+        value = data.get(key)
+        if value is None:
+            data[key] = default()
+        elif not isinstance(value, kind):
+            if strict:
+                raise SchemaError(f"{key} is a JSON {type(value).__name__}, not a {kind.__name__}")
+            data[key] = default()
+
+    pain_points = data['pain_points']
+    if not all(map(check_pain_point, pain_points)):
+        data['pain_points'] = [pp for pp in pain_points if check_pain_point(pp)]
+    for key in ('key_insights', 'market_opportunities'):
+        texts = data[key]
+        if not all(isinstance(t, str) for t in texts):
+            data[key] = [t for t in texts if isinstance(t, str)]
+    return data
+
+
+def check_pain_point(pp: Any) -> bool:
+    """Coerce one pain point to PAIN_POINT_SCHEMA in place; False if it cannot be used"""
+    if not isinstance(pp, dict):
+        return False
+    description = pp.get('description')
+    if not isinstance(description, str) or not description.strip():
+        return False
+
+    severity = pp.get('severity')
+    if severity not in SEVERITIES:
+        severity = severity.lower() if isinstance(severity, str) else None
+        pp['severity'] = severity if severity in SEVERITIES else 'medium'
+    intent = pp.get('purchase_intent')
+    if intent not in INTENTS:
+        intent = intent.lower() if isinstance(intent, str) else None
+        pp['purchase_intent'] = intent if intent in INTENTS else 'none'
+
+    frequency = pp.get('frequency_mentioned')
+    if type(frequency) is not int:
+        try:
+            pp['frequency_mentioned'] = max(int(frequency), 0)
+        except (TypeError, ValueError, OverflowError):
+            pp['frequency_mentioned'] = 0
+    examples = pp.get('example_comments')
+    if not isinstance(examples, list):
+        pp['example_comments'] = []
+    elif not all(isinstance(e, str) for e in examples):
+        pp['example_comments'] = [e for e in examples if isinstance(e, str)]
+    if not isinstance(pp.get('category'), str):
+        pp['category'] = 'Other'
+    return True
+
+
+def salvage_analysis(text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Recover the complete parts of a malformed or truncated answer.
+
+    Walks the top-level object member by member, and the pain_points array
+    item by item, decoding each value with the C decoder; the walk stops at
+    the first value that does not decode.
+
+    Returns:
+        (validated analysis with the fields recovered, the unparsed rest of
+        the answer from where the walk stopped; '' if nothing is left)
+    """
+    data: Dict[str, Any] = {}
+    start = text.find('{')
+    if start < 0:
+        return check_analysis(data), text.strip()
+
+    decode = _DECODER.raw_decode
+    pos = done = start + 1  # done: end of the last value recovered
+    try:
+        while True:
+            pos = _SEP.match(text, pos).end()
+            if text.startswith('}', pos):
+                done = pos + 1
+                break
+            key, pos = decode(text, pos)
+            if not isinstance(key, str):
+                break
+            pos = _SEP.match(text, pos).end()
+            if key == 'pain_points' and text.startswith('[', pos):
+                items = data['pain_points'] = []
+                pos += 1
+                while True:
+                    pos = _SEP.match(text, pos).end()
+                    if text.startswith(']', pos):
+                        pos += 1
+                        break
+                    item, pos = decode(text, pos)
+                    items.append(item)
+                    done = pos
+            else:
+                data[key], pos = decode(text, pos)
+            done = pos
+    except json.JSONDecodeError:
+        pass
+
+    return check_analysis(data, strict=False), text[done:].strip()
+
+
+def merge_repair(salvaged: Dict[str, Any], repaired: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine a salvaged answer with the repair of its broken rest: pain
+    points are appended, other fields are taken from the repair only where
+    the salvage found nothing.
+    """
+    merged = dict(salvaged)
+    merged['pain_points'] = salvaged['pain_points'] + repaired['pain_points']
+    for key in ('key_insights', 'market_opportunities', 'sentiment_summary'):
+        if not salvaged[key]:
+            merged[key] = repaired[key]
+    return merged
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Result Store
+SQLite database of fetched threads, comments, analyses and pain points,
+queryable without globbing the output directory
+
+Usage:
+  python result_store.py import output/   (thread_*.json, analysis_*.json, *.ndjson[.gz|.zst])
+  python result_store.py query --subreddit SaaS --since-days 30 --min-intent high
+  python result_store.py stats
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import config as cfg
+from ai_analyzer import INTENT_ORDER, SEVERITY_ORDER, AnalysisResult, analysis_from_dict
+from ndjson_io import ANALYSES_FILE, THREADS_FILE, iter_records
+from reddit_fetcher import walk_comments
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    id TEXT PRIMARY KEY,
+    subreddit TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    author TEXT,
+    selftext TEXT,
+    score INTEGER,
+    num_comments INTEGER,
+    created_utc REAL,
+    url TEXT,
+    upvote_ratio REAL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_threads_subreddit_created ON threads(subreddit, created_utc);
+CREATE INDEX IF NOT EXISTS idx_threads_created ON threads(created_utc);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL REFERENCES threads(id) ON DELETE CASCADE,
+    parent_id TEXT,
+    author TEXT,
+    body TEXT,
+    score INTEGER,
+    created_utc REAL,
+    gilded INTEGER,
+    depth INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_comments_thread ON comments(thread_id);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    thread_id TEXT NOT NULL UNIQUE,
+    thread_title TEXT,
+    total_comments INTEGER,
+    analyzed_comments INTEGER,
+    tokens_used INTEGER,
+    sentiment_summary TEXT,
+    key_insights TEXT NOT NULL,
+    market_opportunities TEXT NOT NULL,
+    analyzed_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pain_points (
+    id INTEGER PRIMARY KEY,
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    thread_id TEXT NOT NULL,
+    description TEXT NOT NULL,
+    severity TEXT,
+    severity_rank INTEGER NOT NULL,
+    frequency_mentioned INTEGER,
+    purchase_intent TEXT,
+    intent_rank INTEGER NOT NULL,
+    category TEXT,
+    example_comments TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pain_points_thread ON pain_points(thread_id);
+CREATE INDEX IF NOT EXISTS idx_pain_points_category ON pain_points(category);
+CREATE INDEX IF NOT EXISTS idx_pain_points_severity ON pain_points(severity_rank);
+CREATE INDEX IF NOT EXISTS idx_pain_points_intent ON pain_points(intent_rank);
+"""
+
+# Rows per executemany/commit when importing
+_BATCH = 500
+
+
+class ResultStore:
+    """SQLite store for threads and their analyses (WAL mode, thread-safe)"""
+
+    def __init__(self, path: str | None = None, clock=time.time):
+        """
+        Args:
+            path: SQLite file. Defaults to config.RESULT_DB_PATH.
+            clock: Wall-clock time source (injectable for tests).
+        """
+        self.path = path or cfg.RESULT_DB_PATH
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ── Writes ────────────────────────────────────────────────────────────
+
+    def save_thread(self, thread: Dict[str, Any]):
+        """Insert or update a thread dict (thread_<id>.json format) and all its comments"""
+        with self._lock:
+            self._insert_thread(thread)
+            self._conn.commit()
+
+    def save_analysis(self, result: AnalysisResult):
+        """Insert or replace the analysis of a thread, with its pain points"""
+        with self._lock:
+            self._insert_analysis(result)
+            self._conn.commit()
+
+    def _insert_thread(self, thread: Dict[str, Any]):
+        """Write one thread and its comments (lock held, caller commits)"""
+        thread_id = thread.get('id', '')
+        self._conn.execute(
+            "INSERT OR REPLACE INTO threads "
+            "(id, subreddit, title, author, selftext, score, num_comments, created_utc, url, "
+            "upvote_ratio, stored_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (thread_id, thread.get('subreddit', ''), thread.get('title', ''), thread.get('author'),
+             thread.get('selftext'), thread.get('score'), thread.get('num_comments'),
+             thread.get('created_utc'), thread.get('url'), thread.get('upvote_ratio'), self._clock()),
+        )
+        rows = (
+            (c.get('id'), thread_id, c.get('parent_id'), c.get('author'), c.get('body'),
+             c.get('score'), c.get('created_utc'), c.get('gilded'), c.get('depth', depth))
+            for c, depth, _ in walk_comments(thread.get('comments', []), lambda c: c.get('replies'))
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO comments "
+            "(id, thread_id, parent_id, author, body, score, created_utc, gilded, depth) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _insert_analysis(self, result: AnalysisResult):
+        """Write one analysis and its pain points (lock held, caller commits)"""
+        self._conn.execute("DELETE FROM analyses WHERE thread_id = ?", (result.thread_id,))
+        cursor = self._conn.execute(
+            "INSERT INTO analyses "
+            "(thread_id, thread_title, total_comments, analyzed_comments, tokens_used, "
+            "sentiment_summary, key_insights, market_opportunities, analyzed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (result.thread_id, result.thread_title, result.total_comments, result.analyzed_comments,
+             result.tokens_used, result.sentiment_summary,
+             json.dumps(result.key_insights, ensure_ascii=False),
+             json.dumps(result.market_opportunities, ensure_ascii=False), self._clock()),
+        )
+        analysis_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO pain_points "
+            "(analysis_id, thread_id, description, severity, severity_rank, frequency_mentioned, "
+            "purchase_intent, intent_rank, category, example_comments) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (analysis_id, result.thread_id, pp.description, pp.severity,
+                 SEVERITY_ORDER.get(pp.severity, 0), pp.frequency_mentioned, pp.purchase_intent,
+                 INTENT_ORDER.get(pp.purchase_intent, 0), pp.category,
+                 json.dumps(pp.example_comments, ensure_ascii=False))
+                for pp in result.pain_points
+            ],
+        )
+
+    def import_directory(self, directory: str) -> Dict[str, int]:
+        """
+        Load existing thread_<id>.json and analysis_<id>.json files, and
+        threads.ndjson*/analyses.ndjson* archives (see ndjson_io.py).
+
+        Records are written in batches of a few hundred per transaction.
+        Unreadable files are logged and skipped.
+
+        Returns:
+            Dict with 'threads', 'analyses' and 'skipped' counts.
+        """
+        counts = {'threads': 0, 'analyses': 0, 'skipped': 0}
+        records = _directory_records(directory)
+        while True:
+            batch = list(itertools.islice(records, _BATCH))
+            if not batch:
+                break
+            with self._lock:
+                for kind, data in batch:
+                    if not isinstance(data, dict):
+                        counts['skipped'] += 1
+                        continue
+                    if kind == 'threads':
+                        self._insert_thread(data)
+                    else:
+                        result = analysis_from_dict(data)
+                        result.analyzed_comments = data.get('analyzed_comments', 0)
+                        self._insert_analysis(result)
+                    counts[kind] += 1
+                self._conn.commit()
+        logger.info("Imported %d threads, %d analyses from %s (%d skipped)",
+                    counts['threads'], counts['analyses'], directory, counts['skipped'])
+        return counts
+
+    # ── Reads ─────────────────────────────────────────────────────────────
+
+    def query_pain_points(
+        self,
+        subreddit: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        category: str | None = None,
+        min_severity: str | None = None,
+        min_intent: str | None = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Pain points matching all given filters, highest intent and severity first.
+
+        Args:
+            subreddit: Subreddit name (case-insensitive).
+            since / until: Thread created_utc range (epoch seconds).
+            category: Exact category (case-insensitive).
+            min_severity: low/medium/high/critical or above.
+            min_intent: none/low/medium/high or above.
+            limit: Maximum rows.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if subreddit:
+            clauses.append("t.subreddit = ? COLLATE NOCASE")
+            params.append(subreddit)
+        if since is not None:
+            clauses.append("t.created_utc >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("t.created_utc < ?")
+            params.append(until)
+        if category:
+            clauses.append("p.category = ? COLLATE NOCASE")
+            params.append(category)
+        if min_severity:
+            clauses.append("p.severity_rank >= ?")
+            params.append(SEVERITY_ORDER[min_severity])
+        if min_intent:
+            clauses.append("p.intent_rank >= ?")
+            params.append(INTENT_ORDER[min_intent])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            "SELECT p.description, p.severity, p.purchase_intent, p.category, p.frequency_mentioned, "
+            "p.example_comments, p.thread_id, COALESCE(t.title, a.thread_title), t.subreddit, "
+            "t.created_utc, t.url "
+            "FROM pain_points p JOIN analyses a ON a.id = p.analysis_id "
+            "LEFT JOIN threads t ON t.id = p.thread_id "
+            f"{where} "
+            "ORDER BY p.intent_rank DESC, p.severity_rank DESC, p.frequency_mentioned DESC "
+            "LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit)).fetchall()
+
+        keys = ('description', 'severity', 'purchase_intent', 'category', 'frequency_mentioned',
+                'example_comments', 'thread_id', 'thread_title', 'subreddit', 'created_utc', 'url')
+        results = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            item['example_comments'] = json.loads(item['example_comments'])
+            results.append(item)
+        return results
+
+    def labeled_threads(self) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        (thread dict, highest intent rank) for every analyzed thread, as
+        training data for thread_gate.py. Comments come back flat, highest
+        score first; threads without pain points have rank 0.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.id, t.subreddit, t.title, t.selftext, t.url, t.num_comments, "
+                "COALESCE(MAX(p.intent_rank), 0) "
+                "FROM threads t JOIN analyses a ON a.thread_id = t.id "
+                "LEFT JOIN pain_points p ON p.analysis_id = a.id "
+                "GROUP BY t.id ORDER BY t.id"
+            ).fetchall()
+        for thread_id, subreddit, title, selftext, url, num_comments, rank in rows:
+            with self._lock:
+                bodies = self._conn.execute(
+                    "SELECT body FROM comments WHERE thread_id = ? ORDER BY score DESC",
+                    (thread_id,),
+                ).fetchall()
+            thread = {'id': thread_id, 'subreddit': subreddit, 'title': title or '',
+                      'selftext': selftext or '', 'url': url, 'num_comments': num_comments,
+                      'comments': [{'body': body or ''} for body, in bodies]}
+            yield thread, rank
+
+    def stats(self) -> Dict[str, int]:
+        """Row counts per table"""
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('threads', 'comments', 'analyses', 'pain_points')
+            }
+
+
+def _directory_records(directory: str) -> Iterator[Tuple[str, Any]]:
+    """(kind, record) for every thread/analysis file and archive record in *directory*"""
+    for kind, pattern, archive in (('threads', 'thread_*.json', THREADS_FILE),
+                                   ('analyses', 'analysis_*.json', ANALYSES_FILE)):
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            yield kind, _read_json(path)
+        for path in sorted(glob.glob(os.path.join(directory, archive + '*'))):
+            try:
+                for record in iter_records(path):
+                    yield kind, record
+            except (OSError, EOFError, RuntimeError) as e:
+                logger.warning("Skipping rest of %s: %s", path, e)
+                yield kind, None
+
+
+def _read_json(path: str) -> Optional[Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Skipping %s: %s", path, e)
+        return None
+
+
+def _print_pain_points(rows: Iterable[Dict[str, Any]]):
+    for i, row in enumerate(rows, 1):
+        print(f"{i:>3}. [{row['purchase_intent']}/{row['severity']}] {row['description']}")
+        print(f"     {row['category']} · r/{row['subreddit'] or '?'} · {row['thread_title']}")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(
+        description='Query and import Reddit Goldmine results',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Usage:', 1)[1],
+    )
+    parser.add_argument('--db', default=cfg.RESULT_DB_PATH, help=f'Database file (default: {cfg.RESULT_DB_PATH})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    imp = sub.add_parser('import', help='Import thread_*.json / analysis_*.json from a directory')
+    imp.add_argument('directory')
+
+    query = sub.add_parser('query', help='List pain points')
+    query.add_argument('--subreddit')
+    query.add_argument('--since-days', type=float, help='Threads created in the last N days')
+    query.add_argument('--category')
+    query.add_argument('--min-severity', choices=list(SEVERITY_ORDER))
+    query.add_argument('--min-intent', choices=list(INTENT_ORDER))
+    query.add_argument('--limit', type=int, default=50)
+    query.add_argument('--json', action='store_true', help='Print JSON instead of a list')
+
+    sub.add_parser('stats', help='Show row counts')
+
+    args = parser.parse_args()
+    store = ResultStore(args.db)
+    try:
+        if args.command == 'import':
+            if not os.path.isdir(args.directory):
+                parser.error(f"not a directory: {args.directory}")
+            store.import_directory(args.directory)
+        elif args.command == 'query':
+            since = time.time() - args.since_days * 86400 if args.since_days else None
+            rows = store.query_pain_points(
+                subreddit=args.subreddit, since=since, category=args.category,
+                min_severity=args.min_severity, min_intent=args.min_intent, limit=args.limit,
+            )
+            if args.json:
+                print(json.dumps(rows, ensure_ascii=False, indent=2))
+            else:
+                _print_pain_points(rows)
+        else:
+            for table, count in store.stats().items():
+                print(f"{table:<12} {count:>8,}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
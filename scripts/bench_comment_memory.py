@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measure the memory held by a parsed comment tree.
+
+Parses the same synthetic 50k-comment thread as bench_comment_tree.py and
+compares, with tracemalloc, the slotted Comment objects against an
+equivalent __dict__-based dataclass without string interning, and against
+the nested dict form written to JSON.
+
+Usage:
+  python scripts/bench_comment_memory.py [--comments 50000] [--depth 500]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_comment_tree import build_listing  # noqa: E402
+from reddit_fetcher import (RedditParser, _comment_replies, comments_to_dicts,  # noqa: E402
+                            map_comment_tree)
+
+
+@dataclass
+class DictComment:
+    """The pre-slots Comment layout, for comparison"""
+    id: str
+    author: str
+    body: str
+    score: int
+    created_utc: float
+    parent_id: str
+    gilded: int
+    depth: int = 0
+    replies: List['DictComment'] = field(default_factory=list)
+
+
+def _unshared(value: str) -> str:
+    """A private copy of *value*, as json.loads would produce per comment"""
+    return (value + '.')[:-1]
+
+
+def _to_dict_comment(comment, _depth):
+    return DictComment(comment.id, _unshared(comment.author), comment.body, comment.score,
+                       comment.created_utc, _unshared(comment.parent_id), comment.gilded, comment.depth)
+
+
+def measure(label: str, build, count: int):
+    """Bytes retained by the result of build()"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"  {label:<34} {retained / 1024 / 1024:8.1f} MB  {retained / count:7.0f} B/comment")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=50_000)
+    parser.add_argument('--depth', type=int, default=500)
+    args = parser.parse_args()
+
+    listing = build_listing(args.comments, args.depth)
+    print(f"Synthetic thread: {args.comments:,} comments, max depth {args.depth}")
+
+    comments = RedditParser()._parse_comments(listing)
+    # Bodies and ids are shared by all three forms, so they cancel out and
+    # the numbers compare per-object overhead plus author/parent_id copies.
+    measure("Comment (slots, interned)",
+            lambda: RedditParser()._parse_comments(listing), args.comments)
+    measure("dataclass with __dict__",
+            lambda: map_comment_tree(comments, _to_dict_comment, _comment_replies,
+                                     lambda c: c.replies), args.comments)
+    measure("nested dicts (comments_to_dicts)",
+            lambda: comments_to_dicts(comments), args.comments)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark the comment tree walkers on a synthetic thread.
+
+Builds a raw Reddit comment listing with 50k comments, including one reply
+chain 500 levels deep, then times parsing, flattening and dict conversion.
+
+Usage:
+  python scripts/bench_comment_tree.py [--comments 50000] [--depth 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ai_analyzer import AIAnalyzer  # noqa: E402
+from comment_table import CommentTable  # noqa: E402
+from reddit_fetcher import RedditParser, comments_to_dicts, iter_comments  # noqa: E402
+
+
+def _raw_comment(i: int, depth: int, children: list) -> dict:
+    return {
+        'kind': 't1',
+        'data': {
+            'id': f'c{i}', 'author': f'user{i % 97}', 'body': f'comment {i} at depth {depth}',
+            'score': i % 50, 'created_utc': 1.7e9 + i, 'parent_id': 't3_bench', 'gilded': 0,
+            'replies': {'data': {'children': children}} if children else '',
+        },
+    }
+
+
+def build_listing(total: int, max_depth: int) -> list:
+    """One chain max_depth deep, the rest spread as 3-level subtrees"""
+    counter = iter(range(total))
+
+    chain: list = []
+    for depth in reversed(range(max_depth)):
+        chain = [_raw_comment(next(counter), depth, chain)]
+    roots = chain
+
+    remaining = total - max_depth
+    while remaining > 0:
+        leaves = [_raw_comment(next(counter), 2, []) for _ in range(min(3, max(remaining - 2, 0)))]
+        mid = [_raw_comment(next(counter), 1, leaves)] if remaining > 1 else []
+        roots.append(_raw_comment(next(counter), 0, mid))
+        remaining -= 1 + len(mid) + len(leaves)
+    return roots
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:<28} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=50_000)
+    parser.add_argument('--depth', type=int, default=500)
+    args = parser.parse_args()
+
+    listing = build_listing(args.comments, args.depth)
+    print(f"Synthetic thread: {args.comments:,} comments, max depth {args.depth} "
+          f"(recursion limit {sys.getrecursionlimit()})")
+
+    comments = timed("parse (_parse_comments)", lambda: RedditParser()._parse_comments(listing))
+    flat = timed("flatten (iter_comments)", lambda: list(iter_comments(comments)))
+    dicts = timed("to dicts (comments_to_dicts)", lambda: comments_to_dicts(comments))
+    flat_dicts = timed("flatten dicts (analyzer)", lambda: AIAnalyzer.__new__(AIAnalyzer)._flatten_comments(dicts))
+    table = timed("columns (CommentTable)", lambda: CommentTable.from_dicts(dicts))
+    timed("usable rows (usable_mask)", lambda: table.usable_mask())
+
+    assert len(flat) == len(flat_dicts) == len(table) == args.comments
+    print(f"  max depth seen: {max(c.depth for c in flat)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare JSON decoders on a thread payload.
+
+Times decode and decode + _parse_thread for every installed backend
+(orjson, msgspec, stdlib json), and reports peak memory during decoding.
+Uses a recorded payload when given, otherwise a synthetic thread built
+like bench_comment_tree.py.
+
+Usage:
+  python scripts/bench_json_decode.py [--payload thread.json] [--comments 50000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_comment_tree import build_listing  # noqa: E402
+from json_codec import available_backends, get_decoder  # noqa: E402
+from reddit_fetcher import RedditParser, _json_replies, walk_comments  # noqa: E402
+
+
+def synthetic_payload(comments: int) -> bytes:
+    post = {'kind': 't3', 'data': {'id': 'bench', 'title': 'Benchmark thread', 'author': 'op',
+                                   'selftext': 'x' * 2000, 'score': 1, 'num_comments': comments,
+                                   'created_utc': 1.7e9, 'url': 'https://reddit.com/bench',
+                                   'subreddit': 'bench', 'upvote_ratio': 1.0}}
+    # Reddit pages stop at depth ~10 ("continue this thread")
+    listing = build_listing(comments, min(10, comments))
+    for item, _, _ in walk_comments(listing, _json_replies):
+        # Real payloads carry ~80 fields per comment; pad with unused ones
+        item['data'].update({f'unused_{k}': None for k in range(40)})
+    return json.dumps([{'data': {'children': [post]}}, {'data': {'children': listing}}]).encode()
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--payload', help='Recorded thread JSON (as returned by <thread>.json)')
+    parser.add_argument('--comments', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, 'rb') as f:
+            payload = f.read()
+    else:
+        payload = synthetic_payload(args.comments)
+    print(f"Payload: {len(payload) / 1024 / 1024:.1f} MB")
+
+    reddit = RedditParser()
+    print(f"  {'backend':<10} {'decode':>9} {'decode+parse':>13} {'peak MB':>9}")
+    for name in available_backends():
+        loads = get_decoder(name)
+        decode = best_of(args.repeat, lambda: loads(payload))
+        total = best_of(args.repeat, lambda: reddit._parse_thread(loads(payload)))
+
+        tracemalloc.start()
+        loads(payload)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"  {name:<10} {decode:8.3f}s {total:12.3f}s {peak / 1024 / 1024:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
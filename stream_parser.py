@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Scanners
+Scan a JSON document incrementally as it arrives and emit selected values
+as soon as their JSON is complete: the post and each top-level comment
+subtree of a Reddit thread payload (see RedditFetcher stream_parse), or
+each pain point of a streamed AI answer (see AIAnalyzer.analyze_thread_stream)
+"""
+
+import codecs
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Tuple
+
+# Structural characters outside strings, and the ones that end or escape a string
+_STRUCTURAL = re.compile(r'["{}\[\]:,]')
+_STRING_END = re.compile(r'["\\]')
+
+# Container path of a comment listing child: top array[1] -> "data" -> "children"
+_CHILDREN_PATH = (1, 'data', 'children')
+
+
+class _Container:
+    __slots__ = ('is_object', 'name', 'index', 'key', 'expecting_key')
+
+    def __init__(self, is_object: bool, name: Any):
+        self.is_object = is_object
+        self.name = name          # key or index under which this container sits
+        self.index = 0            # arrays: position of the current element
+        self.key = None           # objects: key of the current member
+        self.expecting_key = is_object
+
+
+class JsonScanner(ABC):
+    """
+    Incremental JSON scanner; subclasses choose the values to emit.
+
+    feed() / feed_text() return completed (kind, value) events for every
+    value _capture_kind() names when the value opens.
+
+    The surrounding structure is tracked character by character, but each
+    captured value is decoded with the C-accelerated json decoder once
+    enough of it has arrived. Decoding of an incomplete value is retried
+    only after the buffer has grown by RETRY_GROWTH (doubled by default),
+    so total work stays linear. Everything else in the document is
+    skipped without being decoded.
+    """
+
+    RETRY_GROWTH = 2.0
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._stack: List[_Container] = []
+        self._in_string = False
+        self._key_start: Optional[int] = None
+        self._capture: Optional[Tuple[str, int]] = None  # (kind, start)
+        self._retry_at = 0
+        self._done = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Any]]:
+        return self.feed_text(self._utf8.decode(chunk))
+
+    def feed_text(self, text: str) -> List[Tuple[str, Any]]:
+        self._buf += text
+        events: List[Tuple[str, Any]] = []
+        buf = self._buf
+        pos = self._pos
+
+        while True:
+            if self._capture is not None:
+                kind, start = self._capture
+                if len(buf) < self._retry_at:
+                    break
+                try:
+                    value, pos = self._decoder.raw_decode(buf, start)
+                except json.JSONDecodeError:
+                    # Incomplete so far (or malformed: reported by close())
+                    self._retry_at = start + self.RETRY_GROWTH * (len(buf) - start)
+                    break
+                events.append((kind, value))
+                self._capture = None
+                continue
+
+            if self._in_string:
+                m = _STRING_END.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                if m.group() == '\\':
+                    if m.end() >= len(buf):
+                        pos = m.start()  # escaped character not here yet
+                        break
+                    pos = m.end() + 1
+                    continue
+                pos = m.end()
+                self._in_string = False
+                if self._key_start is not None:
+                    self._stack[-1].key = json.loads(buf[self._key_start:pos])
+                    self._key_start = None
+                continue
+
+            m = _STRUCTURAL.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            char = m.group()
+            pos = m.end()
+            top = self._stack[-1] if self._stack else None
+
+            if char == '"':
+                self._in_string = True
+                if top is not None and top.is_object and top.expecting_key:
+                    self._key_start = m.start()
+            elif char in '{[':
+                kind = self._capture_kind()
+                if kind:
+                    self._capture = (kind, m.start())
+                    self._retry_at = 0
+                    continue
+                name = (top.key if top.is_object else top.index) if top is not None else None
+                self._stack.append(_Container(char == '{', name))
+            elif char in '}]':
+                if not self._stack:
+                    raise ValueError("Unbalanced JSON in thread payload")
+                self._stack.pop()
+                if not self._stack:
+                    self._done = True
+            elif char == ':':
+                if top is not None:
+                    top.expecting_key = False
+            elif top is not None:  # ','
+                if top.is_object:
+                    top.expecting_key = True
+                else:
+                    top.index += 1
+
+        # Drop consumed text that no pending capture or key still needs
+        keep = min(p for p in (self._capture and self._capture[1], self._key_start, pos) if p is not None)
+        if keep:
+            buf = buf[keep:]
+            if self._capture is not None:
+                self._capture = (self._capture[0], self._capture[1] - keep)
+                self._retry_at -= keep
+            if self._key_start is not None:
+                self._key_start -= keep
+            pos -= keep
+        self._buf = buf
+        self._pos = pos
+        return events
+
+    @abstractmethod
+    def _capture_kind(self) -> Optional[str]:
+        """Event kind of a value opening at the current position, if any"""
+
+    def close(self) -> List[Tuple[str, Any]]:
+        """
+        Finish the document: returns the last events, or raises ValueError if
+        it was malformed or ended before the top-level value closed.
+        """
+        self._buf += self._utf8.decode(b'', final=True)
+        self._retry_at = 0
+        events = self.feed_text('')
+        if self._capture is not None:
+            # Surfaces the decoder's own error for a malformed value
+            self._decoder.raw_decode(self._buf, self._capture[1])
+        if not self._done:
+            raise ValueError("Truncated JSON document")
+        return events
+
+
+class ThreadPayloadScanner(JsonScanner):
+    """
+    Incremental scanner for the [post_listing, comment_listing] payload.
+
+    Events:
+        ('post', post_listing)       element 0 of the payload, decoded
+        ('child', listing_child)     one item of comment_listing.data.children
+    """
+
+    def _capture_kind(self) -> Optional[str]:
+        stack = self._stack
+        if len(stack) == 1 and not stack[0].is_object and stack[0].index == 0:
+            return 'post'
+        if (len(stack) == 4 and not stack[3].is_object
+                and (stack[0].index, stack[2].name, stack[3].name) == _CHILDREN_PATH):
+            return 'child'
+        return None
+
+
+class PainPointScanner(JsonScanner):
+    """
+    Incremental scanner for an AI analysis answer ({"pain_points": [...], ...}).
+
+    Events:
+        ('pain_point', dict)         one item of the top-level pain_points array
+
+    Answers are a few KB, so decoding is retried on every chunk: a pain
+    point is emitted with the chunk that closes it.
+    """
+
+    RETRY_GROWTH = 1.0
+
+    def _capture_kind(self) -> Optional[str]:
+        stack = self._stack
+        if (len(stack) == 2 and stack[0].is_object and not stack[1].is_object
+                and stack[1].name == 'pain_points'):
+            return 'pain_point'
+        return None
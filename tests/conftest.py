@@ -4,6 +4,23 @@ import json
 import os
 import pytest
 
+import rate_limiter
+
+
+def make_thread_dict(thread_id="t1", comments=3):
+    """Thread dict with *comments* usable top-level comments (ids "<thread_id>c<i>")."""
+    return {
+        "id": thread_id, "title": f"Thread {thread_id}", "selftext": "body",
+        "comments": [{"id": f"{thread_id}c{i}", "body": f"comment number {i} with enough text",
+                      "replies": []} for i in range(comments)],
+    }
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_reddit(monkeypatch):
+    """Give every test an unlimited shared Reddit limiter so nothing sleeps."""
+    monkeypatch.setattr(rate_limiter, "_default_limiter", rate_limiter.TokenBucket(rate=0))
+
 
 @pytest.fixture
 def sample_thread_data():
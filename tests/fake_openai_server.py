@@ -0,0 +1,133 @@
+"""
+Local OpenAI-compatible server for tests.
+
+Serves POST /v1/chat/completions on 127.0.0.1 from a script of responses,
+so the real openai client (and its HTTP stack) is exercised end to end.
+
+    with FakeOpenAIServer() as server:
+        server.script = [(429, {"retry-after": "0"}, {}), server.completion({...})]
+        client = AsyncOpenAI(api_key="test", base_url=server.base_url)
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (status, headers, JSON body)
+Reply = Tuple[int, Dict[str, str], Any]
+
+
+class FakeOpenAIServer:
+    """
+    Threaded HTTP server answering chat completions.
+
+    Attributes:
+        script: Replies handed out in order; once it runs out, *default* is used.
+        default: Callable(request_body) -> Reply for unscripted requests.
+        requests: JSON bodies received, in arrival order.
+        delay: Seconds each request takes (to observe concurrency).
+        max_in_flight: Highest number of requests handled at the same time.
+    """
+
+    def __init__(self):
+        self.script: List[Reply] = []
+        self.default: Callable[[Dict[str, Any]], Reply] = lambda body: self.completion(EMPTY_ANALYSIS)
+        self.requests: List[Dict[str, Any]] = []
+        self.arrivals: List[float] = []
+        self.delay = 0.0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> 'FakeOpenAIServer':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @staticmethod
+    def completion(content: Any, total_tokens: int = 100, prompt_tokens: int = 80) -> Reply:
+        """A 200 reply whose message content is *content* (JSON-encoded unless a string)"""
+        text = content if isinstance(content, str) else json.dumps(content)
+        return 200, {}, {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "fake",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": total_tokens - prompt_tokens,
+                "total_tokens": total_tokens,
+            },
+        }
+
+    @staticmethod
+    def error(status: int, headers: Optional[Dict[str, str]] = None) -> Reply:
+        return status, headers or {}, {"error": {"message": f"HTTP {status}", "type": "test"}}
+
+    def _next_reply(self, body: Dict[str, Any]) -> Reply:
+        with self._lock:
+            self.requests.append(body)
+            self.arrivals.append(time.monotonic())
+            if self.script:
+                return self.script.pop(0)
+        return self.default(body)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                with server._lock:
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    status, headers, payload = server._next_reply(body)
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+EMPTY_ANALYSIS = {
+    "pain_points": [],
+    "key_insights": [],
+    "market_opportunities": [],
+    "sentiment_summary": "neutral",
+}
@@ -115,7 +115,6 @@ class TestAnalyzeThread:
         with patch.object(analyzer, "_analyze_with_ai", return_value=empty_return):
             with patch("ai_analyzer.cfg") as mock_cfg:
                 mock_cfg.MAX_COMMENTS = 50
-                mock_cfg.MAX_COMMENTS_IN_PROMPT = 25
                 mock_cfg.TEMPERATURE = 0.3
                 result = analyzer.analyze_thread(thread)
         assert result.analyzed_comments == 50
@@ -2,7 +2,7 @@
 Tests for app.py pure logic — no Streamlit import required.
 
 Covers:
-- _comment_to_dict recursive conversion
+- comment_to_dict conversion used by _fetch_thread
 - i18n t() helper with format kwargs
 - render_analysis sorting: (purchase_intent DESC, frequency_mentioned DESC)
 - load_sample returns valid analysis data
@@ -17,22 +17,12 @@ import html
 
 import pytest
 from reddit_fetcher import Comment
+from reddit_fetcher import comment_to_dict as _comment_to_dict
 
 
 # ── _comment_to_dict ────────────────────────────────────────────────────────
 
 
-def _comment_to_dict(c):
-    """Mirror of app._comment_to_dict (avoids importing Streamlit)."""
-    return {
-        "id": c.id, "author": c.author, "body": c.body,
-        "score": c.score, "created_utc": c.created_utc,
-        "parent_id": c.parent_id, "gilded": c.gilded,
-        "depth": c.depth,
-        "replies": [_comment_to_dict(r) for r in c.replies],
-    }
-
-
 class TestCommentToDict:
     def test_simple_comment(self):
         c = Comment(id="c1", author="u1", body="hello", score=5,
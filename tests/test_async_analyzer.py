@@ -0,0 +1,265 @@
+"""
+Tests for async_analyzer.py: AsyncAIAnalyzer against a local fake
+OpenAI-compatible server (tests/fake_openai_server.py).
+
+Covers:
+- analyze_thread / analyze_threads end to end through the real async client
+- Retries of 429 / 5xx with Retry-After, giving up after max_retries,
+  no retry of other 4xx
+- Concurrency bound (max_concurrency)
+- Request and token budgets
+- retry_delay / is_retryable
+"""
+
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import openai
+import pytest
+
+from ai_analyzer import AnalysisResult
+from async_analyzer import AsyncAIAnalyzer, is_retryable, retry_delay
+from response_schema import RESPONSE_FORMAT
+from tests.conftest import make_thread_dict
+from tests.fake_openai_server import EMPTY_ANALYSIS, FakeOpenAIServer
+
+ANALYSIS = {
+    "pain_points": [{
+        "description": "Invoicing takes hours", "severity": "high",
+        "frequency_mentioned": 3, "example_comments": ["invoices are painful"],
+        "purchase_intent": "high", "category": "Finance",
+    }],
+    "key_insights": ["Billing is manual"],
+    "market_opportunities": ["Invoice automation"],
+    "sentiment_summary": "negative",
+}
+
+
+def _analyzer(server, **kwargs):
+    kwargs.setdefault("max_retries", 3)
+    kwargs.setdefault("rpm_limit", 0)
+    kwargs.setdefault("tpm_limit", 0)
+    return AsyncAIAnalyzer(model="gpt-4o-mini", api_key="test", base_url=server.base_url,
+                           map_reduce=False, **kwargs)
+
+
+def _run(analyzer, coro_fn):
+    async def main():
+        async with analyzer:
+            return await coro_fn(analyzer)
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAIServer() as fake:
+        yield fake
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr("config.AI_RETRY_BASE_DELAY", 0.01)
+
+
+class TestAnalyzeThread:
+    def test_parses_result(self, server):
+        server.default = lambda body: server.completion(ANALYSIS, total_tokens=321)
+
+        result = _run(_analyzer(server), lambda a: a.analyze_thread(make_thread_dict()))
+
+        assert isinstance(result, AnalysisResult)
+        assert result.thread_id == "t1"
+        assert result.total_comments == 3
+        assert result.pain_points[0].description == "Invoicing takes hours"
+        assert result.tokens_used == 321
+        sent = server.requests[0]
+        assert sent["model"] == "gpt-4o-mini"
+        assert sent["response_format"] == RESPONSE_FORMAT
+        assert "comment number 0" in sent["messages"][1]["content"]
+
+    def test_invalid_json_gives_failed_analysis(self, server):
+        server.default = lambda body: server.completion("not json")
+
+        result = _run(_analyzer(server), lambda a: a.analyze_thread(make_thread_dict()))
+
+        assert result.pain_points == []
+        assert "invalid response format" in result.sentiment_summary
+
+    def test_map_reduce_sends_one_request_per_chunk(self, server, monkeypatch):
+        monkeypatch.setattr("config.PROMPT_TOKEN_BUDGET", 30)
+        analyzer = _analyzer(server)
+        analyzer.map_reduce = True
+
+        result = _run(analyzer, lambda a: a.analyze_thread(make_thread_dict(comments=4)))
+
+        assert len(server.requests) > 1
+        assert result.analyzed_comments == 4
+
+    def test_analyze_threads_keeps_order_and_reports_failures(self, server):
+        def reply(body):
+            if "Thread bad" in body["messages"][1]["content"]:
+                return server.error(400)
+            return server.completion(EMPTY_ANALYSIS)
+        server.default = reply
+
+        results = _run(_analyzer(server), lambda a: a.analyze_threads(
+            [make_thread_dict("a"), make_thread_dict("bad"), make_thread_dict("b")]))
+
+        assert [r and r.thread_id for r in results] == ["a", None, "b"]
+
+
+class TestRetries:
+    def test_retries_429_then_succeeds(self, server):
+        server.script = [server.error(429, {"retry-after": "0"}),
+                         server.error(503),
+                         server.completion(ANALYSIS)]
+
+        result = _run(_analyzer(server), lambda a: a.analyze_thread(make_thread_dict()))
+
+        assert len(server.requests) == 3
+        assert len(result.pain_points) == 1
+
+    def test_honors_retry_after_ms(self, server):
+        server.script = [server.error(429, {"retry-after-ms": "300"})]
+
+        async def timed(a):
+            start = asyncio.get_running_loop().time()
+            await a.analyze_thread(make_thread_dict())
+            return asyncio.get_running_loop().time() - start
+
+        elapsed = _run(_analyzer(server), timed)
+        assert elapsed >= 0.3
+
+    def test_gives_up_after_max_retries(self, server):
+        server.default = lambda body: server.error(500)
+
+        with pytest.raises(openai.InternalServerError):
+            _run(_analyzer(server, max_retries=2), lambda a: a.analyze_thread(make_thread_dict()))
+        assert len(server.requests) == 3
+
+    def test_client_errors_are_not_retried(self, server):
+        server.default = lambda body: server.error(401)
+
+        with pytest.raises(openai.AuthenticationError):
+            _run(_analyzer(server), lambda a: a.analyze_thread(make_thread_dict()))
+        assert len(server.requests) == 1
+
+    def test_connection_errors_are_retried(self):
+        analyzer = AsyncAIAnalyzer(api_key="test", base_url="http://127.0.0.1:9/v1",
+                                   max_retries=1, rpm_limit=0, tpm_limit=0)
+        analyzer.client.chat.completions.create = AsyncMock(side_effect=[
+            openai.APIConnectionError(request=httpx.Request("POST", "http://x")),
+            MagicMock(choices=[MagicMock(message=MagicMock(content='{"pain_points": []}'))],
+                      usage=MagicMock(total_tokens=5)),
+        ])
+
+        result = _run(analyzer, lambda a: a.analyze_thread(make_thread_dict()))
+
+        assert analyzer.client.chat.completions.create.await_count == 2
+        assert result.tokens_used == 5
+
+
+class TestConcurrency:
+    def test_max_concurrency_bounds_in_flight_requests(self, server):
+        server.delay = 0.05
+
+        _run(_analyzer(server, max_concurrency=2),
+             lambda a: a.analyze_threads([make_thread_dict(str(i)) for i in range(6)]))
+
+        assert len(server.requests) == 6
+        assert server.max_in_flight == 2
+
+
+class TestBudgets:
+    def test_reserves_request_and_estimated_tokens(self, server):
+        analyzer = _analyzer(server)
+        analyzer.request_budget = MagicMock(acquire_async=AsyncMock())
+        analyzer.token_budget = MagicMock(acquire_async=AsyncMock())
+
+        _run(analyzer, lambda a: a.analyze_thread(make_thread_dict()))
+
+        analyzer.request_budget.acquire_async.assert_awaited_once_with()
+        (tokens,), _ = analyzer.token_budget.acquire_async.await_args
+        # Prompt template plus the assumed answer
+        assert tokens > 1500
+
+    def test_requests_consume_the_per_minute_budget(self, server):
+        analyzer = _analyzer(server, rpm_limit=2)
+
+        _run(analyzer, lambda a: a.analyze_threads([make_thread_dict("a"), make_thread_dict("b")]))
+
+        # Both burst slots used: the next request would have to wait ~30s
+        assert analyzer.request_budget.reserve() == pytest.approx(30, abs=1)
+
+    def test_usage_beyond_estimate_is_charged(self, server):
+        server.default = lambda body: server.completion(EMPTY_ANALYSIS, total_tokens=20000)
+        analyzer = _analyzer(server, tpm_limit=12000)
+
+        _run(analyzer, lambda a: a.analyze_thread(make_thread_dict()))
+
+        # 20000 tokens against a 12000 bucket refilling at 200/s: ~40s of debt
+        assert analyzer.token_budget.reserve(0) == pytest.approx(40, abs=1)
+
+    def test_unlimited_by_default_config(self, server, monkeypatch):
+        monkeypatch.setattr("config.AI_RPM_LIMIT", 0)
+        monkeypatch.setattr("config.AI_TPM_LIMIT", 0)
+        analyzer = AsyncAIAnalyzer(api_key="test", base_url=server.base_url)
+        assert analyzer.request_budget.unlimited
+        assert analyzer.token_budget.unlimited
+
+
+def _status_error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {},
+                              request=httpx.Request("POST", "http://x"))
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+class TestRetryDelay:
+    def test_retry_after_seconds(self):
+        error = _status_error(429, {"retry-after": "7"})
+        assert retry_delay(error, 0, base_delay=1, max_delay=60, rand=lambda: 0.5) == 7.5
+
+    def test_retry_after_ms_wins(self):
+        error = _status_error(429, {"retry-after-ms": "250", "retry-after": "7"})
+        assert retry_delay(error, 0, base_delay=1, max_delay=60, rand=lambda: 0) == 0.25
+
+    def test_retry_after_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        error = _status_error(503, {"retry-after": format_datetime(when, usegmt=True)})
+        assert 28 <= retry_delay(error, 0, base_delay=1, max_delay=60, rand=lambda: 0) <= 30
+
+    def test_retry_after_capped(self):
+        error = _status_error(429, {"retry-after": "3600"})
+        assert retry_delay(error, 0, base_delay=1, max_delay=60, rand=lambda: 0) == 60
+
+    def test_exponential_backoff_with_jitter(self):
+        error = _status_error(500)
+        assert retry_delay(error, 0, base_delay=1, max_delay=60, rand=lambda: 1) == 1
+        assert retry_delay(error, 3, base_delay=1, max_delay=60, rand=lambda: 1) == 8
+        assert retry_delay(error, 3, base_delay=1, max_delay=60, rand=lambda: 0) == 4
+        assert retry_delay(error, 10, base_delay=1, max_delay=60, rand=lambda: 1) == 60
+
+    def test_malformed_retry_after_falls_back_to_backoff(self):
+        error = _status_error(429, {"retry-after": "soon"})
+        assert retry_delay(error, 1, base_delay=1, max_delay=60, rand=lambda: 1) == 2
+
+
+class TestIsRetryable:
+    @pytest.mark.parametrize("status", [408, 409, 429, 500, 502, 503])
+    def test_retryable_status(self, status):
+        assert is_retryable(_status_error(status))
+
+    @pytest.mark.parametrize("status", [400, 401, 403, 404, 422])
+    def test_client_errors(self, status):
+        assert not is_retryable(_status_error(status))
+
+    def test_connection_and_timeout(self):
+        request = httpx.Request("POST", "http://x")
+        assert is_retryable(openai.APIConnectionError(request=request))
+        assert is_retryable(openai.APITimeoutError(request=request))
+
+    def test_other_exceptions(self):
+        assert not is_retryable(ValueError("boom"))
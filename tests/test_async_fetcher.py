@@ -0,0 +1,181 @@
+"""
+Tests for async_fetcher.py: AsyncRedditFetcher over a stub httpx transport.
+
+Covers:
+- fetch_thread parses through the shared RedditParser
+- fetch_subreddit_hot/top/new URL construction, listing parsing and pagination
+- Concurrency bound (max_concurrency)
+- Error handling: HTTP errors, invalid JSON, transport failures
+- Shared rate limiter usage
+"""
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from async_fetcher import AsyncRedditFetcher
+from reddit_fetcher import Thread
+
+
+def _thread_payload(thread_id="t1"):
+    return [
+        {"data": {"children": [{"data": {
+            "id": thread_id, "title": f"Thread {thread_id}", "author": "a",
+            "selftext": "body", "score": 5, "num_comments": 1,
+            "created_utc": 1700000000.0, "url": "u", "subreddit": "test",
+            "upvote_ratio": 0.9,
+        }}]}},
+        {"data": {"children": [
+            {"kind": "t1", "data": {
+                "id": "c1", "author": "u1", "body": "hello there", "score": 3,
+                "created_utc": 1700000100.0, "parent_id": f"t3_{thread_id}",
+                "gilded": 0, "replies": "",
+            }},
+            {"kind": "more", "data": {"children": ["c9"]}},
+        ]}},
+    ]
+
+
+def _run(fetcher, coro_fn):
+    async def main():
+        async with fetcher:
+            return await coro_fn(fetcher)
+    return asyncio.run(main())
+
+
+class TestFetchThread:
+    def test_parses_thread(self):
+        seen = []
+
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, json=_thread_payload())
+
+        fetcher = AsyncRedditFetcher(transport=httpx.MockTransport(handler))
+        thread = _run(fetcher, lambda f: f.fetch_thread("https://www.reddit.com/r/test/comments/t1/"))
+
+        assert isinstance(thread, Thread)
+        assert thread.id == "t1"
+        assert [c.id for c in thread.comments] == ["c1"]
+        assert seen == ["https://old.reddit.com/r/test/comments/t1.json"]
+
+    def test_sends_user_agent(self):
+        agents = []
+
+        def handler(request):
+            agents.append(request.headers["User-Agent"])
+            return httpx.Response(200, json=_thread_payload())
+
+        fetcher = AsyncRedditFetcher(user_agent="TestAgent/1.0", transport=httpx.MockTransport(handler))
+        _run(fetcher, lambda f: f.fetch_thread("https://reddit.com/r/t/comments/t1/"))
+        assert agents == ["TestAgent/1.0"]
+
+    def test_http_error_returns_none(self):
+        fetcher = AsyncRedditFetcher(transport=httpx.MockTransport(lambda r: httpx.Response(404)))
+        assert _run(fetcher, lambda f: f.fetch_thread("https://reddit.com/r/t/comments/x/")) is None
+
+    def test_invalid_json_returns_none(self):
+        fetcher = AsyncRedditFetcher(
+            transport=httpx.MockTransport(lambda r: httpx.Response(200, content=b"not json")))
+        assert _run(fetcher, lambda f: f.fetch_thread("https://reddit.com/r/t/comments/x/")) is None
+
+    def test_unexpected_structure_returns_none(self):
+        fetcher = AsyncRedditFetcher(
+            transport=httpx.MockTransport(lambda r: httpx.Response(200, json=[])))
+        assert _run(fetcher, lambda f: f.fetch_thread("https://reddit.com/r/t/comments/x/")) is None
+
+    def test_transport_error_returns_none(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        fetcher = AsyncRedditFetcher(transport=httpx.MockTransport(handler))
+        assert _run(fetcher, lambda f: f.fetch_thread("https://reddit.com/r/t/comments/x/")) is None
+
+
+class TestFetchThreadsConcurrently:
+    def test_keeps_order_and_bounds_concurrency(self):
+        active = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            thread_id = request.url.path.split("/")[-1].removesuffix(".json")
+            return httpx.Response(200, json=_thread_payload(thread_id))
+
+        fetcher = AsyncRedditFetcher(max_concurrency=3, transport=httpx.MockTransport(handler))
+        urls = [f"https://www.reddit.com/r/test/comments/id{i}/" for i in range(10)]
+        threads = _run(fetcher, lambda f: f.fetch_threads(urls))
+
+        assert [t.id for t in threads] == [f"id{i}" for i in range(10)]
+        assert 1 < peak <= 3
+
+    def test_uses_rate_limiter(self):
+        limiter = MagicMock()
+
+        async def acquire_async():
+            limiter.calls += 1
+
+        limiter.calls = 0
+        limiter.acquire_async = acquire_async
+        fetcher = AsyncRedditFetcher(
+            rate_limiter=limiter,
+            transport=httpx.MockTransport(lambda r: httpx.Response(200, json=_thread_payload())),
+        )
+        _run(fetcher, lambda f: f.fetch_threads(["https://reddit.com/r/t/comments/a/"] * 4))
+        assert limiter.calls == 4
+        assert limiter.update_from_headers.call_count == 4
+
+
+class TestFetchListings:
+    def _fetcher(self, listing, seen):
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, json=listing)
+        return AsyncRedditFetcher(transport=httpx.MockTransport(handler))
+
+    def test_hot(self, mock_listing_response):
+        seen = []
+        posts = _run(self._fetcher(mock_listing_response, seen),
+                     lambda f: f.fetch_subreddit_hot("Entrepreneur", limit=10))
+        assert [p["id"] for p in posts] == ["post1", "post2", "post3"]
+        assert seen == ["https://old.reddit.com/r/Entrepreneur/hot.json?limit=10"]
+
+    def test_top(self, mock_listing_response):
+        seen = []
+        _run(self._fetcher(mock_listing_response, seen),
+             lambda f: f.fetch_subreddit_top("SaaS", time_filter="month", limit=50))
+        assert seen == ["https://old.reddit.com/r/SaaS/top.json?t=month&limit=50"]
+
+    def test_new_caps_limit(self, mock_listing_response):
+        seen = []
+        _run(self._fetcher(mock_listing_response, seen),
+             lambda f: f.fetch_subreddit_new("startups", limit=500))
+        assert seen == ["https://old.reddit.com/r/startups/new.json?limit=100"]
+
+    def test_paginates_with_after(self):
+        def page(start, n, after):
+            return {"data": {"after": after, "children": [
+                {"data": {"id": f"p{i}", "permalink": f"/p{i}"}} for i in range(start, start + n)]}}
+
+        seen = []
+
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, json=page(100, 30, None) if "after=" in str(request.url)
+                                  else page(0, 100, "t3_p99"))
+
+        fetcher = AsyncRedditFetcher(transport=httpx.MockTransport(handler))
+        posts = _run(fetcher, lambda f: f.fetch_subreddit_new("startups", limit=500))
+        assert len(posts) == 130
+        assert seen[1] == "https://old.reddit.com/r/startups/new.json?limit=100&after=t3_p99&count=100"
+
+    def test_error_returns_empty(self):
+        fetcher = AsyncRedditFetcher(transport=httpx.MockTransport(lambda r: httpx.Response(503)))
+        assert _run(fetcher, lambda f: f.fetch_subreddit_hot("x")) == []
@@ -0,0 +1,371 @@
+"""
+Tests for batch_api.py: BatchRunner against an in-memory fake Batch API.
+
+Covers:
+- Request JSONL built from the analyzer's prompts
+- Results mapped back to threads (single and map-reduce requests)
+- Usage recorded as its own entry, billed at the batch price
+- Cached prompts answered without being sent
+- Resuming across restarts from the manifest (no duplicate upload/batch)
+- Failed requests, invalid answers and failed batches
+- GoldmineFinder --batch-api integration
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai_analyzer import AIAnalyzer, AnalysisResult, UsageStats
+from batch_api import (COLLECTED, FAILED, PREPARED, REQUESTS_FILE, SUBMITTED, BatchRunner)
+from llm_cache import AnalysisCache
+from reddit_fetcher import Thread, thread_to_dict
+from response_schema import RESPONSE_FORMAT
+from tests.conftest import make_thread_dict
+
+ANALYSIS = {
+    "pain_points": [{
+        "description": "Invoicing takes hours", "severity": "high",
+        "frequency_mentioned": 3, "example_comments": ["invoices are painful"],
+        "purchase_intent": "high", "category": "Finance",
+    }],
+    "key_insights": ["Billing is manual"],
+    "market_opportunities": ["Invoice automation"],
+    "sentiment_summary": "negative",
+}
+
+
+class FakeBatchClient:
+    """
+    In-memory Batch API. Each batch completes after *polls* status calls;
+    *answer(custom_id, body)* returns the output line's response (or None
+    to report a per-request error).
+    """
+
+    def __init__(self, polls=1, answer=None, final_status="completed"):
+        self.polls = polls
+        self.answer = answer or (lambda custom_id, body: ANALYSIS)
+        self.final_status = final_status
+        self.files = {}
+        self.batches = {}
+        self.uploads = []
+        self.created = []
+        self.status_calls = 0
+
+    def upload(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = data
+        self.uploads.append([json.loads(line) for line in data.decode().splitlines()])
+        return file_id
+
+    def find_batch(self, input_file_id):
+        for batch_id, batch in self.batches.items():
+            if batch["input_file_id"] == input_file_id:
+                return batch_id
+        return None
+
+    def create_batch(self, input_file_id, metadata):
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {"input_file_id": input_file_id, "polls": 0, "metadata": metadata}
+        self.created.append(batch_id)
+        return batch_id
+
+    def status(self, batch_id):
+        self.status_calls += 1
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] < self.polls:
+            return {"status": "in_progress", "completed": 0, "failed": 0, "total": 1}
+        if self.final_status == "failed":
+            return {"status": "failed", "errors": ["invalid input"]}
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode().splitlines():
+            request = json.loads(line)
+            content = self.answer(request["custom_id"], request["body"])
+            if content is None:
+                errors.append({"custom_id": request["custom_id"], "response": None,
+                               "error": {"code": "server_error", "message": "boom"}})
+                continue
+            text = content if isinstance(content, str) else json.dumps(content)
+            output.append({"custom_id": request["custom_id"], "error": None, "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"role": "assistant", "content": text}}],
+                         "usage": {"total_tokens": 250, "completion_tokens": 50,
+                                   "prompt_tokens_details": {"cached_tokens": 128}}},
+            }})
+        ids = {}
+        for key, lines in (("output_file_id", output), ("error_file_id", errors)):
+            if lines:
+                ids[key] = f"file-{len(self.files)}"
+                self.files[ids[key]] = "\n".join(json.dumps(l) for l in lines).encode()
+        return {"status": self.final_status, "completed": len(output), "failed": len(errors),
+                "total": len(output) + len(errors), **ids}
+
+    def download(self, file_id):
+        return self.files[file_id]
+
+
+def _analyzer(cache=None, map_reduce=False):
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.model = "gpt-4o-mini"
+    analyzer.client = MagicMock()
+    analyzer.cache = cache
+    analyzer.refresh = False
+    analyzer.map_reduce = map_reduce
+    return analyzer
+
+
+def _runner(tmp_path, client, analyzer=None, **kwargs):
+    kwargs.setdefault("poll_interval", 0)
+    return BatchRunner(analyzer or _analyzer(), str(tmp_path / "batch"), client=client,
+                       sleep=lambda s: None, **kwargs)
+
+
+class TestPrepare:
+    def test_writes_completion_requests(self, tmp_path):
+        runner = _runner(tmp_path, FakeBatchClient())
+        manifest = runner.prepare([make_thread_dict("a"), make_thread_dict("b")], label="SaaS")
+
+        with open(os.path.join(runner.work_dir, REQUESTS_FILE)) as f:
+            lines = [json.loads(line) for line in f]
+        assert [l["custom_id"] for l in lines] == ["a-0", "b-0"]
+        assert lines[0]["method"] == "POST"
+        assert lines[0]["url"] == "/v1/chat/completions"
+        body = lines[0]["body"]
+        assert body["model"] == "gpt-4o-mini"
+        assert body["response_format"] == RESPONSE_FORMAT
+        assert "comment number 2" in body["messages"][1]["content"]
+        assert manifest["status"] == PREPARED
+        assert manifest["label"] == "SaaS"
+        assert manifest["requests"] == 2
+
+    def test_duplicate_threads_sent_once(self, tmp_path):
+        runner = _runner(tmp_path, FakeBatchClient())
+        manifest = runner.prepare([make_thread_dict("a"), make_thread_dict("a")])
+        assert [t["id"] for t in manifest["threads"]] == ["a"]
+
+
+class TestRun:
+    def test_maps_results_back_to_threads(self, tmp_path):
+        client = FakeBatchClient(polls=3)
+        runner = _runner(tmp_path, client)
+
+        results = runner.run([make_thread_dict("a"), make_thread_dict("b", comments=2)], label="SaaS")
+
+        assert [t["id"] for t, _ in results] == ["a", "b"]
+        thread, result = results[1]
+        assert isinstance(result, AnalysisResult)
+        assert result.thread_id == "b"
+        assert result.total_comments == 2
+        assert result.pain_points[0].description == "Invoicing takes hours"
+        assert result.tokens_used == 250
+        assert (result.completion_tokens, result.cached_tokens) == (50, 128)
+        assert client.status_calls == 3
+
+    def test_usage_split_into_input_and_output(self, tmp_path):
+        runner = _runner(tmp_path, FakeBatchClient())
+        runner.run([make_thread_dict("a"), make_thread_dict("b")])
+
+        usage = runner.analyzer.usage["gpt-4o-mini (batch)"]
+        assert (usage.requests, usage.input_tokens, usage.output_tokens) == (2, 400, 100)
+        assert usage.cached_tokens == 256
+        assert "gpt-4o-mini" not in runner.analyzer.usage
+        assert runner.load_manifest()["status"] == COLLECTED
+        assert not runner.pending()
+
+    def test_usage_billed_at_batch_price(self, tmp_path):
+        runner = _runner(tmp_path, FakeBatchClient())
+        runner.run([make_thread_dict("a"), make_thread_dict("b")])
+
+        usage = runner.analyzer.usage["gpt-4o-mini (batch)"]
+        interactive = UsageStats("gpt-4o-mini", input_tokens=usage.input_tokens,
+                                 cached_tokens=usage.cached_tokens, output_tokens=usage.output_tokens)
+        assert usage.cost == pytest.approx(interactive.cost * 0.5)
+        assert usage.uncached_cost == pytest.approx(interactive.uncached_cost * 0.5)
+
+    def test_map_reduce_requests_are_merged(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("config.PROMPT_TOKEN_BUDGET", 30)
+        client = FakeBatchClient()
+        runner = _runner(tmp_path, client, analyzer=_analyzer(map_reduce=True))
+
+        (_, result), = runner.run([make_thread_dict("a", comments=4)])
+
+        assert len(client.uploads[0]) > 1
+        assert result.analyzed_comments == 4
+        assert result.tokens_used == 250 * len(client.uploads[0])
+
+    def test_cached_prompts_are_not_sent(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+        client = FakeBatchClient()
+        _runner(tmp_path, client, analyzer=_analyzer(cache)).run([make_thread_dict("a")])
+
+        client2 = FakeBatchClient()
+        runner = BatchRunner(_analyzer(cache), str(tmp_path / "batch2"), client=client2,
+                             poll_interval=0, sleep=lambda s: None)
+        (_, result), = runner.run([make_thread_dict("a")])
+
+        assert client2.uploads == []
+        assert result.cache_hit
+        assert result.tokens_used == 250
+        assert len(result.pain_points) == 1
+        cache.close()
+
+    def test_unusable_cached_answer_is_sent(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+        analyzer = _analyzer(cache)
+        thread = make_thread_dict("a")
+        comments, _, _ = analyzer._select_comments(thread)
+        request = analyzer._build_request(thread["title"], thread["selftext"], comments)
+        cache.put(request.cache_key, "not json at all", 10)
+
+        client = FakeBatchClient()
+        (_, result), = _runner(tmp_path, client, analyzer=analyzer).run([thread])
+
+        assert len(client.uploads[0]) == 1
+        assert not result.cache_hit
+        assert len(result.pain_points) == 1
+        cache.close()
+
+    def test_empty_input(self, tmp_path):
+        client = FakeBatchClient()
+        assert _runner(tmp_path, client).run([]) == []
+        assert client.uploads == []
+
+
+class TestResume:
+    def test_resumes_after_restart(self, tmp_path):
+        client = FakeBatchClient(polls=5)
+        clock = iter(range(0, 1000, 10))
+        runner = _runner(tmp_path, client, poll_interval=10, max_wait=25,
+                         clock=lambda: next(clock))
+
+        assert runner.run([make_thread_dict("a")]) is None
+        assert runner.pending()
+        assert runner.load_manifest()["status"] == SUBMITTED
+
+        # New process: same work directory, fresh runner
+        restarted = _runner(tmp_path, client)
+        results = restarted.run([make_thread_dict("other")])
+
+        assert [t["id"] for t, _ in results] == ["a"]
+        assert len(client.uploads) == 1
+        assert len(client.created) == 1
+
+    def test_interrupted_submit_does_not_create_second_batch(self, tmp_path):
+        client = FakeBatchClient()
+        runner = _runner(tmp_path, client)
+        runner.prepare([make_thread_dict("a")])
+        manifest = runner.load_manifest()
+        # Upload recorded, batch created, but the process died before saving its id
+        manifest["input_file_id"] = client.upload(os.path.join(runner.work_dir, REQUESTS_FILE))
+        client.create_batch(manifest["input_file_id"], {})
+        runner._save_manifest(manifest)
+
+        results = _runner(tmp_path, client).resume()
+
+        assert len(results) == 1
+        assert len(client.uploads) == 1
+        assert len(client.created) == 1
+
+    def test_resume_without_job(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            _runner(tmp_path, FakeBatchClient()).resume()
+
+
+class TestFailures:
+    def test_failed_request_drops_its_thread(self, tmp_path):
+        client = FakeBatchClient(answer=lambda cid, body: None if cid.startswith("bad") else ANALYSIS)
+        results = _runner(tmp_path, client).run([make_thread_dict("good"), make_thread_dict("bad")])
+        assert [t["id"] for t, _ in results] == ["good"]
+
+    def test_invalid_json_gives_failed_analysis(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("config.REPAIR_MALFORMED", False)
+        client = FakeBatchClient(answer=lambda cid, body: "not json")
+        (_, result), = _runner(tmp_path, client).run([make_thread_dict("a")])
+        assert result.pain_points == []
+        assert "invalid response format" in result.sentiment_summary
+
+    def test_failed_batch_raises_and_ends_job(self, tmp_path):
+        runner = _runner(tmp_path, FakeBatchClient(final_status="failed"))
+        with pytest.raises(RuntimeError, match="invalid input"):
+            runner.run([make_thread_dict("a")])
+        assert runner.load_manifest()["status"] == FAILED
+        assert not runner.pending()
+
+    def test_expired_batch_keeps_finished_answers(self, tmp_path):
+        runner = _runner(tmp_path, FakeBatchClient(final_status="expired"))
+        results = runner.run([make_thread_dict("a")])
+        assert len(results) == 1
+
+
+def _reddit_thread(thread_id):
+    data = make_thread_dict(thread_id)
+    return Thread(id=thread_id, title=data["title"], author="op", selftext="body", score=5,
+                  num_comments=3, created_utc=1.7e9, url=f"https://reddit.com/{thread_id}",
+                  subreddit="SaaS", upvote_ratio=1.0, comments=[])
+
+
+class TestGoldmineFinderBatchApi:
+    def _finder(self, tmp_path, client):
+        with patch("goldmine_finder.RedditFetcher") as fetcher_cls, \
+             patch("goldmine_finder.AIAnalyzer", side_effect=lambda **kw: _analyzer()):
+            from goldmine_finder import GoldmineFinder
+            finder = GoldmineFinder(output_dir=str(tmp_path), batch_api=True, batch_client=client)
+        finder.batch_runner.poll_interval = 0
+        fetched = {}
+
+        def fetch(url):
+            thread_id = url.rsplit("/", 1)[-1]
+            fetched[thread_id] = True
+            return _reddit_thread(thread_id)
+
+        fetcher_cls.return_value.fetch_thread.side_effect = fetch
+        finder.fetcher = fetcher_cls.return_value
+        finder._thread_to_dict = lambda thread: {**thread_to_dict(thread), **make_thread_dict(thread.id)}
+        return finder, fetched
+
+    def test_batch_urls_write_reports(self, tmp_path):
+        client = FakeBatchClient()
+        finder, _ = self._finder(tmp_path, client)
+
+        results = finder.batch_analyze_urls(["https://reddit.com/a", "https://reddit.com/b"])
+
+        assert [r["analysis"].thread_id for r in results] == ["a", "b"]
+        assert os.path.exists(tmp_path / "analysis_a.json")
+        assert os.path.exists(tmp_path / "report_b.md")
+        assert os.path.exists(tmp_path / "summary_batch.md")
+        assert len(client.uploads[0]) == 2
+
+    def test_pending_job_is_resumed_without_fetching(self, tmp_path):
+        client = FakeBatchClient(polls=3)
+        finder, _ = self._finder(tmp_path, client)
+        finder.batch_runner.max_wait = 1
+        finder.batch_runner.poll_interval = 5
+
+        assert finder.batch_analyze_urls(["https://reddit.com/a"]) == []
+        assert finder.batch_runner.pending()
+
+        finder2, fetched = self._finder(tmp_path, client)
+        results = finder2.resume_batch_api()
+
+        assert [r["analysis"].thread_id for r in results] == ["a"]
+        assert fetched == {}
+        assert os.path.exists(tmp_path / "summary_batch.md")
+
+    def test_new_urls_during_pending_job_are_reported(self, tmp_path, caplog):
+        client = FakeBatchClient(polls=3)
+        finder, _ = self._finder(tmp_path, client)
+        finder.batch_runner.max_wait = 1
+        finder.batch_runner.poll_interval = 5
+        finder.batch_analyze_urls(["https://reddit.com/a"])
+
+        finder2, fetched = self._finder(tmp_path, client)
+        with caplog.at_level("WARNING", logger="goldmine_finder"):
+            results = finder2.batch_analyze_urls(["https://reddit.com/b"])
+
+        assert [r["analysis"].thread_id for r in results] == ["a"]
+        assert fetched == {}
+        assert "new threads are ignored" in caplog.text
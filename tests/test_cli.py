@@ -7,12 +7,16 @@ Covers:
 - --subreddit mode dispatches to analyze_subreddit with limit/min-comments
 - --batch mode reads file and dispatches to batch_analyze_urls
 - --output sets output directory
+- --workers sets the analysis worker pool size
+- --http-cache / --no-http-cache
+- --no-cache / --refresh
+- --db
 - Exception handling (exit code)
 """
 
 import sys
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, mock_open
 
 
 class TestCliNoArgs:
@@ -51,7 +55,7 @@ class TestCliSubredditMode:
             from goldmine_finder import main
             main()
             mock_instance.analyze_subreddit.assert_called_once_with(
-                "SaaS", limit=10, min_comments=5,
+                "SaaS", limit=10, min_comments=5, sort="hot", max_age_hours=None,
             )
 
     def test_subreddit_with_custom_limit(self):
@@ -63,7 +67,19 @@ class TestCliSubredditMode:
             from goldmine_finder import main
             main()
             mock_instance.analyze_subreddit.assert_called_once_with(
-                "SaaS", limit=20, min_comments=10,
+                "SaaS", limit=20, min_comments=10, sort="hot", max_age_hours=None,
+            )
+
+    def test_subreddit_sort_and_max_age(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS", "--limit", "500",
+                                 "--sort", "new", "--max-age-hours", "24"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            mock_instance = MagicMock()
+            MockFinder.return_value = mock_instance
+            from goldmine_finder import main
+            main()
+            mock_instance.analyze_subreddit.assert_called_once_with(
+                "SaaS", limit=500, min_comments=5, sort="new", max_age_hours=24.0,
             )
 
 
@@ -107,7 +123,27 @@ class TestCliOutputDir:
             MockFinder.return_value = mock_instance
             from goldmine_finder import main
             main()
-            MockFinder.assert_called_once_with(output_dir=out)
+            assert MockFinder.call_args.kwargs["output_dir"] == out
+
+
+class TestCliWorkers:
+    """--workers sets the analysis worker pool size."""
+
+    def test_default_workers(self):
+        import config as cfg
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["workers"] == cfg.ANALYSIS_WORKERS
+
+    def test_custom_workers(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com",
+                                 "--workers", "8"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["workers"] == 8
 
 
 class TestCliExceptionHandling:
@@ -123,3 +159,170 @@ class TestCliExceptionHandling:
             with pytest.raises(SystemExit) as exc_info:
                 main()
             assert exc_info.value.code == 1
+
+
+class TestCliHttpCache:
+    """--http-cache / --no-http-cache control the persistent Reddit cache."""
+
+    def test_default_cache_path(self):
+        import config as cfg
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["http_cache_path"] == cfg.HTTP_CACHE_PATH
+            MockFinder.return_value.log_cache_stats.assert_called_once()
+
+    def test_no_http_cache(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", "--no-http-cache"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["http_cache_path"] is None
+
+
+class TestCliLlmCache:
+    """--no-cache / --refresh control the AI result cache."""
+
+    def test_defaults(self):
+        import config as cfg
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["llm_cache_path"] == cfg.LLM_CACHE_PATH
+            assert MockFinder.call_args.kwargs["refresh"] is False
+
+    def test_no_cache_and_refresh(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com",
+                                 "--no-cache", "--refresh"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["llm_cache_path"] is None
+            assert MockFinder.call_args.kwargs["refresh"] is True
+
+
+class TestCliMapReduce:
+    def test_default_off(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["map_reduce"] is False
+
+    def test_flag(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", "--map-reduce"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["map_reduce"] is True
+
+
+class TestCliExpandMore:
+    def test_default_off(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["expand_more"] is False
+
+    def test_flag(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", "--expand-more"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["expand_more"] is True
+
+
+class TestCliResultDb:
+    def test_default_off(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["db_path"] is None
+
+    def test_flag_without_path_uses_default(self):
+        import config as cfg
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", "--db"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["db_path"] == cfg.RESULT_DB_PATH
+
+    def test_flag_with_path(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", "--db", "r.sqlite"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["db_path"] == "r.sqlite"
+
+
+class TestCliBatchApi:
+    def test_default_off(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--batch", "urls.txt"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder, \
+             patch("builtins.open", mock_open(read_data="http://test.com\n")):
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["batch_api"] is False
+
+    def test_flag_with_subreddit(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS", "--batch-api"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            MockFinder.return_value.batch_runner.pending.return_value = False
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["batch_api"] is True
+            MockFinder.return_value.analyze_subreddit.assert_called_once()
+
+    def test_pending_job_resumed_first(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS", "--batch-api"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            MockFinder.return_value.batch_runner.pending.return_value = True
+            from goldmine_finder import main
+            main()
+            MockFinder.return_value.resume_batch_api.assert_called_once_with()
+            MockFinder.return_value.analyze_subreddit.assert_not_called()
+
+    def test_rejected_with_url(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", "--batch-api"]), \
+             patch("goldmine_finder.GoldmineFinder"):
+            from goldmine_finder import main
+            with pytest.raises(SystemExit):
+                main()
+
+
+class TestCliGate:
+    def test_threshold_and_model_passed(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS",
+                                "--gate-threshold", "0.2", "--gate-model", "gate.npz"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["gate_threshold"] == 0.2
+            assert MockFinder.call_args.kwargs["gate_model_path"] == "gate.npz"
+
+    def test_threshold_out_of_range(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS", "--gate-threshold", "1.5"]), \
+             patch("goldmine_finder.GoldmineFinder"):
+            from goldmine_finder import main
+            with pytest.raises(SystemExit):
+                main()
+
+
+class TestCliTiered:
+    def test_flag_passed(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS", "--tiered"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["tiered"] is True
+
+    def test_rejected_with_batch_api(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS", "--tiered", "--batch-api"]), \
+             patch("goldmine_finder.GoldmineFinder"):
+            from goldmine_finder import main
+            with pytest.raises(SystemExit):
+                main()
@@ -0,0 +1,128 @@
+"""
+Tests for comment_ranker.py: relevance ranking and near-duplicate removal.
+
+Covers:
+- Feature effects (score, gilded, depth, length, keywords)
+- Keyword hits attributed to the right comment
+- SimHash near-duplicate detection
+- rank_comments ordering and dedupe
+- AIAnalyzer ranks before the MAX_COMMENTS cap
+- 10k-comment performance
+"""
+
+import time
+from unittest.mock import patch
+
+import numpy as np
+
+from comment_ranker import _keyword_hits, near_duplicates, rank_comments, score_comments, simhashes
+
+
+def _c(body, score=1, gilded=0, depth=0):
+    return {'body': body, 'score': score, 'gilded': gilded, 'depth': depth, 'replies': []}
+
+
+class TestScoring:
+    def test_higher_score_ranks_higher(self):
+        s = score_comments([_c("same text here", score=1), _c("same text here", score=500)])
+        assert s[1] > s[0]
+
+    def test_gilded_ranks_higher(self):
+        s = score_comments([_c("same text here"), _c("same text here", gilded=2)])
+        assert s[1] > s[0]
+
+    def test_deep_reply_ranks_lower(self):
+        s = score_comments([_c("same text here", depth=6), _c("same text here", depth=0)])
+        assert s[1] > s[0]
+
+    def test_keywords_rank_higher(self):
+        s = score_comments([
+            _c("Nice weather today in the city"),
+            _c("I'd pay for a tool, struggling daily"),
+        ])
+        assert s[1] > s[0]
+
+    def test_missing_fields_default(self):
+        s = score_comments([{'body': 'only a body field here'}])
+        assert s.shape == (1,)
+        assert np.isfinite(s).all()
+
+    def test_empty(self):
+        assert score_comments([]).shape == (0,)
+
+
+class TestKeywordHits:
+    def test_hits_attributed_per_comment(self):
+        hits = _keyword_hits(["nothing here", "so frustrating, I'd pay", "", "looking for a tool"])
+        assert hits.tolist() == [0, 2, 0, 1]
+
+
+class TestNearDuplicates:
+    def test_identical_bodies_same_fingerprint(self):
+        fp = simhashes(["the export feature is broken again", "the export feature is broken again"])
+        assert fp[0] == fp[1]
+
+    def test_minor_edit_is_near_duplicate(self):
+        base = "we spend hours every week copying invoices into a spreadsheet by hand and it is painful"
+        fp = simhashes([base, base + " !!!", "completely unrelated comment about hiking trails in spring"])
+        dup = near_duplicates(fp, np.arange(3), max_distance=3)
+        assert dup.tolist() == [False, True, False]
+
+    def test_empty_bodies(self):
+        assert simhashes(["", "   "]).tolist() == [0, 0]
+
+
+class TestRankComments:
+    def test_orders_best_first(self):
+        comments = [
+            _c("ok thanks for sharing", score=1, depth=3),
+            _c("Our biggest problem is reconciling invoices manually, I'd pay for a fix", score=40),
+        ]
+        ranked = rank_comments(comments)
+        assert ranked[0] is comments[1]
+
+    def test_dedupe_keeps_higher_ranked_copy(self):
+        text = "I hate how the billing dashboard hides the invoice export behind three menus"
+        low, high = _c(text, score=1), _c(text, score=90)
+        ranked = rank_comments([low, high, _c("totally different content about onboarding flows")])
+        assert high in ranked and low not in ranked
+        assert len(ranked) == 2
+
+    def test_dedupe_disabled(self):
+        text = "I hate how the billing dashboard hides the invoice export"
+        assert len(rank_comments([_c(text), _c(text)], dedupe=False)) == 2
+
+    def test_empty(self):
+        assert rank_comments([]) == []
+
+
+class TestAnalyzerUsesRanking:
+    def test_cap_keeps_top_ranked(self):
+        from ai_analyzer import AIAnalyzer
+
+        analyzer = AIAnalyzer.__new__(AIAnalyzer)
+        analyzer.map_reduce = False
+        chain = [_c(f"reply {i} in a long side discussion about weather", depth=i + 1) for i in range(5)]
+        signal = _c("Looking for a tool to automate payroll, would pay today", score=50)
+        thread = {'id': 't', 'title': 'T', 'comments': chain + [signal]}
+        empty = {'pain_points': [], 'key_insights': [], 'market_opportunities': [], 'sentiment_summary': ''}
+
+        with patch.object(analyzer, '_analyze_with_ai', return_value=empty) as mock_ai, \
+             patch("config.MAX_COMMENTS", 2):
+            analyzer.analyze_thread(thread)
+        assert mock_ai.call_args.kwargs['comments'][0] == signal['body']
+
+
+class TestPerformance:
+    def test_10k_comments_fast(self):
+        rng = np.random.default_rng(0)
+        words = [f"w{i}" for i in range(2000)]
+        comments = [
+            _c(" ".join(rng.choice(words, size=40)), score=int(rng.integers(-5, 500)),
+               depth=int(rng.integers(0, 10)))
+            for _ in range(10_000)
+        ]
+        start = time.perf_counter()
+        ranked = rank_comments(comments)
+        assert time.perf_counter() - start < 5.0
+        assert len(ranked) > 9_000
@@ -0,0 +1,124 @@
+"""
+Tests for comment_table.py and rank_table.
+
+Covers:
+- Columns, parent rows and body buffer from dicts and Comment objects
+- usable_mask: length, deleted placeholders, excluded ids
+- depth_stats
+- rank_table matches rank_comments
+- analyze_thread uses the table (filtering, skip ids)
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+
+from ai_analyzer import AIAnalyzer
+from comment_ranker import rank_comments, rank_table
+from comment_table import CommentTable
+from reddit_fetcher import Comment, comments_to_dicts, iter_comment_dicts
+
+
+def _c(id, body, score=1, replies=()):
+    return {"id": id, "body": body, "score": score, "gilded": 0, "created_utc": 1.0,
+            "replies": list(replies)}
+
+
+def _tree():
+    return [
+        _c("a", "first top-level comment", score=5, replies=[
+            _c("b", "a reply that is long enough", score=2, replies=[_c("c", "short")]),
+        ]),
+        _c("d", "[deleted]", score=0),
+        _c("e", "another top-level comment here", score=-3),
+    ]
+
+
+class TestBuild:
+    def test_columns_from_dicts(self):
+        table = CommentTable.from_dicts(_tree())
+        assert len(table) == 5
+        assert table.ids.tolist() == ["a", "b", "c", "d", "e"]
+        assert table.parent.tolist() == [-1, 0, 1, -1, -1]
+        assert table.depth.tolist() == [0, 1, 2, 0, 0]
+        assert table.score.tolist() == [5, 2, 1, 0, -3]
+        assert table.deleted.tolist() == [False, False, False, True, False]
+
+    def test_body_buffer(self):
+        table = CommentTable.from_dicts(_tree())
+        assert table.body(2) == "short"
+        assert table.bodies([4, 0]) == ["another top-level comment here", "first top-level comment"]
+        assert table.lengths.tolist() == [len(b) for b in table.bodies()]
+
+    def test_from_comments_matches_from_dicts(self):
+        reply = Comment(id="b", author="x", body="reply body", score=2, created_utc=2.0,
+                        parent_id="t1_a", gilded=1, depth=1)
+        top = Comment(id="a", author="y", body="top body", score=1, created_utc=1.0,
+                      parent_id="t3_t", gilded=0, replies=[reply])
+        from_objects = CommentTable.from_comments([top])
+        from_dicts = CommentTable.from_dicts(comments_to_dicts([top]))
+        for column in ("ids", "parent", "depth", "score", "gilded", "created_utc", "offsets"):
+            assert getattr(from_objects, column).tolist() == getattr(from_dicts, column).tolist()
+        assert from_objects.buffer == from_dicts.buffer
+
+    def test_empty(self):
+        table = CommentTable.from_dicts([])
+        assert len(table) == 0
+        assert table.bodies() == []
+        assert table.usable_mask().tolist() == []
+        assert table.depth_stats() == {}
+
+
+class TestQueries:
+    def test_usable_mask(self):
+        table = CommentTable.from_dicts(_tree())
+        assert table.ids[table.usable_mask()].tolist() == ["a", "b", "e"]
+
+    def test_usable_mask_excludes_ids(self):
+        table = CommentTable.from_dicts(_tree())
+        assert table.ids[table.usable_mask(exclude_ids={"a", "zz"})].tolist() == ["b", "e"]
+
+    def test_deleted_excluded_even_with_low_min_length(self):
+        table = CommentTable.from_dicts(_tree())
+        assert "d" not in table.ids[table.usable_mask(min_length=0)].tolist()
+
+    def test_depth_stats(self):
+        stats = CommentTable.from_dicts(_tree()).depth_stats()
+        assert stats[0]["count"] == 3
+        assert stats[0]["mean_score"] == (5 + 0 - 3) / 3
+        assert stats[2] == {"count": 1, "mean_score": 1.0, "mean_length": 5.0}
+
+
+class TestRankTable:
+    def test_matches_rank_comments(self):
+        comments = [_c(f"c{i}", f"comment number {i} about {word} and would pay for a tool", score=i % 7)
+                    for i, word in enumerate(["billing", "invoices", "exports", "reports", "onboarding"] * 4)]
+        comments.append(_c("dup", comments[0]["body"]))
+        table = CommentTable.from_dicts(comments)
+        rows = np.flatnonzero(table.usable_mask())
+        ranked = table.ids[rank_table(table, rows)].tolist()
+        flat = [c for c in iter_comment_dicts(comments)]
+        assert ranked == [c["id"] for c in rank_comments(flat)]
+
+    def test_subset_rows(self):
+        table = CommentTable.from_dicts(_tree())
+        assert sorted(rank_table(table, np.array([0, 4])).tolist()) == [0, 4]
+
+    def test_empty_rows(self):
+        table = CommentTable.from_dicts(_tree())
+        assert rank_table(table, np.array([], dtype=np.int64)).tolist() == []
+
+
+class TestAnalyzeThread:
+    def test_sends_filtered_bodies(self):
+        analyzer = AIAnalyzer.__new__(AIAnalyzer)
+        analyzer.model = "gpt-4o-mini"
+        analyzer.map_reduce = False
+        analysis = {"pain_points": [], "key_insights": [], "market_opportunities": [],
+                    "sentiment_summary": ""}
+        with patch.object(analyzer, "_analyze_with_ai", return_value=analysis) as mock_ai:
+            result = analyzer.analyze_thread({"id": "t", "title": "T", "comments": _tree()},
+                                             skip_comment_ids={"e"})
+        sent = mock_ai.call_args.kwargs["comments"]
+        assert sorted(sent) == ["a reply that is long enough", "first top-level comment"]
+        assert result.total_comments == 2
@@ -5,7 +5,7 @@ Covers:
 - All default values
 - Environment variable overrides via monkeypatch
 - Type correctness
-- Invariants (MAX_COMMENTS_IN_PROMPT <= MAX_COMMENTS)
+- Invariants (MAX_COMMENT_TOKENS <= PROMPT_TOKEN_BUDGET)
 """
 
 import importlib
@@ -29,6 +29,10 @@ class TestConfigDefaults:
         assert self.cfg.RATE_LIMIT_DELAY == 2.0
         assert isinstance(self.cfg.RATE_LIMIT_DELAY, float)
 
+    def test_rate_limit_burst(self):
+        assert self.cfg.RATE_LIMIT_BURST == 3
+        assert isinstance(self.cfg.RATE_LIMIT_BURST, int)
+
     def test_request_timeout(self):
         assert self.cfg.REQUEST_TIMEOUT == 30
         assert isinstance(self.cfg.REQUEST_TIMEOUT, int)
@@ -48,12 +52,28 @@ class TestConfigDefaults:
         assert self.cfg.MAX_COMMENTS == 100
         assert isinstance(self.cfg.MAX_COMMENTS, int)
 
-    def test_max_comments_in_prompt(self):
-        assert self.cfg.MAX_COMMENTS_IN_PROMPT == 50
-        assert isinstance(self.cfg.MAX_COMMENTS_IN_PROMPT, int)
+    def test_prompt_token_budget(self):
+        assert self.cfg.PROMPT_TOKEN_BUDGET == 6000
+        assert self.cfg.MAX_COMMENT_TOKENS == 400
+
+    def test_pipeline_workers(self):
+        assert self.cfg.FETCH_WORKERS == 2
+        assert self.cfg.ANALYSIS_WORKERS == 4
+
+    def test_http_cache_ttls_ordered(self):
+        assert self.cfg.HTTP_CACHE_LISTING_TTL < self.cfg.HTTP_CACHE_THREAD_TTL < self.cfg.HTTP_CACHE_OLD_THREAD_TTL
+
+    def test_expand_more_off_by_default(self):
+        assert self.cfg.EXPAND_MORE is False
+        assert self.cfg.MORECHILDREN_BATCH == 100
+        assert self.cfg.MORECHILDREN_MAX_REQUESTS == 20
+
+    def test_map_reduce_off_by_default(self):
+        assert self.cfg.MAP_REDUCE is False
+        assert self.cfg.CHUNK_CONCURRENCY == 4
 
-    def test_prompt_limit_leq_max_comments(self):
-        assert self.cfg.MAX_COMMENTS_IN_PROMPT <= self.cfg.MAX_COMMENTS
+    def test_comment_cap_leq_prompt_budget(self):
+        assert self.cfg.MAX_COMMENT_TOKENS <= self.cfg.PROMPT_TOKEN_BUDGET
 
 
 class TestConfigEnvironmentOverrides:
@@ -92,7 +112,17 @@ class TestConfigEnvironmentOverrides:
         cfg = _reload_config()
         assert cfg.MAX_COMMENTS == 200
 
-    def test_max_comments_in_prompt_override(self, monkeypatch):
-        monkeypatch.setenv("RGA_MAX_COMMENTS_IN_PROMPT", "75")
+    def test_prompt_token_budget_override(self, monkeypatch):
+        monkeypatch.setenv("RGA_PROMPT_TOKEN_BUDGET", "12000")
+        cfg = _reload_config()
+        assert cfg.PROMPT_TOKEN_BUDGET == 12000
+
+    def test_analysis_workers_override(self, monkeypatch):
+        monkeypatch.setenv("RGA_ANALYSIS_WORKERS", "8")
+        cfg = _reload_config()
+        assert cfg.ANALYSIS_WORKERS == 8
+
+    def test_map_reduce_override(self, monkeypatch):
+        monkeypatch.setenv("RGA_MAP_REDUCE", "true")
         cfg = _reload_config()
-        assert cfg.MAX_COMMENTS_IN_PROMPT == 75
+        assert cfg.MAP_REDUCE is True
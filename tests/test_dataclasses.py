@@ -5,6 +5,7 @@ Covers:
 - Default values (__post_init__)
 - Field types
 - Edge cases (None replies, empty lists)
+- Slots, string interning and to_dict/from_dict
 """
 
 import pytest
@@ -44,6 +45,36 @@ class TestComment:
         assert len(parent.replies) == 1
         assert parent.replies[0].id == "c2"
 
+    def test_slotted(self):
+        c = Comment(id="c1", author="u1", body="hello", score=1,
+                    created_utc=0.0, parent_id="t3_x", gilded=0)
+        assert not hasattr(c, "__dict__")
+        with pytest.raises(AttributeError):
+            c.extra = 1
+
+    def test_author_and_parent_interned(self):
+        # Build equal strings at runtime so they start as distinct objects
+        a = Comment(id="c1", author="".join(["us", "er"]), body="x", score=0,
+                    created_utc=0.0, parent_id="".join(["t3_", "x"]), gilded=0)
+        b = Comment(id="c2", author="".join(["use", "r"]), body="y", score=0,
+                    created_utc=0.0, parent_id="".join(["t3", "_x"]), gilded=0)
+        assert a.author is b.author
+        assert a.parent_id is b.parent_id
+
+    def test_none_author_not_interned(self):
+        c = Comment(id="c1", author=None, body="x", score=0,
+                    created_utc=0.0, parent_id="t3_x", gilded=0)
+        assert c.author is None
+
+    def test_to_dict_round_trip(self):
+        child = Comment(id="c2", author="u2", body="reply", score=0,
+                        created_utc=0.0, parent_id="t1_c1", gilded=0, depth=1)
+        parent = Comment(id="c1", author="u1", body="hello", score=1,
+                         created_utc=0.0, parent_id="t3_x", gilded=0, replies=[child])
+        data = parent.to_dict()
+        assert data["replies"][0]["id"] == "c2"
+        assert Comment.from_dict(data) == parent
+
 
 # ── Thread ───────────────────────────────────────────────────────────────────
 
@@ -66,6 +97,26 @@ class TestThread:
         )
         assert t.comments == []
 
+    def test_slotted(self):
+        t = Thread(
+            id="t1", title="T", author="a", selftext="",
+            score=0, num_comments=0, created_utc=0.0,
+            url="", subreddit="", upvote_ratio=0.0,
+        )
+        assert not hasattr(t, "__dict__")
+
+    def test_to_dict_round_trip(self):
+        c = Comment(id="c1", author="u1", body="hello", score=1,
+                    created_utc=0.0, parent_id="t3_t1", gilded=0)
+        t = Thread(
+            id="t1", title="T", author="a", selftext="",
+            score=3, num_comments=1, created_utc=0.0,
+            url="u", subreddit="s", upvote_ratio=0.5, comments=[c],
+        )
+        data = t.to_dict()
+        assert data["comments"][0]["body"] == "hello"
+        assert Thread.from_dict(data) == t
+
 
 # ── PainPoint ────────────────────────────────────────────────────────────────
 
@@ -5,6 +5,7 @@ Covers:
 - _parse_post_listing (new)
 - _fetch_listing (new, mocked HTTP)
 - fetch_subreddit_top / fetch_subreddit_new (new)
+- iter_subreddit pagination (after/count, limit, predicate, prefetch)
 - fetch_thread (mocked HTTP)
 - save_to_json (file I/O)
 - Network error handling
@@ -88,11 +89,10 @@ class TestFetchListing:
 
     def setup_method(self):
         self.fetcher = RedditFetcher()
-        self.fetcher.rate_limit_delay = 0
 
     def test_successful_fetch(self):
         mock_response = MagicMock()
-        mock_response.json.return_value = {"data": {"children": []}}
+        mock_response.content = json.dumps({"data": {"children": []}}).encode()
         mock_response.raise_for_status.return_value = None
         with patch.object(self.fetcher.session, "get", return_value=mock_response):
             result = self.fetcher._fetch_listing("https://old.reddit.com/r/test/hot.json")
@@ -121,7 +121,7 @@ class TestFetchListing:
     def test_json_decode_error(self):
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
-        mock_response.json.side_effect = json.JSONDecodeError("bad", "", 0)
+        mock_response.content = b"<html>not json</html>"
         with patch.object(self.fetcher.session, "get", return_value=mock_response):
             assert self.fetcher._fetch_listing("https://example.com") == []
 
@@ -134,43 +134,42 @@ class TestFetchSubredditVariants:
 
     def setup_method(self):
         self.fetcher = RedditFetcher()
-        self.fetcher.rate_limit_delay = 0
 
-    @patch.object(RedditFetcher, "_fetch_listing", return_value=[])
+    @patch.object(RedditFetcher, "_fetch_listing_page", return_value=([], None))
     def test_hot_url(self, mock_fetch):
         self.fetcher.fetch_subreddit_hot("Entrepreneur", limit=10)
         mock_fetch.assert_called_once_with(
             "https://old.reddit.com/r/Entrepreneur/hot.json?limit=10"
         )
 
-    @patch.object(RedditFetcher, "_fetch_listing", return_value=[])
+    @patch.object(RedditFetcher, "_fetch_listing_page", return_value=([], None))
     def test_top_url_default_week(self, mock_fetch):
         self.fetcher.fetch_subreddit_top("SaaS")
         mock_fetch.assert_called_once_with(
             "https://old.reddit.com/r/SaaS/top.json?t=week&limit=25"
         )
 
-    @patch.object(RedditFetcher, "_fetch_listing", return_value=[])
+    @patch.object(RedditFetcher, "_fetch_listing_page", return_value=([], None))
     def test_top_url_custom_time_and_limit(self, mock_fetch):
         self.fetcher.fetch_subreddit_top("SaaS", time_filter="month", limit=50)
         mock_fetch.assert_called_once_with(
             "https://old.reddit.com/r/SaaS/top.json?t=month&limit=50"
         )
 
-    @patch.object(RedditFetcher, "_fetch_listing", return_value=[])
+    @patch.object(RedditFetcher, "_fetch_listing_page", return_value=([], None))
     def test_new_url(self, mock_fetch):
         self.fetcher.fetch_subreddit_new("startups", limit=15)
         mock_fetch.assert_called_once_with(
             "https://old.reddit.com/r/startups/new.json?limit=15"
         )
 
-    @patch.object(RedditFetcher, "_fetch_listing", return_value=[])
-    def test_limit_capped_at_100(self, mock_fetch):
+    @patch.object(RedditFetcher, "_fetch_listing_page", return_value=([], None))
+    def test_first_page_capped_at_100(self, mock_fetch):
         self.fetcher.fetch_subreddit_hot("test", limit=200)
         url = mock_fetch.call_args[0][0]
         assert "limit=100" in url
 
-    @patch.object(RedditFetcher, "_fetch_listing", return_value=[])
+    @patch.object(RedditFetcher, "_fetch_listing_page", return_value=([], None))
     def test_top_all_time_filters(self, mock_fetch):
         for tf in ("hour", "day", "week", "month", "year", "all"):
             self.fetcher.fetch_subreddit_top("t", time_filter=tf)
@@ -178,6 +177,78 @@ class TestFetchSubredditVariants:
             assert f"t={tf}" in url
 
 
+# ── iter_subreddit pagination ────────────────────────────────────────────────
+
+
+def _page(start, n, after):
+    """Listing payload with posts p<start>..p<start+n-1>"""
+    return {"data": {"after": after, "children": [
+        {"data": {"id": f"p{i}", "title": f"Post {i}", "num_comments": i,
+                  "permalink": f"/r/t/comments/p{i}/", "created_utc": 2000.0 - i}}
+        for i in range(start, start + n)
+    ]}}
+
+
+class TestIterSubreddit:
+    """Paginated listing streaming"""
+
+    def setup_method(self):
+        self.fetcher = RedditFetcher()
+        self.pages = {
+            None: _page(0, 100, "t3_p99"),
+            "t3_p99": _page(100, 100, "t3_p199"),
+            "t3_p199": _page(200, 50, None),
+        }
+        self.urls = []
+
+        def get_json(url):
+            self.urls.append(url)
+            after = url.split("after=")[1].split("&")[0] if "after=" in url else None
+            return self.pages[after]
+
+        self.fetcher._get_json = get_json
+
+    def test_limit_500_follows_cursor(self):
+        posts = self.fetcher.fetch_subreddit_new("t", limit=500)
+        assert len(posts) == 250
+        assert posts[-1]["id"] == "p249"
+        assert self.urls == [
+            "https://old.reddit.com/r/t/new.json?limit=100",
+            "https://old.reddit.com/r/t/new.json?limit=100&after=t3_p99&count=100",
+            "https://old.reddit.com/r/t/new.json?limit=100&after=t3_p199&count=200",
+        ]
+
+    def test_limit_trims_last_page(self):
+        posts = self.fetcher.fetch_subreddit_hot("t", limit=150)
+        assert len(posts) == 150
+        assert self.urls[1].startswith("https://old.reddit.com/r/t/hot.json?limit=50&after=t3_p99")
+
+    def test_lazy(self):
+        it = self.fetcher.iter_subreddit("t", "new", limit=None)
+        next(it)
+        # First page consumed, at most one page prefetched
+        assert len(self.urls) <= 2
+        it.close()
+
+    def test_predicate_stops_early(self):
+        posts = list(self.fetcher.iter_subreddit("t", "new", limit=None,
+                                                 predicate=lambda p: p["created_utc"] > 2000.0 - 120))
+        assert len(posts) == 120
+        assert len(self.urls) <= 3
+
+    def test_posted_since(self):
+        from reddit_fetcher import posted_since
+        keep = posted_since(1990.0)
+        assert keep({"created_utc": 1995.0}) and not keep({"created_utc": 1980.0})
+
+    def test_error_ends_stream(self):
+        def failing(url):
+            raise requests.exceptions.ConnectionError("down")
+
+        self.fetcher._get_json = failing
+        assert self.fetcher.fetch_subreddit_hot("t", limit=300) == []
+
+
 # ── fetch_thread (mocked HTTP) ───────────────────────────────────────────────
 
 
@@ -186,7 +257,6 @@ class TestFetchThread:
 
     def setup_method(self):
         self.fetcher = RedditFetcher()
-        self.fetcher.rate_limit_delay = 0
 
     def _mock_thread_json(self):
         return [
@@ -215,7 +285,7 @@ class TestFetchThread:
 
     def test_successful_fetch(self):
         mock_response = MagicMock()
-        mock_response.json.return_value = self._mock_thread_json()
+        mock_response.content = json.dumps(self._mock_thread_json()).encode()
         mock_response.raise_for_status.return_value = None
         with patch.object(self.fetcher.session, "get", return_value=mock_response):
             thread = self.fetcher.fetch_thread(
@@ -226,6 +296,17 @@ class TestFetchThread:
         assert thread.title == "Test Thread"
         assert thread.subreddit == "test"
 
+    def test_uses_rate_limiter(self):
+        limiter = MagicMock()
+        fetcher = RedditFetcher(rate_limiter=limiter)
+        mock_response = MagicMock()
+        mock_response.content = json.dumps(self._mock_thread_json()).encode()
+        mock_response.headers = {"X-Ratelimit-Remaining": "50"}
+        with patch.object(fetcher.session, "get", return_value=mock_response):
+            fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/")
+        limiter.acquire.assert_called_once()
+        limiter.update_from_headers.assert_called_once_with({"X-Ratelimit-Remaining": "50"})
+
     def test_network_error_returns_none(self):
         with patch.object(
             self.fetcher.session, "get",
@@ -236,7 +317,7 @@ class TestFetchThread:
     def test_json_error_returns_none(self):
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
-        mock_response.json.side_effect = json.JSONDecodeError("bad", "", 0)
+        mock_response.content = b"<html>not json</html>"
         with patch.object(self.fetcher.session, "get", return_value=mock_response):
             assert self.fetcher.fetch_thread("https://reddit.com/r/t/comments/x/") is None
 
@@ -5,13 +5,14 @@ Covers:
 - _thread_to_dict conversion
 - analyze_single_thread (mocked fetcher + analyzer)
 - analyze_subreddit filtering by min_comments
-- batch_analyze_urls
+- batch_analyze_urls (pipelined fetch → analyze)
 - _generate_summary_report content & file I/O
 - Edge cases: fetch failures, empty results
 """
 
 import os
 import json
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -150,15 +151,15 @@ class TestAnalyzeSubreddit:
             {"title": "P3", "num_comments": 5, "permalink": "https://reddit.com/r/t/comments/3/"},
         ]
         finder = _make_finder(tmp_path)
-        finder.fetcher.fetch_subreddit_hot.return_value = posts
+        finder.fetcher.iter_subreddit.return_value = iter(posts)
 
-        with patch.object(finder, "analyze_single_thread", return_value=None) as mock_analyze:
+        with patch.object(finder, "_fetch_and_save", return_value=None) as mock_fetch:
             finder.analyze_subreddit("test", limit=10, min_comments=5)
-            assert mock_analyze.call_count == 2  # P1 (10) and P3 (5)
+            assert mock_fetch.call_count == 2  # P1 (10) and P3 (5)
 
     def test_empty_posts(self, tmp_path):
         finder = _make_finder(tmp_path)
-        finder.fetcher.fetch_subreddit_hot.return_value = []
+        finder.fetcher.iter_subreddit.return_value = iter([])
         assert finder.analyze_subreddit("empty") == []
 
     def test_all_below_threshold(self, tmp_path):
@@ -167,32 +168,92 @@ class TestAnalyzeSubreddit:
             {"title": "P2", "num_comments": 0, "permalink": "url2"},
         ]
         finder = _make_finder(tmp_path)
-        finder.fetcher.fetch_subreddit_hot.return_value = posts
-        with patch.object(finder, "analyze_single_thread") as mock:
+        finder.fetcher.iter_subreddit.return_value = iter(posts)
+        with patch.object(finder, "_fetch_and_save") as mock:
             finder.analyze_subreddit("test", min_comments=5)
             mock.assert_not_called()
 
+    def test_consumes_listing_lazily(self, tmp_path):
+        """Threads are fetched while the listing is still streaming"""
+        events = []
+
+        def posts():
+            for i in range(10):
+                events.append(f"post{i}")
+                yield {"title": f"P{i}", "num_comments": 10, "permalink": f"url{i}"}
+
+        finder = _make_finder(tmp_path)
+        finder.workers = 1
+        finder.fetcher.iter_subreddit.return_value = posts()
+
+        def fetch(url):
+            events.append(f"fetch:{url}")
+            return None
+
+        with patch.object(finder, "_fetch_and_save", side_effect=fetch):
+            finder.analyze_subreddit("test")
+        assert events.index("fetch:url0") < events.index("post9")
+
+    def test_max_age_on_new_stops_sweep(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        finder.fetcher.iter_subreddit.return_value = iter([])
+        finder.analyze_subreddit("test", sort="new", max_age_hours=24)
+        predicate = finder.fetcher.iter_subreddit.call_args.kwargs["predicate"]
+        assert predicate({"created_utc": time.time()})
+        assert not predicate({"created_utc": time.time() - 48 * 3600})
+
+    def test_max_age_on_hot_filters(self, tmp_path):
+        now = time.time()
+        posts = [
+            {"title": "old", "num_comments": 10, "permalink": "old", "created_utc": now - 72 * 3600},
+            {"title": "new", "num_comments": 10, "permalink": "new", "created_utc": now},
+        ]
+        finder = _make_finder(tmp_path)
+        finder.fetcher.iter_subreddit.return_value = iter(posts)
+        with patch.object(finder, "_fetch_and_save", return_value=None) as mock_fetch:
+            finder.analyze_subreddit("test", max_age_hours=24)
+        assert finder.fetcher.iter_subreddit.call_args.kwargs["predicate"] is None
+        mock_fetch.assert_called_once_with("new")
+
 
 # ── batch_analyze_urls ────────────────────────────────────────────────────────
 
 
 class TestBatchAnalyze:
+    def _result_for(self, thread):
+        return {"thread": {"id": thread.id}, "analysis": _make_analysis(thread_id=thread.id),
+                "report_file": "r.md"}
+
     def test_processes_all_urls(self, tmp_path):
         finder = _make_finder(tmp_path)
-        mock_result = {"thread": {}, "analysis": _make_analysis(), "report_file": "r.md"}
 
-        with patch.object(finder, "analyze_single_thread", return_value=mock_result) as mock_analyze, \
+        with patch.object(finder, "_fetch_and_save", side_effect=lambda u: _make_thread(id=u)) as mock_fetch, \
+             patch.object(finder, "_analyze_and_report", side_effect=self._result_for) as mock_analyze, \
              patch.object(finder, "_generate_summary_report"):
             results = finder.batch_analyze_urls(["url1", "url2", "url3"])
+            assert mock_fetch.call_count == 3
             assert mock_analyze.call_count == 3
             assert len(results) == 3
 
+    def test_results_keep_input_order(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        finder.workers = 4
+        urls = [f"url{i}" for i in range(8)]
+
+        with patch.object(finder, "_fetch_and_save", side_effect=lambda u: _make_thread(id=u)), \
+             patch.object(finder, "_analyze_and_report", side_effect=self._result_for), \
+             patch.object(finder, "_generate_summary_report"):
+            results = finder.batch_analyze_urls(urls)
+        assert [r["thread"]["id"] for r in results] == urls
+
     def test_skips_failed_urls(self, tmp_path):
         finder = _make_finder(tmp_path)
-        # First succeeds, second fails
-        mock_result = {"thread": {}, "analysis": _make_analysis(), "report_file": "r.md"}
 
-        with patch.object(finder, "analyze_single_thread", side_effect=[mock_result, None, mock_result]), \
+        def fetch(url):
+            return None if url == "url2" else _make_thread(id=url)
+
+        with patch.object(finder, "_fetch_and_save", side_effect=fetch), \
+             patch.object(finder, "_analyze_and_report", side_effect=self._result_for), \
              patch.object(finder, "_generate_summary_report"):
             results = finder.batch_analyze_urls(["url1", "url2", "url3"])
             assert len(results) == 2  # Only 2 succeed
@@ -202,6 +263,13 @@ class TestBatchAnalyze:
         with patch.object(finder, "_generate_summary_report"):
             assert finder.batch_analyze_urls([]) == []
 
+    def test_analysis_error_propagates(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        with patch.object(finder, "_fetch_and_save", side_effect=lambda u: _make_thread(id=u)), \
+             patch.object(finder, "_analyze_and_report", side_effect=RuntimeError("api down")):
+            with pytest.raises(RuntimeError):
+                finder.batch_analyze_urls(["url1"])
+
 
 # ── _generate_summary_report ─────────────────────────────────────────────────
 
@@ -237,6 +305,28 @@ class TestGenerateSummaryReport:
         assert "HIGH" in content
         assert "Tech" in content
 
+    def test_reports_tokens_saved(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        results = [
+            {"thread": {}, "analysis": _make_analysis(cache_hit=True, tokens_used=1500), "report_file": "a.md"},
+            {"thread": {}, "analysis": _make_analysis(tokens_used=900), "report_file": "b.md"},
+        ]
+        finder._generate_summary_report("cached", results)
+        with open(os.path.join(str(tmp_path), "summary_cached.md"), encoding="utf-8") as f:
+            assert "**Cached Analyses**: 1 (1,500 tokens saved)" in f.read()
+
+    def test_reports_prompt_cache_ratio(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        results = [
+            {"thread": {}, "analysis": _make_analysis(tokens_used=2100, completion_tokens=100,
+                                                      cached_tokens=1024), "report_file": "a.md"},
+            {"thread": {}, "analysis": _make_analysis(tokens_used=2100, completion_tokens=100),
+             "report_file": "b.md"},
+        ]
+        finder._generate_summary_report("prompt", results)
+        with open(os.path.join(str(tmp_path), "summary_prompt.md"), encoding="utf-8") as f:
+            assert "**Prompt Cache**: 1,024 of 4,000 input tokens (26%)" in f.read()
+
     def test_pain_points_sorted_by_intent(self, tmp_path):
         finder = _make_finder(tmp_path)
         analysis = _make_analysis(
@@ -0,0 +1,220 @@
+"""
+Tests for http_cache.py and RedditFetcher's cached/conditional requests.
+
+Covers:
+- TTL rules per endpoint type (listing vs young/old thread)
+- Fresh hits, stale entries, 304 revalidation
+- Size-based LRU eviction
+- Hit/miss counters (also under concurrent use) and persistence across instances
+- RedditFetcher integration: no network on fresh hit, conditional headers on stale
+"""
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import config as cfg
+from http_cache import ResponseCache
+from reddit_fetcher import RedditFetcher
+
+THREAD_URL = "https://old.reddit.com/r/test/comments/t1.json"
+LISTING_URL = "https://old.reddit.com/r/test/hot.json?limit=10"
+
+
+class FakeClock:
+    def __init__(self, now=1_800_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    c = ResponseCache(str(tmp_path / "cache.sqlite"), clock=clock)
+    yield c
+    c.close()
+
+
+class TestTtlRules:
+    def test_listing_is_short(self, cache):
+        assert cache.ttl_for(LISTING_URL) == cfg.HTTP_CACHE_LISTING_TTL
+
+    def test_young_thread(self, cache, clock):
+        assert cache.ttl_for(THREAD_URL, clock.now - 3600) == cfg.HTTP_CACHE_THREAD_TTL
+
+    def test_old_thread_is_long(self, cache, clock):
+        old = clock.now - cfg.HTTP_CACHE_OLD_THREAD_AGE - 1
+        assert cache.ttl_for(THREAD_URL, old) == cfg.HTTP_CACHE_OLD_THREAD_TTL
+        assert cfg.HTTP_CACHE_OLD_THREAD_TTL > cfg.HTTP_CACHE_THREAD_TTL > cfg.HTTP_CACHE_LISTING_TTL
+
+    def test_unknown_age_uses_thread_ttl(self, cache):
+        assert cache.ttl_for(THREAD_URL) == cfg.HTTP_CACHE_THREAD_TTL
+
+
+class TestGetPut:
+    def test_miss_returns_none(self, cache):
+        assert cache.get(THREAD_URL) is None
+
+    def test_fresh_hit(self, cache):
+        cache.put(THREAD_URL, b"[1]", {"ETag": '"abc"'})
+        entry = cache.get(THREAD_URL)
+        assert entry.fresh
+        assert entry.body == b"[1]"
+        assert entry.etag == '"abc"'
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_stale_after_ttl(self, cache, clock):
+        cache.put(LISTING_URL, b"{}", {"ETag": '"e1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        clock.now += cfg.HTTP_CACHE_LISTING_TTL + 1
+        entry = cache.get(LISTING_URL)
+        assert not entry.fresh
+        assert entry.validators() == {
+            "If-None-Match": '"e1"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+        }
+
+    def test_mark_revalidated_refreshes(self, cache, clock):
+        cache.put(LISTING_URL, b"{}")
+        clock.now += cfg.HTTP_CACHE_LISTING_TTL + 1
+        cache.mark_revalidated(LISTING_URL)
+        assert cache.get(LISTING_URL).fresh
+        assert cache.stats()["revalidated"] == 1
+
+    def test_persists_across_instances(self, tmp_path, clock):
+        path = str(tmp_path / "p.sqlite")
+        first = ResponseCache(path, clock=clock)
+        first.put(THREAD_URL, b"[42]")
+        first.close()
+        second = ResponseCache(path, clock=clock)
+        assert second.get(THREAD_URL).body == b"[42]"
+        assert second.stats()["bytes"] == 4
+        second.close()
+
+    def test_counters_under_concurrent_use(self, cache):
+        cache.put(LISTING_URL, b"{}")
+
+        def work(i):
+            cache.get(LISTING_URL)
+            cache.put(THREAD_URL, b"[]")
+            cache.mark_revalidated(THREAD_URL)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(400)))
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["revalidated"]) == (400, 401, 400)
+
+    def test_closed_with_finder(self, tmp_path):
+        with patch("goldmine_finder.RedditFetcher"), patch("goldmine_finder.AIAnalyzer"):
+            from goldmine_finder import GoldmineFinder
+            finder = GoldmineFinder(output_dir=str(tmp_path), http_cache_path=str(tmp_path / "h.sqlite"))
+        finder.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            finder.http_cache.stats()
+
+
+class TestEviction:
+    def test_lru_eviction_by_size(self, tmp_path, clock):
+        cache = ResponseCache(str(tmp_path / "e.sqlite"), max_bytes=25, clock=clock)
+        for i in range(3):
+            clock.now += 1
+            cache.put(f"https://old.reddit.com/r/x/comments/{i}.json", b"x" * 10)
+        # 30 bytes > 25: the oldest entry (0) is evicted
+        assert cache.get("https://old.reddit.com/r/x/comments/0.json") is None
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["bytes"] == 20
+
+    def test_recent_access_protects_entry(self, tmp_path, clock):
+        cache = ResponseCache(str(tmp_path / "e.sqlite"), max_bytes=25, clock=clock)
+        urls = [f"https://old.reddit.com/r/x/comments/{i}.json" for i in range(3)]
+        clock.now += 1
+        cache.put(urls[0], b"x" * 10)
+        clock.now += 1
+        cache.put(urls[1], b"x" * 10)
+        clock.now += 1
+        cache.get(urls[0])  # touch 0, so 1 becomes least recently used
+        clock.now += 1
+        cache.put(urls[2], b"x" * 10)
+        assert cache.get(urls[0]) is not None
+        assert cache.get(urls[1]) is None
+
+    def test_replacing_entry_updates_size(self, cache):
+        cache.put(THREAD_URL, b"x" * 10)
+        cache.put(THREAD_URL, b"x" * 4)
+        assert cache.stats()["bytes"] == 4
+
+
+def _response(payload, status=200, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.content = json.dumps(payload).encode()
+    resp.raise_for_status.return_value = None
+    return resp
+
+
+class TestFetcherIntegration:
+    def _thread_json(self, title="Cached"):
+        return [
+            {"data": {"children": [{"data": {"id": "t1", "title": title, "created_utc": 1000.0}}]}},
+            {"data": {"children": []}},
+        ]
+
+    def test_fresh_hit_skips_network(self, cache):
+        fetcher = RedditFetcher(cache=cache)
+        with patch.object(fetcher.session, "get", return_value=_response(self._thread_json())) as get:
+            fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/")
+            thread = fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/")
+        assert get.call_count == 1
+        assert thread.title == "Cached"
+        assert cache.stats()["hits"] == 1
+
+    def test_stale_entry_sends_conditional_request(self, cache, clock):
+        fetcher = RedditFetcher(cache=cache)
+        first = _response(self._thread_json(), headers={"ETag": '"v1"'})
+        not_modified = _response(None, status=304)
+        with patch.object(fetcher.session, "get", side_effect=[first, not_modified]) as get:
+            fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/")
+            clock.now += cfg.HTTP_CACHE_OLD_THREAD_TTL + 1
+            thread = fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/")
+        assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert thread.title == "Cached"
+        assert cache.stats()["revalidated"] == 1
+
+    def test_changed_thread_is_redownloaded(self, cache, clock):
+        fetcher = RedditFetcher(cache=cache)
+        first = _response(self._thread_json("Old"), headers={"ETag": '"v1"'})
+        changed = _response(self._thread_json("New"), headers={"ETag": '"v2"'})
+        with patch.object(fetcher.session, "get", side_effect=[first, changed]):
+            fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/")
+            clock.now += cfg.HTTP_CACHE_OLD_THREAD_TTL + 1
+            thread = fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/")
+        assert thread.title == "New"
+        assert cache.get("https://old.reddit.com/r/test/comments/t1.json").etag == '"v2"'
+
+    def test_listings_cached(self, cache, mock_listing_response):
+        fetcher = RedditFetcher(cache=cache)
+        with patch.object(fetcher.session, "get", return_value=_response(mock_listing_response)) as get:
+            fetcher.fetch_subreddit_hot("test", limit=10)
+            posts = fetcher.fetch_subreddit_hot("test", limit=10)
+        assert get.call_count == 1
+        assert len(posts) == 3
+
+    def test_http_error_not_cached(self, cache):
+        import requests
+        fetcher = RedditFetcher(cache=cache)
+        bad = _response(None, status=500)
+        bad.raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+        with patch.object(fetcher.session, "get", return_value=bad):
+            assert fetcher.fetch_thread("https://www.reddit.com/r/test/comments/t1/") is None
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,71 @@
+"""
+Tests for json_codec.py.
+
+Covers:
+- Backend selection (auto, explicit, unknown, not installed)
+- Every installed backend decodes bytes and str identically
+- Invalid JSON raises json.JSONDecodeError for every backend
+- Fetchers decode response bytes through the codec
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import json_codec
+from json_codec import available_backends, get_decoder
+
+PAYLOAD = [{"data": {"children": [{"kind": "t1", "data": {"body": "日本語 ok", "score": -3, "x": None}}]}}]
+
+
+@pytest.fixture(autouse=True)
+def _clear_decoder_cache():
+    get_decoder.cache_clear()
+    yield
+    get_decoder.cache_clear()
+
+
+class TestSelection:
+    def test_stdlib_always_available(self):
+        assert available_backends()[-1] == "json"
+
+    def test_auto_picks_fastest_installed(self):
+        assert get_decoder("auto") is json_codec._LOADERS[available_backends()[0]]
+
+    def test_config_default(self, monkeypatch):
+        monkeypatch.setattr(json_codec.cfg, "JSON_DECODER", "json")
+        assert get_decoder() is json_codec._json_loads
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_decoder("yaml")
+
+    def test_missing_backend_falls_back(self):
+        with patch.object(json_codec, "orjson", None), patch.object(json_codec, "msgspec", None):
+            assert get_decoder("orjson") is json_codec._json_loads
+
+
+@pytest.mark.parametrize("backend", available_backends())
+class TestBackends:
+    def test_bytes_and_str(self, backend):
+        loads = get_decoder(backend)
+        raw = json.dumps(PAYLOAD, ensure_ascii=False)
+        assert loads(raw.encode("utf-8")) == PAYLOAD
+        assert loads(raw) == PAYLOAD
+
+    def test_invalid_json(self, backend):
+        with pytest.raises(json.JSONDecodeError):
+            get_decoder(backend)(b"<html>rate limited</html>")
+
+
+class TestFetcherIntegration:
+    def test_sync_fetcher_decodes_content(self):
+        from reddit_fetcher import RedditFetcher
+
+        fetcher = RedditFetcher()
+        response = MagicMock(status_code=200, headers={}, content=json.dumps({"ok": 1}).encode())
+        with patch.object(fetcher.session, "get", return_value=response), \
+             patch.object(json_codec, "loads", wraps=json_codec.loads) as loads:
+            assert fetcher._get_json("https://example.com/x.json") == {"ok": 1}
+        loads.assert_called_once_with(response.content)
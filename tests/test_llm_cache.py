@@ -0,0 +1,178 @@
+"""
+Tests for llm_cache.py and AIAnalyzer's cached _analyze_with_ai.
+
+Covers:
+- make_key stability and sensitivity to every input
+- get/put round trip, TTL expiry, LRU entry limit
+- Hit/miss/tokens-saved counters, also under concurrent use
+- AIAnalyzer: cache hit skips the API, refresh bypasses reads, failures not cached
+"""
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai_analyzer import AIAnalyzer, PROMPT_VERSION
+from llm_cache import AnalysisCache, make_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    c = AnalysisCache(str(tmp_path / "llm.sqlite"), ttl=100, max_entries=3, clock=clock)
+    yield c
+    c.close()
+
+
+class TestMakeKey:
+    BASE = dict(model="m", temperature=0.3, prompt_version="1",
+                title="t", body="b", comments=["c1", "c2"])
+
+    def test_stable(self):
+        assert make_key(**self.BASE) == make_key(**self.BASE)
+
+    @pytest.mark.parametrize("field,value", [
+        ("model", "other"), ("temperature", 0.7), ("prompt_version", "2"),
+        ("title", "T"), ("body", "B"), ("comments", ["c2", "c1"]),
+    ])
+    def test_sensitive_to_each_input(self, field, value):
+        changed = dict(self.BASE, **{field: value})
+        assert make_key(**changed) != make_key(**self.BASE)
+
+
+class TestAnalysisCache:
+    def test_miss(self, cache):
+        assert cache.get("nope") is None
+        assert cache.misses == 1
+
+    def test_round_trip(self, cache):
+        cache.put("k", '{"a": 1}', 1234)
+        assert cache.get("k") == ('{"a": 1}', 1234)
+        assert cache.hits == 1
+        assert cache.tokens_saved == 1234
+
+    def test_counters_under_concurrent_use(self, cache):
+        cache.put("k", "{}", 10)
+
+        def work(i):
+            cache.get("k")
+            cache.get("nope")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(400)))
+
+        assert (cache.hits, cache.misses, cache.tokens_saved) == (400, 400, 4000)
+
+    def test_closed_with_finder(self, tmp_path):
+        with patch("goldmine_finder.RedditFetcher"), patch("goldmine_finder.AIAnalyzer"):
+            from goldmine_finder import GoldmineFinder
+            finder = GoldmineFinder(output_dir=str(tmp_path), llm_cache_path=str(tmp_path / "llm.sqlite"))
+        finder.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            finder.llm_cache.entries()
+
+    def test_ttl_expiry(self, cache, clock):
+        cache.put("k", "{}", 10)
+        clock.now += 101
+        assert cache.get("k") is None
+
+    def test_lru_limit(self, cache, clock):
+        for key in ("a", "b", "c"):
+            clock.now += 1
+            cache.put(key, "{}", 1)
+        clock.now += 1
+        cache.get("a")  # b is now least recently used
+        clock.now += 1
+        cache.put("d", "{}", 1)
+        assert cache.entries() == 3
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+
+def _analyzer(cache, response_dict, refresh=False, tokens=500):
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.model = "gpt-4.1-mini"
+    analyzer.cache = cache
+    analyzer.refresh = refresh
+    completion = MagicMock()
+    completion.choices = [MagicMock()]
+    completion.choices[0].message.content = (
+        json.dumps(response_dict) if isinstance(response_dict, dict) else response_dict
+    )
+    completion.usage.total_tokens = tokens
+    analyzer.client = MagicMock()
+    analyzer.client.chat.completions.create.return_value = completion
+    return analyzer
+
+
+class TestAnalyzerIntegration:
+    ARGS = dict(thread_title="Title", thread_body="Body", comments=["a comment", "another one"])
+
+    def test_second_call_served_from_cache(self, cache, mock_ai_response):
+        analyzer = _analyzer(cache, mock_ai_response)
+        first = analyzer._analyze_with_ai(**self.ARGS)
+        second = analyzer._analyze_with_ai(**self.ARGS)
+
+        assert analyzer.client.chat.completions.create.call_count == 1
+        assert not first.get("cache_hit")
+        assert second["cache_hit"]
+        assert second["tokens_used"] == 500
+        assert [p.description for p in second["pain_points"]] == \
+               [p.description for p in first["pain_points"]]
+
+    def test_changed_comments_miss(self, cache, mock_ai_response):
+        analyzer = _analyzer(cache, mock_ai_response)
+        analyzer._analyze_with_ai(**self.ARGS)
+        analyzer._analyze_with_ai(**dict(self.ARGS, comments=["something new"]))
+        assert analyzer.client.chat.completions.create.call_count == 2
+
+    def test_refresh_bypasses_read_but_writes(self, cache, mock_ai_response):
+        _analyzer(cache, mock_ai_response)._analyze_with_ai(**self.ARGS)
+        refreshing = _analyzer(cache, mock_ai_response, refresh=True, tokens=700)
+        result = refreshing._analyze_with_ai(**self.ARGS)
+        assert refreshing.client.chat.completions.create.call_count == 1
+        assert not result.get("cache_hit")
+        assert _analyzer(cache, mock_ai_response)._analyze_with_ai(**self.ARGS)["tokens_used"] == 700
+
+    def test_invalid_json_not_cached(self, cache):
+        analyzer = _analyzer(cache, "not json")
+        analyzer._analyze_with_ai(**self.ARGS)
+        assert cache.entries() == 0
+
+    def test_unusable_entry_is_a_miss(self, cache, mock_ai_response):
+        analyzer = _analyzer(cache, mock_ai_response)
+        key = analyzer._build_request(**self.ARGS).cache_key
+        cache.put(key, "not json at all", 10)
+
+        result = analyzer._analyze_with_ai(**self.ARGS)
+
+        assert not result.get("cache_hit")
+        assert analyzer.client.chat.completions.create.call_count == 1
+        assert (cache.hits, cache.misses, cache.tokens_saved) == (0, 1, 0)
+        # Replaced by the fresh answer
+        assert _analyzer(cache, mock_ai_response)._analyze_with_ai(**self.ARGS)["cache_hit"]
+
+    def test_analyze_thread_reports_hit(self, cache, mock_ai_response, minimal_thread_dict):
+        analyzer = _analyzer(cache, mock_ai_response)
+        analyzer.analyze_thread(minimal_thread_dict)
+        result = analyzer.analyze_thread(minimal_thread_dict)
+        assert result.cache_hit
+        assert result.tokens_used == 500
+
+    def test_prompt_version_is_string(self):
+        assert isinstance(PROMPT_VERSION, str)
@@ -0,0 +1,185 @@
+"""
+Tests for map-reduce analysis in ai_analyzer.py.
+
+Covers:
+- Chunking by token budget and comment count
+- Concurrent map over chunks with a mocked OpenAI API
+- merge_analyses / merge_pain_points reduce rules
+- Chunk limit (MAP_REDUCE_MAX_CHUNKS)
+"""
+
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+from ai_analyzer import AIAnalyzer, PainPoint, merge_analyses, merge_pain_points
+
+
+def _make_analyzer(responses):
+    """AIAnalyzer with map-reduce on and a client returning *responses* in order"""
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.model = "gpt-4.1-mini"
+    analyzer.map_reduce = True
+    lock = threading.Lock()
+    queue = list(responses)
+
+    def create(**kwargs):
+        with lock:
+            payload = queue.pop(0) if queue else responses[-1]
+        completion = MagicMock()
+        completion.choices = [MagicMock()]
+        completion.choices[0].message.content = json.dumps(payload)
+        completion.usage.total_tokens = 100
+        return completion
+
+    analyzer.client = MagicMock()
+    analyzer.client.chat.completions.create.side_effect = create
+    return analyzer
+
+
+def _pp(description, category="Pricing", severity="medium", freq=1,
+        examples=None, intent="low"):
+    return PainPoint(description=description, severity=severity, frequency_mentioned=freq,
+                     example_comments=examples or [], purchase_intent=intent, category=category)
+
+
+def _analysis(pain_points=(), insights=(), opportunities=(), sentiment="", tokens=0, hit=False):
+    return {
+        'pain_points': list(pain_points),
+        'key_insights': list(insights),
+        'market_opportunities': list(opportunities),
+        'sentiment_summary': sentiment,
+        'tokens_used': tokens,
+        'cache_hit': hit,
+    }
+
+
+class TestChunking:
+    def test_respects_token_budget(self):
+        analyzer = _make_analyzer([{}])
+        with patch("config.PROMPT_TOKEN_BUDGET", 120):
+            chunks = analyzer._chunk_comments(["x" * 200] * 5)  # 50 tokens + overhead each
+        assert [len(c) for c in chunks] == [2, 2, 1]
+
+    def test_short_comments_share_chunk(self):
+        analyzer = _make_analyzer([{}])
+        chunks = analyzer._chunk_comments([f"comment {i}" for i in range(200)])
+        assert len(chunks) == 1
+
+    def test_oversized_comment_gets_own_chunk(self):
+        analyzer = _make_analyzer([{}])
+        with patch("config.PROMPT_TOKEN_BUDGET", 100), patch("config.MAX_COMMENT_TOKENS", 1000):
+            chunks = analyzer._chunk_comments(["y" * 1000, "short"])
+        assert chunks == [["y" * 1000], ["short"]]
+
+    def test_chunks_keep_every_comment(self):
+        analyzer = _make_analyzer([{}])
+        comments = [f"comment {i} " * (i % 7 + 1) for i in range(50)]
+        with patch("config.PROMPT_TOKEN_BUDGET", 60):
+            chunks = analyzer._chunk_comments(comments)
+        assert [c for chunk in chunks for c in chunk] == comments
+
+
+class TestMergePainPoints:
+    def test_similar_descriptions_merge(self):
+        merged = merge_pain_points([
+            _pp("Subscription pricing is too expensive", freq=2, severity="medium",
+                examples=["a"], intent="low"),
+            _pp("The subscription pricing is too expensive for us", freq=3, severity="high",
+                examples=["a", "b"], intent="high"),
+        ])
+        assert len(merged) == 1
+        assert merged[0].frequency_mentioned == 5
+        assert merged[0].severity == "high"
+        assert merged[0].purchase_intent == "high"
+        assert merged[0].example_comments == ["a", "b"]
+
+    def test_different_category_kept_apart(self):
+        merged = merge_pain_points([
+            _pp("Slow onboarding process", category="UX"),
+            _pp("Slow onboarding process", category="Support"),
+        ])
+        assert len(merged) == 2
+
+    def test_unrelated_descriptions_kept_apart(self):
+        merged = merge_pain_points([
+            _pp("Invoices are hard to export"),
+            _pp("No mobile app available"),
+        ])
+        assert len(merged) == 2
+
+    def test_inputs_not_mutated(self):
+        first = _pp("Pricing too high", freq=1, examples=["a"])
+        merge_pain_points([first, _pp("Pricing too high", freq=4, examples=["b"])])
+        assert first.frequency_mentioned == 1
+        assert first.example_comments == ["a"]
+
+
+class TestMergeAnalyses:
+    def test_combines_fields(self):
+        merged = merge_analyses([
+            _analysis(insights=["Users want exports"], opportunities=["CSV tool"],
+                      sentiment="", tokens=100, hit=True),
+            _analysis(insights=["users want exports", "Price sensitive"],
+                      opportunities=["CSV tool"], sentiment="Frustrated", tokens=50),
+        ])
+        assert merged['key_insights'] == ["Users want exports", "Price sensitive"]
+        assert merged['market_opportunities'] == ["CSV tool"]
+        assert merged['sentiment_summary'] == "Frustrated"
+        assert merged['tokens_used'] == 150
+        assert merged['cache_hit'] is False
+
+    def test_all_cached(self):
+        merged = merge_analyses([_analysis(hit=True), _analysis(hit=True)])
+        assert merged['cache_hit'] is True
+
+
+class TestMapReduceAnalyzeThread:
+    def _thread(self, n):
+        return {
+            'id': 'big', 'title': 'Big thread', 'selftext': '',
+            'url': 'https://reddit.com/r/test/comments/big/',
+            'comments': [{'body': f'alpha{i} beta{i} gamma{i} delta{i} eps{i}', 'replies': []}
+                         for i in range(n)],
+        }
+
+    def test_all_comments_analyzed_in_chunks(self):
+        response = {
+            'pain_points': [{'description': 'Pricing too high', 'severity': 'high',
+                             'frequency_mentioned': 2, 'example_comments': [],
+                             'purchase_intent': 'medium', 'category': 'Pricing'}],
+            'key_insights': ['Price matters'],
+            'market_opportunities': [],
+            'sentiment_summary': 'Negative',
+        }
+        analyzer = _make_analyzer([response])
+        with patch("config.PROMPT_TOKEN_BUDGET", 150), patch("config.CHUNK_CONCURRENCY", 3):
+            result = analyzer.analyze_thread(self._thread(35))
+
+        assert analyzer.client.chat.completions.create.call_count == 4
+        assert result.analyzed_comments == 35
+        assert len(result.pain_points) == 1
+        assert result.pain_points[0].frequency_mentioned == 8
+        assert result.tokens_used == 400
+
+    def test_chunk_limit(self):
+        analyzer = _make_analyzer([{}])
+        with patch("config.PROMPT_TOKEN_BUDGET", 150), patch("config.MAP_REDUCE_MAX_CHUNKS", 2):
+            result = analyzer.analyze_thread(self._thread(35))
+
+        assert analyzer.client.chat.completions.create.call_count == 2
+        assert result.analyzed_comments == 20
+
+    def test_small_thread_single_call(self):
+        analyzer = _make_analyzer([{}])
+        result = analyzer.analyze_thread(self._thread(3))
+        assert analyzer.client.chat.completions.create.call_count == 1
+        assert result.analyzed_comments == 3
+
+    def test_disabled_uses_cap(self):
+        analyzer = _make_analyzer([{}])
+        analyzer.map_reduce = False
+        with patch("config.MAX_COMMENTS", 5):
+            result = analyzer.analyze_thread(self._thread(35))
+        assert analyzer.client.chat.completions.create.call_count == 1
+        assert result.analyzed_comments == 5
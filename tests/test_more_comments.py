@@ -0,0 +1,138 @@
+"""
+Tests for 'more' stub expansion via /api/morechildren.
+
+Uses recorded responses in tests/fixtures/:
+- thread_with_more.json: thread payload with nested and top-level 'more' stubs
+- morechildren_page1.json: first batch, including a further 'more' stub
+- morechildren_page2.json: the follow-up batch
+
+Covers:
+- Collecting stub ids (ignoring "continue this thread" stubs)
+- Grafting under the right parent at the right depth
+- Follow-up rounds, request cap, batching at 100 ids
+- Failed batches do not fail the thread
+- Opt-in only (off by default), sync and async fetchers
+"""
+
+import asyncio
+import json
+import os
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+import requests
+
+from async_fetcher import AsyncRedditFetcher
+from reddit_fetcher import RedditFetcher, iter_comments
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _route(url):
+    """Fixture payload for a request URL"""
+    if "/api/morechildren" not in url:
+        return _load("thread_with_more.json")
+    children = parse_qs(urlparse(url).query)["children"][0].split(",")
+    if children == ["c7"]:
+        return _load("morechildren_page2.json")
+    return _load("morechildren_page1.json")
+
+
+def _mock_response(payload):
+    response = MagicMock()
+    response.status_code = 200
+    response.content = json.dumps(payload).encode()
+    response.headers = {}
+    return response
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = RedditFetcher(expand_more=True)
+    fetcher.session.get = MagicMock(side_effect=lambda url, **kw: _mock_response(_route(url)))
+    return fetcher
+
+
+def _ids(thread):
+    return [c.id for c in iter_comments(thread.comments)]
+
+
+class TestMoreIds:
+    def test_collects_nested_and_top_level(self):
+        ids = RedditFetcher()._more_ids(_load("thread_with_more.json"))
+        assert ids == ["c5", "c3", "c6"]
+
+    def test_malformed_payload(self):
+        assert RedditFetcher()._more_ids([]) == []
+
+
+class TestExpandMore:
+    def test_grafts_all_comments(self, fetcher):
+        thread = fetcher.fetch_thread("https://www.reddit.com/r/smallbusiness/comments/abc123/")
+        assert sorted(_ids(thread)) == ["c1", "c2", "c3", "c4", "c5", "c6", "c7"]
+        # One thread request + two morechildren rounds
+        assert fetcher.session.get.call_count == 3
+
+    def test_depth_and_placement(self, fetcher):
+        thread = fetcher.fetch_thread("https://www.reddit.com/r/smallbusiness/comments/abc123/")
+        by_id = {c.id: c for c in iter_comments(thread.comments)}
+        assert [c.id for c in thread.comments] == ["c1", "c3", "c6"]
+        assert by_id["c2"].replies[0].id == "c5"
+        assert by_id["c5"].depth == 2
+        assert by_id["c3"].replies[0].id == "c4"
+        assert by_id["c4"].depth == 1
+        assert by_id["c7"].depth == 1
+
+    def test_request_cap(self, fetcher):
+        with patch("config.MORECHILDREN_MAX_REQUESTS", 1):
+            thread = fetcher.fetch_thread("https://www.reddit.com/r/smallbusiness/comments/abc123/")
+        assert "c7" not in _ids(thread)
+        assert fetcher.session.get.call_count == 2
+
+    def test_batches_of_100(self, fetcher):
+        thread = fetcher._parse_thread(_load("thread_with_more.json"))
+        ids = [f"x{i}" for i in range(250)]
+        fetcher.session.get = MagicMock(return_value=_mock_response({"json": {"data": {"things": []}}}))
+        fetcher.expand_more_comments(thread, ids)
+        sizes = sorted(
+            len(parse_qs(urlparse(call.args[0]).query)["children"][0].split(","))
+            for call in fetcher.session.get.call_args_list
+        )
+        assert sizes == [50, 100, 100]
+
+    def test_failed_batch_keeps_thread(self, fetcher):
+        def get(url, **kw):
+            if "/api/morechildren" in url:
+                raise requests.exceptions.ConnectionError("down")
+            return _mock_response(_route(url))
+
+        fetcher.session.get = MagicMock(side_effect=get)
+        thread = fetcher.fetch_thread("https://www.reddit.com/r/smallbusiness/comments/abc123/")
+        assert _ids(thread) == ["c1", "c2"]
+
+    def test_off_by_default(self):
+        fetcher = RedditFetcher()
+        fetcher.session.get = MagicMock(side_effect=lambda url, **kw: _mock_response(_route(url)))
+        thread = fetcher.fetch_thread("https://www.reddit.com/r/smallbusiness/comments/abc123/")
+        assert _ids(thread) == ["c1", "c2"]
+        assert fetcher.session.get.call_count == 1
+
+
+class TestAsyncExpandMore:
+    def test_grafts_all_comments(self):
+        def handler(request):
+            return httpx.Response(200, json=_route(str(request.url)))
+
+        async def main():
+            async with AsyncRedditFetcher(transport=httpx.MockTransport(handler), expand_more=True) as f:
+                return await f.fetch_thread("https://www.reddit.com/r/smallbusiness/comments/abc123/")
+
+        thread = asyncio.run(main())
+        assert sorted(_ids(thread)) == ["c1", "c2", "c3", "c4", "c5", "c6", "c7"]
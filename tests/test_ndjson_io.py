@@ -0,0 +1,190 @@
+"""
+Tests for ndjson_io.py and compact JSON output.
+
+Covers:
+- thread_to_dict / thread_from_dict round trip (nested comments)
+- NdjsonWriter + iter_threads / iter_analyses, plain and gzip
+- Appending across writer sessions, malformed trailing line skipped
+- archive_path suffixes, zstd without zstandard
+- save_to_json / save_analysis compact mode
+- GoldmineFinder ndjson output, result_store import of archives
+- --output-format / --compact-json CLI wiring
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import ndjson_io
+from ai_analyzer import AIAnalyzer, AnalysisResult, PainPoint
+from ndjson_io import (ANALYSES_FILE, THREADS_FILE, NdjsonWriter, archive_path, iter_analyses,
+                       iter_records, iter_threads)
+from reddit_fetcher import Comment, RedditFetcher, Thread, thread_from_dict, thread_to_dict
+
+
+def _thread(id="t1"):
+    reply = Comment(id="c2", author="b", body="reply", score=1, created_utc=2.0,
+                    parent_id="t1_c1", gilded=0, depth=1)
+    top = Comment(id="c1", author="a", body="top 日本語", score=5, created_utc=1.0,
+                  parent_id=f"t3_{id}", gilded=1, depth=0, replies=[reply])
+    return Thread(id=id, title=f"Post {id}", author="op", selftext="body", score=10,
+                  num_comments=2, created_utc=100.0, url=f"https://reddit.com/{id}",
+                  subreddit="SaaS", upvote_ratio=0.9, comments=[top])
+
+
+def _result(thread_id="t1"):
+    pp = PainPoint(description="billing", severity="high", frequency_mentioned=2,
+                   example_comments=["ex"], purchase_intent="high", category="Finance")
+    return AnalysisResult(thread_id=thread_id, thread_title="Post", total_comments=2,
+                          pain_points=[pp], key_insights=["k"], market_opportunities=["m"],
+                          sentiment_summary="ok")
+
+
+class TestThreadDicts:
+    def test_round_trip(self):
+        thread = _thread()
+        assert thread_from_dict(thread_to_dict(thread)) == thread
+
+    def test_json_round_trip(self):
+        thread = _thread()
+        assert thread_from_dict(json.loads(json.dumps(thread_to_dict(thread)))) == thread
+
+
+class TestArchives:
+    @pytest.mark.parametrize("compression", ["none", "gzip"])
+    def test_threads_round_trip(self, tmp_path, compression):
+        path = archive_path(str(tmp_path), THREADS_FILE, compression)
+        with NdjsonWriter(path) as writer:
+            writer.write_thread(_thread("t1"))
+            writer.write_thread(_thread("t2"))
+        assert [t.id for t in iter_threads(path)] == ["t1", "t2"]
+        assert next(iter_threads(path)) == _thread("t1")
+
+    def test_analyses_round_trip(self, tmp_path):
+        path = archive_path(str(tmp_path), ANALYSES_FILE, "gzip")
+        with NdjsonWriter(path) as writer:
+            writer.write_analysis(_result())
+        assert list(iter_analyses(path)) == [_result()]
+
+    @pytest.mark.parametrize("compression", ["none", "gzip"])
+    def test_append_across_sessions(self, tmp_path, compression):
+        path = archive_path(str(tmp_path), THREADS_FILE, compression)
+        for i in range(3):
+            with NdjsonWriter(path) as writer:
+                writer.write({"id": i})
+        assert [r["id"] for r in iter_records(path)] == [0, 1, 2]
+
+    def test_one_line_per_record(self, tmp_path):
+        path = str(tmp_path / "x.ndjson")
+        with NdjsonWriter(path) as writer:
+            writer.write_thread(_thread())
+        lines = open(path, encoding="utf-8").read().splitlines()
+        assert len(lines) == 1
+        assert "日本語" in lines[0]
+
+    def test_malformed_line_skipped(self, tmp_path):
+        path = tmp_path / "x.ndjson"
+        path.write_text('{"id": 1}\n\n{"id": 2}\n{"id": 3, "tru', encoding="utf-8")
+        assert [r["id"] for r in iter_records(str(path))] == [1, 2]
+
+    def test_concurrent_writes(self, tmp_path):
+        path = str(tmp_path / "x.ndjson")
+        writer = NdjsonWriter(path)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: writer.write({"id": i, "pad": "x" * 1000}), range(200)))
+        writer.close()
+        assert writer.count == 200
+        assert sorted(r["id"] for r in iter_records(path)) == list(range(200))
+
+    def test_archive_path(self, tmp_path):
+        assert archive_path("out", THREADS_FILE, "none").endswith("threads.ndjson")
+        assert archive_path("out", THREADS_FILE, "gzip").endswith("threads.ndjson.gz")
+        assert archive_path("out", ANALYSES_FILE, "zstd").endswith("analyses.ndjson.zst")
+        with pytest.raises(ValueError):
+            archive_path("out", THREADS_FILE, "bz2")
+
+    def test_zstd_requires_zstandard(self, tmp_path):
+        with patch.object(ndjson_io, "zstandard", None):
+            with pytest.raises(RuntimeError, match="zstandard"):
+                NdjsonWriter(str(tmp_path / "x.ndjson.zst")).write({"id": 1})
+
+
+class TestCompactJson:
+    def test_save_to_json_compact(self, tmp_path):
+        fp = tmp_path / "thread.json"
+        RedditFetcher.__new__(RedditFetcher).save_to_json(_thread(), str(fp), indent=0)
+        text = fp.read_text(encoding="utf-8")
+        assert "\n" not in text and ": " not in text
+        assert thread_from_dict(json.loads(text)) == _thread()
+
+    def test_save_analysis_compact(self, tmp_path):
+        fp = tmp_path / "analysis.json"
+        AIAnalyzer.__new__(AIAnalyzer).save_analysis(_result(), str(fp), indent=0)
+        assert "\n" not in fp.read_text(encoding="utf-8")
+
+    def test_default_indented(self, tmp_path):
+        fp = tmp_path / "analysis.json"
+        AIAnalyzer.__new__(AIAnalyzer).save_analysis(_result(), str(fp))
+        assert "\n  " in fp.read_text(encoding="utf-8")
+
+
+def _finder(tmp_path, **kwargs):
+    with patch("goldmine_finder.RedditFetcher"), \
+         patch("goldmine_finder.AIAnalyzer"):
+        from goldmine_finder import GoldmineFinder
+        return GoldmineFinder(output_dir=str(tmp_path), **kwargs)
+
+
+class TestGoldmineFinderNdjson:
+    def test_writes_archives_instead_of_files(self, tmp_path):
+        finder = _finder(tmp_path, output_format="ndjson")
+        finder.fetcher.fetch_thread.return_value = _thread()
+        finder.analyzer.generate_report.return_value = "# report"
+
+        thread = finder._fetch_and_save("https://reddit.com/t1")
+        finder._save_outputs(thread, thread_to_dict(thread), _result())
+        finder.close()
+
+        finder.fetcher.save_to_json.assert_not_called()
+        finder.analyzer.save_analysis.assert_not_called()
+        assert [t.id for t in iter_threads(finder.thread_archive.path)] == ["t1"]
+        assert [a.thread_id for a in iter_analyses(finder.analysis_archive.path)] == ["t1"]
+        assert (tmp_path / "report_t1.md").exists()
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            _finder(tmp_path, output_format="xml")
+
+    def test_result_store_imports_archives(self, tmp_path):
+        from result_store import ResultStore
+
+        with NdjsonWriter(archive_path(str(tmp_path), THREADS_FILE, "gzip")) as writer:
+            writer.write_thread(_thread())
+        with NdjsonWriter(archive_path(str(tmp_path), ANALYSES_FILE, "none")) as writer:
+            writer.write_analysis(_result())
+
+        store = ResultStore(str(tmp_path / "db.sqlite"))
+        assert store.import_directory(str(tmp_path)) == {"threads": 1, "analyses": 1, "skipped": 0}
+        assert store.stats()["comments"] == 2
+        store.close()
+
+
+class TestCli:
+    def _run(self, *args):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", *args]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+        return MockFinder.call_args.kwargs
+
+    def test_defaults(self):
+        kwargs = self._run()
+        assert kwargs["output_format"] == "json"
+        assert kwargs["json_indent"] is None
+
+    def test_flags(self):
+        kwargs = self._run("--output-format", "ndjson", "--compact-json")
+        assert kwargs["output_format"] == "ndjson"
+        assert kwargs["json_indent"] == 0
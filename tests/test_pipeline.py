@@ -0,0 +1,101 @@
+"""
+Tests for pipeline.py: concurrent fetch → analyze executor.
+
+Covers:
+- Results keep input order
+- Items dropped by the fetch stage yield None
+- Fetch and analysis stages overlap (wall time ≈ slowest stage)
+- Lazy consumption of generator input
+- First stage exception is re-raised
+"""
+
+import threading
+import time
+
+import pytest
+
+from pipeline import ThreadPipeline
+
+
+class TestPipelineResults:
+    def test_preserves_input_order(self):
+        def analyze(x):
+            time.sleep(0.01 * (5 - x))  # later items finish first
+            return x * 10
+
+        pipeline = ThreadPipeline(fetch=lambda x: x, analyze=analyze,
+                                  fetch_workers=2, analysis_workers=5)
+        assert pipeline.run(range(5)) == [0, 10, 20, 30, 40]
+
+    def test_fetch_none_drops_item(self):
+        pipeline = ThreadPipeline(
+            fetch=lambda x: None if x == 1 else x,
+            analyze=lambda x: x,
+            analysis_workers=2,
+        )
+        assert pipeline.run([0, 1, 2]) == [0, None, 2]
+
+    def test_empty_input(self):
+        pipeline = ThreadPipeline(fetch=lambda x: x, analyze=lambda x: x)
+        assert pipeline.run([]) == []
+
+    def test_generator_input(self):
+        pipeline = ThreadPipeline(fetch=lambda x: x, analyze=lambda x: x + 1)
+        assert pipeline.run(i for i in range(3)) == [1, 2, 3]
+
+
+class TestPipelineConcurrency:
+    def test_stages_overlap(self):
+        """8 × (20ms fetch + 100ms analysis) sequential ≈ 0.96s; pipelined ≈ 0.3s."""
+        def fetch(x):
+            time.sleep(0.02)
+            return x
+
+        def analyze(x):
+            time.sleep(0.1)
+            return x
+
+        pipeline = ThreadPipeline(fetch=fetch, analyze=analyze,
+                                  fetch_workers=1, analysis_workers=8)
+        start = time.monotonic()
+        assert pipeline.run(range(8)) == list(range(8))
+        assert time.monotonic() - start < 0.6
+
+    def test_analysis_pool_is_bounded(self):
+        active = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def analyze(x):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return x
+
+        pipeline = ThreadPipeline(fetch=lambda x: x, analyze=analyze,
+                                  fetch_workers=2, analysis_workers=3)
+        pipeline.run(range(12))
+        assert peak[0] <= 3
+
+
+class TestPipelineErrors:
+    def test_analysis_exception_reraised(self):
+        def analyze(x):
+            if x == 2:
+                raise RuntimeError("boom")
+            return x
+
+        pipeline = ThreadPipeline(fetch=lambda x: x, analyze=analyze, analysis_workers=2)
+        with pytest.raises(RuntimeError, match="boom"):
+            pipeline.run(range(5))
+
+    def test_fetch_exception_reraised(self):
+        def fetch(x):
+            raise ValueError("bad fetch")
+
+        pipeline = ThreadPipeline(fetch=fetch, analyze=lambda x: x)
+        with pytest.raises(ValueError, match="bad fetch"):
+            pipeline.run(range(3))
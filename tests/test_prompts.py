@@ -0,0 +1,139 @@
+"""
+Tests for prompts.py and the prompt-caching bookkeeping in ai_analyzer.py.
+
+Covers:
+- Static system prefix first, thread payload last, identical prefix across threads
+- Static prefix long enough for provider-side prompt caching
+- Prompt version is part of the result cache key
+- cached_tokens from the usage response in AnalysisResult and per-run usage stats
+- Cost estimate with cached input tokens
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import prompts
+from ai_analyzer import AIAnalyzer, UsageStats, estimate_cost
+from llm_cache import AnalysisCache
+from token_counter import count_tokens
+
+ANSWER = {"pain_points": [], "key_insights": [], "market_opportunities": [], "sentiment_summary": "neutral"}
+
+
+def _response(total=2000, completion=100, cached=1024):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(ANSWER)))],
+        usage=SimpleNamespace(total_tokens=total, completion_tokens=completion,
+                              prompt_tokens_details=SimpleNamespace(cached_tokens=cached)),
+    )
+
+
+def _analyzer(*responses, cache=None):
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.model = "gpt-4.1-mini"
+    analyzer.cache = cache
+    analyzer.refresh = False
+    analyzer.map_reduce = False
+    analyzer.client = MagicMock()
+    analyzer.client.chat.completions.create.side_effect = list(responses)
+    return analyzer
+
+
+def _thread(thread_id="t1", title="Invoicing"):
+    return {"id": thread_id, "title": title, "selftext": "body",
+            "comments": [{"id": f"{thread_id}c{i}", "body": f"{title} comment number {i}", "replies": []}
+                         for i in range(3)]}
+
+
+class TestLayout:
+    def test_static_prefix_then_thread(self):
+        messages = prompts.analysis_messages("My title", "My body", "Comment 1: hello")
+        assert messages[0] == {"role": "system", "content": prompts.ANALYSIS_SYSTEM_PROMPT}
+        assert messages[1]["role"] == "user"
+        assert messages[1]["content"].startswith("【Thread Title】\nMy title")
+        assert messages[1]["content"].endswith("Comment 1: hello")
+
+    def test_prefix_identical_across_threads(self):
+        analyzer = _analyzer(_response(), _response())
+        analyzer.analyze_thread(_thread("a", "Invoicing"))
+        analyzer.analyze_thread(_thread("b", "Hiring"))
+
+        first, second = (c.kwargs["messages"] for c in analyzer.client.chat.completions.create.call_args_list)
+        assert first[0] == second[0]
+        assert "Invoicing" not in first[0]["content"]
+        assert "Invoicing" in first[1]["content"] and "Hiring" in second[1]["content"]
+
+    def test_prefix_long_enough_to_be_cached(self):
+        # OpenAI only caches prompts from 1024 tokens, counted from the start
+        assert count_tokens(prompts.ANALYSIS_SYSTEM_PROMPT) >= 1024
+
+    def test_triage_layout(self):
+        messages = prompts.triage_messages("T", "B", "Comment 1: c")
+        assert messages[0]["content"] == prompts.TRIAGE_SYSTEM_PROMPT
+        assert "【Top Comments】" in messages[1]["content"]
+
+
+def test_prompt_version_in_cache_key(tmp_path, monkeypatch):
+    cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+    _analyzer(_response(), cache=cache).analyze_thread(_thread())
+
+    monkeypatch.setattr("ai_analyzer.PROMPT_VERSION", "test-next")
+    again = _analyzer(_response(), cache=cache)
+    result = again.analyze_thread(_thread())
+
+    assert not result.cache_hit
+    again.client.chat.completions.create.assert_called_once()
+    cache.close()
+
+
+class TestCachedTokens:
+    def test_recorded_in_result(self):
+        result = _analyzer(_response(cached=1280)).analyze_thread(_thread())
+        assert result.cached_tokens == 1280
+        assert result.completion_tokens == 100
+
+    def test_missing_details(self):
+        response = _response()
+        response.usage = SimpleNamespace(total_tokens=10, completion_tokens=2)
+        assert _analyzer(response).analyze_thread(_thread()).cached_tokens == 0
+
+    def test_usage_stats(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+        analyzer = _analyzer(_response(cached=0), _response(cached=1536), cache=cache)
+        analyzer.analyze_thread(_thread("a", "Invoicing"))
+        analyzer.analyze_thread(_thread("b", "Hiring"))
+        analyzer.analyze_thread(_thread("a", "Invoicing"))  # local cache hit
+        cache.close()
+
+        stats = analyzer.usage["gpt-4.1-mini"]
+        assert (stats.requests, stats.cache_hits) == (2, 1)
+        assert (stats.input_tokens, stats.cached_tokens, stats.output_tokens) == (3800, 1536, 200)
+        assert stats.prompt_cache_ratio == pytest.approx(1536 / 3800)
+        assert stats.cost < stats.uncached_cost
+
+    def test_log_usage(self, caplog):
+        analyzer = _analyzer(_response(total=2000, completion=100, cached=950))
+        analyzer.analyze_thread(_thread())
+
+        with caplog.at_level("INFO", logger="ai_analyzer"):
+            analyzer.log_usage()
+
+        assert "AI usage (gpt-4.1-mini): 1 requests" in caplog.text
+        assert "(50% from prompt cache)" in caplog.text
+        assert "without prompt caching" in caplog.text
+
+
+class TestEstimateCost:
+    def test_cached_input_price(self):
+        # gpt-4.1-mini: $0.40 input, $0.10 cached input, $1.60 output per 1M
+        assert estimate_cost("gpt-4.1-mini", 1_000_000, 0, cached_tokens=500_000) == pytest.approx(0.25)
+
+    def test_two_price_entries_bill_cached_as_input(self, monkeypatch):
+        monkeypatch.setitem(__import__("config").MODEL_PRICING, "my-model", (1.0, 2.0))
+        assert estimate_cost("my-model", 1_000_000, 1_000_000, cached_tokens=1_000_000) == pytest.approx(3.0)
+
+    def test_unknown_model_usage(self):
+        assert UsageStats("my-model", input_tokens=10).cost is None
@@ -0,0 +1,136 @@
+"""
+Tests for rate_limiter.py: shared token bucket.
+
+Covers:
+- Burst capacity is available immediately (no cold-start sleep)
+- Sustained rate once the burst is spent
+- Unlimited mode (rate <= 0)
+- X-Ratelimit-Remaining / X-Ratelimit-Reset handling
+- Thread and asyncio callers share one budget
+- Process-wide default limiter wiring in RedditFetcher
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import rate_limiter
+from rate_limiter import TokenBucket, get_default_limiter, set_default_limiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestReserve:
+    def test_burst_is_free(self):
+        bucket = TokenBucket(rate=1, capacity=3, clock=FakeClock())
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+    def test_waits_after_burst(self):
+        bucket = TokenBucket(rate=2, capacity=1, clock=FakeClock())
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now += 1.0
+        assert bucket.reserve() == 0
+
+    def test_refill_capped_at_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+        clock.now += 1000
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_multi_token_reservation(self):
+        bucket = TokenBucket(rate=10, capacity=5, clock=FakeClock())
+        assert bucket.reserve(5) == 0
+        assert bucket.reserve(10) == pytest.approx(1.0)
+
+    def test_unlimited(self):
+        bucket = TokenBucket(rate=0)
+        assert bucket.unlimited
+        assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+class TestHeaders:
+    def test_remaining_caps_tokens(self):
+        bucket = TokenBucket(rate=1, capacity=10, clock=FakeClock())
+        bucket.update_from_headers({"X-Ratelimit-Remaining": "1.0", "X-Ratelimit-Reset": "60"})
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_exhausted_blocks_until_reset(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=10, clock=clock)
+        bucket.update_from_headers({"X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "42"})
+        assert bucket.reserve() >= 42
+        clock.now += 100
+        assert bucket.reserve() == 0
+
+    def test_missing_or_malformed_headers_ignored(self):
+        bucket = TokenBucket(rate=1, capacity=2, clock=FakeClock())
+        bucket.update_from_headers({})
+        bucket.update_from_headers({"X-Ratelimit-Remaining": "n/a"})
+        bucket.update_from_headers(None)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+
+
+class TestConcurrency:
+    def test_threads_share_budget(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # 1 free token + 10 more at 100/s ≈ 0.1s
+        assert time.monotonic() - start >= 0.09
+
+    def test_async_acquire(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+
+        async def main():
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(6)))
+
+        start = time.monotonic()
+        asyncio.run(main())
+        assert 0.04 <= time.monotonic() - start < 1.0
+
+
+class TestDefaultLimiter:
+    def test_built_from_config(self, monkeypatch):
+        import config as cfg
+        monkeypatch.setattr(cfg, "RATE_LIMIT_DELAY", 0.5)
+        monkeypatch.setattr(cfg, "RATE_LIMIT_BURST", 4)
+        set_default_limiter(None)
+        limiter = get_default_limiter()
+        assert limiter.rate == pytest.approx(2.0)
+        assert limiter.capacity == 4
+        assert get_default_limiter() is limiter
+
+    def test_zero_delay_is_unlimited(self, monkeypatch):
+        import config as cfg
+        monkeypatch.setattr(cfg, "RATE_LIMIT_DELAY", 0)
+        set_default_limiter(None)
+        assert get_default_limiter().unlimited
+
+    def test_fetchers_share_default(self):
+        from reddit_fetcher import RedditFetcher
+        assert RedditFetcher().rate_limiter is RedditFetcher().rate_limiter
+        assert RedditFetcher().rate_limiter is rate_limiter.get_default_limiter()
@@ -1,7 +1,12 @@
 """Tests for reddit_fetcher.py"""
 
+import sys
+
 import pytest
-from reddit_fetcher import RedditFetcher, Comment, Thread
+from reddit_fetcher import (
+    RedditFetcher, Comment, Thread,
+    comments_to_dicts, iter_comment_dicts, walk_comments,
+)
 
 
 class TestNormalizeUrl:
@@ -136,3 +141,59 @@ class TestGetAllCommentsFlat:
         assert len(flat) == 2
         assert flat[0].id == "c1"
         assert flat[1].id == "c2"
+
+
+def _raw_chain(depth):
+    """Raw listing with one reply chain *depth* levels deep"""
+    node = []
+    for level in reversed(range(depth)):
+        node = [{"kind": "t1", "data": {
+            "id": f"c{level}", "body": f"level {level}",
+            "replies": {"data": {"children": node}} if node else "",
+        }}]
+    return node
+
+
+class TestIterativeTreeWalk:
+    """Comment tree helpers must not recurse (deep chains exceed the recursion limit)"""
+
+    def setup_method(self):
+        self.fetcher = RedditFetcher()
+        self.depth = sys.getrecursionlimit() * 3
+
+    def test_parse_deep_chain(self):
+        comments = self.fetcher._parse_comments(_raw_chain(self.depth))
+        flat = list(walk_comments(comments))
+        assert len(flat) == self.depth
+        assert flat[-1][0].depth == self.depth - 1
+        assert flat[-1][1] == self.depth - 1
+
+    def test_dicts_and_flatten_deep_chain(self):
+        comments = self.fetcher._parse_comments(_raw_chain(self.depth))
+        dicts = comments_to_dicts(comments)
+        assert sum(1 for _ in iter_comment_dicts(dicts)) == self.depth
+
+    def test_preorder_and_parent(self):
+        c3 = Comment(id="c3", author="", body="", score=0, created_utc=0, parent_id="", gilded=0)
+        c2 = Comment(id="c2", author="", body="", score=0, created_utc=0, parent_id="", gilded=0,
+                     replies=[c3])
+        c4 = Comment(id="c4", author="", body="", score=0, created_utc=0, parent_id="", gilded=0)
+        c1 = Comment(id="c1", author="", body="", score=0, created_utc=0, parent_id="", gilded=0,
+                     replies=[c2])
+        walked = [(n.id, d, p.id if p else None) for n, d, p in walk_comments([c1, c4])]
+        assert walked == [("c1", 0, None), ("c2", 1, "c1"), ("c3", 2, "c2"), ("c4", 0, None)]
+
+    def test_walk_is_lazy(self):
+        def roots():
+            yield Comment(id="a", author="", body="", score=0, created_utc=0, parent_id="", gilded=0)
+            raise AssertionError("consumed too far")
+
+        node, _, _ = next(walk_comments(roots()))
+        assert node.id == "a"
+
+    def test_more_stub_subtree_skipped(self):
+        data = [
+            {"kind": "more", "data": {"children": ["x"]}},
+            {"kind": "t1", "data": {"id": "c1", "body": "keep", "replies": ""}},
+        ]
+        assert [c.id for c in self.fetcher._parse_comments(data)] == ["c1"]
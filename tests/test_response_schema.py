@@ -0,0 +1,246 @@
+"""
+Tests for response_schema.py and the salvage / repair path of AIAnalyzer.
+
+Covers:
+- RESPONSE_FORMAT is a valid strict structured-output schema
+- decode_answer skips code fences and surrounding prose
+- check_analysis: defaults, coercion, dropped pain points, SchemaError
+- salvage_analysis on truncated and malformed answers
+- AIAnalyzer: salvaged pain points, repair re-ask with only the broken rest,
+  usage and cache of the repaired answer, async repair
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai_analyzer import AIAnalyzer
+from async_analyzer import AsyncAIAnalyzer
+from llm_cache import AnalysisCache
+from response_schema import (ANALYSIS_SCHEMA, RESPONSE_FORMAT, SchemaError, check_analysis, decode_answer,
+                             merge_repair, parse_answer, salvage_analysis)
+from tests.fake_openai_server import FakeOpenAIServer
+
+
+def _pain_point(description, severity="high", intent="high"):
+    return {"description": description, "severity": severity, "frequency_mentioned": 2,
+            "example_comments": ["quote"], "purchase_intent": intent, "category": "Finance"}
+
+
+ANSWER = {
+    "pain_points": [_pain_point("Invoicing takes hours"), _pain_point("No API for exports")],
+    "key_insights": ["Billing is manual"],
+    "market_opportunities": ["Invoice automation"],
+    "sentiment_summary": "negative",
+}
+TEXT = json.dumps(ANSWER)
+# Cut inside the second pain point
+TRUNCATED = TEXT[:TEXT.index("No API") + 3]
+
+
+def _objects(schema):
+    if schema.get("type") == "object":
+        yield schema
+        for sub in schema["properties"].values():
+            yield from _objects(sub)
+    elif schema.get("type") == "array":
+        yield from _objects(schema["items"])
+
+
+class TestSchema:
+    def test_strict_structured_output_rules(self):
+        assert RESPONSE_FORMAT["json_schema"]["strict"] is True
+        for obj in _objects(ANALYSIS_SCHEMA):
+            assert obj["additionalProperties"] is False
+            assert sorted(obj["required"]) == sorted(obj["properties"])
+
+
+class TestDecodeAnswer:
+    @pytest.mark.parametrize("text", [
+        "```json\n" + TEXT + "\n```",
+        "```\n" + TEXT + "```",
+        "Here is the analysis:\n" + TEXT + "\nHope this helps!",
+    ])
+    def test_skips_fences_and_prose(self, text):
+        assert decode_answer(text) == ANSWER
+
+    def test_no_object(self):
+        with pytest.raises(json.JSONDecodeError):
+            decode_answer("Sorry, I cannot help with that.")
+
+
+class TestCheckAnalysis:
+    def test_valid_answer_unchanged(self):
+        data = json.loads(TEXT)
+        assert check_analysis(data) is data
+        assert data == ANSWER
+
+    def test_defaults_for_missing_fields(self):
+        assert check_analysis({}) == {"pain_points": [], "key_insights": [],
+                                      "market_opportunities": [], "sentiment_summary": ""}
+
+    def test_coerces_pain_point_fields(self):
+        pp = {"description": "Slow reports", "severity": "High", "purchase_intent": "maybe",
+              "frequency_mentioned": "4", "example_comments": ["a", 3], "category": None}
+        check_analysis({"pain_points": [pp]})
+        assert pp == {"description": "Slow reports", "severity": "high", "purchase_intent": "none",
+                      "frequency_mentioned": 4, "example_comments": ["a"], "category": "Other"}
+
+    @pytest.mark.parametrize("frequency", ["1e999", "Infinity", "-Infinity", "NaN"])
+    def test_non_finite_frequency(self, frequency):
+        text = TEXT.replace('"frequency_mentioned": 2', f'"frequency_mentioned": {frequency}', 1)
+        assert parse_answer(text)["pain_points"][0]["frequency_mentioned"] == 0
+
+    def test_drops_unusable_items(self):
+        data = check_analysis({"pain_points": [_pain_point("ok"), "text", {"severity": "high"}],
+                               "key_insights": ["a", None]})
+        assert [pp["description"] for pp in data["pain_points"]] == ["ok"]
+        assert data["key_insights"] == ["a"]
+
+    @pytest.mark.parametrize("data", [[ANSWER], {"pain_points": "none"}, {"sentiment_summary": 3}])
+    def test_wrong_types_raise(self, data):
+        with pytest.raises(SchemaError):
+            check_analysis(data)
+
+    def test_lenient_drops_wrong_types(self):
+        assert check_analysis({"pain_points": "none"}, strict=False)["pain_points"] == []
+
+
+class TestSalvage:
+    def test_truncated_inside_pain_point(self):
+        data, rest = salvage_analysis(TRUNCATED)
+        assert [pp["description"] for pp in data["pain_points"]] == ["Invoicing takes hours"]
+        assert data["key_insights"] == []
+        assert rest.startswith(', {"description": "No')
+
+    def test_truncated_inside_summary(self):
+        text = TEXT[:-5]
+        data, rest = salvage_analysis(text)
+        assert len(data["pain_points"]) == 2
+        assert data["market_opportunities"] == ["Invoice automation"]
+        assert data["sentiment_summary"] == ""
+        assert rest == ', "sentiment_summary": "negat'
+
+    def test_malformed_member_stops_the_walk(self):
+        text = TEXT.replace('"key_insights": ["Billing is manual"]', '"key_insights": [Billing is manual]')
+        data, rest = salvage_analysis(text)
+        assert len(data["pain_points"]) == 2
+        assert rest.startswith(', "key_insights": [Billing')
+
+    def test_complete_answer_leaves_nothing(self):
+        data, rest = salvage_analysis(TEXT)
+        assert data == ANSWER and rest == ""
+
+    def test_no_json_at_all(self):
+        data, rest = salvage_analysis("I could not analyze this thread.")
+        assert not any(data.values())
+        assert rest == "I could not analyze this thread."
+
+    def test_merge_repair(self):
+        salvaged, _ = salvage_analysis(TRUNCATED)
+        repaired = parse_answer(json.dumps({**ANSWER, "pain_points": [_pain_point("No API")]}))
+        merged = merge_repair(salvaged, repaired)
+        assert [pp["description"] for pp in merged["pain_points"]] == ["Invoicing takes hours", "No API"]
+        assert merged["sentiment_summary"] == "negative"
+
+
+def _response(text, total=1000, completion=200):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(total_tokens=total, completion_tokens=completion),
+    )
+
+
+def _analyzer(*responses, cache=None):
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.model = "gpt-4.1-mini"
+    analyzer.cache = cache
+    analyzer.refresh = False
+    analyzer.map_reduce = False
+    analyzer.client = MagicMock()
+    analyzer.client.chat.completions.create.side_effect = list(responses)
+    return analyzer
+
+
+def _thread():
+    return {"id": "t1", "title": "Invoicing", "selftext": "body",
+            "comments": [{"id": f"c{i}", "body": f"comment number {i} with enough text", "replies": []}
+                         for i in range(3)]}
+
+
+REPAIRED = json.dumps({"pain_points": [_pain_point("No API for exports")], "key_insights": ["Billing is manual"],
+                       "market_opportunities": [], "sentiment_summary": "negative"})
+
+
+class TestAnalyzerRepair:
+    def test_sends_strict_schema(self):
+        analyzer = _analyzer(_response(TEXT))
+        analyzer.analyze_thread(_thread())
+        kwargs = analyzer.client.chat.completions.create.call_args.kwargs
+        assert kwargs["response_format"] == RESPONSE_FORMAT
+
+    def test_plain_json_mode(self, monkeypatch):
+        monkeypatch.setattr("config.STRUCTURED_OUTPUT", False)
+        analyzer = _analyzer(_response(TEXT))
+        analyzer.analyze_thread(_thread())
+        kwargs = analyzer.client.chat.completions.create.call_args.kwargs
+        assert kwargs["response_format"] == {"type": "json_object"}
+
+    def test_repairs_only_the_broken_rest(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+        analyzer = _analyzer(_response(TRUNCATED), _response(REPAIRED, total=300, completion=100), cache=cache)
+
+        result = analyzer.analyze_thread(_thread())
+
+        assert [pp.description for pp in result.pain_points] == ["Invoicing takes hours", "No API for exports"]
+        assert result.key_insights == ["Billing is manual"]
+        assert (result.tokens_used, result.completion_tokens) == (1300, 300)
+        assert analyzer.usage["gpt-4.1-mini"].requests == 2
+
+        repair = analyzer.client.chat.completions.create.call_args_list[1].kwargs
+        assert repair["messages"][1]["content"].startswith(', {"description": "No')
+        assert "comment number" not in json.dumps(repair["messages"])
+
+        # The merged answer is what gets cached
+        again = _analyzer(cache=cache)
+        assert len(again.analyze_thread(_thread()).pain_points) == 2
+        again.client.chat.completions.create.assert_not_called()
+        cache.close()
+
+    def test_salvage_without_repair(self, monkeypatch):
+        monkeypatch.setattr("config.REPAIR_MALFORMED", False)
+        analyzer = _analyzer(_response(TRUNCATED))
+
+        result = analyzer.analyze_thread(_thread())
+
+        assert [pp.description for pp in result.pain_points] == ["Invoicing takes hours"]
+        analyzer.client.chat.completions.create.assert_called_once()
+
+    def test_unusable_repair_keeps_salvage(self):
+        analyzer = _analyzer(_response(TRUNCATED), _response("still broken"))
+        result = analyzer.analyze_thread(_thread())
+        assert len(result.pain_points) == 1
+
+    def test_nothing_recovered(self):
+        analyzer = _analyzer(_response("no idea"), _response("no idea either"))
+        result = analyzer.analyze_thread(_thread())
+        assert result.pain_points == []
+        assert "invalid response format" in result.sentiment_summary
+
+    def test_async_repair(self):
+        with FakeOpenAIServer() as server:
+            server.script = [server.completion(TRUNCATED), server.completion(json.loads(REPAIRED))]
+            analyzer = AsyncAIAnalyzer(model="gpt-4o-mini", api_key="test", base_url=server.base_url,
+                                       map_reduce=False, rpm_limit=0, tpm_limit=0)
+
+            async def main():
+                async with analyzer:
+                    return await analyzer.analyze_thread(_thread())
+
+            result = asyncio.run(main())
+
+        assert len(result.pain_points) == 2
+        assert server.requests[1]["messages"][1]["content"].startswith(', {"description": "No')
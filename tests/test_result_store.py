@@ -0,0 +1,172 @@
+"""
+Tests for result_store.py.
+
+Covers:
+- Thread and nested comment rows, re-saving replaces instead of duplicating
+- Analysis and pain point rows, re-analysis replaces the old pain points
+- query_pain_points filters (subreddit, time range, category, severity, intent) and order
+- import_directory over thread_*/analysis_*.json, skipping broken files
+- WAL journal mode and indexes
+- GoldmineFinder writes to the store when db_path is set
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai_analyzer import AnalysisResult, PainPoint, analysis_to_dict
+from result_store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"), clock=lambda: 1000.0)
+    yield store
+    store.close()
+
+
+def _comment(id, body="A comment body", replies=(), depth=0):
+    return {"id": id, "author": "u", "body": body, "score": 1, "created_utc": 1.0,
+            "parent_id": "t3_t1", "gilded": 0, "depth": depth, "replies": list(replies)}
+
+
+def _thread(id="t1", subreddit="SaaS", created_utc=5000.0, comments=None):
+    return {"id": id, "title": f"Post {id}", "author": "op", "selftext": "", "score": 10,
+            "num_comments": 3, "created_utc": created_utc, "url": f"https://reddit.com/{id}",
+            "subreddit": subreddit, "upvote_ratio": 0.9,
+            "comments": comments if comments is not None else [
+                _comment("c1", replies=[_comment("c2", depth=1, replies=[_comment("c3", depth=2)])]),
+            ]}
+
+
+def _pp(description, severity="medium", intent="low", category="Ops", freq=1):
+    return PainPoint(description=description, severity=severity, frequency_mentioned=freq,
+                     example_comments=["example"], purchase_intent=intent, category=category)
+
+
+def _result(thread_id="t1", pain_points=()):
+    return AnalysisResult(thread_id=thread_id, thread_title=f"Post {thread_id}", total_comments=3,
+                          pain_points=list(pain_points), key_insights=["insight"],
+                          market_opportunities=["opportunity"], sentiment_summary="ok",
+                          analyzed_comments=3, tokens_used=100)
+
+
+class TestWrites:
+    def test_thread_and_nested_comments(self, store):
+        store.save_thread(_thread())
+        assert store.stats()["threads"] == 1
+        assert store.stats()["comments"] == 3
+
+    def test_resave_replaces(self, store):
+        store.save_thread(_thread())
+        store.save_thread(_thread())
+        assert store.stats()["threads"] == 1
+        assert store.stats()["comments"] == 3
+
+    def test_reanalysis_replaces_pain_points(self, store):
+        store.save_analysis(_result(pain_points=[_pp("a"), _pp("b")]))
+        store.save_analysis(_result(pain_points=[_pp("c")]))
+        stats = store.stats()
+        assert stats["analyses"] == 1
+        assert stats["pain_points"] == 1
+        assert store.query_pain_points()[0]["description"] == "c"
+
+    def test_wal_mode_and_indexes(self, store):
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {r[0] for r in store._conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        assert {"idx_threads_subreddit_created", "idx_threads_created", "idx_pain_points_category",
+                "idx_pain_points_severity", "idx_pain_points_intent"} <= indexes
+
+
+class TestQuery:
+    @pytest.fixture
+    def filled(self, store):
+        store.save_thread(_thread("t1", subreddit="SaaS", created_utc=5000.0))
+        store.save_thread(_thread("t2", subreddit="Entrepreneur", created_utc=100.0))
+        store.save_analysis(_result("t1", [
+            _pp("billing", severity="high", intent="high", category="Finance"),
+            _pp("onboarding", severity="low", intent="none", category="UX"),
+        ]))
+        store.save_analysis(_result("t2", [_pp("hiring", severity="critical", intent="medium")]))
+        return store
+
+    def test_order_intent_then_severity(self, filled):
+        assert [r["description"] for r in filled.query_pain_points()] == ["billing", "hiring", "onboarding"]
+
+    def test_subreddit_case_insensitive(self, filled):
+        rows = filled.query_pain_points(subreddit="saas")
+        assert {r["description"] for r in rows} == {"billing", "onboarding"}
+        assert rows[0]["thread_title"] == "Post t1"
+        assert rows[0]["example_comments"] == ["example"]
+
+    def test_since(self, filled):
+        assert {r["thread_id"] for r in filled.query_pain_points(since=1000.0)} == {"t1"}
+
+    def test_until(self, filled):
+        assert {r["thread_id"] for r in filled.query_pain_points(until=1000.0)} == {"t2"}
+
+    def test_min_intent(self, filled):
+        assert [r["description"] for r in filled.query_pain_points(min_intent="medium")] == ["billing", "hiring"]
+
+    def test_min_severity_and_category(self, filled):
+        assert [r["description"] for r in filled.query_pain_points(min_severity="high")] == ["billing", "hiring"]
+        assert [r["description"] for r in filled.query_pain_points(category="ux")] == ["onboarding"]
+
+    def test_limit(self, filled):
+        assert len(filled.query_pain_points(limit=1)) == 1
+
+    def test_analysis_without_thread_row(self, store):
+        store.save_analysis(_result("t9", [_pp("orphan")]))
+        rows = store.query_pain_points()
+        assert rows[0]["thread_title"] == "Post t9"
+        assert rows[0]["subreddit"] is None
+
+
+class TestImport:
+    def test_import_directory(self, store, tmp_path):
+        out = tmp_path / "output"
+        out.mkdir()
+        (out / "thread_t1.json").write_text(json.dumps(_thread()), encoding="utf-8")
+        (out / "analysis_t1.json").write_text(
+            json.dumps(analysis_to_dict(_result(pain_points=[_pp("billing")]))), encoding="utf-8")
+        (out / "analysis_bad.json").write_text("{not json", encoding="utf-8")
+        (out / "report_t1.md").write_text("# report", encoding="utf-8")
+
+        counts = store.import_directory(str(out))
+
+        assert counts == {"threads": 1, "analyses": 1, "skipped": 1}
+        assert store.stats()["comments"] == 3
+        assert store.query_pain_points(subreddit="SaaS")[0]["description"] == "billing"
+
+    def test_import_is_idempotent(self, store, tmp_path):
+        (tmp_path / "thread_t1.json").write_text(json.dumps(_thread()), encoding="utf-8")
+        store.import_directory(str(tmp_path))
+        store.import_directory(str(tmp_path))
+        assert store.stats()["threads"] == 1
+
+
+def _finder(tmp_path, **kwargs):
+    with patch("goldmine_finder.RedditFetcher"), \
+         patch("goldmine_finder.AIAnalyzer"):
+        from goldmine_finder import GoldmineFinder
+        return GoldmineFinder(output_dir=str(tmp_path / "out"), **kwargs)
+
+
+class TestGoldmineFinderIntegration:
+    def test_save_outputs_writes_store(self, tmp_path):
+        db = str(tmp_path / "results.sqlite")
+        finder = _finder(tmp_path, db_path=db)
+        finder.analyzer.generate_report.return_value = "# report"
+        thread = MagicMock(id="t1")
+
+        finder._save_outputs(thread, _thread(), _result(pain_points=[_pp("billing")]))
+        finder.store.close()
+
+        reopened = ResultStore(db)
+        assert reopened.stats()["threads"] == 1
+        assert reopened.query_pain_points()[0]["description"] == "billing"
+        reopened.close()
+
+    def test_no_store_by_default(self, tmp_path):
+        assert _finder(tmp_path).store is None
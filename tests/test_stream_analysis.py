@@ -0,0 +1,172 @@
+"""
+Tests for streamed AI analysis: PainPointScanner (stream_parser.py) and
+AIAnalyzer.analyze_thread_stream with a mocked streaming OpenAI client.
+
+Covers:
+- Pain points emitted as soon as their object closes, for any chunking
+- Nested pain_points keys and surrounding fields are ignored
+- Stream events: pain points first, result last, usage tokens, cache
+- Invalid answers and map-reduce fall back to whole-answer parsing
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai_analyzer import AIAnalyzer, AnalysisResult, PainPoint
+from llm_cache import AnalysisCache
+from response_schema import RESPONSE_FORMAT
+from stream_parser import PainPointScanner
+from tests.conftest import make_thread_dict
+
+ANSWER = {
+    "pain_points": [
+        {"description": "Invoicing takes hours", "severity": "high", "frequency_mentioned": 3,
+         "example_comments": ["invoices {are} \"painful\""], "purchase_intent": "high",
+         "category": "Finance"},
+        {"description": "No API for exports", "severity": "medium", "frequency_mentioned": 1,
+         "example_comments": [], "purchase_intent": "low", "category": "Technology"},
+    ],
+    "key_insights": ["Billing is manual"],
+    "market_opportunities": ["Invoice automation"],
+    "sentiment_summary": "negative",
+}
+
+
+def _scan(text, size):
+    scanner = PainPointScanner()
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(scanner.feed_text(text[i:i + size]))
+    events.extend(scanner.close())
+    return events
+
+
+class TestPainPointScanner:
+    @pytest.mark.parametrize("size", [1, 3, 17, 10_000])
+    def test_emits_each_pain_point(self, size):
+        events = _scan(json.dumps(ANSWER, indent=2), size)
+        assert events == [("pain_point", pp) for pp in ANSWER["pain_points"]]
+
+    def test_emits_before_answer_finishes(self):
+        text = json.dumps(ANSWER)
+        first_end = text.index('"No API') - 2
+        scanner = PainPointScanner()
+        assert scanner.feed_text(text[:first_end]) == [("pain_point", ANSWER["pain_points"][0])]
+
+    def test_ignores_other_fields_and_nested_keys(self):
+        answer = {"key_insights": [{"pain_points": [1]}], "meta": {"pain_points": [2]},
+                  "pain_points": [{"description": "x"}]}
+        assert _scan(json.dumps(answer), 5) == [("pain_point", {"description": "x"})]
+
+    def test_truncated_answer(self):
+        scanner = PainPointScanner()
+        scanner.feed_text(json.dumps(ANSWER)[:-10])
+        with pytest.raises(ValueError):
+            scanner.close()
+
+
+def _chunk(content=None, usage=None):
+    choices = [] if content is None else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _stream(text, size=7, tokens=321):
+    chunks = [_chunk(text[i:i + size]) for i in range(0, len(text), size)]
+    chunks.append(_chunk(usage=SimpleNamespace(total_tokens=tokens)))
+    return chunks
+
+
+def _analyzer(chunks, cache=None, map_reduce=False):
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.model = "gpt-4o-mini"
+    analyzer.cache = cache
+    analyzer.refresh = False
+    analyzer.map_reduce = map_reduce
+    analyzer.client = MagicMock()
+    analyzer.client.chat.completions.create.return_value = iter(chunks)
+    return analyzer
+
+
+class TestAnalyzeThreadStream:
+    def test_pain_points_then_result(self):
+        analyzer = _analyzer(_stream(json.dumps(ANSWER)))
+
+        events = list(analyzer.analyze_thread_stream(make_thread_dict()))
+
+        kinds = [k for k, _ in events]
+        assert kinds == ["pain_point", "pain_point", "result"]
+        assert isinstance(events[0][1], PainPoint)
+        assert events[0][1].description == "Invoicing takes hours"
+        result = events[-1][1]
+        assert isinstance(result, AnalysisResult)
+        assert [pp.description for pp in result.pain_points] == ["Invoicing takes hours",
+                                                                 "No API for exports"]
+        assert result.key_insights == ["Billing is manual"]
+        assert result.tokens_used == 321
+
+        kwargs = analyzer.client.chat.completions.create.call_args.kwargs
+        assert kwargs["stream"] is True
+        assert kwargs["stream_options"] == {"include_usage": True}
+        assert kwargs["response_format"] == RESPONSE_FORMAT
+
+    def test_first_pain_point_before_stream_ends(self):
+        consumed = []
+
+        def chunks():
+            for i, chunk in enumerate(_stream(json.dumps(ANSWER), size=5)):
+                consumed.append(i)
+                yield chunk
+
+        analyzer = _analyzer([])
+        analyzer.client.chat.completions.create.return_value = chunks()
+        text = json.dumps(ANSWER)
+        first_close = text.index('}, {"description": "No API')  # "}" ending the first pain point
+
+        kind, _ = next(analyzer.analyze_thread_stream(make_thread_dict()))
+
+        assert kind == "pain_point"
+        # Emitted with the chunk that closes it
+        assert len(consumed) == first_close // 5 + 1
+
+    def test_answer_is_cached(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+        list(_analyzer(_stream(json.dumps(ANSWER)), cache=cache).analyze_thread_stream(make_thread_dict()))
+
+        again = _analyzer([], cache=cache)
+        events = list(again.analyze_thread_stream(make_thread_dict()))
+
+        again.client.chat.completions.create.assert_not_called()
+        assert [k for k, _ in events] == ["pain_point", "pain_point", "result"]
+        assert events[-1][1].cache_hit
+        cache.close()
+
+    def test_invalid_answer(self, monkeypatch):
+        monkeypatch.setattr("config.REPAIR_MALFORMED", False)
+        events = list(_analyzer(_stream("not json")).analyze_thread_stream(make_thread_dict()))
+        (kind, result), = events
+        assert kind == "result"
+        assert "invalid response format" in result.sentiment_summary
+
+    def test_unexpected_shape_still_parsed_at_end(self):
+        text = "]" + json.dumps(ANSWER)
+        events = list(_analyzer(_stream(text)).analyze_thread_stream(make_thread_dict()))
+        assert [k for k, _ in events] == ["result"]
+        assert len(events[0][1].pain_points) == 2
+        assert events[0][1].sentiment_summary == "negative"
+
+    def test_map_reduce_yields_merged_pain_points(self, monkeypatch):
+        monkeypatch.setattr("config.PROMPT_TOKEN_BUDGET", 30)
+        analyzer = _analyzer([], map_reduce=True)
+        analyzer.client.chat.completions.create.side_effect = lambda **kw: SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(ANSWER)))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+
+        events = list(analyzer.analyze_thread_stream(make_thread_dict(comments=4)))
+
+        assert events[-1][0] == "result"
+        assert len(events) - 1 == len(events[-1][1].pain_points)
+        assert analyzer.client.chat.completions.create.call_count > 1
@@ -0,0 +1,177 @@
+"""
+Tests for stream_parser.py and RedditFetcher stream_parse.
+
+Covers:
+- Streamed parse equals _parse_thread / _more_ids for any chunk size
+- Escapes and multi-byte characters split across chunks
+- Comments are emitted before the download finishes
+- Truncated and malformed payloads raise ValueError
+- fetch_thread streaming: cache write, cached payloads not streamed, 'more' expansion
+- --stream-parse CLI wiring
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from http_cache import ResponseCache
+from reddit_fetcher import RedditFetcher, RedditParser, iter_comments
+from stream_parser import JsonScanner, ThreadPayloadScanner
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _fixture_bytes():
+    with open(os.path.join(FIXTURES, "thread_with_more.json"), encoding="utf-8") as f:
+        return json.dumps(json.load(f), ensure_ascii=False).encode("utf-8")
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _payload(bodies):
+    post = {"kind": "t3", "data": {"id": "p1", "title": "Title \"quoted\" {x}", "author": "op",
+                                   "selftext": "", "score": 1, "num_comments": len(bodies),
+                                   "created_utc": 1.0, "url": "u", "subreddit": "s", "upvote_ratio": 1.0}}
+    children = [{"kind": "t1", "data": {"id": f"c{i}", "author": "a", "body": body, "score": 1,
+                                         "created_utc": 1.0, "parent_id": "t3_p1", "gilded": 0,
+                                         "replies": ""}}
+                for i, body in enumerate(bodies)]
+    return [{"kind": "Listing", "data": {"children": [post]}},
+            {"kind": "Listing", "data": {"after": None, "children": children, "before": None}}]
+
+
+class TestStreamParse:
+    @pytest.mark.parametrize("size", [1, 2, 7, 64, 4096])
+    def test_matches_full_parse(self, size):
+        raw = _fixture_bytes()
+        parser = RedditParser()
+        thread, more_ids = parser._parse_thread_stream(_chunks(raw, size))
+        data = json.loads(raw)
+        assert thread == parser._parse_thread(data)
+        assert more_ids == parser._more_ids(data)
+
+    @pytest.mark.parametrize("size", [1, 3, 5])
+    def test_escapes_and_multibyte_split(self, size):
+        bodies = ['He said "hi" \\ and } ] { [', "日本語のコメント 🎉", "tab\tnew\nline \\\"x\\\""]
+        raw = json.dumps(_payload(bodies), ensure_ascii=False).encode("utf-8")
+        thread, _ = RedditParser()._parse_thread_stream(_chunks(raw, size))
+        assert thread.title == 'Title "quoted" {x}'
+        assert [c.body for c in thread.comments] == bodies
+
+    def test_ascii_escaped_payload(self):
+        raw = json.dumps(_payload(["日本語  "])).encode()
+        thread, _ = RedditParser()._parse_thread_stream(_chunks(raw, 3))
+        assert thread.comments[0].body == "日本語  "
+
+    def test_comments_emitted_before_download_ends(self):
+        raw = json.dumps(_payload([f"comment number {i}" for i in range(50)])).encode()
+        chunks = _chunks(raw, 256)
+        consumed = []
+
+        def feed():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        seen_at = [len(consumed) for kind, _ in RedditParser()._iter_thread_stream(feed()) if kind == 'comment']
+        assert len(seen_at) == 50
+        assert seen_at[0] < len(chunks)
+
+    def test_truncated(self):
+        raw = _fixture_bytes()
+        with pytest.raises(ValueError):
+            RedditParser()._parse_thread_stream(_chunks(raw[:len(raw) // 2], 100))
+
+    def test_malformed_child(self):
+        raw = json.dumps(_payload(["fine comment"])).encode().replace(b'"score": 1, "created', b'"score": 1,, "created')
+        with pytest.raises(ValueError):
+            RedditParser()._parse_thread_stream(_chunks(raw, 50))
+
+    def test_no_post(self):
+        with pytest.raises(ValueError):
+            RedditParser()._parse_thread_stream([b"[]"])
+
+    def test_scanner_buffers_one_subtree(self):
+        raw = json.dumps(_payload(["x" * 1000] * 200)).encode()
+        scanner = ThreadPayloadScanner()
+        largest = 0
+        for chunk in _chunks(raw, 512):
+            scanner.feed(chunk)
+            largest = max(largest, len(scanner._buf))
+        scanner.close()
+        assert largest < 4000
+
+    def test_scanner_without_capture_kind(self):
+        class NoCapture(JsonScanner):
+            pass
+
+        with pytest.raises(TypeError):
+            NoCapture()
+
+
+def _streaming_response(raw, headers=None):
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = headers or {}
+    response.iter_content.side_effect = lambda chunk_size: iter(_chunks(raw, chunk_size))
+    response.__enter__.return_value = response
+    return response
+
+
+class TestFetcherStreaming:
+    def test_fetch_thread_streams(self):
+        raw = _fixture_bytes()
+        fetcher = RedditFetcher(stream_parse=True)
+        response = _streaming_response(raw)
+        with patch.object(fetcher.session, "get", return_value=response) as get:
+            thread = fetcher.fetch_thread("https://www.reddit.com/r/t/comments/abc/x/")
+        assert get.call_args.kwargs["stream"] is True
+        assert thread == RedditParser()._parse_thread(json.loads(raw))
+
+    def test_truncated_download_returns_none(self):
+        raw = _fixture_bytes()
+        fetcher = RedditFetcher(stream_parse=True)
+        with patch.object(fetcher.session, "get", return_value=_streaming_response(raw[:-20])):
+            assert fetcher.fetch_thread("https://www.reddit.com/r/t/comments/abc/x/") is None
+
+    def test_writes_cache_then_serves_from_it(self, tmp_path):
+        raw = _fixture_bytes()
+        cache = ResponseCache(str(tmp_path / "http.sqlite"))
+        fetcher = RedditFetcher(cache=cache, stream_parse=True)
+        url = "https://www.reddit.com/r/t/comments/abc/x/"
+        with patch.object(fetcher.session, "get", return_value=_streaming_response(raw)) as get:
+            first = fetcher.fetch_thread(url)
+            second = fetcher.fetch_thread(url)
+        assert get.call_count == 1
+        assert first == second
+        assert cache.hits == 1
+        cache.close()
+
+    def test_expand_more_uses_streamed_ids(self):
+        raw = _fixture_bytes()
+        fetcher = RedditFetcher(stream_parse=True, expand_more=True)
+        with patch.object(fetcher.session, "get", return_value=_streaming_response(raw)), \
+             patch.object(fetcher, "expand_more_comments") as expand:
+            thread = fetcher.fetch_thread("https://www.reddit.com/r/t/comments/abc/x/")
+        expand.assert_called_once_with(thread, RedditParser()._more_ids(json.loads(raw)))
+        assert len(list(iter_comments(thread.comments))) > 0
+
+
+class TestCli:
+    def test_flag(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com", "--stream-parse"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+        assert MockFinder.call_args.kwargs["stream_parse"] is True
+
+    def test_default_off(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--url", "http://test.com"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+        assert MockFinder.call_args.kwargs["stream_parse"] is False
@@ -0,0 +1,241 @@
+"""
+Tests for thread_gate.py.
+
+Covers:
+- keyword_score: pain-heavy questions beat memes and link dumps
+- hashed_features: bucket range, normalization, title/body separation
+- HashedLogisticModel: learns a separable set, save/load round trip
+- ThreadGate: threshold decisions, audits, skip-rate and false-negative stats
+- ResultStore.labeled_threads as training data
+- GoldmineFinder skips gated threads in batch and Batch API runs
+"""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from ai_analyzer import AnalysisResult, PainPoint
+from result_store import ResultStore
+from thread_gate import (HashedLogisticModel, ThreadGate, evaluate, has_high_intent, hashed_features,
+                         keyword_score)
+
+
+def _thread(id="t1", title="How do you handle invoicing?", selftext="We do it by hand",
+            bodies=("I'd pay for a tool that automates this", "Spreadsheets are a nightmare",
+                    "Same, so frustrating")):
+    return {"id": id, "title": title, "selftext": selftext,
+            "comments": [{"id": f"{id}c{i}", "body": b, "replies": []} for i, b in enumerate(bodies)]}
+
+
+def _meme(id="m1"):
+    return _thread(id, title="Meme Monday: we just hit 10k members", selftext="",
+                   bodies=("lol", "congrats!", "nice"))
+
+
+def _result(thread_id="t1", intent="high"):
+    pain_points = [] if intent is None else [PainPoint(
+        description="Invoicing", severity="high", frequency_mentioned=2, example_comments=[],
+        purchase_intent=intent, category="Finance")]
+    return AnalysisResult(thread_id=thread_id, thread_title="T", total_comments=3, pain_points=pain_points,
+                          key_insights=[], market_opportunities=[], sentiment_summary="")
+
+
+class TestKeywordScore:
+    def test_pain_thread_beats_meme(self):
+        assert keyword_score(_thread()) > 0.5 > keyword_score(_meme())
+
+    def test_link_only_post_scores_lower(self):
+        assert keyword_score(_thread(selftext="")) < keyword_score(_thread())
+
+    def test_empty_thread(self):
+        assert 0 < keyword_score({"title": "", "comments": []}) < 0.1
+
+    def test_nested_replies_are_counted(self):
+        flat = _thread(bodies=())
+        nested = _thread(bodies=())
+        nested["comments"] = [{"body": "ok", "replies": [{"body": "I'd pay for this", "replies": []}]}]
+        assert keyword_score(nested) > keyword_score(flat)
+
+
+class TestHashedFeatures:
+    def test_buckets_in_range_and_normalized(self):
+        indices, values = hashed_features(_thread(), 1024)
+        assert indices.min() >= 0 and indices.max() < 1024
+        assert len(set(indices.tolist())) == len(indices)
+        assert np.linalg.norm(values) == pytest.approx(1.0)
+
+    def test_title_and_body_words_hash_apart(self):
+        a, _ = hashed_features({"title": "invoice", "selftext": ""}, 2 ** 18)
+        b, _ = hashed_features({"title": "", "selftext": "invoice"}, 2 ** 18)
+        assert set(a.tolist()) != set(b.tolist())
+
+    def test_empty(self):
+        indices, values = hashed_features({}, 16)
+        assert len(indices) == len(values) == 0
+
+
+class TestHashedLogisticModel:
+    def _data(self):
+        threads = [_thread(f"p{i}", bodies=(f"invoicing is a nightmare {i}", "would pay for automation"))
+                   for i in range(10)]
+        threads += [_thread(f"n{i}", title=f"Look at my cat {i}", bodies=("cute cat", "so fluffy"))
+                    for i in range(30)]
+        return threads, [True] * 10 + [False] * 30
+
+    def test_learns_separable_data(self):
+        threads, labels = self._data()
+        model = HashedLogisticModel(dim=2 ** 12).fit(threads, labels)
+        scores = [model.predict(t) for t in threads]
+        assert min(scores[:10]) > 0.5 > max(scores[10:])
+
+    def test_save_and_load(self, tmp_path):
+        threads, labels = self._data()
+        model = HashedLogisticModel(dim=2 ** 12).fit(threads, labels, epochs=2)
+        path = str(tmp_path / "gate" / "model.npz")
+        model.save(path)
+
+        loaded = HashedLogisticModel.load(path)
+        assert loaded.dim == 2 ** 12
+        assert loaded.predict(threads[0]) == pytest.approx(model.predict(threads[0]), abs=1e-5)
+
+    def test_needs_both_classes(self):
+        with pytest.raises(ValueError):
+            HashedLogisticModel(dim=16).fit([_thread()], [True])
+
+    def test_dim_power_of_two(self):
+        with pytest.raises(ValueError):
+            HashedLogisticModel(dim=1000)
+
+
+class TestThreadGate:
+    def _gate(self, tmp_path, threshold=0.5, audit_rate=0.0, rand=lambda: 0.99):
+        return ThreadGate(threshold, model_path=str(tmp_path / "missing.npz"),
+                          audit_rate=audit_rate, rand=rand)
+
+    def test_threshold(self, tmp_path):
+        gate = self._gate(tmp_path)
+        assert gate.scorer == "keywords"
+        assert gate.decide(_thread()).analyze
+        assert not gate.decide(_meme()).analyze
+
+    def test_audit_lets_skipped_thread_through(self, tmp_path):
+        gate = self._gate(tmp_path, audit_rate=0.1, rand=lambda: 0.05)
+        decision = gate.decide(_meme())
+        assert not decision.passed
+        assert decision.audit and decision.analyze
+
+    def test_stats(self, tmp_path):
+        rolls = iter([0.01, 0.99])
+        gate = self._gate(tmp_path, audit_rate=0.1, rand=lambda: next(rolls))
+        gate.decide(_thread("t1"))
+        gate.decide(_meme("m1"))  # audited
+        gate.decide(_meme("m2"))  # skipped
+        gate.observe(_result("t1", intent="high"))
+        gate.observe(_result("m1", intent="high"))
+        gate.observe(_result("x", intent="high"))  # not gated: ignored
+
+        stats = gate.stats()
+        assert stats["scored"] == 3
+        assert stats["passed"] == 1 and stats["skipped"] == 2
+        assert stats["skip_rate"] == pytest.approx(2 / 3)
+        assert stats["audited"] == 1 and stats["audit_hits"] == 1
+        assert stats["false_negative_rate"] == 1.0
+        assert stats["hit_rate"] == 1.0
+
+    def test_no_audits_means_unknown_false_negative_rate(self, tmp_path):
+        gate = self._gate(tmp_path)
+        gate.decide(_meme())
+        assert gate.stats()["false_negative_rate"] is None
+
+    def test_uses_trained_model(self, tmp_path):
+        path = str(tmp_path / "model.npz")
+        model = HashedLogisticModel(dim=16)
+        model.bias = 5.0
+        model.save(path)
+
+        gate = ThreadGate(0.5, model_path=path)
+
+        assert gate.scorer == "model"
+        assert gate.score(_meme()) > 0.99
+
+
+class TestHasHighIntent:
+    def test_min_intent(self):
+        assert has_high_intent(_result(intent="high"), "high")
+        assert not has_high_intent(_result(intent="medium"), "high")
+        assert has_high_intent(_result(intent="medium"), "medium")
+        assert not has_high_intent(_result(intent=None), "low")
+
+
+def test_evaluate():
+    rows = evaluate([0.1, 0.4, 0.6, 0.9], [False, True, False, True], [0.5])
+    assert rows == [{"threshold": 0.5, "skip_rate": 0.5, "false_negative_rate": 0.5}]
+
+
+def test_labeled_threads(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    for thread_id, intent in (("a", "high"), ("b", "low"), ("c", None)):
+        thread = _thread(thread_id)
+        thread["comments"][0]["replies"] = [{"id": f"{thread_id}r", "body": "nested", "replies": []}]
+        store.save_thread(thread)
+        store.save_analysis(_result(thread_id, intent))
+    store.save_thread(_thread("unanalyzed"))
+
+    examples = {t["id"]: (t, rank) for t, rank in store.labeled_threads()}
+    store.close()
+
+    assert {k: rank for k, (_, rank) in examples.items()} == {"a": 4, "b": 2, "c": 0}
+    assert len(examples["a"][0]["comments"]) == 4
+    assert examples["a"][0]["title"] == "How do you handle invoicing?"
+
+
+class TestFinderGate:
+    def _finder(self, tmp_path, **kwargs):
+        with patch("goldmine_finder.RedditFetcher"), patch("goldmine_finder.AIAnalyzer"):
+            from goldmine_finder import GoldmineFinder
+            return GoldmineFinder(output_dir=str(tmp_path), gate_threshold=0.5,
+                                  gate_model_path=str(tmp_path / "missing.npz"), **kwargs)
+
+    def test_off_by_default(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("config.GATE_THRESHOLD", 0)
+        with patch("goldmine_finder.RedditFetcher"), patch("goldmine_finder.AIAnalyzer"):
+            from goldmine_finder import GoldmineFinder
+            assert GoldmineFinder(output_dir=str(tmp_path)).gate is None
+
+    def test_skips_low_scoring_threads(self, tmp_path):
+        finder = self._finder(tmp_path)
+        finder.gate.audit_rate = 0
+        threads = {"t1": _thread("t1"), "m1": _meme("m1")}
+
+        def analyze(thread, thread_dict):
+            result = _result(thread_dict["id"])
+            finder.gate.observe(result)
+            return {"thread": thread_dict, "analysis": result}
+
+        with patch.object(finder, "_fetch_and_save", side_effect=lambda url: url), \
+             patch.object(finder, "_thread_to_dict", side_effect=lambda url: threads[url]), \
+             patch.object(finder, "_analyze_and_report", side_effect=analyze) as mock_analyze, \
+             patch.object(finder, "_generate_summary_report"):
+            results = finder.batch_analyze_urls(["t1", "m1"])
+
+        assert [r["thread"]["id"] for r in results] == ["t1"]
+        assert mock_analyze.call_count == 1
+        stats = finder.gate.stats()
+        assert stats["skipped"] == 1 and stats["passed_hits"] == 1
+
+    def test_batch_api_submits_only_passed_threads(self, tmp_path):
+        finder = self._finder(tmp_path, batch_api=True, batch_client=MagicMock())
+        finder.gate.audit_rate = 0
+        threads = {"t1": _thread("t1"), "m1": _meme("m1")}
+        finder.batch_runner = MagicMock()
+        finder.batch_runner.pending.return_value = False
+        finder.batch_runner.run.return_value = None
+
+        with patch.object(finder, "_fetch_and_save", side_effect=lambda url: url), \
+             patch.object(finder, "_thread_to_dict", side_effect=lambda url: threads[url]):
+            finder._run_pipeline(["t1", "m1"], label="SaaS")
+
+        submitted, label = finder.batch_runner.run.call_args.args
+        assert [t["id"] for t in submitted] == ["t1"]
+        assert label == "SaaS"
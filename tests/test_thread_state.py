@@ -0,0 +1,242 @@
+"""
+Tests for thread_state.py and watch mode (GoldmineFinder.watch_subreddit).
+
+Covers:
+- needs_analysis: new threads, growth threshold
+- seen comment ids and analysis hash persistence
+- merge_results folding new comments into a stored analysis
+- Watch pass: unchanged threads skipped, grown threads send only new comments
+- Only comments actually sent are marked seen; failed updates record nothing
+- --watch CLI wiring
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai_analyzer import (FAILED_SENTIMENT, AIAnalyzer, AnalysisResult, PainPoint, analysis_from_dict, analysis_to_dict,
+                         merge_results)
+from reddit_fetcher import Comment, Thread
+from thread_state import ThreadStateStore, analysis_hash
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ThreadStateStore(str(tmp_path / "state.sqlite"), min_new_comments=10)
+    yield store
+    store.close()
+
+
+def _post(id="t1", num_comments=20, score=5):
+    return {"id": id, "title": f"Post {id}", "num_comments": num_comments, "score": score,
+            "subreddit": "test", "permalink": f"https://www.reddit.com/r/test/comments/{id}/"}
+
+
+def _pp(description, freq=1):
+    return PainPoint(description=description, severity="medium", frequency_mentioned=freq,
+                     example_comments=[], purchase_intent="low", category="Ops")
+
+
+def _result(pain_points=(), analyzed=5, tokens=100, total=5, sentiment="ok", comment_ids=("c1", "c2")):
+    return AnalysisResult(thread_id="t1", thread_title="Post t1", total_comments=total,
+                          pain_points=list(pain_points), key_insights=[], market_opportunities=[],
+                          sentiment_summary=sentiment, analyzed_comments=analyzed, tokens_used=tokens,
+                          comment_ids=list(comment_ids))
+
+
+class TestThreadStateStore:
+    def test_new_thread_needs_analysis(self, store):
+        assert store.needs_analysis(_post())
+
+    def test_growth_threshold(self, store):
+        store.record_analysis("t1", "test", 20, 5, {"pain_points": []}, ["c1"])
+        assert not store.needs_analysis(_post(num_comments=29))
+        assert store.needs_analysis(_post(num_comments=30))
+
+    def test_observed_only_still_needs_analysis(self, store):
+        store.observe(_post())
+        assert store.needs_analysis(_post())
+        assert store.get("t1").score == 5
+
+    def test_observe_keeps_analysis(self, store):
+        store.record_analysis("t1", "test", 20, 5, {"pain_points": []}, [])
+        store.observe(_post(score=99))
+        state = store.get("t1")
+        assert state.score == 99
+        assert state.analysis == {"pain_points": []}
+
+    def test_seen_ids_accumulate(self, store):
+        store.record_analysis("t1", "test", 2, 1, {}, ["c1", "c2"])
+        store.record_analysis("t1", "test", 3, 1, {}, ["c2", "c3"])
+        assert store.seen_comment_ids("t1") == {"c1", "c2", "c3"}
+        assert store.seen_comment_ids("other") == set()
+
+    def test_hash_stored_and_persisted(self, tmp_path):
+        path = str(tmp_path / "s.sqlite")
+        analysis = {"pain_points": [{"description": "x"}]}
+        ThreadStateStore(path).record_analysis("t1", "test", 1, 1, analysis, [])
+        state = ThreadStateStore(path).get("t1")
+        assert state.analysis_hash == analysis_hash(analysis)
+        assert state.analysis == analysis
+
+
+class TestMergeResults:
+    def test_folds_new_findings(self):
+        previous = _result([_pp("Manual invoicing takes hours", 3)], analyzed=10, total=10)
+        update = _result([_pp("Manual invoicing takes hours every week", 2), _pp("No mobile app")],
+                         analyzed=4, tokens=50, total=4, sentiment="worse")
+        merged = merge_results(previous, update)
+        assert [pp.frequency_mentioned for pp in merged.pain_points] == [5, 1]
+        assert merged.analyzed_comments == 14
+        assert merged.total_comments == 14
+        assert merged.tokens_used == 50
+        assert merged.sentiment_summary == "worse"
+
+    def test_failed_update_keeps_sentiment(self):
+        previous = _result([_pp("Manual invoicing takes hours", 3)], sentiment="frustrated")
+        merged = merge_results(previous, _result(sentiment=FAILED_SENTIMENT))
+        assert merged.sentiment_summary == "frustrated"
+        assert [pp.frequency_mentioned for pp in merged.pain_points] == [3]
+
+    def test_dict_roundtrip(self):
+        result = _result([_pp("A problem", 2)])
+        again = analysis_from_dict(analysis_to_dict(result))
+        assert again.pain_points == result.pain_points
+        assert again.thread_id == "t1"
+
+
+def _make_finder(tmp_path):
+    with patch("goldmine_finder.RedditFetcher"), patch("goldmine_finder.AIAnalyzer"):
+        from goldmine_finder import GoldmineFinder
+        finder = GoldmineFinder(output_dir=str(tmp_path / "out"),
+                                state_path=str(tmp_path / "state.sqlite"), min_new_comments=10)
+    finder.analyzer.generate_report.return_value = "report"
+    return finder
+
+
+def _thread(comment_ids, num_comments, bodies=None):
+    bodies = bodies or {}
+    comments = [Comment(id=cid, author="u", body=bodies.get(cid, f"comment body {cid}"), score=1,
+                        created_utc=0, parent_id="t3_t1", gilded=0) for cid in comment_ids]
+    return Thread(id="t1", title="Post t1", author="op", selftext="", score=5,
+                  num_comments=num_comments, created_utc=0, url="", subreddit="test",
+                  upvote_ratio=1.0, comments=comments)
+
+
+def _analyzer(*answers):
+    """AIAnalyzer whose client returns *answers* in turn"""
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.model = "gpt-4.1-mini"
+    analyzer.map_reduce = False
+    analyzer.client = MagicMock()
+    analyzer.client.chat.completions.create.side_effect = [
+        SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))],
+                        usage=SimpleNamespace(total_tokens=100, completion_tokens=10))
+        for answer in answers
+    ]
+    return analyzer
+
+
+ANSWER = json.dumps({"pain_points": [], "key_insights": [], "market_opportunities": [],
+                     "sentiment_summary": "neutral"})
+
+
+class TestWatchSubreddit:
+    def _run(self, finder, post, thread):
+        finder.fetcher.iter_subreddit.return_value = iter([post])
+        with patch.object(finder, "_fetch_and_save", return_value=thread):
+            return finder.watch_subreddit("test")
+
+    def test_first_pass_full_then_skip_unchanged(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        finder.analyzer.analyze_thread.return_value = _result([_pp("Invoices arrive late")])
+
+        assert len(self._run(finder, _post(num_comments=20), _thread(["c1", "c2"], 20))) == 1
+        finder.analyzer.analyze_thread.assert_called_once()
+        assert finder.analyzer.analyze_thread.call_args.kwargs == {}
+
+        # Same thread, 5 new comments: below threshold, no LLM work
+        assert self._run(finder, _post(num_comments=25), _thread(["c1", "c2"], 25)) == []
+        assert finder.analyzer.analyze_thread.call_count == 1
+
+    def test_grown_thread_sends_only_new_comments(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        finder.analyzer.analyze_thread.return_value = _result([_pp("Invoices arrive late", 2)])
+        self._run(finder, _post(num_comments=20), _thread(["c1", "c2"], 20))
+
+        finder.analyzer.analyze_thread.return_value = _result([_pp("Payroll export broken")], analyzed=1, tokens=30,
+                                                              comment_ids=["c3"])
+        results = self._run(finder, _post(num_comments=40), _thread(["c1", "c2", "c3"], 40))
+
+        assert finder.analyzer.analyze_thread.call_args.kwargs["skip_comment_ids"] == {"c1", "c2"}
+        merged = results[0]["analysis"]
+        assert [pp.description for pp in merged.pain_points] == ["Invoices arrive late", "Payroll export broken"]
+        assert merged.tokens_used == 30
+
+        state = finder.state.get("t1")
+        assert state.num_comments == 40
+        assert len(state.analysis["pain_points"]) == 2
+        assert finder.state.seen_comment_ids("t1") == {"c1", "c2", "c3"}
+
+    def test_grown_thread_without_usable_comments_skips_llm(self, tmp_path):
+        finder = _make_finder(tmp_path)
+        finder.analyzer.analyze_thread.return_value = _result([_pp("Invoices arrive late", 2)])
+        self._run(finder, _post(num_comments=20), _thread(["c1", "c2"], 20))
+
+        thread = _thread(["c1", "c2", "c3", "c4"], 40, bodies={"c3": "[deleted]", "c4": "+1"})
+        results = self._run(finder, _post(num_comments=40), thread)
+
+        finder.analyzer.analyze_thread.assert_called_once()
+        kept = results[0]["analysis"]
+        assert [(pp.description, pp.frequency_mentioned) for pp in kept.pain_points] == \
+               [("Invoices arrive late", 2)]
+        assert kept.sentiment_summary == "ok"
+        state = finder.state.get("t1")
+        assert state.num_comments == 40
+        assert finder.state.seen_comment_ids("t1") == {"c1", "c2"}
+
+    def test_comments_over_the_cap_are_analyzed_next_pass(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("config.MAX_COMMENTS", 2)
+        monkeypatch.setattr("config.RANK_COMMENTS", False)
+        finder = _make_finder(tmp_path)
+        finder.analyzer = _analyzer(ANSWER, ANSWER)
+
+        self._run(finder, _post(num_comments=20), _thread(["c1", "c2", "c3", "c4"], 20))
+        assert finder.state.seen_comment_ids("t1") == {"c1", "c2"}
+
+        self._run(finder, _post(num_comments=40), _thread(["c1", "c2", "c3", "c4", "c5"], 40))
+        prompt = finder.analyzer.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert "comment body c3" in prompt and "comment body c4" in prompt
+        assert "comment body c1" not in prompt
+        # c5 is over the cap this time and stays pending
+        assert finder.state.seen_comment_ids("t1") == {"c1", "c2", "c3", "c4"}
+
+    def test_failed_update_records_nothing(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("config.REPAIR_MALFORMED", False)
+        finder = _make_finder(tmp_path)
+        finder.analyzer = _analyzer(ANSWER, "not json")
+        self._run(finder, _post(num_comments=20), _thread(["c1", "c2"], 20))
+
+        results = self._run(finder, _post(num_comments=40), _thread(["c1", "c2", "c3"], 40))
+
+        assert results[0]["analysis"].sentiment_summary == "neutral"
+        state = finder.state.get("t1")
+        assert state.num_comments == 20
+        assert finder.state.seen_comment_ids("t1") == {"c1", "c2"}
+        assert finder.state.needs_analysis(_post(num_comments=40))
+
+
+class TestCliWatch:
+    def test_watch_dispatch(self):
+        with patch("sys.argv", ["goldmine_finder.py", "--subreddit", "SaaS", "--watch",
+                                 "--min-new-comments", "25"]), \
+             patch("goldmine_finder.GoldmineFinder") as MockFinder:
+            from goldmine_finder import main
+            main()
+            assert MockFinder.call_args.kwargs["min_new_comments"] == 25
+            MockFinder.return_value.watch_subreddit.assert_called_once_with(
+                "SaaS", limit=10, min_comments=5, sort="hot", max_age_hours=None,
+            )
+            MockFinder.return_value.analyze_subreddit.assert_not_called()
@@ -0,0 +1,189 @@
+"""
+Tests for tiered_analyzer.py: TieredAnalyzer with a mocked OpenAI client.
+
+Covers:
+- Triage on the cheap model, escalation to the full model above the thresholds
+- Non-escalated threads get an empty analysis recording the verdict
+- Unparseable triage answers escalate
+- Triage answers are cached
+- Per-tier token, cost and latency stats
+- estimate_cost pricing lookup
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai_analyzer import estimate_cost
+from llm_cache import AnalysisCache
+from tests.conftest import make_thread_dict
+from tiered_analyzer import TieredAnalyzer
+
+ANALYSIS = {
+    "pain_points": [{"description": "Invoicing takes hours", "severity": "high", "frequency_mentioned": 3,
+                     "example_comments": [], "purchase_intent": "high", "category": "Finance"}],
+    "key_insights": ["Billing is manual"],
+    "market_opportunities": ["Invoice automation"],
+    "sentiment_summary": "negative",
+}
+
+
+def _response(content, total=100, completion=20):
+    text = content if isinstance(content, str) else json.dumps(content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(total_tokens=total, completion_tokens=completion),
+    )
+
+
+def _triage(likelihood, count=2, reason="people ask for tools"):
+    return _response({"goldmine_likelihood": likelihood, "pain_point_count": count, "reason": reason},
+                     total=300, completion=30)
+
+
+def _analyzer(*responses, cache=None, **kwargs):
+    ticks = iter(range(0, 1000, 2))
+    analyzer = TieredAnalyzer(model="gpt-4.1", triage_model="gpt-4.1-nano", api_key="test",
+                              cache=cache, map_reduce=False, clock=lambda: next(ticks), **kwargs)
+    analyzer.client = MagicMock()
+    analyzer.client.chat.completions.create.side_effect = list(responses)
+    return analyzer
+
+
+def _models(analyzer):
+    return [c.kwargs["model"] for c in analyzer.client.chat.completions.create.call_args_list]
+
+
+class TestRouting:
+    def test_escalates_likely_goldmine(self):
+        analyzer = _analyzer(_triage(0.9), _response(ANALYSIS, total=2000, completion=500))
+
+        result = analyzer.analyze_thread(make_thread_dict())
+
+        assert _models(analyzer) == ["gpt-4.1-nano", "gpt-4.1"]
+        assert result.pain_points[0].description == "Invoicing takes hours"
+        # Both tiers are counted in the result's usage
+        assert result.tokens_used == 2300
+        assert result.completion_tokens == 530
+
+    def test_triage_prompt_is_short(self):
+        analyzer = _analyzer(_triage(0.1))
+        analyzer.analyze_thread(make_thread_dict())
+
+        kwargs = analyzer.client.chat.completions.create.call_args.kwargs
+        assert kwargs["max_tokens"] == 150
+        assert kwargs["response_format"] == {"type": "json_object"}
+        assert "goldmine_likelihood" in kwargs["messages"][0]["content"]
+        assert "comment number 0" in kwargs["messages"][1]["content"]
+
+    def test_low_likelihood_not_escalated(self):
+        analyzer = _analyzer(_triage(0.2, reason="a meme"))
+
+        result = analyzer.analyze_thread(make_thread_dict())
+
+        assert _models(analyzer) == ["gpt-4.1-nano"]
+        assert result.pain_points == []
+        assert result.thread_id == "t1"
+        assert "Not escalated by triage" in result.sentiment_summary
+        assert "a meme" in result.sentiment_summary
+        assert result.tokens_used == 300
+
+    def test_too_few_pain_points_not_escalated(self):
+        analyzer = _analyzer(_triage(0.9, count=1), min_pain_points=2)
+        analyzer.analyze_thread(make_thread_dict())
+        assert _models(analyzer) == ["gpt-4.1-nano"]
+
+    def test_threshold_is_configurable(self, monkeypatch):
+        monkeypatch.setattr("config.TIER_TRIAGE_THRESHOLD", 0.1)
+        analyzer = _analyzer(_triage(0.2), _response(ANALYSIS))
+        analyzer.analyze_thread(make_thread_dict())
+        assert _models(analyzer) == ["gpt-4.1-nano", "gpt-4.1"]
+
+    @pytest.mark.parametrize("answer", ["not json", '{"goldmine_likelihood": "high"}', "[1]"])
+    def test_unusable_triage_escalates(self, answer):
+        analyzer = _analyzer(_response(answer), _response(ANALYSIS))
+        result = analyzer.analyze_thread(make_thread_dict())
+        assert _models(analyzer) == ["gpt-4.1-nano", "gpt-4.1"]
+        assert len(result.pain_points) == 1
+
+    def test_likelihood_clamped(self):
+        analyzer = _analyzer(_triage(7), _response(ANALYSIS))
+        assert analyzer.triage("t", "b", ["c"]).likelihood == 1.0
+
+    def test_stream_goes_through_triage(self):
+        analyzer = _analyzer(_triage(0.1))
+        events = list(analyzer.analyze_thread_stream(make_thread_dict()))
+        assert [k for k, _ in events] == ["result"]
+        assert "Not escalated" in events[0][1].sentiment_summary
+
+
+class TestTriageCache:
+    def test_triage_answer_reused(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+        _analyzer(_triage(0.2), cache=cache).analyze_thread(make_thread_dict())
+
+        again = _analyzer(cache=cache)
+        result = again.analyze_thread(make_thread_dict())
+
+        again.client.chat.completions.create.assert_not_called()
+        assert result.cache_hit
+        assert again.tier_stats["triage"].cache_hits == 1
+        cache.close()
+
+    def test_unusable_answer_not_cached(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "llm.sqlite"))
+        _analyzer(_response("not json"), _response(ANALYSIS), cache=cache).analyze_thread(make_thread_dict())
+
+        again = _analyzer(_triage(0.2), cache=cache)
+        again.analyze_thread(make_thread_dict())
+
+        assert _models(again) == ["gpt-4.1-nano"]
+        cache.close()
+
+
+class TestTierStats:
+    def test_tokens_cost_and_latency_per_tier(self):
+        analyzer = _analyzer(_triage(0.9), _response(ANALYSIS, total=2000, completion=500),
+                             _triage(0.1, reason="meme"))
+        analyzer.analyze_thread(make_thread_dict("a"))
+        analyzer.analyze_thread(make_thread_dict("b"))
+
+        triage, full = analyzer.tier_stats["triage"], analyzer.tier_stats["full"]
+        assert (triage.threads, triage.input_tokens, triage.output_tokens) == (2, 540, 60)
+        assert (full.threads, full.input_tokens, full.output_tokens) == (1, 1500, 500)
+        assert triage.cost == pytest.approx((540 * 0.10 + 60 * 0.40) / 1e6)
+        assert full.cost == pytest.approx((1500 * 2.00 + 500 * 8.00) / 1e6)
+        assert triage.seconds == 4 and full.seconds == 2
+
+    def test_log_tier_stats(self, caplog):
+        analyzer = _analyzer(_triage(0.9), _response(ANALYSIS))
+        analyzer.analyze_thread(make_thread_dict())
+
+        with caplog.at_level("INFO", logger="tiered_analyzer"):
+            analyzer.log_tier_stats()
+
+        assert "1 of 1 threads escalated (100%)" in caplog.text
+        assert "Tier triage (gpt-4.1-nano)" in caplog.text
+
+
+class TestEstimateCost:
+    def test_known_model(self):
+        assert estimate_cost("gpt-4.1-mini", 1_000_000, 1_000_000) == pytest.approx(2.0)
+
+    def test_dated_snapshot_uses_base_price(self):
+        assert estimate_cost("gpt-4.1-mini-2025-04-14", 1_000_000, 0) == pytest.approx(0.40)
+
+    def test_unknown_model(self):
+        assert estimate_cost("my-model", 10, 10) is None
+
+
+class TestFinderTiered:
+    def test_uses_tiered_analyzer(self, tmp_path):
+        with patch("goldmine_finder.RedditFetcher"), patch("goldmine_finder.TieredAnalyzer") as tiered:
+            from goldmine_finder import GoldmineFinder
+            finder = GoldmineFinder(output_dir=str(tmp_path), tiered=True)
+            assert finder.analyzer is tiered.return_value
+            finder.log_cache_stats()
+            tiered.return_value.log_tier_stats.assert_called_once_with()
@@ -0,0 +1,110 @@
+"""
+Tests for token_counter.py: local token counts and prompt packing.
+
+Covers:
+- Estimator calibration (ASCII vs CJK)
+- truncate_to_tokens marker and bound
+- pack_comments budget, per-comment cap, and order
+- AnalysisResult.packed_tokens reported by AIAnalyzer
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import token_counter
+from token_counter import (
+    TRUNCATION_MARKER,
+    count_tokens,
+    estimate_tokens,
+    pack_comments,
+    truncate_to_tokens,
+)
+
+
+@pytest.fixture(autouse=True)
+def estimator_only():
+    """Pin the estimator so results do not depend on tiktoken being installed"""
+    with patch.object(token_counter, "tiktoken", None):
+        token_counter._encoding.cache_clear()
+        yield
+    token_counter._encoding.cache_clear()
+
+
+class TestEstimator:
+    def test_empty(self):
+        assert estimate_tokens("") == 0
+
+    def test_ascii_four_chars_per_token(self):
+        assert estimate_tokens("a" * 400) == 100
+
+    def test_cjk_one_token_per_char(self):
+        assert estimate_tokens("価格が高すぎる") == 7
+
+    def test_count_tokens_falls_back(self):
+        assert count_tokens("hello world!") == estimate_tokens("hello world!")
+
+
+class TestTruncate:
+    def test_short_text_unchanged(self):
+        assert truncate_to_tokens("short", 10) == "short"
+
+    def test_long_text_marked_and_bounded(self):
+        text = "word " * 500
+        out = truncate_to_tokens(text, 50)
+        assert out.endswith(TRUNCATION_MARKER)
+        assert count_tokens(out) <= 50
+
+
+class TestPackComments:
+    def test_fills_budget_in_order(self):
+        comments = ["x" * 200] * 10  # 50 tokens + overhead each
+        packed = pack_comments(comments, budget=200, max_comment_tokens=400)
+        assert packed.consumed == 3
+        assert packed.comments == comments[:3]
+        assert packed.tokens <= 200
+
+    def test_many_short_comments(self):
+        comments = [f"ok {i}" for i in range(300)]
+        packed = pack_comments(comments, budget=6000, max_comment_tokens=400)
+        assert packed.consumed == 300
+
+    def test_long_comment_truncated(self):
+        packed = pack_comments(["z" * 10_000, "next"], budget=6000, max_comment_tokens=100)
+        assert packed.consumed == 2
+        assert packed.comments[0].endswith(TRUNCATION_MARKER)
+        assert count_tokens(packed.comments[0]) <= 100
+
+    def test_first_comment_always_included(self):
+        packed = pack_comments(["z" * 10_000], budget=50, max_comment_tokens=400)
+        assert packed.consumed == 1
+        assert packed.tokens <= 50
+
+    def test_empty(self):
+        packed = pack_comments([], budget=100)
+        assert (packed.comments, packed.tokens, packed.consumed) == ([], 0, 0)
+
+
+class TestAnalyzerReportsPromptTokens:
+    def test_packed_tokens_on_result(self):
+        from ai_analyzer import AIAnalyzer
+
+        analyzer = AIAnalyzer.__new__(AIAnalyzer)
+        analyzer.model = "gpt-4.1-mini"
+        analyzer.map_reduce = False
+        completion = MagicMock()
+        completion.choices[0].message.content = "{}"
+        completion.usage.total_tokens = 10
+        analyzer.client = MagicMock()
+        analyzer.client.chat.completions.create.return_value = completion
+
+        thread = {"id": "t", "title": "T", "selftext": "",
+                  "comments": [{"body": " ".join(f"c{i}w{j}" for j in range(400)), "replies": []}
+                               for i in range(10)]}
+        with patch("config.PROMPT_TOKEN_BUDGET", 1000), patch("config.MAX_COMMENT_TOKENS", 400):
+            result = analyzer.analyze_thread(thread)
+
+        assert result.analyzed_comments == 2
+        assert 0 < result.packed_tokens <= 1000
+        prompt = analyzer.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert "Comment 2:" in prompt and "Comment 3:" not in prompt
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Thread Gate
+Cheap local pre-classifier run between fetch and AI analysis: threads
+unlikely to contain high-intent pain points (memes, milestone posts, link
+dumps) are skipped instead of being sent to the LLM
+
+Scores come from a keyword/regex scorer, or from a hashed-feature logistic
+regression trained on past analyses in the result database when one exists.
+
+Usage:
+  python thread_gate.py train --db output/goldmine.sqlite
+  python thread_gate.py evaluate --db output/goldmine.sqlite --thresholds 0.1 0.2 0.3
+"""
+
+import argparse
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import config as cfg
+from ai_analyzer import INTENT_ORDER, AnalysisResult
+from comment_ranker import PAIN_RE
+from reddit_fetcher import iter_comment_dicts
+
+logger = logging.getLogger(__name__)
+
+# Title phrases of posts that rarely describe a problem
+LOW_SIGNAL_PATTERNS = [
+    r"memes?", r"shitpost", r"funny", r"humou?r", r"celebrat\w*", r"milestone", r"congrat\w*",
+    r"just (?:hit|reached|crossed|passed|launched)", r"we did it", r"finally (?:hit|reached|made)",
+    r"giveaway", r"ama", r"ask me anything", r"appreciation", r"showcase", r"show off",
+    r"weekly (?:thread|discussion)", r"daily (?:thread|discussion)", r"throwback",
+]
+LOW_SIGNAL_RE = re.compile(r"\b(?:" + "|".join(LOW_SIGNAL_PATTERNS) + r")\b")
+_QUESTION_RE = re.compile(r"\?|^(?:how|what|which|why|any|is there|does anyone|anyone)\b")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Comments considered per thread (the gate must stay much cheaper than the LLM)
+MAX_COMMENTS = 200
+
+# Keyword features, scaled to roughly [0, 1], and the hand-set weights of the keyword scorer
+KEYWORD_FEATURES = ('pain_share', 'pain_hits', 'post_pain', 'question', 'low_signal', 'link_only')
+KEYWORD_WEIGHTS = np.array([4.0, 2.0, 1.5, 1.0, -2.5, -0.75])
+KEYWORD_BIAS = -2.0
+
+
+def _sigmoid(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-max(min(x, 30.0), -30.0)))
+
+
+def _comment_bodies(thread: Dict[str, Any]) -> List[str]:
+    bodies = []
+    for comment in iter_comment_dicts(thread.get('comments') or []):
+        bodies.append((comment.get('body') or '').lower())
+        if len(bodies) >= MAX_COMMENTS:
+            break
+    return bodies
+
+
+def keyword_features(thread: Dict[str, Any]) -> np.ndarray:
+    """KEYWORD_FEATURES of a thread dict (thread_<id>.json format)"""
+    title = (thread.get('title') or '').lower()
+    selftext = (thread.get('selftext') or '').lower()
+    hits = [len(PAIN_RE.findall(body)) for body in _comment_bodies(thread)]
+    return np.array([
+        sum(1 for h in hits if h) / len(hits) if hits else 0.0,
+        min(math.log1p(sum(hits)) / math.log1p(50), 1.0),
+        min(len(PAIN_RE.findall(f"{title}\n{selftext}")), 3) / 3.0,
+        1.0 if _QUESTION_RE.search(title) else 0.0,
+        1.0 if LOW_SIGNAL_RE.search(title) else 0.0,
+        0.0 if selftext.strip() else 1.0,
+    ])
+
+
+def keyword_score(thread: Dict[str, Any]) -> float:
+    """Rough probability (0-1) that a thread has high-intent pain points, from keywords alone"""
+    return _sigmoid(KEYWORD_BIAS + float(KEYWORD_WEIGHTS @ keyword_features(thread)))
+
+
+def hashed_features(thread: Dict[str, Any], dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse bag of word unigrams and bigrams hashed into *dim* buckets.
+
+    Title words are hashed separately from post/comment words. Counts are
+    log-scaled and the vector is L2-normalized.
+
+    Returns:
+        (bucket indices, values)
+    """
+    counts: Dict[int, int] = {}
+    texts = [('t', (thread.get('title') or '').lower()),
+             ('b', (thread.get('selftext') or '').lower())]
+    texts.extend(('b', body) for body in _comment_bodies(thread))
+    for prefix, text in texts:
+        words = _WORD_RE.findall(text)
+        tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for token in tokens:
+            bucket = zlib.crc32(f"{prefix}:{token}".encode('utf-8')) & (dim - 1)
+            counts[bucket] = counts.get(bucket, 0) + 1
+
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.log1p(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+class HashedLogisticModel:
+    """Logistic regression over hashed text features plus the keyword features"""
+
+    def __init__(self, dim: int = 2 ** 18):
+        if dim <= 0 or dim & (dim - 1):
+            raise ValueError(f"dim must be a power of two: {dim}")
+        self.dim = dim
+        self.weights = np.zeros(dim)
+        self.keyword_weights = np.zeros(len(KEYWORD_FEATURES))
+        self.bias = 0.0
+
+    def _features(self, thread: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        indices, values = hashed_features(thread, self.dim)
+        return indices, values, keyword_features(thread)
+
+    def _logit(self, indices: np.ndarray, values: np.ndarray, keywords: np.ndarray) -> float:
+        return float(self.weights[indices] @ values + self.keyword_weights @ keywords + self.bias)
+
+    def predict(self, thread: Dict[str, Any]) -> float:
+        """Probability (0-1) that the thread has high-intent pain points"""
+        return _sigmoid(self._logit(*self._features(thread)))
+
+    def fit(self, threads: Sequence[Dict[str, Any]], labels: Sequence[bool], epochs: int = 10,
+            learning_rate: float = 0.5, l2: float = 1e-5, seed: int = 0) -> 'HashedLogisticModel':
+        """
+        Train with SGD on log loss. Classes are weighted so that the (usually
+        rare) positive threads count as much as all negatives together.
+        """
+        examples = [self._features(t) for t in threads]
+        y = np.asarray(labels, dtype=np.float64)
+        n = len(y)
+        positives = float(y.sum())
+        if n == 0 or positives in (0, n):
+            raise ValueError("training data needs both positive and negative threads")
+        class_weight = {1.0: n / (2 * positives), 0.0: n / (2 * (n - positives))}
+
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            for i in rng.permutation(n).tolist():
+                indices, values, keywords = examples[i]
+                error = (_sigmoid(self._logit(indices, values, keywords)) - y[i]) * class_weight[y[i]]
+                self.weights[indices] -= learning_rate * (error * values + l2 * self.weights[indices])
+                self.keyword_weights -= learning_rate * (error * keywords + l2 * self.keyword_weights)
+                self.bias -= learning_rate * error
+        return self
+
+    def save(self, path: str):
+        """Write the model as .npz (atomically)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, weights=self.weights.astype(np.float32),
+                                keyword_weights=self.keyword_weights, bias=self.bias)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'HashedLogisticModel':
+        with np.load(path) as data:
+            model = cls(dim=len(data['weights']))
+            model.weights = data['weights'].astype(np.float64)
+            model.keyword_weights = data['keyword_weights']
+            model.bias = float(data['bias'])
+        return model
+
+
+def has_high_intent(result: AnalysisResult, min_intent: str | None = None) -> bool:
+    """Whether an analysis found a pain point with at least *min_intent* purchase intent"""
+    rank = INTENT_ORDER[min_intent or cfg.GATE_MIN_INTENT]
+    return any(INTENT_ORDER.get(pp.purchase_intent, 0) >= rank for pp in result.pain_points)
+
+
+@dataclass
+class GateDecision:
+    score: float
+    passed: bool
+    # Below the threshold but analyzed anyway to measure misses
+    audit: bool = False
+
+    @property
+    def analyze(self) -> bool:
+        return self.passed or self.audit
+
+
+class ThreadGate:
+    """
+    Decides which fetched threads go to AI analysis (thread-safe).
+
+    A small random share of below-threshold threads is analyzed anyway; the
+    share of those that turn out to have high-intent pain points estimates
+    the false-negative rate of the skipped rest.
+    """
+
+    def __init__(self, threshold: float | None = None, model_path: str | None = None,
+                 audit_rate: float | None = None, rand=random.random):
+        """
+        Args:
+            threshold: Minimum score to analyze. Defaults to config.GATE_THRESHOLD.
+            model_path: Trained HashedLogisticModel. Defaults to
+                config.GATE_MODEL_PATH; the keyword scorer is used when the
+                file does not exist.
+            audit_rate: Share of skipped threads analyzed anyway.
+                Defaults to config.GATE_AUDIT_RATE.
+            rand: Random source in [0, 1) (injectable for tests).
+        """
+        self.threshold = threshold if threshold is not None else cfg.GATE_THRESHOLD
+        self.audit_rate = audit_rate if audit_rate is not None else cfg.GATE_AUDIT_RATE
+        self._rand = rand
+        self.model: Optional[HashedLogisticModel] = None
+        path = model_path or cfg.GATE_MODEL_PATH
+        if os.path.exists(path):
+            self.model = HashedLogisticModel.load(path)
+            logger.info("Thread gate: using model %s", path)
+        elif model_path:
+            logger.warning("Thread gate: no model at %s, using the keyword scorer", model_path)
+        self._lock = threading.Lock()
+        self._counts = {'scored': 0, 'passed': 0, 'skipped': 0, 'audited': 0,
+                        'passed_hits': 0, 'audit_hits': 0}
+        self._decisions: Dict[str, GateDecision] = {}
+
+    @property
+    def scorer(self) -> str:
+        return "model" if self.model else "keywords"
+
+    def score(self, thread: Dict[str, Any]) -> float:
+        return self.model.predict(thread) if self.model else keyword_score(thread)
+
+    def decide(self, thread: Dict[str, Any]) -> GateDecision:
+        """Score a thread dict and decide whether to analyze it"""
+        score = self.score(thread)
+        passed = score >= self.threshold
+        decision = GateDecision(score, passed, audit=not passed and self._rand() < self.audit_rate)
+        with self._lock:
+            self._counts['scored'] += 1
+            self._counts['passed' if passed else 'skipped'] += 1
+            self._counts['audited'] += decision.audit
+            if decision.analyze:
+                self._decisions[thread.get('id', '')] = decision
+
+        title = thread.get('title', '')
+        if passed:
+            logger.info("Gate %.2f >= %.2f: analyzing %s", score, self.threshold, title)
+        elif decision.audit:
+            logger.info("Gate %.2f < %.2f: auditing %s", score, self.threshold, title)
+        else:
+            logger.info("Gate %.2f < %.2f: skipping %s", score, self.threshold, title)
+        return decision
+
+    def observe(self, result: AnalysisResult):
+        """Record the analysis of a thread this gate let through"""
+        with self._lock:
+            decision = self._decisions.pop(result.thread_id, None)
+            if decision and has_high_intent(result):
+                self._counts['passed_hits' if decision.passed else 'audit_hits'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counts plus skip_rate, false_negative_rate (high-intent share of
+        audited threads) and hit_rate (high-intent share of passed threads)
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counts)
+        stats['skip_rate'] = stats['skipped'] / stats['scored'] if stats['scored'] else 0.0
+        stats['false_negative_rate'] = (stats['audit_hits'] / stats['audited']
+                                        if stats['audited'] else None)
+        stats['hit_rate'] = stats['passed_hits'] / stats['passed'] if stats['passed'] else None
+        return stats
+
+
+def evaluate(scores: Sequence[float], labels: Sequence[bool],
+             thresholds: Iterable[float]) -> List[Dict[str, float]]:
+    """
+    Skip rate and false-negative rate (share of positive threads that
+    would be skipped) for each threshold.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=bool)
+    positives = int(labels.sum())
+    rows = []
+    for threshold in thresholds:
+        skipped = scores < threshold
+        rows.append({
+            'threshold': threshold,
+            'skip_rate': float(skipped.mean()) if len(scores) else 0.0,
+            'false_negative_rate': float((skipped & labels).sum() / positives) if positives else 0.0,
+        })
+    return rows
+
+
+def _load_examples(db_path: str, min_intent: str) -> Tuple[List[Dict[str, Any]], List[bool]]:
+    from result_store import ResultStore
+
+    store = ResultStore(db_path)
+    try:
+        rank = INTENT_ORDER[min_intent]
+        examples = list(store.labeled_threads())
+    finally:
+        store.close()
+    return [t for t, _ in examples], [r >= rank for _, r in examples]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(
+        description='Train and evaluate the local thread gate',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Usage:', 1)[1],
+    )
+    parser.add_argument('--db', default=cfg.RESULT_DB_PATH, help=f'Result database (default: {cfg.RESULT_DB_PATH})')
+    parser.add_argument('--model', default=cfg.GATE_MODEL_PATH, help=f'Model file (default: {cfg.GATE_MODEL_PATH})')
+    parser.add_argument('--min-intent', choices=list(INTENT_ORDER), default=cfg.GATE_MIN_INTENT,
+                        help=f'Purchase intent that counts as a hit (default: {cfg.GATE_MIN_INTENT})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    train = sub.add_parser('train', help='Fit the model on analyzed threads in the database')
+    train.add_argument('--epochs', type=int, default=10)
+
+    ev = sub.add_parser('evaluate', help='Skip and false-negative rates per threshold')
+    ev.add_argument('--thresholds', type=float, nargs='+', default=[0.05, 0.1, 0.2, 0.3, 0.5])
+    ev.add_argument('--keywords', action='store_true', help='Evaluate the keyword scorer even if a model exists')
+
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"no result database at {args.db} (run goldmine_finder.py with --db first)")
+    threads, labels = _load_examples(args.db, args.min_intent)
+    logger.info("%d analyzed threads, %d with %s-intent pain points", len(threads), sum(labels), args.min_intent)
+
+    if args.command == 'train':
+        try:
+            model = HashedLogisticModel().fit(threads, labels, epochs=args.epochs)
+        except ValueError as e:
+            parser.error(str(e))
+        model.save(args.model)
+        logger.info("Saved %s", args.model)
+    else:
+        if not args.keywords and os.path.exists(args.model):
+            score = HashedLogisticModel.load(args.model).predict
+            logger.info("Scorer: model %s (scores on its own training data are optimistic)", args.model)
+        else:
+            score = keyword_score
+            logger.info("Scorer: keywords")
+        print(f"{'threshold':>9}  {'skipped':>8}  {'missed':>8}")
+        for row in evaluate([score(t) for t in threads], labels, args.thresholds):
+            print(f"{row['threshold']:>9.2f}  {row['skip_rate']:>8.1%}  {row['false_negative_rate']:>8.1%}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
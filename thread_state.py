@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Thread State Store
+Remembers what each watched thread looked like when it was last analyzed,
+so repeated sweeps only spend LLM calls on new or growing threads
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Set
+
+import config as cfg
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    subreddit TEXT NOT NULL,
+    num_comments INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    analysis_hash TEXT,
+    analysis TEXT,
+    analyzed_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen_comments (
+    thread_id TEXT NOT NULL,
+    comment_id TEXT NOT NULL,
+    PRIMARY KEY (thread_id, comment_id)
+) WITHOUT ROWID;
+"""
+
+
+def analysis_hash(analysis: Dict[str, Any]) -> str:
+    """Stable fingerprint of an analysis dict"""
+    payload = json.dumps(analysis, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ThreadState:
+    """Last recorded state of one thread"""
+    thread_id: str
+    subreddit: str
+    num_comments: int
+    score: int
+    analysis_hash: Optional[str]
+    analysis: Optional[Dict[str, Any]]
+    analyzed_at: Optional[float]
+
+
+class ThreadStateStore:
+    """SQLite record of watched threads and the comments already analyzed"""
+
+    def __init__(self, path: str | None = None, min_new_comments: int | None = None,
+                 clock=time.time):
+        """
+        Args:
+            path: SQLite file. Defaults to config.THREAD_STATE_PATH.
+            min_new_comments: Comment growth that triggers re-analysis.
+                Defaults to config.WATCH_MIN_NEW_COMMENTS.
+            clock: Wall-clock time source (injectable for tests).
+        """
+        self.path = path or cfg.THREAD_STATE_PATH
+        self.min_new_comments = (min_new_comments if min_new_comments is not None
+                                 else cfg.WATCH_MIN_NEW_COMMENTS)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, thread_id: str) -> Optional[ThreadState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT thread_id, subreddit, num_comments, score, analysis_hash, analysis, analyzed_at "
+                "FROM threads WHERE thread_id = ?", (thread_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return ThreadState(
+            thread_id=row[0], subreddit=row[1], num_comments=row[2], score=row[3],
+            analysis_hash=row[4], analysis=json.loads(row[5]) if row[5] else None,
+            analyzed_at=row[6],
+        )
+
+    def needs_analysis(self, post: Dict[str, Any]) -> bool:
+        """
+        True for threads never analyzed, or whose comment count grew by at
+        least min_new_comments since the last analysis.
+        """
+        state = self.get(post['id'])
+        if state is None or state.analysis is None:
+            return True
+        return (post.get('num_comments') or 0) - state.num_comments >= self.min_new_comments
+
+    def seen_comment_ids(self, thread_id: str) -> Set[str]:
+        """Comment ids already covered by the stored analysis"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT comment_id FROM seen_comments WHERE thread_id = ?", (thread_id,),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def observe(self, post: Dict[str, Any]):
+        """Record a listing sighting (score changes) without touching the analysis"""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO threads (thread_id, subreddit, num_comments, score, updated_at) "
+                "VALUES (?, ?, 0, ?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET score = excluded.score, updated_at = excluded.updated_at",
+                (post['id'], post.get('subreddit') or '', post.get('score') or 0, now),
+            )
+            self._conn.commit()
+
+    def record_analysis(self, thread_id: str, subreddit: str, num_comments: int, score: int,
+                        analysis: Dict[str, Any], comment_ids: Iterable[str]):
+        """Store the (merged) analysis and mark *comment_ids* as analyzed"""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads "
+                "(thread_id, subreddit, num_comments, score, analysis_hash, analysis, analyzed_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, subreddit, num_comments, score, analysis_hash(analysis),
+                 json.dumps(analysis, ensure_ascii=False), now, now),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_comments (thread_id, comment_id) VALUES (?, ?)",
+                ((thread_id, cid) for cid in comment_ids if cid),
+            )
+            self._conn.commit()
+
+    def thread_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
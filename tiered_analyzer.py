@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Tiered AI Analyzer
+Two-tier model routing: a cheap model triages every thread with a short
+prompt, and only likely goldmines are escalated to the full extraction
+prompt on a stronger model
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
+
+import config as cfg
+from ai_analyzer import (AIAnalyzer, AnalysisResult, _cached_tokens, _completion_tokens, _total_tokens,
+                         estimate_cost)
+from llm_cache import AnalysisCache, make_key
+from prompts import TRIAGE_PROMPT_VERSION, triage_messages
+from token_counter import COMMENT_SEPARATOR, format_comment, pack_comments, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TriageResult:
+    """Answer of the triage model for one thread"""
+    likelihood: float
+    pain_point_count: int
+    reason: str
+    comments: int           # comments shown to the triage model
+    tokens_used: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cache_hit: bool = False
+
+
+@dataclass
+class TierStats:
+    """Usage of one tier over a run"""
+    model: str
+    threads: int = 0
+    cache_hits: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+
+    @property
+    def cost(self) -> Optional[float]:
+        """USD per config.MODEL_PRICING (None for unknown models)"""
+        return estimate_cost(self.model, self.input_tokens, self.output_tokens, self.cached_tokens)
+
+
+class TieredAnalyzer(AIAnalyzer):
+    """
+    AIAnalyzer that triages each thread with a cheap model first.
+
+    Threads below the triage thresholds get an empty analysis that records
+    the triage verdict; the rest are analyzed as usual on the full model.
+    Usage, cost and latency are tracked per tier (see tier_stats).
+    """
+
+    def __init__(self, model: str | None = None, triage_model: str | None = None,
+                 api_key: str | None = None, cache: AnalysisCache | None = None,
+                 refresh: bool = False, map_reduce: bool | None = None,
+                 threshold: float | None = None, min_pain_points: int | None = None,
+                 clock=time.monotonic):
+        """
+        Args:
+            model: Full extraction model. Defaults to config.TIER_FULL_MODEL.
+            triage_model: Triage model. Defaults to config.TIER_TRIAGE_MODEL.
+            threshold: Goldmine likelihood (0-1) needed for escalation.
+                Defaults to config.TIER_TRIAGE_THRESHOLD.
+            min_pain_points: Estimated pain points needed for escalation.
+                Defaults to config.TIER_MIN_PAIN_POINTS.
+            clock: Monotonic time source for latency (injectable for tests).
+
+        Other arguments are as for AIAnalyzer.
+        """
+        super().__init__(model=model or cfg.TIER_FULL_MODEL, api_key=api_key, cache=cache,
+                         refresh=refresh, map_reduce=map_reduce)
+        self.triage_model = triage_model or cfg.TIER_TRIAGE_MODEL
+        self.threshold = threshold if threshold is not None else cfg.TIER_TRIAGE_THRESHOLD
+        self.min_pain_points = min_pain_points if min_pain_points is not None else cfg.TIER_MIN_PAIN_POINTS
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.tier_stats = {'triage': TierStats(self.triage_model), 'full': TierStats(self.model)}
+
+    def analyze_thread(self, thread_data: Dict[str, Any],
+                       skip_comment_ids: Collection[str] = ()) -> AnalysisResult:
+        """Triage the thread, then run the full analysis if it is escalated"""
+        comment_texts, comment_ids, total = self._select_comments(thread_data, skip_comment_ids)
+        triage = self._triage_thread(thread_data, comment_texts)
+        if not self.should_escalate(triage):
+            return self._triage_result(thread_data, total, triage)
+
+        start = self._clock()
+        batches, analyzed = self._comment_batches(comment_texts, total)
+        analysis = self._analyze_batches(
+            thread_data.get('title', ''), thread_data.get('selftext', ''), batches,
+        )
+        result = self._build_result(thread_data, total, analysis, analyzed, comment_ids)
+        self._record('full', result.tokens_used, result.completion_tokens, result.cached_tokens,
+                     result.cache_hit, self._clock() - start)
+        return _with_triage_usage(result, triage)
+
+    def analyze_thread_stream(self, thread_data: Dict[str, Any],
+                              skip_comment_ids: Collection[str] = ()) -> Iterator[Tuple[str, Any]]:
+        """AIAnalyzer.analyze_thread_stream behind the triage step"""
+        comment_texts, _, total = self._select_comments(thread_data, skip_comment_ids)
+        triage = self._triage_thread(thread_data, comment_texts)
+        if not self.should_escalate(triage):
+            yield 'result', self._triage_result(thread_data, total, triage)
+            return
+
+        start = self._clock()
+        for kind, value in super().analyze_thread_stream(thread_data, skip_comment_ids):
+            if kind == 'result':
+                self._record('full', value.tokens_used, value.completion_tokens, value.cached_tokens,
+                             value.cache_hit, self._clock() - start)
+                value = _with_triage_usage(value, triage)
+            yield kind, value
+
+    def should_escalate(self, triage: TriageResult) -> bool:
+        return triage.likelihood >= self.threshold and triage.pain_point_count >= self.min_pain_points
+
+    def _triage_thread(self, thread_data: Dict[str, Any], comment_texts: List[str]) -> TriageResult:
+        triage = self.triage(thread_data.get('title', ''), thread_data.get('selftext', ''), comment_texts)
+        verdict = "escalating" if self.should_escalate(triage) else "not escalated"
+        logger.info("Triage %.2f (~%d pain points), %s: %s",
+                    triage.likelihood, triage.pain_point_count, verdict, thread_data.get('title', ''))
+        return triage
+
+    def triage(self, thread_title: str, thread_body: str, comments: List[str]) -> TriageResult:
+        """Ask the triage model how likely the thread is to be a goldmine"""
+        start = self._clock()
+        packed = pack_comments(comments, budget=cfg.TIER_TRIAGE_TOKEN_BUDGET, model=self.triage_model)
+        body = truncate_to_tokens(thread_body or '', cfg.MAX_COMMENT_TOKENS, self.triage_model)
+        comments_text = COMMENT_SEPARATOR.join(
+            format_comment(i + 1, c) for i, c in enumerate(packed.comments)
+        )
+
+        cache_key = None
+        if self.cache:
+            cache_key = make_key(self.triage_model, cfg.TEMPERATURE, TRIAGE_PROMPT_VERSION,
+                                 thread_title, body, packed.comments)
+        cached = self.cache.get(cache_key) if self.cache and not self.refresh else None
+
+        if cached:
+            text, tokens = cached
+            completion_tokens = cached_tokens = 0
+            self._record_usage(self.triage_model, cache_hit=True)
+        else:
+            response = self.client.chat.completions.create(
+                model=self.triage_model,
+                messages=triage_messages(thread_title, body, comments_text),
+                temperature=cfg.TEMPERATURE,
+                response_format={"type": "json_object"},
+                max_tokens=cfg.TIER_TRIAGE_MAX_TOKENS,
+            )
+            text = response.choices[0].message.content.strip()
+            tokens, completion_tokens = _total_tokens(response), _completion_tokens(response)
+            cached_tokens = _cached_tokens(response)
+            self._record_usage(self.triage_model, tokens, completion_tokens, cached_tokens)
+
+        triage = _parse_triage(text, packed.consumed)
+        triage.tokens_used, triage.completion_tokens = tokens, completion_tokens
+        triage.cached_tokens, triage.cache_hit = cached_tokens, bool(cached)
+        if self.cache and not cached and triage.reason != _UNPARSEABLE:
+            self.cache.put(cache_key, text, tokens)
+
+        self._record('triage', tokens, completion_tokens, cached_tokens, bool(cached), self._clock() - start)
+        return triage
+
+    def _triage_result(self, thread_data: Dict[str, Any], total: int, triage: TriageResult) -> AnalysisResult:
+        """Empty analysis recording why the thread was not escalated"""
+        return AnalysisResult(
+            thread_id=thread_data.get('id', ''),
+            thread_title=thread_data.get('title', ''),
+            total_comments=total,
+            pain_points=[],
+            key_insights=[],
+            market_opportunities=[],
+            sentiment_summary=(f"Not escalated by triage (goldmine likelihood {triage.likelihood:.2f}, "
+                               f"~{triage.pain_point_count} pain points): {triage.reason}"),
+            analyzed_comments=triage.comments,
+            tokens_used=triage.tokens_used,
+            completion_tokens=triage.completion_tokens,
+            cached_tokens=triage.cached_tokens,
+            cache_hit=triage.cache_hit,
+        )
+
+    def _record(self, tier: str, tokens: int, completion_tokens: int, cached_tokens: int,
+                cache_hit: bool, seconds: float):
+        with self._lock:
+            stats = self.tier_stats[tier]
+            stats.threads += 1
+            stats.seconds += seconds
+            if cache_hit:
+                stats.cache_hits += 1
+            else:
+                stats.input_tokens += tokens - completion_tokens
+                stats.cached_tokens += cached_tokens
+                stats.output_tokens += completion_tokens
+
+    def log_tier_stats(self):
+        """Log usage, cost and latency per tier for this run"""
+        with self._lock:
+            tiers = [(name, TierStats(**vars(stats))) for name, stats in self.tier_stats.items()]
+        triaged = tiers[0][1].threads
+        if not triaged:
+            return
+        total_cost = 0.0
+        for name, stats in tiers:
+            cost = stats.cost
+            total_cost += cost or 0.0
+            logger.info(
+                "Tier %-6s (%s): %d threads, %d cached, %d in / %d out tokens, %s, %.2fs avg",
+                name, stats.model, stats.threads, stats.cache_hits, stats.input_tokens,
+                stats.output_tokens, "unknown cost" if cost is None else f"${cost:.4f}",
+                stats.seconds / stats.threads if stats.threads else 0.0,
+            )
+        escalated = tiers[1][1].threads
+        logger.info("Tiered routing: %d of %d threads escalated (%.0f%%), ~$%.4f total",
+                    escalated, triaged, 100 * escalated / triaged, total_cost)
+
+
+_UNPARSEABLE = "triage answer could not be parsed"
+
+
+def _parse_triage(text: str, comments: int) -> TriageResult:
+    """
+    TriageResult from the triage model's JSON. Unusable answers escalate
+    (likelihood 1), so a triage failure never hides a goldmine.
+    """
+    try:
+        data = json.loads(text)
+        likelihood = min(max(float(data.get('goldmine_likelihood', 0)), 0.0), 1.0)
+        count = max(int(data.get('pain_point_count', 0)), 0)
+        reason = str(data.get('reason', ''))
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning("Triage returned an unusable answer (%s); escalating", e)
+        return TriageResult(likelihood=1.0, pain_point_count=max(cfg.TIER_MIN_PAIN_POINTS, 1),
+                            reason=_UNPARSEABLE, comments=comments)
+    return TriageResult(likelihood=likelihood, pain_point_count=count, reason=reason, comments=comments)
+
+
+def _with_triage_usage(result: AnalysisResult, triage: TriageResult) -> AnalysisResult:
+    """Add the triage call's tokens to a full analysis, so totals reflect both tiers"""
+    result.tokens_used += triage.tokens_used
+    result.completion_tokens += triage.completion_tokens
+    result.cached_tokens += triage.cached_tokens
+    return result
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Token Counting and Prompt Packing
+Local token counts (tiktoken when installed, calibrated estimate otherwise)
+used to fill prompts up to a token budget instead of a fixed comment count
+"""
+
+import functools
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import config as cfg
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = " …[truncated]"
+COMMENT_SEPARATOR = "\n\n---\n\n"
+
+# Measured against o200k_base on Reddit comments: English averages ~4 chars
+# per token, while CJK text is close to one token per character.
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_TOKENS_PER_CHAR = 1.0
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for *model*, or None when unavailable offline"""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # encoding files missing and no network
+        logger.debug("tiktoken unavailable, using estimator: %s", e)
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Calibrated character-based token estimate"""
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + non_ascii * NON_ASCII_TOKENS_PER_CHAR)
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Token count of *text* for *model* (defaults to config.MODEL)"""
+    encoding = _encoding(model or cfg.MODEL)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str | None = None) -> str:
+    """Shorten *text* to at most *max_tokens*, ending with TRUNCATION_MARKER"""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+
+    room = max(0, max_tokens - count_tokens(TRUNCATION_MARKER, model))
+    # Binary search on character length: works for any tokenizer
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid], model) <= room:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + TRUNCATION_MARKER
+
+
+@dataclass
+class PackedComments:
+    """Comments selected for one prompt"""
+    comments: List[str]  # possibly truncated comment texts, in input order
+    tokens: int          # tokens of the formatted comment block
+    consumed: int        # number of input comments used
+
+
+def format_comment(index: int, text: str) -> str:
+    """How a comment appears in the prompt (1-based index)"""
+    return f"Comment {index}: {text}"
+
+
+def pack_comments(comments: Sequence[str], budget: int | None = None,
+                  max_comment_tokens: int | None = None,
+                  model: str | None = None) -> PackedComments:
+    """
+    Take comments in order until the formatted block would exceed *budget*.
+
+    Comments longer than *max_comment_tokens* are truncated first, so one
+    huge comment cannot crowd out the rest. The first comment is always
+    included (truncated to the budget if needed).
+
+    Args:
+        comments: Comment texts, most important first.
+        budget: Token budget for the comment block. Defaults to config.PROMPT_TOKEN_BUDGET.
+        max_comment_tokens: Per-comment cap. Defaults to config.MAX_COMMENT_TOKENS.
+        model: Tokenizer model. Defaults to config.MODEL.
+    """
+    budget = budget if budget is not None else cfg.PROMPT_TOKEN_BUDGET
+    max_comment_tokens = max_comment_tokens if max_comment_tokens is not None else cfg.MAX_COMMENT_TOKENS
+    separator_tokens = count_tokens(COMMENT_SEPARATOR, model)
+
+    packed: List[str] = []
+    used = 0
+    for text in comments:
+        overhead = count_tokens(format_comment(len(packed) + 1, ""), model)
+        if packed:
+            overhead += separator_tokens
+        limit = max_comment_tokens if packed else min(max_comment_tokens, budget - overhead)
+        text = truncate_to_tokens(text, max(limit, 1), model)
+        tokens = overhead + count_tokens(text, model)
+        if packed and used + tokens > budget:
+            break
+        packed.append(text)
+        used += tokens
+
+    return PackedComments(comments=packed, tokens=used, consumed=len(packed))